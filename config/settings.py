@@ -147,15 +147,22 @@ DATABASES = {
     }
 }
 
-# 为SQLite启用外键约束
+# SQLite 连接参数：WAL、内存映射、页缓存、临时表与锁等待（见 config/sqlite_tuning.py）
+# SQLITE_TUNING=off 可关闭；python manage.py sqlite_maintenance 查看实际生效值
+from config.sqlite_tuning import apply_sqlite_pragmas, sqlite_pragmas_from_env
+SQLITE_PRAGMAS = sqlite_pragmas_from_env()
+
+# 为SQLite启用外键约束并应用连接参数
 from django.db.backends.signals import connection_created
-def enable_sqlite_foreign_keys(sender, connection, **kwargs):
-    """启用SQLite外键约束"""
+def configure_sqlite_connection(sender, connection, **kwargs):
+    """启用SQLite外键约束，并按 SQLITE_PRAGMAS 设置连接参数"""
     if connection.vendor == 'sqlite':
-        cursor = connection.cursor()
-        cursor.execute('PRAGMA foreign_keys = ON;')
+        from django.conf import settings as django_settings
+        with connection.cursor() as cursor:
+            cursor.execute('PRAGMA foreign_keys = ON;')
+            apply_sqlite_pragmas(cursor, getattr(django_settings, 'SQLITE_PRAGMAS', {}))
 
-connection_created.connect(enable_sqlite_foreign_keys)
+connection_created.connect(configure_sqlite_connection)
 
 # Password validation
 AUTH_PASSWORD_VALIDATORS = [
@@ -245,6 +252,19 @@ CACHES = {
             'MAX_ENTRIES': 5000,
         }
     },
+    # 统计缓存：缓存代数（cachegen:*）及依赖代数的统计/首页/筛选选项缓存
+    # 必须跨进程共享——多个 Web 工作进程与管理命令都会递增代数，
+    # 若放在进程内的 LocMemCache 中，其他进程看不到递增，会按旧代数返回长达数小时的旧数据。
+    # 生产环境使用 Redis 时可将本别名指向同一 Redis。
+    'statistics': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': BASE_DIR / 'cache' / 'statistics',
+        'TIMEOUT': 300,
+        'OPTIONS': {
+            'MAX_ENTRIES': 5000,
+        },
+        'KEY_PREFIX': 'taizhang',
+    },
     # Dummy缓存（测试环境）
     'dummy': {
         'BACKEND': 'django.core.cache.backends.dummy.DummyCache',
@@ -276,6 +296,25 @@ RQ_QUEUES = {
     },
 }
 
+# 后台导出任务（多项目导出ZIP）：产物目录与保留时长
+# 未配置可用的 Redis 时，导出任务退回进程内后台线程执行
+EXPORT_JOB_ROOT = BASE_DIR / 'data' / 'exports'
+EXPORT_JOB_RETENTION_HOURS = int(os.environ.get('EXPORT_JOB_RETENTION_HOURS', '24'))
+
+# 数据库备份（SQLite 在线备份）：产物目录、压缩方式（none/gzip/zstd，zstd 需安装 zstandard）
+# 与定时备份保留份数（python manage.py backup_database 由计划任务调用，手动备份不参与清理）
+DATABASE_BACKUP_ROOT = BASE_DIR / 'backups' / 'database'
+DATABASE_BACKUP_COMPRESSION = os.environ.get('DATABASE_BACKUP_COMPRESSION', 'gzip')
+DATABASE_BACKUP_KEEP = int(os.environ.get('DATABASE_BACKUP_KEEP', '7'))
+
+# 操作日志写入：thread=后台线程批量写入（默认），rq=攒批后投递到 django-rq，sync=请求内立即写入
+# 测试中需要断言日志时用 override_settings(OPERATION_LOG_SINK='sync')，写入器随设置变化重建
+OPERATION_LOG_SINK = os.environ.get('OPERATION_LOG_SINK', 'thread')
+OPERATION_LOG_BATCH_SIZE = 50           # 每批最多写入条数
+OPERATION_LOG_FLUSH_INTERVAL_MS = 500   # 未攒满一批时的最长等待时间（毫秒）
+OPERATION_LOG_MAX_BUFFER = 5000         # 缓冲区上限，超出后丢弃并计数
+OPERATION_LOG_RQ_QUEUE = 'low'
+
 # Redis配置示例（生产环境使用）
 # 需要安装: pip install django-redis redis
 """
@@ -332,6 +371,8 @@ PDF_IMPORT_CONFIG = {
     'ENABLE_ASYNC': False,  # 是否启用异步处理（需要Celery）
     'SESSION_EXPIRY_HOURS': 24,  # 会话默认过期时间（小时）
     'DRAFT_EXPIRY_HOURS': 72,  # 草稿过期时间（小时）
+    'EXTRACT_WORKERS': None,  # 并行提取的工作进程数，None 表示按CPU核数（最多4个）
+    'PERSIST_PARSE_CACHE': False,  # 是否将PDF解析结果持久化到会话上传目录（重新提取时免解析）
 }
 
 # ============================================================================
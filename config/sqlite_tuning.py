@@ -0,0 +1,55 @@
+"""
+SQLite 连接参数（PRAGMA）配置
+
+每个新建的数据库连接都会按 SQLITE_PRAGMAS 依次执行 PRAGMA（见 settings 中的 connection_created 钩子）：
+- journal_mode=WAL：读写互不阻塞，导入期间的统计查询不再报 "database is locked"；
+- synchronous=NORMAL：WAL 模式下只在检查点同步磁盘，断电最多丢失最近的事务，不会损坏数据库；
+- mmap_size / cache_size：内存映射读取与更大的页缓存，减少统计查询的页缓存未命中；
+- temp_store=MEMORY：排序、分组的临时表放在内存中；
+- busy_timeout：遇到写锁时等待而不是立即报错（毫秒，与 OPTIONS['timeout'] 保持一致）。
+busy_timeout 排在最前，切换 journal_mode 时如遇锁也会等待。
+本模块不依赖 Django，settings、管理命令与 scripts/benchmark_sqlite_pragmas.py 共用。
+"""
+import os
+
+DEFAULT_SQLITE_PRAGMAS = {
+    'busy_timeout': 20000,
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',
+    'mmap_size': 256 * 1024 * 1024,  # 256MB
+    'cache_size': -64000,            # 负数单位为 KiB，约 64MB
+    'temp_store': 'MEMORY',
+}
+
+# 环境变量 -> PRAGMA 名称
+_ENV_OVERRIDES = {
+    'SQLITE_BUSY_TIMEOUT_MS': 'busy_timeout',
+    'SQLITE_JOURNAL_MODE': 'journal_mode',
+    'SQLITE_SYNCHRONOUS': 'synchronous',
+    'SQLITE_MMAP_SIZE': 'mmap_size',
+    'SQLITE_CACHE_SIZE': 'cache_size',
+    'SQLITE_TEMP_STORE': 'temp_store',
+}
+
+
+def sqlite_pragmas_from_env(environ=None) -> dict:
+    """
+    按环境变量生成 PRAGMA 配置
+
+    SQLITE_TUNING=off 时返回空配置（保持 SQLite 默认值）；单项可用 SQLITE_MMAP_SIZE 等变量覆盖。
+    """
+    environ = os.environ if environ is None else environ
+    if environ.get('SQLITE_TUNING', 'on').lower() in ('off', '0', 'false'):
+        return {}
+    pragmas = dict(DEFAULT_SQLITE_PRAGMAS)
+    for env_name, pragma in _ENV_OVERRIDES.items():
+        value = environ.get(env_name)
+        if value:
+            pragmas[pragma] = int(value) if value.lstrip('-').isdigit() else value
+    return pragmas
+
+
+def apply_sqlite_pragmas(cursor, pragmas: dict) -> None:
+    """在连接上依次执行 PRAGMA（cursor 可为 DB-API 游标或 sqlite3.Connection）"""
+    for name, value in pragmas.items():
+        cursor.execute(f'PRAGMA {name} = {value}')
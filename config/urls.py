@@ -36,6 +36,7 @@ urlpatterns = [
     path('payment/<str:payment_code>/', views.payment_detail, name='payment_detail'),
     path('database/management/', views.database_management, name='database_management'),
     path('database/restore-no-auth/', views.restore_database_no_auth, name='restore_database_no_auth'),
+    path('database/backup/jobs/<str:job_id>/', views.database_backup_status, name='database_backup_status'),
     
     # 监控与报表路由
     path('monitoring/cockpit/', views.monitoring_cockpit, name='monitoring_cockpit'),
@@ -84,6 +85,8 @@ urlpatterns = [
 
     # 数据导出/导入API
     path('api/export/project-data/', views.export_project_data, name='export_project_data'),
+    path('api/export/jobs/<int:job_id>/', views.export_job_status, name='export_job_status'),
+    path('api/export/jobs/<int:job_id>/download/', views.export_job_download, name='export_job_download'),
     path('api/import/project-data/', views.import_project_data, name='import_project_data'),
     
     # 前端编辑API
@@ -4,4 +4,8 @@ from django.apps import AppConfig
 class ContractConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'contract'
-    verbose_name = '合同管理'
\ No newline at end of file
+    verbose_name = '合同管理'
+    
+    def ready(self):
+        """应用启动时注册信号"""
+        import contract.signals  # noqa: F401
@@ -0,0 +1,34 @@
+"""
+重建合同财务汇总表（ContractFinancialSummary）
+
+用途：
+1. 批量导入、直接改库等绕过信号的操作后修复汇总数据
+2. 定期校准
+
+使用方法：
+    python manage.py rebuild_contract_rollups                      # 全量重建
+    python manage.py rebuild_contract_rollups --contract=HT2025001  # 只重算指定合同（可重复）
+"""
+from django.core.management.base import BaseCommand
+
+from contract.models import ContractFinancialSummary
+
+
+class Command(BaseCommand):
+    help = '重建合同财务汇总表（累计付款、补充协议金额、结算价、付款比例）'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--contract',
+            action='append',
+            dest='contracts',
+            help='只重算指定合同编号，可重复指定',
+        )
+
+    def handle(self, *args, **options):
+        contracts = options.get('contracts')
+        if contracts:
+            count = ContractFinancialSummary.objects.refresh(contracts)
+        else:
+            count = ContractFinancialSummary.objects.rebuild()
+        self.stdout.write(self.style.SUCCESS(f'已重建 {count} 个合同的财务汇总'))
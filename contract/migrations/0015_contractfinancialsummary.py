@@ -0,0 +1,52 @@
+# Generated by Django 5.2.7 on 2026-10-16 20:10
+
+import contract.models
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def build_financial_summaries(apps, schema_editor):
+    """按现有付款、结算、补充协议数据生成汇总行"""
+    ContractFinancialSummary = apps.get_model('contract', 'ContractFinancialSummary')
+    ContractFinancialSummary.objects.rebuild()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('contract', '0014_contract_is_from_weekly_report_and_more'),
+        ('payment', '0010_alter_payment_created_at_and_more'),
+        ('settlement', '0005_alter_settlement_created_at_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ContractFinancialSummary',
+            fields=[
+                ('contract', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='financial_summary', serialize=False, to='contract.contract', verbose_name='合同')),
+                ('total_paid_amount', models.DecimalField(decimal_places=2, default=0, max_digits=18, verbose_name='累计付款金额(元)')),
+                ('payment_count', models.PositiveIntegerField(default=0, verbose_name='付款笔数')),
+                ('has_settled_payment', models.BooleanField(default=False, verbose_name='有已结算付款')),
+                ('supplements_total', models.DecimalField(decimal_places=2, default=0, max_digits=18, verbose_name='补充协议金额合计(元)')),
+                ('supplement_count', models.PositiveIntegerField(default=0, verbose_name='补充协议数量')),
+                ('contract_total_amount', models.DecimalField(decimal_places=2, default=0, help_text='主合同为合同价+补充协议金额，其他合同为自身合同价', max_digits=18, verbose_name='合同总额(元)')),
+                ('settlement_final_amount', models.DecimalField(blank=True, decimal_places=2, max_digits=18, null=True, verbose_name='结算记录结算价(元)')),
+                ('settlement_payment_amount', models.DecimalField(blank=True, decimal_places=2, help_text='最近一笔已结算付款记录上的结算价', max_digits=18, null=True, verbose_name='付款记录结算价(元)')),
+                ('settlement_amount', models.DecimalField(blank=True, decimal_places=2, help_text='优先取结算记录，其次取付款记录上的结算价', max_digits=18, null=True, verbose_name='有效结算价(元)')),
+                ('settlement_completion_date', models.DateField(blank=True, null=True, verbose_name='结算完成时间')),
+                ('has_settlement', models.BooleanField(default=False, verbose_name='已结算')),
+                ('base_amount', models.DecimalField(decimal_places=2, default=0, max_digits=18, verbose_name='付款比例基数(元)')),
+                ('payment_ratio', models.DecimalField(decimal_places=2, default=0, max_digits=20, verbose_name='付款比例(%)')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='汇总时间')),
+            ],
+            options={
+                'verbose_name': '合同财务汇总',
+                'verbose_name_plural': '合同财务汇总',
+                'indexes': [models.Index(fields=['payment_ratio'], name='contract_co_payment_47ca1d_idx')],
+            },
+            managers=[
+                ('objects', contract.models.ContractFinancialSummaryManager()),
+            ],
+        ),
+        migrations.RunPython(build_financial_summaries, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 5.2.7 on 2026-10-16 20:42
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('contract', '0015_contractfinancialsummary'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='contract',
+            index=models.Index(fields=['project', 'signing_date', 'contract_officer'], name='contract_co_project_758396_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='contract',
+            index=models.Index(fields=['signing_date', 'contract_officer'], name='contract_co_signing_9113b9_idx'),
+        ),
+    ]
@@ -2,12 +2,14 @@
 合同管理模块 - 数据模型
 """
 from typing import TYPE_CHECKING
-from django.db import models
+from django.db import models, transaction
+from django.db.models import Count, Q, Sum
 from django.core.exceptions import ValidationError
 from procurement.models import BaseModel
 from project.validators import validate_code_field, validate_and_clean_code
 from project.enums import FilePositioning, ContractSource, ProcurementCategory, get_enum_choices
 from project.helptext import get_help_text
+from project.services.shared.utils import in_query_batches
 
 if TYPE_CHECKING:
     from django.db.models import QuerySet
@@ -258,6 +260,9 @@ class Contract(BaseModel):
             models.Index(fields=['contract_officer']),
             models.Index(fields=['archive_date']),
             models.Index(fields=['project', 'contract_officer']),
+            # 年度区间筛选（项目 + 签订日期 + 经办人），覆盖按经办人/项目分组的统计
+            models.Index(fields=['project', 'signing_date', 'contract_officer']),
+            models.Index(fields=['signing_date', 'contract_officer']),
         ]
     
     def __str__(self):
@@ -351,16 +356,21 @@ class Contract(BaseModel):
             raise ValidationError(errors)
     
     
+    def get_financial_summary(self) -> 'ContractFinancialSummary':
+        """获取合同财务汇总（汇总行缺失时即时重算）"""
+        try:
+            return self.financial_summary  # type: ignore[attr-defined]
+        except ContractFinancialSummary.DoesNotExist:
+            ContractFinancialSummary.objects.refresh([self.pk])
+            return ContractFinancialSummary.objects.get(pk=self.pk)
+    
     def get_total_paid_amount(self):
         """获取累计付款金额"""
-        from django.db.models import Sum
-        # type: ignore 用于解决反向关系的类型检查问题
-        total = self.payments.aggregate(total=Sum('payment_amount'))['total'] or 0  # type: ignore[attr-defined]
-        return total
+        return self.get_financial_summary().total_paid_amount
     
     def get_payment_count(self):
         """获取付款笔数"""
-        return self.payments.count()  # type: ignore[attr-defined]
+        return self.get_financial_summary().payment_count
     
     def get_payment_ratio(self):
         """
@@ -369,33 +379,12 @@ class Contract(BaseModel):
         - 如果有结算价, 使用结算价作为分母
         - 否则使用(合同价 + 补充协议金额)作为分母
         """
-        from django.db.models import Sum
-        
-        total_paid = self.get_total_paid_amount()
+        summary = self.get_financial_summary()
+        total_paid = summary.total_paid_amount
         
-        # 获取基准金额(分母)
-        base_amount = 0
-        
-        # 如果是主合同，检查是否有结算
         if self.file_positioning == FilePositioning.MAIN_CONTRACT.value:
-            try:
-                if hasattr(self, 'settlement') and self.settlement and self.settlement.final_amount:  # type: ignore[attr-defined]
-                    # 有结算价，使用结算价
-                    base_amount = self.settlement.final_amount  # type: ignore[attr-defined]
-                else:
-                    # 没有结算价，使用合同价 + 补充协议金额
-                    base_amount = self.contract_amount or 0
-                    supplements_total = self.supplements.aggregate(  # type: ignore[attr-defined]
-                        total=Sum('contract_amount')
-                    )['total'] or 0
-                    base_amount += supplements_total
-            except:
-                # 如果获取settlement失败，使用合同价 + 补充协议金额
-                base_amount = self.contract_amount or 0
-                supplements_total = self.supplements.aggregate(  # type: ignore[attr-defined]
-                    total=Sum('contract_amount')
-                )['total'] or 0
-                base_amount += supplements_total
+            # 主合同：有结算价时使用结算价，否则使用合同价 + 补充协议金额
+            base_amount = summary.settlement_final_amount or summary.contract_total_amount
         else:
             # 补充协议或解除协议，使用自身合同价
             base_amount = self.contract_amount or 0
@@ -407,16 +396,214 @@ class Contract(BaseModel):
     
     def get_contract_with_supplements_amount(self):
         """获取主合同+补充协议的总金额"""
-        from django.db.models import Sum
-        
         if self.file_positioning == FilePositioning.MAIN_CONTRACT.value:
-            total = self.contract_amount or 0
-            supplements_total = self.supplements.aggregate(  # type: ignore[attr-defined]
-                total=Sum('contract_amount')
-            )['total'] or 0
-            return total + supplements_total
+            return self.get_financial_summary().contract_total_amount
         else:
             # 如果不是主合同，返回父合同的总金额
             if self.parent_contract:
                 return self.parent_contract.get_contract_with_supplements_amount()
-            return self.contract_amount or 0
\ No newline at end of file
+            return self.contract_amount or 0
+
+
+ROLLUP_DECIMAL = {'max_digits': 18, 'decimal_places': 2}
+
+
+class ContractFinancialSummaryQuerySet(models.QuerySet):
+    """合同财务汇总查询集 - 按合同集合批量重算汇总行"""
+
+    def _related_models(self):
+        apps = self.model._meta.apps
+        return (
+            apps.get_model('contract', 'Contract'),
+            apps.get_model('payment', 'Payment'),
+            apps.get_model('settlement', 'Settlement'),
+        )
+
+    def refresh(self, contract_codes):
+        """
+        重算指定合同的汇总行（不存在的合同跳过），返回写入的行数
+
+        每批合同固定5次分组查询 + 1次批量写入（INSERT ... ON CONFLICT DO UPDATE），
+        计算规则与合同列表页原先的子查询一致。
+        """
+        return sum(self._refresh_batch(batch) for batch in in_query_batches(contract_codes))
+
+    def rebuild(self):
+        """全量重建：删除全部汇总行后按所有合同重算，返回写入的行数"""
+        Contract = self._related_models()[0]
+        with transaction.atomic(using=self.db):
+            self.all().delete()
+            return self.refresh(Contract.objects.order_by().values_list('pk', flat=True))
+
+    def _refresh_batch(self, codes):
+        from decimal import Decimal
+
+        Contract, Payment, Settlement = self._related_models()
+        zero = Decimal('0')
+
+        contracts = Contract.objects.filter(pk__in=codes).order_by().values_list(
+            'pk', 'file_positioning', 'contract_amount'
+        )
+
+        payments = {
+            row['contract_id']: row
+            for row in Payment.objects.filter(contract_id__in=codes).order_by()
+            .values('contract_id')
+            .annotate(
+                total=Sum('payment_amount'),
+                count=Count('pk'),
+                settled=Count('pk', filter=Q(is_settled=True)),
+            )
+        }
+
+        supplements = {
+            row['parent_contract_id']: row
+            for row in Contract.objects.filter(parent_contract_id__in=codes).order_by()
+            .values('parent_contract_id')
+            .annotate(total=Sum('contract_amount'), count=Count('pk'))
+        }
+
+        settlements = {
+            main_contract_id: (final_amount, completion_date)
+            for main_contract_id, final_amount, completion_date in
+            Settlement.objects.filter(main_contract_id__in=codes).order_by()
+            .values_list('main_contract_id', 'final_amount', 'completion_date')
+        }
+
+        # 已结算付款：每个合同取最近一笔的结算价与最晚的结算完成时间
+        settlement_payment_amounts = {}
+        settlement_payment_dates = {}
+        settled_payments = Payment.objects.filter(contract_id__in=codes, is_settled=True).order_by(
+            'contract_id', '-payment_date'
+        ).values_list('contract_id', 'settlement_amount', 'settlement_completion_date')
+        for contract_id, settlement_amount, completion_date in settled_payments:
+            if settlement_amount is not None:
+                settlement_payment_amounts.setdefault(contract_id, settlement_amount)
+            if completion_date is not None:
+                current = settlement_payment_dates.get(contract_id)
+                if current is None or completion_date > current:
+                    settlement_payment_dates[contract_id] = completion_date
+
+        summaries = []
+        for code, file_positioning, contract_amount in contracts:
+            paid = payments.get(code, {})
+            supplement = supplements.get(code, {})
+            final_amount, record_completion_date = settlements.get(code, (None, None))
+            is_main = file_positioning == FilePositioning.MAIN_CONTRACT.value
+
+            summary = self.model(
+                contract_id=code,
+                total_paid_amount=paid.get('total') or zero,
+                payment_count=paid.get('count', 0),
+                has_settled_payment=bool(paid.get('settled')),
+                supplements_total=supplement.get('total') or zero,
+                supplement_count=supplement.get('count', 0),
+                settlement_final_amount=final_amount,
+                settlement_payment_amount=settlement_payment_amounts.get(code),
+                settlement_completion_date=record_completion_date or settlement_payment_dates.get(code),
+                has_settlement=code in settlements or bool(paid.get('settled')),
+            )
+            summary.contract_total_amount = (
+                (contract_amount or zero) + summary.supplements_total if is_main else contract_amount or zero
+            )
+            summary.settlement_amount = (
+                final_amount if final_amount is not None else summary.settlement_payment_amount
+            )
+            # 付款比例分母：主合同有结算价用结算价，否则用合同价+补充协议；其他合同用自身合同价
+            if is_main:
+                base_amount = (
+                    summary.settlement_amount if summary.settlement_amount is not None
+                    else summary.contract_total_amount
+                )
+            else:
+                base_amount = contract_amount or zero
+            summary.base_amount = base_amount
+            summary.payment_ratio = (
+                (summary.total_paid_amount * 100 / base_amount).quantize(Decimal('0.01'))
+                if base_amount > 0 else zero
+            )
+            summaries.append(summary)
+
+        if summaries:
+            self.bulk_create(
+                summaries,
+                update_conflicts=True,
+                unique_fields=['contract'],
+                update_fields=[field.name for field in self.model._meta.concrete_fields
+                               if not field.primary_key],
+            )
+        return len(summaries)
+
+
+class ContractFinancialSummaryManager(models.Manager.from_queryset(ContractFinancialSummaryQuerySet)):
+    use_in_migrations = True
+
+
+class ContractFinancialSummary(models.Model):
+    """
+    合同财务汇总 - 每个合同一行的物化汇总
+
+    由付款、结算、补充协议及合同自身的保存/删除信号增量维护（见 contract/signals.py），
+    不触发信号的批量写入需调用 refresh_contract_rollups。
+    """
+
+    contract = models.OneToOneField(
+        Contract,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='financial_summary',
+        verbose_name='合同'
+    )
+
+    total_paid_amount = models.DecimalField('累计付款金额(元)', default=0, **ROLLUP_DECIMAL)
+    payment_count = models.PositiveIntegerField('付款笔数', default=0)
+    has_settled_payment = models.BooleanField('有已结算付款', default=False)
+
+    supplements_total = models.DecimalField('补充协议金额合计(元)', default=0, **ROLLUP_DECIMAL)
+    supplement_count = models.PositiveIntegerField('补充协议数量', default=0)
+    contract_total_amount = models.DecimalField(
+        '合同总额(元)',
+        default=0,
+        help_text='主合同为合同价+补充协议金额，其他合同为自身合同价',
+        **ROLLUP_DECIMAL
+    )
+
+    settlement_final_amount = models.DecimalField('结算记录结算价(元)', null=True, blank=True, **ROLLUP_DECIMAL)
+    settlement_payment_amount = models.DecimalField(
+        '付款记录结算价(元)',
+        null=True,
+        blank=True,
+        help_text='最近一笔已结算付款记录上的结算价',
+        **ROLLUP_DECIMAL
+    )
+    settlement_amount = models.DecimalField(
+        '有效结算价(元)',
+        null=True,
+        blank=True,
+        help_text='优先取结算记录，其次取付款记录上的结算价',
+        **ROLLUP_DECIMAL
+    )
+    settlement_completion_date = models.DateField('结算完成时间', null=True, blank=True)
+    has_settlement = models.BooleanField('已结算', default=False)
+
+    base_amount = models.DecimalField('付款比例基数(元)', default=0, **ROLLUP_DECIMAL)
+    payment_ratio = models.DecimalField('付款比例(%)', max_digits=20, decimal_places=2, default=0)
+
+    updated_at = models.DateTimeField('汇总时间', auto_now=True)
+
+    objects = ContractFinancialSummaryManager()
+
+    class Meta:
+        verbose_name = '合同财务汇总'
+        verbose_name_plural = '合同财务汇总'
+        indexes = [
+            models.Index(fields=['payment_ratio']),
+        ]
+
+    def __str__(self):
+        return f"{self.contract_id} 财务汇总"
+
+
+def refresh_contract_rollups(contract_codes):
+    """重算指定合同的财务汇总行，供不触发信号的批量操作显式调用"""
+    return ContractFinancialSummary.objects.refresh(contract_codes)
@@ -0,0 +1,71 @@
+"""
+合同管理模块 - 信号处理器
+
+付款、结算、合同（含补充协议）保存或删除时增量重算受影响合同的财务汇总行
+（ContractFinancialSummary），汇总与业务数据在同一事务内写入。
+"""
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+# 结算保存/删除时 payment.signals 会批量同步付款记录上的结算信息，
+# 先导入以保证其处理器先于汇总重算执行
+import payment.signals  # noqa: F401
+
+from contract.models import refresh_contract_rollups
+
+
+def _remember_previous_contract(sender, instance, field_name):
+    """记录修改前的关联合同，记录改挂到其他合同时同时重算原合同"""
+    if instance._state.adding:
+        return
+    instance._previous_rollup_contract = (
+        sender._default_manager.filter(pk=instance.pk).values_list(field_name, flat=True).first()
+    )
+
+
+@receiver(pre_save, sender='payment.Payment', dispatch_uid='rollup_pre_save_payment')
+def remember_payment_contract(sender, instance, **kwargs):
+    _remember_previous_contract(sender, instance, 'contract_id')
+
+
+@receiver(post_save, sender='payment.Payment', dispatch_uid='rollup_post_save_payment')
+@receiver(post_delete, sender='payment.Payment', dispatch_uid='rollup_post_delete_payment')
+def refresh_payment_rollup(sender, instance, **kwargs):
+    refresh_contract_rollups({instance.contract_id, getattr(instance, '_previous_rollup_contract', None)})
+
+
+@receiver(pre_save, sender='settlement.Settlement', dispatch_uid='rollup_pre_save_settlement')
+def remember_settlement_contract(sender, instance, **kwargs):
+    _remember_previous_contract(sender, instance, 'main_contract_id')
+
+
+@receiver(post_save, sender='settlement.Settlement', dispatch_uid='rollup_post_save_settlement')
+@receiver(post_delete, sender='settlement.Settlement', dispatch_uid='rollup_post_delete_settlement')
+def refresh_settlement_rollup(sender, instance, **kwargs):
+    from contract.models import Contract
+
+    main_codes = {instance.main_contract_id, getattr(instance, '_previous_rollup_contract', None)} - {None}
+    # 结算信息同步到了主合同及其补充协议的付款记录，补充协议的汇总一并重算
+    supplement_codes = Contract.objects.filter(parent_contract_id__in=main_codes).values_list('pk', flat=True)
+    refresh_contract_rollups(main_codes | set(supplement_codes))
+
+
+@receiver(pre_save, sender='contract.Contract', dispatch_uid='rollup_pre_save_contract')
+def remember_parent_contract(sender, instance, **kwargs):
+    _remember_previous_contract(sender, instance, 'parent_contract_id')
+
+
+@receiver(post_save, sender='contract.Contract', dispatch_uid='rollup_post_save_contract')
+def refresh_contract_rollup(sender, instance, **kwargs):
+    """合同自身金额影响其付款比例，补充协议金额影响主合同总额"""
+    refresh_contract_rollups({
+        instance.pk,
+        instance.parent_contract_id,
+        getattr(instance, '_previous_rollup_contract', None),
+    })
+
+
+@receiver(post_delete, sender='contract.Contract', dispatch_uid='rollup_post_delete_contract')
+def refresh_parent_rollup(sender, instance, **kwargs):
+    """合同自身的汇总行随合同级联删除，只需重算主合同"""
+    refresh_contract_rollups({instance.parent_contract_id})
@@ -13,8 +13,10 @@
 """
 from django.core.management.base import BaseCommand
 from django.db import transaction
+from contract.models import refresh_contract_rollups
 from settlement.models import Settlement
 from payment.models import Payment
+from project.signals import invalidate_statistics_cache
 
 
 class Command(BaseCommand):
@@ -118,6 +120,9 @@ class Command(BaseCommand):
                         settlement_archive_date=settlement.created_at.date() if settlement.created_at else None,
                         settlement_amount=settlement.final_amount
                     )
+                    # update 不触发信号，显式重算合同财务汇总并使统计缓存失效
+                    refresh_contract_rollups(contract_codes)
+                    invalidate_statistics_cache({main_contract.project_id})
                     
                     self.stdout.write(
                         self.style.SUCCESS(
@@ -0,0 +1,17 @@
+# Generated by Django 5.2.7 on 2026-10-16 20:42
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('payment', '0010_alter_payment_created_at_and_more'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='payment',
+            index=models.Index(fields=['contract', 'payment_date'], name='payment_pay_contrac_b30249_idx'),
+        ),
+    ]
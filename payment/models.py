@@ -1,12 +1,96 @@
 """
 付款管理模块 - 数据模型
 """
-from django.db import models
+from bisect import bisect_right, insort
+from collections import Counter, defaultdict
+
+from django.db import models, transaction
 from django.core.exceptions import ValidationError
 from django.utils import timezone
 from procurement.models import BaseModel
 from project.validators import validate_code_field, validate_and_clean_code
 from project.helptext import get_help_text
+from project.signals import invalidate_statistics_cache
+
+
+def _contract_identifier(contract):
+    """付款编号前缀：优先使用合同序号，否则使用合同编号"""
+    return contract.contract_sequence or contract.contract_code
+
+
+class PaymentQuerySet(models.QuerySet):
+    """付款查询集 - 提供按合同批量分配编号与批量创建"""
+
+    def allocate_codes(self, payments):
+        """
+        为一批新付款分配编号（仅处理 payment_code 为空的对象）
+
+        每个合同的已有付款日期只查询一次（单条有序查询），
+        之后按传入顺序二分定位序号，结果与逐条 save() 生成的编号一致：
+        序号 = 同合同中付款日期早于或等于本笔的已有付款数 + 1。
+        """
+        payments = list(payments)
+        for payment in payments:
+            if payment.payment_code:
+                continue
+            if not payment.contract_id:
+                raise ValidationError('生成付款编号需要关联合同')
+            if not payment.payment_date:
+                raise ValidationError('生成付款编号需要提供付款日期')
+
+        contract_ids = {payment.contract_id for payment in payments if payment.contract_id}
+        dates_by_contract = defaultdict(list)
+        existing = self.model.objects.filter(
+            contract_id__in=contract_ids
+        ).order_by('contract_id', 'payment_date').values_list('contract_id', 'payment_date')
+        for contract_id, payment_date in existing:
+            dates_by_contract[contract_id].append(payment_date)
+
+        for payment in payments:
+            dates = dates_by_contract[payment.contract_id]
+            if not payment.payment_code:
+                sequence = bisect_right(dates, payment.payment_date) + 1
+                payment.payment_code = f"{_contract_identifier(payment.contract)}-FK-{sequence:03d}"
+            # 本批次中已编号的付款同样计入后续付款的序号
+            insort(dates, payment.payment_date)
+
+        return payments
+
+    def bulk_create_with_codes(self, payments, batch_size=None):
+        """
+        批量创建付款并自动分配编号
+
+        与逐条 save() 相同：清洗字符串字段、执行字段校验；
+        编号与已有记录或本批次内重复时抛出 ValidationError，不写入任何数据。
+        bulk_create 不触发信号，创建后显式使统计缓存失效并重算合同财务汇总与更新事件。
+        """
+        from contract.models import refresh_contract_rollups
+        from project.models_update_event import refresh_update_events
+
+        payments = list(payments)
+        if not payments:
+            return []
+
+        for payment in payments:
+            payment._clean_string_fields()
+        self.allocate_codes(payments)
+
+        codes = [payment.payment_code for payment in payments]
+        duplicates = {code for code, count in Counter(codes).items() if count > 1}
+        duplicates.update(self.model.objects.filter(pk__in=codes).order_by().values_list('pk', flat=True))
+        if duplicates:
+            raise ValidationError(f"付款编号已存在: {', '.join(sorted(duplicates))}")
+
+        for payment in payments:
+            # 关联合同由调用方提供实例，跳过逐条外键查询
+            payment.full_clean(exclude=['contract'], validate_unique=False, validate_constraints=False)
+
+        with transaction.atomic():
+            created = self.bulk_create(payments, batch_size=batch_size)
+            invalidate_statistics_cache({payment.contract.project_id for payment in payments})
+            refresh_contract_rollups({payment.contract_id for payment in payments})
+            refresh_update_events('payment', codes)
+        return created
 
 
 class Payment(BaseModel):
@@ -75,6 +159,8 @@ class Payment(BaseModel):
         help_text=get_help_text('payment', 'settlement_completion_date')
     )
     
+    objects = PaymentQuerySet.as_manager()
+
     class Meta:
         verbose_name = '付款信息'
         verbose_name_plural = '付款信息'
@@ -83,6 +169,8 @@ class Payment(BaseModel):
             models.Index(fields=['payment_code']),
             models.Index(fields=['contract']),
             models.Index(fields=['payment_date']),
+            # 合同 + 付款日期：按合同汇总年度付款
+            models.Index(fields=['contract', 'payment_date']),
         ]
     
     def __str__(self):
@@ -109,26 +197,18 @@ class Payment(BaseModel):
             raise ValidationError('生成付款编号需要提供付款日期')
         
         # 使用合同序号，如果没有则使用合同编号
-        contract_identifier = self.contract.contract_sequence or self.contract.contract_code
-        
-        # 查询该合同下所有付款记录，按付款日期排序
-        existing_payments = Payment.objects.filter(
-            contract=self.contract
-        ).order_by('payment_date', 'created_at')
+        contract_identifier = _contract_identifier(self.contract)
 
-        # 计算当前付款在按日期排序后的序号
-        sequence = 1
+        # 统计按付款日期排序后位于当前付款之前的记录数（同一天按创建时间排序）
         reference_created = self.created_at if self.pk else timezone.now()
-        for payment in existing_payments:
-            # 如果是更新操作且是当前记录，跳过
-            if self.pk and payment.pk == self.pk:
-                continue
-            # 如果现有付款日期早于或等于当前付款日期，序号+1
-            if payment.payment_date < self.payment_date:
-                sequence += 1
-            elif payment.payment_date == self.payment_date and payment.created_at < reference_created:
-                # 同一天的付款，按创建时间排序
-                sequence += 1
+        earlier = Payment.objects.filter(contract=self.contract).filter(
+            models.Q(payment_date__lt=self.payment_date)
+            | models.Q(payment_date=self.payment_date, created_at__lt=reference_created)
+        )
+        if self.pk:
+            # 如果是更新操作，排除当前记录
+            earlier = earlier.exclude(pk=self.pk)
+        sequence = earlier.count() + 1
 
         return f"{contract_identifier}-FK-{sequence:03d}"
     
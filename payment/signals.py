@@ -58,6 +58,7 @@ def sync_settlement_to_payments(sender, instance, created, **kwargs):
         return
     
     # 批量更新付款记录的结算信息
+    # update 不触发付款信号；统计缓存由本次结算保存的信号按同一项目失效（见 project/signals.py）
     update_count = related_payments.update(
         is_settled=True,
         settlement_completion_date=instance.completion_date,
@@ -103,6 +104,7 @@ def clear_settlement_from_payments(sender, instance, **kwargs):
         contract_codes.extend(supplement_codes)
         
         # 如果没有其他结算记录，清除付款记录的结算信息
+        # update 不触发付款信号；统计缓存由本次结算删除的信号按同一项目失效（见 project/signals.py）
         update_count = Payment.objects.filter(
             contract__contract_code__in=contract_codes
         ).update(
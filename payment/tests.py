@@ -1,14 +1,19 @@
 """
 付款模块单元测试
 """
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
 from django.utils import timezone
 from decimal import Decimal
 from datetime import date, timedelta
 
+from django.core.exceptions import ValidationError
+
 from payment.models import Payment
 from payment.validators import PaymentDataValidator
 from contract.models import Contract
+from project.enums import ContractSource
 from project.models import Project
 
 
@@ -274,4 +279,77 @@ class PaymentImportTests(TestCase):
         all_payments = list(Payment.objects.filter(contract=self.contract).order_by('payment_code'))
         expected_codes = [f'TEST-003-FK-{i:03d}' for i in range(1, 6)]
         actual_codes = [p.payment_code for p in all_payments]
-        self.assertEqual(actual_codes, expected_codes)
\ No newline at end of file
+        self.assertEqual(actual_codes, expected_codes)
+
+
+class PaymentBulkCreateWithCodesTests(TestCase):
+    """批量创建付款：按合同一次查询分配编号，结果与逐条保存一致"""
+
+    def setUp(self):
+        self.project = Project.objects.create(
+            project_code='TEST-004',
+            project_name='测试项目4'
+        )
+        self.contract = Contract.objects.create(
+            contract_code='TEST-HT-004',
+            contract_sequence='TEST-004',
+            contract_name='测试合同4',
+            contract_source=ContractSource.DIRECT.value,
+            project=self.project,
+            contract_amount=Decimal('3000000.00'),
+            signing_date=date(2025, 1, 1)
+        )
+
+    def _payment(self, payment_date, amount='100000.00'):
+        return Payment(
+            contract=self.contract,
+            payment_amount=Decimal(amount),
+            payment_date=payment_date,
+        )
+
+    def test_codes_follow_payment_date_order(self):
+        """编号按付款日期续接已有付款，查询次数不随批量大小增长"""
+        Payment.objects.create(
+            contract=self.contract,
+            payment_amount=Decimal('100000.00'),
+            payment_date=date(2025, 1, 15)
+        )
+
+        with CaptureQueriesContext(connection) as small_batch:
+            Payment.objects.bulk_create_with_codes(
+                [self._payment(date(2025, month, 15)) for month in (2, 3)]
+            )
+        with CaptureQueriesContext(connection) as large_batch:
+            Payment.objects.bulk_create_with_codes(
+                [self._payment(date(2025, month, 15)) for month in range(4, 10)]
+            )
+
+        self.assertEqual(len(large_batch), len(small_batch))
+        codes = list(Payment.objects.order_by('payment_date').values_list('payment_code', flat=True))
+        self.assertEqual(len(set(codes)), len(codes))
+        self.assertEqual(codes, [f'TEST-004-FK-{i:03d}' for i in range(1, 10)])
+
+    def test_same_date_matches_sequential_save(self):
+        """同一天的多笔付款按传入顺序编号，与逐条 save() 一致"""
+        payments = [self._payment(date(2025, 1, 15)) for _ in range(3)]
+        Payment.objects.bulk_create_with_codes(payments)
+
+        self.assertEqual(
+            [p.payment_code for p in payments],
+            ['TEST-004-FK-001', 'TEST-004-FK-002', 'TEST-004-FK-003']
+        )
+        sequential = self._payment(date(2025, 1, 15))
+        self.assertEqual(sequential._generate_payment_code(), 'TEST-004-FK-004')
+
+    def test_conflicting_code_writes_nothing(self):
+        """编号与已有付款冲突时整体拒绝写入"""
+        Payment.objects.create(
+            contract=self.contract,
+            payment_amount=Decimal('100000.00'),
+            payment_date=date(2025, 3, 15)
+        )
+
+        # 早于已有付款的新付款会分配到 001，与已有编号冲突
+        with self.assertRaises(ValidationError):
+            Payment.objects.bulk_create_with_codes([self._payment(date(2025, 1, 15))])
+        self.assertEqual(Payment.objects.filter(contract=self.contract).count(), 1)
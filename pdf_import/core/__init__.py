@@ -4,5 +4,6 @@ PDF导入模块 - 核心组件
 from .pdf_detector import PDFDetector
 from .field_extractor import FieldExtractor
 from .config_loader import ConfigLoader
+from .document_cache import DocumentCache, ParsedDocument
 
-__all__ = ['PDFDetector', 'FieldExtractor', 'ConfigLoader']
\ No newline at end of file
+__all__ = ['PDFDetector', 'FieldExtractor', 'ConfigLoader', 'DocumentCache', 'ParsedDocument']
\ No newline at end of file
@@ -0,0 +1,232 @@
+"""
+PDF解析结果缓存 - 同一导入会话内每个PDF只解析一次
+按文件内容哈希缓存页面文本、文字块（单元格）与表格，供类型检测、字段提取、单元格检测共用
+"""
+import hashlib
+import json
+import logging
+import os
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# 持久化文件格式版本，缓存结构变化时递增，旧文件自动失效
+CACHE_FORMAT_VERSION = 2
+# 文字块只保留单元格检测需要的键，减小内存与持久化体积
+WORD_KEYS = ('text', 'x0', 'top', 'x1', 'bottom')
+
+
+def compute_content_hash(pdf_path: str, chunk_size: int = 1024 * 1024) -> str:
+    """计算文件内容的 SHA-256（分块读取，避免大文件一次性载入内存）"""
+    digest = hashlib.sha256()
+    with open(pdf_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class ParsedDocument:
+    """
+    单个PDF的解析结果
+
+    各部分按需解析、解析后常驻：
+    - page_texts: PyMuPDF 页面文本（类型检测读取前几页，字段提取读取全文）
+    - plumber_page_texts / page_tables: pdfplumber 页面文本与表格（表格字段使用）
+    - page_words: pdfplumber 文字块，按容差分别缓存（单元格检测使用）
+    """
+
+    def __init__(self, pdf_path: str, content_hash: str):
+        self.pdf_path = pdf_path
+        self.content_hash = content_hash
+        self._fitz_texts: List[str] = []
+        self._fitz_complete = False
+        self._plumber_texts: Optional[List[str]] = None
+        self._tables: Dict[int, List[List[List[Optional[str]]]]] = {}
+        self._words: Dict[Tuple[float, float], List[List[Dict[str, Any]]]] = {}
+        self._persist_path: Optional[Path] = None
+        self._lock = threading.RLock()
+
+    def to_dict(self) -> Dict[str, Any]:
+        """可 JSON 序列化的解析结果（持久化用，不含路径与锁）"""
+        return {
+            'content_hash': self.content_hash,
+            'fitz_texts': self._fitz_texts,
+            'fitz_complete': self._fitz_complete,
+            'plumber_texts': self._plumber_texts,
+            'tables': {str(page_index): tables for page_index, tables in self._tables.items()},
+            'words': [[x_tolerance, y_tolerance, pages] for (x_tolerance, y_tolerance), pages in self._words.items()],
+        }
+
+    @classmethod
+    def from_dict(cls, pdf_path: str, data: Dict[str, Any]) -> 'ParsedDocument':
+        """由 to_dict 的结果还原（结构不符时抛出 KeyError/TypeError/ValueError）"""
+        document = cls(pdf_path, data['content_hash'])
+        document._fitz_texts = list(data['fitz_texts'])
+        document._fitz_complete = bool(data['fitz_complete'])
+        document._plumber_texts = data['plumber_texts']
+        document._tables = {int(page_index): tables for page_index, tables in data['tables'].items()}
+        document._words = {
+            (float(x_tolerance), float(y_tolerance)): pages for x_tolerance, y_tolerance, pages in data['words']
+        }
+        return document
+
+    def page_texts(self, max_pages: Optional[int] = None) -> List[str]:
+        """PyMuPDF 提取的页面文本列表，max_pages 为空表示全部页面"""
+        with self._lock:
+            if not self._fitz_complete and (max_pages is None or len(self._fitz_texts) < max_pages):
+                import fitz  # PyMuPDF
+
+                texts = []
+                complete = True
+                with fitz.open(self.pdf_path) as doc:
+                    for page_index, page in enumerate(doc):
+                        if max_pages is not None and page_index >= max_pages:
+                            complete = False
+                            break
+                        texts.append(page.get_text())
+                self._fitz_texts = texts
+                self._fitz_complete = complete
+                self._save()
+            return self._fitz_texts if max_pages is None else self._fitz_texts[:max_pages]
+
+    def text(self, max_pages: Optional[int] = None) -> str:
+        """PyMuPDF 提取的文本（页面文本直接拼接，与逐页 get_text 累加一致）"""
+        return ''.join(self.page_texts(max_pages))
+
+    def plumber_page_texts(self) -> List[str]:
+        """pdfplumber 提取的页面文本列表（表格字段用于定位表格所在页）"""
+        with self._lock:
+            if self._plumber_texts is None:
+                import pdfplumber
+
+                with pdfplumber.open(self.pdf_path) as pdf:
+                    self._plumber_texts = [page.extract_text() or '' for page in pdf.pages]
+                self._save()
+            return self._plumber_texts
+
+    def page_tables(self, page_index: int) -> List[List[List[Optional[str]]]]:
+        """指定页的表格（pdfplumber extract_tables 结果），只在首次访问该页时解析"""
+        with self._lock:
+            if page_index not in self._tables:
+                import pdfplumber
+
+                with pdfplumber.open(self.pdf_path) as pdf:
+                    self._tables[page_index] = pdf.pages[page_index].extract_tables() or []
+                self._save()
+            return self._tables[page_index]
+
+    def page_words(self, x_tolerance: float, y_tolerance: float) -> List[List[Dict[str, Any]]]:
+        """各页文字块列表（每个文字块仅含 text/x0/top/x1/bottom）"""
+        key = (x_tolerance, y_tolerance)
+        with self._lock:
+            if key not in self._words:
+                import pdfplumber
+
+                pages = []
+                with pdfplumber.open(self.pdf_path) as pdf:
+                    for page in pdf.pages:
+                        words = page.extract_words(x_tolerance=x_tolerance, y_tolerance=y_tolerance)
+                        pages.append([{k: word[k] for k in WORD_KEYS} for word in words])
+                self._words[key] = pages
+                self._save()
+            return self._words[key]
+
+    def _save(self):
+        """写入持久化文件（未启用持久化时跳过），写入失败不影响提取"""
+        if self._persist_path is None:
+            return
+        tmp_path = self._persist_path.with_name(self._persist_path.name + '.tmp')
+        try:
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(self.to_dict(), f, ensure_ascii=False)
+            os.replace(tmp_path, self._persist_path)
+        except OSError as exc:
+            logger.warning('PDF解析缓存写入失败: %s', exc)
+
+
+class DocumentCache:
+    """
+    PDF解析结果缓存（LRU）
+
+    以文件内容哈希为键，同一内容的PDF无论路径如何只解析一次。
+    一个导入会话共享一个实例，传给 PDFDetector、FieldExtractor 即可；
+    指定 cache_dir 后解析结果同时持久化到磁盘，重新提取时直接复用。
+    """
+
+    def __init__(self, max_documents: int = 32, cache_dir: Optional[str] = None):
+        self.max_documents = max_documents
+        self.cache_dir = Path(cache_dir) if cache_dir else None
+        self._documents: 'OrderedDict[str, ParsedDocument]' = OrderedDict()
+        # 路径 -> (mtime_ns, size, content_hash)，文件未变化时免去重复计算哈希
+        self._hashes: Dict[str, Tuple[int, int, str]] = {}
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._documents)
+
+    def get(self, pdf_path: str) -> ParsedDocument:
+        """获取PDF的解析结果（未缓存时创建，内容在首次访问时解析）"""
+        pdf_path = str(pdf_path)
+        content_hash = self._content_hash(pdf_path)
+
+        with self._lock:
+            document = self._documents.get(content_hash)
+            if document is not None:
+                self._documents.move_to_end(content_hash)
+                return document
+
+            document = self._load(content_hash) or ParsedDocument(pdf_path, content_hash)
+            document.pdf_path = pdf_path
+            if self.cache_dir is not None:
+                document._persist_path = self._persist_path(content_hash)
+
+            self._documents[content_hash] = document
+            while len(self._documents) > self.max_documents:
+                self._documents.popitem(last=False)
+            return document
+
+    def clear(self):
+        """清空内存缓存（不删除持久化文件）"""
+        with self._lock:
+            self._documents.clear()
+            self._hashes.clear()
+
+    def _content_hash(self, pdf_path: str) -> str:
+        stat = os.stat(pdf_path)
+        cached = self._hashes.get(pdf_path)
+        if cached and cached[0] == stat.st_mtime_ns and cached[1] == stat.st_size:
+            return cached[2]
+        content_hash = compute_content_hash(pdf_path)
+        self._hashes[pdf_path] = (stat.st_mtime_ns, stat.st_size, content_hash)
+        return content_hash
+
+    def _persist_path(self, content_hash: str) -> Path:
+        return self.cache_dir / f'{content_hash}.v{CACHE_FORMAT_VERSION}.json'
+
+    def _load(self, content_hash: str) -> Optional[ParsedDocument]:
+        """
+        从持久化目录加载解析结果，文件不存在或损坏时返回None
+
+        持久化目录可能位于上传目录下，只读取 JSON 数据，不反序列化任意对象。
+        """
+        if self.cache_dir is None:
+            return None
+        path = self._persist_path(content_hash)
+        if not path.exists():
+            try:
+                self.cache_dir.mkdir(parents=True, exist_ok=True)
+            except OSError as exc:
+                logger.warning('PDF解析缓存目录创建失败: %s', exc)
+            return None
+        try:
+            with open(path, encoding='utf-8') as f:
+                document = ParsedDocument.from_dict('', json.load(f))
+        except (OSError, KeyError, TypeError, ValueError, AttributeError) as exc:
+            logger.warning('PDF解析缓存读取失败，将重新解析: %s', exc)
+            return None
+        if document.content_hash != content_hash:
+            return None
+        return document
@@ -2,11 +2,11 @@
 字段提取引擎 - 核心模块
 基于配置驱动的智能字段提取 + 单元格检测增强
 """
-import fitz  # PyMuPDF
 from typing import Dict, Any, Optional, Tuple, List
 from pathlib import Path
 
 from .config_loader import ConfigLoader
+from .document_cache import DocumentCache
 from ..utils.text_parser import TextParser
 from ..utils.date_parser import DateParser
 from ..utils.amount_parser import AmountParser
@@ -17,14 +17,17 @@ from ..utils.cell_detector import CellDetector
 class FieldExtractor:
     """字段提取引擎"""
     
-    def __init__(self, config_loader: Optional[ConfigLoader] = None):
+    def __init__(self, config_loader: Optional[ConfigLoader] = None,
+                 document_cache: Optional[DocumentCache] = None):
         """
         初始化字段提取器
         
         Args:
             config_loader: 配置加载器实例
+            document_cache: PDF解析结果缓存（全文、单元格、表格只解析一次）
         """
         self.config_loader = config_loader or ConfigLoader()
+        self.document_cache = document_cache if document_cache is not None else DocumentCache()
         self.text_parser = TextParser()
         self.date_parser = DateParser()
         self.amount_parser = AmountParser()
@@ -73,12 +76,7 @@ class FieldExtractor:
     def _extract_text_from_pdf(self, pdf_path: str) -> str:
         """提取PDF全文文本"""
         try:
-            doc = fitz.open(pdf_path)
-            text = ""
-            for page in doc:
-                text += page.get_text()
-            doc.close()
-            return text
+            return self.document_cache.get(pdf_path).text()
         except Exception as e:
             print(f"PDF文本提取失败: {e}")
             return ""
@@ -107,7 +105,9 @@ class FieldExtractor:
         if method in ['cell_keyvalue', 'horizontal_keyvalue', 'vertical_keyvalue']:
             if pdf_path not in self._pdf_cache:
                 self.cell_detector = CellDetector()
-                self.cell_detector.extract_cells_from_pdf(pdf_path)
+                self.cell_detector.extract_cells_from_pdf(
+                    pdf_path, document=self.document_cache.get(pdf_path)
+                )
                 self._pdf_cache[pdf_path] = True
         
         # 根据不同的提取方法调用相应的处理函数
@@ -310,7 +310,8 @@ class FieldExtractor:
             return None
         
         return self.text_parser.extract_table_first_data_row(
-            pdf_path, table_marker, column_name
+            pdf_path, table_marker, column_name,
+            document=self.document_cache.get(pdf_path)
         )
     
     def _extract_table_cell(self, pdf_path: str, 
@@ -327,7 +328,8 @@ class FieldExtractor:
         target_column = extraction_config.get('target_column')
         
         return self.text_parser.extract_from_table(
-            pdf_path, table_markers, row_identifier, target_column
+            pdf_path, table_markers, row_identifier, target_column,
+            document=self.document_cache.get(pdf_path)
         )
     
     def _post_process(self, value: str, field_config: Dict) -> Any:
@@ -406,6 +408,21 @@ class FieldExtractor:
         print(f"警告: 枚举值 '{value}' 不在标准列表中，也无别名映射")
         return value
     
+    # PDF类型的处理优先级（从高到低），优先级高的PDF类型的字段值会被优先采用
+    PRIORITY_ORDER = [
+        'procurement_request',      # 2-23 采购请示（最权威）
+        'procurement_notice',        # 2-24 采购公告
+        'procurement_result_oa',     # 2-44 采购结果OA
+        'result_publicity',          # 2-47 结果公示
+        'candidate_publicity',       # 2-45 候选人公示
+        'control_price_approval',    # 2-21 控制价审批（fallback）
+    ]
+    
+    # 合并时不需要提取的字段
+    EXCLUDED_FIELDS = [
+        'requirement_approval_date',  # 采购需求书审批完成日期（OA）
+    ]
+    
     def extract_all_from_pdfs(self, pdf_files: Dict[str, str]) -> Tuple[Dict[str, Any], List[Dict[str, Any]]]:
         """
         从多个PDF文件提取所有字段（智能合并结果）
@@ -432,29 +449,11 @@ class FieldExtractor:
             - merged_data: 合并后的字段字典
             - requires_confirmation: 需要人工确认的字段列表
         """
-        # 定义PDF类型的处理优先级（从高到低）
-        # 优先级高的PDF类型的字段值会被优先采用
-        PRIORITY_ORDER = [
-            'procurement_request',      # 2-23 采购请示（最权威）
-            'procurement_notice',        # 2-24 采购公告
-            'procurement_result_oa',     # 2-44 采购结果OA
-            'result_publicity',          # 2-47 结果公示
-            'candidate_publicity',       # 2-45 候选人公示
-            'control_price_approval',    # 2-21 控制价审批（fallback）
-        ]
-        
-        # 过滤掉不需要提取的字段
-        EXCLUDED_FIELDS = [
-            'requirement_approval_date',  # 采购需求书审批完成日期（OA）
-        ]
-        
         # 存储每个文件的提取结果（独立存储，避免混淆）
         extraction_results = {}
-        # 字段级别需确认列表
-        requires_confirmation: List[Dict[str, Any]] = []
         
         # 按优先级顺序处理PDF文件
-        for pdf_type in PRIORITY_ORDER:
+        for pdf_type in self.PRIORITY_ORDER:
             if pdf_type not in pdf_files:
                 continue
             
@@ -465,40 +464,62 @@ class FieldExtractor:
                 continue
             
             print(f"\n[处理] {pdf_type}: {Path(pdf_path).name}")
+            extraction_results[pdf_type] = self.extract_for_merge(pdf_path, pdf_type)
+        
+        return self.merge_extraction_results(pdf_files, extraction_results)
+    
+    def extract_for_merge(self, pdf_path: str, pdf_type: str) -> Dict[str, Any]:
+        """
+        独立提取单个PDF的字段（供合并使用），过滤掉不需要的字段，失败时返回空字典
+        
+        并行提取引擎在工作进程中调用该方法，结果再交给 merge_extraction_results 合并。
+        """
+        # 重要：清空缓存，确保每个文件独立处理
+        self._pdf_cache.clear()
+        if self.cell_detector:
+            self.cell_detector = None
+        
+        # 提取字段
+        try:
+            extracted = self.extract(pdf_path, pdf_type)
+        except Exception as e:
+            print(f"  [错误] 提取失败: {e}")
+            return {}
+        
+        # 过滤掉不需要的字段
+        filtered_extracted = {
+            field_name: value
+            for field_name, value in extracted.items()
+            if field_name not in self.EXCLUDED_FIELDS
+        }
+        
+        # 打印提取到的字段
+        for field_name, value in filtered_extracted.items():
+            if value is not None:
+                print(f"  [成功] {field_name}: {value}")
+        
+        return filtered_extracted
+    
+    def merge_extraction_results(self, pdf_files: Dict[str, str],
+                                 extraction_results: Dict[str, Dict[str, Any]]
+                                 ) -> Tuple[Dict[str, Any], List[Dict[str, Any]]]:
+        """
+        按 PRIORITY_ORDER 合并各PDF的提取结果（字段级优先级策略）
+        
+        Args:
+            pdf_files: {pdf_type: pdf_path, ...}（用于控制价的 fallback 提取）
+            extraction_results: {pdf_type: {field_name: value, ...}, ...}
             
-            # 重要：清空缓存，确保每个文件独立处理
-            self._pdf_cache.clear()
-            if self.cell_detector:
-                self.cell_detector = None
-            
-            # 提取字段
-            try:
-                extracted = self.extract(pdf_path, pdf_type)
-                
-                # 过滤掉不需要的字段
-                filtered_extracted = {
-                    field_name: value
-                    for field_name, value in extracted.items()
-                    if field_name not in EXCLUDED_FIELDS
-                }
-                
-                # 存储提取结果
-                extraction_results[pdf_type] = filtered_extracted
-                
-                # 打印提取到的字段
-                for field_name, value in filtered_extracted.items():
-                    if value is not None:
-                        print(f"  [成功] {field_name}: {value}")
-                
-            except Exception as e:
-                print(f"  [错误] 提取失败: {e}")
-                extraction_results[pdf_type] = {}
+        Returns:
+            (merged_data, requires_confirmation)
+        """
+        # 字段级别需确认列表
+        requires_confirmation: List[Dict[str, Any]] = []
         
-        # 智能合并数据（字段级优先级策略）
         merged_data = {}
         field_sources = {}  # 记录每个字段的来源
         
-        for pdf_type in PRIORITY_ORDER:
+        for pdf_type in self.PRIORITY_ORDER:
             if pdf_type not in extraction_results:
                 continue
             
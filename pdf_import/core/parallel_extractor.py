@@ -0,0 +1,249 @@
+"""
+并行提取引擎 - 多个PDF的类型识别与字段提取分发到多进程执行
+PDF解析是CPU密集型且各文件相互独立，每个文件在一个工作进程中完成识别+提取，
+主进程按 FieldExtractor.PRIORITY_ORDER 合并结果（与 extract_all_from_pdfs 规则一致）
+"""
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from multiprocessing import get_context
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from .document_cache import DocumentCache
+from .field_extractor import FieldExtractor
+from .pdf_detector import PDFDetector
+
+# 文件编号 → PDF类型（上传阶段 PDFFileFilter 识别出的 matched_number）
+NUMBER_TYPE_MAP = {
+    '2-21': 'control_price_approval',
+    '2-23': 'procurement_request',
+    '2-24': 'procurement_notice',
+    '2-25': 'procurement_notice',  # 虽然 2-25 已在过滤器中排除，这里仍保持映射以兼容历史数据
+    '2-44': 'procurement_result_oa',
+    '2-45': 'candidate_publicity',
+    '2-47': 'result_publicity',
+}
+
+# 默认工作进程数上限：一个采购项目通常只有5-7个PDF
+DEFAULT_MAX_WORKERS = 4
+
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_workers = 0
+_pool_lock = threading.Lock()
+
+# 工作进程内的识别器/提取器与解析缓存（每个进程初始化一次）
+_worker_state: Dict[str, Any] = {}
+
+
+def default_max_workers() -> int:
+    return max(1, min(DEFAULT_MAX_WORKERS, os.cpu_count() or 1))
+
+
+def _get_process_pool(max_workers: int) -> ProcessPoolExecutor:
+    """进程级共享进程池（惰性创建，使用 spawn 避免在多线程的Web进程中 fork）"""
+    global _pool, _pool_workers
+    with _pool_lock:
+        if _pool is None or _pool_workers != max_workers:
+            if _pool is not None:
+                _pool.shutdown(wait=False)
+            _pool = ProcessPoolExecutor(max_workers=max_workers, mp_context=get_context('spawn'))
+            _pool_workers = max_workers
+        return _pool
+
+
+def shutdown_process_pool() -> None:
+    """关闭共享进程池（命令行批量提取结束时调用）"""
+    global _pool, _pool_workers
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(wait=True)
+        _pool = None
+        _pool_workers = 0
+
+
+def _discard_broken_pool() -> None:
+    global _pool, _pool_workers
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(wait=False)
+        _pool = None
+        _pool_workers = 0
+
+
+def process_file(detector: PDFDetector, extractor: FieldExtractor, pdf_path: str,
+                 pdf_type: Optional[str] = None, min_confidence: float = 0.0) -> Dict[str, Any]:
+    """
+    识别并提取单个PDF
+
+    Args:
+        pdf_path: PDF文件路径
+        pdf_type: 已知类型（如由文件编号推导），为空时使用 detector 识别
+        min_confidence: 低于该置信度的文件只识别不提取
+
+    Returns:
+        {'path', 'pdf_type', 'confidence', 'method', 'accepted', 'extracted', 'error'}，
+        accepted 表示类型已识别且达到 min_confidence，参与合并；
+        extracted 为 None 表示未提取（未被接受或类型不在合并优先级中）
+    """
+    result = {
+        'path': pdf_path,
+        'pdf_type': pdf_type,
+        'confidence': 1.0 if pdf_type else 0.0,
+        'method': 'filename_number' if pdf_type else 'none',
+        'accepted': False,
+        'extracted': None,
+        'error': None,
+    }
+    try:
+        if not pdf_type:
+            result['pdf_type'], result['confidence'], result['method'] = detector.detect(pdf_path)
+
+        pdf_type = result['pdf_type']
+        result['accepted'] = bool(pdf_type) and pdf_type != 'unknown' and result['confidence'] >= min_confidence
+        if result['accepted'] and pdf_type in FieldExtractor.PRIORITY_ORDER and Path(pdf_path).exists():
+            print(f"\n[处理] {pdf_type}: {Path(pdf_path).name}")
+            result['extracted'] = extractor.extract_for_merge(pdf_path, pdf_type)
+    except Exception as exc:
+        result['error'] = str(exc)
+    return result
+
+
+def _process_file_in_worker(pdf_path: str, pdf_type: Optional[str], min_confidence: float,
+                            cache_dir: Optional[str]) -> Dict[str, Any]:
+    """工作进程入口：复用本进程的识别器/提取器，按 cache_dir 区分解析缓存"""
+    caches = _worker_state.setdefault('caches', {})
+    if cache_dir not in caches:
+        if len(caches) >= 8:
+            caches.clear()
+        caches[cache_dir] = DocumentCache(cache_dir=cache_dir)
+    document_cache = caches[cache_dir]
+
+    if 'extractor' not in _worker_state:
+        _worker_state['detector'] = PDFDetector()
+        _worker_state['extractor'] = FieldExtractor()
+    detector = _worker_state['detector']
+    extractor = _worker_state['extractor']
+    detector.document_cache = document_cache
+    extractor.document_cache = document_cache
+    return process_file(detector, extractor, pdf_path, pdf_type, min_confidence)
+
+
+class ParallelExtractor:
+    """
+    多PDF并行提取器
+
+    用法：
+        engine = ParallelExtractor(max_workers=4)
+        outcome = engine.extract_group([(path, None), (path2, 'procurement_request')])
+        outcome['merged_data'], outcome['requires_confirmation']
+
+    max_workers <= 1 或只有一个文件时在当前进程顺序执行；进程池不可用时自动退回顺序执行。
+    """
+
+    def __init__(self, max_workers: Optional[int] = None, cache_dir: Optional[str] = None,
+                 document_cache: Optional[DocumentCache] = None):
+        self.max_workers = max_workers if max_workers is not None else default_max_workers()
+        self.cache_dir = str(cache_dir) if cache_dir else None
+        self.document_cache = (
+            document_cache if document_cache is not None else DocumentCache(cache_dir=self.cache_dir)
+        )
+        self.detector = PDFDetector(document_cache=self.document_cache)
+        self.extractor = FieldExtractor(document_cache=self.document_cache)
+
+    def process_files(self, items: Sequence[Tuple[str, Optional[str]]],
+                      min_confidence: float = 0.0) -> List[Dict[str, Any]]:
+        """
+        识别并提取一批PDF，返回结果顺序与 items 一致
+
+        Args:
+            items: [(pdf_path, 已知pdf_type或None), ...]
+            min_confidence: 见 process_file
+        """
+        items = [(str(path), pdf_type) for path, pdf_type in items]
+        if self.max_workers > 1 and len(items) > 1:
+            try:
+                pool = _get_process_pool(self.max_workers)
+                futures = [
+                    pool.submit(_process_file_in_worker, path, pdf_type, min_confidence, self.cache_dir)
+                    for path, pdf_type in items
+                ]
+                return [future.result() for future in futures]
+            except (BrokenProcessPool, OSError) as exc:
+                print(f"[警告] 并行提取进程池不可用，改为顺序提取: {exc}")
+                _discard_broken_pool()
+
+        return [
+            process_file(self.detector, self.extractor, path, pdf_type, min_confidence)
+            for path, pdf_type in items
+        ]
+
+    def merge(self, file_results: Sequence[Dict[str, Any]]
+              ) -> Tuple[Dict[str, str], Dict[str, Any], List[Dict[str, Any]]]:
+        """
+        合并单文件结果，返回 (pdf_files_by_type, merged_data, requires_confirmation)
+
+        同一类型有多个文件时以最后一个为准（与逐个识别后按类型分组的行为一致）。
+        """
+        pdf_files: Dict[str, str] = {}
+        extraction_results: Dict[str, Dict[str, Any]] = {}
+        for result in file_results:
+            if not result['accepted']:
+                continue
+            pdf_type = result['pdf_type']
+            pdf_files[pdf_type] = result['path']
+            if result['extracted'] is not None:
+                extraction_results[pdf_type] = result['extracted']
+            else:
+                extraction_results.pop(pdf_type, None)
+
+        merged_data, requires_confirmation = self.extractor.merge_extraction_results(
+            pdf_files, extraction_results
+        )
+        return pdf_files, merged_data, requires_confirmation
+
+    def extract_group(self, items: Sequence[Tuple[str, Optional[str]]],
+                      min_confidence: float = 0.0) -> Dict[str, Any]:
+        """
+        并行处理同一采购项目的一组PDF并合并
+
+        Returns:
+            {'files': 单文件结果列表, 'pdf_files': {pdf_type: path},
+             'merged_data': 合并字段, 'requires_confirmation': 需确认字段}
+        """
+        file_results = self.process_files(items, min_confidence=min_confidence)
+        pdf_files, merged_data, requires_confirmation = self.merge(file_results)
+        return {
+            'files': file_results,
+            'pdf_files': pdf_files,
+            'merged_data': merged_data,
+            'requires_confirmation': requires_confirmation,
+        }
+
+    def extract_groups(self, groups: Dict[str, Sequence[Tuple[str, Optional[str]]]],
+                       min_confidence: float = 0.0) -> Dict[str, Dict[str, Any]]:
+        """
+        批量处理多个采购项目：所有文件一起分发到进程池，再按项目分别合并
+
+        Args:
+            groups: {项目标识: [(pdf_path, pdf_type或None), ...], ...}
+        """
+        flat_items = []
+        for group_items in groups.values():
+            flat_items.extend(group_items)
+        file_results = self.process_files(flat_items, min_confidence=min_confidence)
+
+        outcomes = {}
+        offset = 0
+        for name, group_items in groups.items():
+            group_results = file_results[offset:offset + len(group_items)]
+            offset += len(group_items)
+            pdf_files, merged_data, requires_confirmation = self.merge(group_results)
+            outcomes[name] = {
+                'files': group_results,
+                'pdf_files': pdf_files,
+                'merged_data': merged_data,
+                'requires_confirmation': requires_confirmation,
+            }
+        return outcomes
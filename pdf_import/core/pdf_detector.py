@@ -6,16 +6,26 @@ from typing import Dict, List, Optional, Tuple
 from pathlib import Path
 import yaml
 
+from .document_cache import DocumentCache
+
 
 class PDFDetector:
     """PDF文档类型识别器"""
     
-    def __init__(self, config_path: Optional[str] = None):
-        """初始化PDF检测器"""
+    def __init__(self, config_path: Optional[str] = None,
+                 document_cache: Optional[DocumentCache] = None):
+        """
+        初始化PDF检测器
+
+        Args:
+            config_path: 识别模式配置文件路径
+            document_cache: PDF解析结果缓存（与 FieldExtractor 共用同一实例可避免重复解析）
+        """
         if config_path is None:
             config_path = Path(__file__).parent.parent / 'config' / 'pdf_patterns.yml'
         
         self.patterns = self._load_patterns(config_path)
+        self.document_cache = document_cache if document_cache is not None else DocumentCache()
     
     def _load_patterns(self, config_path: str) -> Dict:
         """加载PDF识别模式配置"""
@@ -70,8 +80,6 @@ class PDFDetector:
         - 综合文件名与内容标记得分，支持权重与最低置信度（见 pdf_patterns.yml 中 detection_strategy）。
         - 为避免大型 PDF 性能问题，只解析前若干页文本。
         """
-        import fitz
-
         filename = Path(pdf_path).name
 
         # 读取配置中的识别策略（带默认值，保持向后兼容）
@@ -84,12 +92,7 @@ class PDFDetector:
         max_pages = 3
         text = ''
         try:
-            doc = fitz.open(pdf_path)
-            for page_index, page in enumerate(doc):
-                text += page.get_text()
-                if page_index + 1 >= max_pages:
-                    break
-            doc.close()
+            text = self.document_cache.get(pdf_path).text(max_pages=max_pages)
         except Exception as exc:
             # 打印错误并回退为内容为空，后续只依赖文件名匹配
             print(f"PDF类型识别时文本提取失败: {exc}")
@@ -2,6 +2,7 @@
 PDF智能提取 - 独立运行脚本
 用于批量处理PDF文件并生成结构化JSON输出
 """
+import argparse
 import json
 import sys
 import os
@@ -22,15 +23,29 @@ sys.path.insert(0, str(project_root))
 from pdf_import.core.pdf_detector import PDFDetector
 from pdf_import.core.field_extractor import FieldExtractor
 from pdf_import.core.config_loader import ConfigLoader
+from pdf_import.core.document_cache import DocumentCache
+from pdf_import.core.parallel_extractor import NUMBER_TYPE_MAP, ParallelExtractor, shutdown_process_pool
+from pdf_import.utils.pdf_filter import PDFFileFilter
 
 
 class PDFBatchExtractor:
     """PDF批量提取器"""
     
-    def __init__(self):
-        """初始化提取器"""
-        self.detector = PDFDetector()
-        self.extractor = FieldExtractor()
+    def __init__(self, cache_dir: str = None, max_workers: int = None):
+        """
+        初始化提取器
+
+        Args:
+            cache_dir: PDF解析结果持久化目录（可选），重复运行时直接复用解析结果
+            max_workers: 并行提取的工作进程数（默认按CPU核数，1 表示顺序执行）
+        """
+        # 类型检测与字段提取共用解析缓存，同一PDF只解析一次
+        self.document_cache = DocumentCache(cache_dir=cache_dir)
+        self.detector = PDFDetector(document_cache=self.document_cache)
+        self.extractor = FieldExtractor(document_cache=self.document_cache)
+        self.engine = ParallelExtractor(
+            max_workers=max_workers, cache_dir=cache_dir, document_cache=self.document_cache
+        )
         self.config_loader = ConfigLoader()
     
     def process_single_pdf(self, pdf_path: str) -> Dict[str, Any]:
@@ -121,27 +136,27 @@ class PDFBatchExtractor:
         Returns:
             合并提取结果
         """
-        # 首先检测所有PDF类型
-        pdf_type_map = {}
+        existing_files = []
         for pdf_file in pdf_files:
-            pdf_path = Path(pdf_file)
-            if not pdf_path.exists():
+            if not Path(pdf_file).exists():
                 print(f"警告: 文件不存在 {pdf_file}")
                 continue
-            
-            pdf_type, confidence, method = self.detector.detect(str(pdf_path))
-            if pdf_type != 'unknown' and confidence >= 0.5:
-                pdf_type_map[pdf_type] = str(pdf_path)
+            existing_files.append(str(pdf_file))
         
-        print(f"\n{'='*60}")
-        print(f"PDF组合提取 - 共 {len(pdf_type_map)} 个有效PDF")
-        print(f"{'='*60}")
-        for pdf_type, pdf_path in pdf_type_map.items():
-            print(f"  {pdf_type}: {Path(pdf_path).name}")
-        
-        # 使用FieldExtractor的合并提取功能
+        # 检测与提取并行执行，合并规则与 FieldExtractor.extract_all_from_pdfs 一致
         try:
-            merged_data, requires_confirmation = self.extractor.extract_all_from_pdfs(pdf_type_map)
+            outcome = self.engine.extract_group(
+                [(pdf_file, None) for pdf_file in existing_files], min_confidence=0.5
+            )
+            pdf_type_map = outcome['pdf_files']
+            merged_data = outcome['merged_data']
+            requires_confirmation = outcome['requires_confirmation']
+            
+            print(f"\n{'='*60}")
+            print(f"PDF组合提取 - 共 {len(pdf_type_map)} 个有效PDF")
+            print(f"{'='*60}")
+            for pdf_type, pdf_path in pdf_type_map.items():
+                print(f"  {pdf_type}: {Path(pdf_path).name}")
             
             # 统计
             total_fields = len(merged_data)
@@ -176,6 +191,69 @@ class PDFBatchExtractor:
                 'error_detail': error_detail
             }
     
+    def process_directory(self, root_dir: str) -> Dict[str, Any]:
+        """
+        批量处理目录下的多个采购项目
+        
+        root_dir 下每个子文件夹（含其下级目录）视为一个采购项目，root_dir 自身直接包含的PDF视为一个项目。
+        与Web导入一致，只处理文件名编号在 PDFFileFilter 允许范围内的PDF，类型由编号推导；
+        所有项目的PDF一起分发到进程池，再按项目分别合并。
+        
+        Args:
+            root_dir: 采购项目文件夹所在目录
+            
+        Returns:
+            {项目文件夹名: 合并提取结果, ...}
+        """
+        root = Path(root_dir)
+        folders = [root] + sorted(p for p in root.iterdir() if p.is_dir())
+        
+        groups = {}
+        skipped = {}
+        for folder in folders:
+            pdf_paths = folder.glob('*.pdf') if folder == root else folder.rglob('*.pdf')
+            items = []
+            for pdf_path in sorted(pdf_paths):
+                should_process, matched_number, reason = PDFFileFilter.should_process_file(pdf_path.name)
+                if not should_process:
+                    skipped.setdefault(folder.name, []).append({'file': pdf_path.name, 'reason': reason})
+                    continue
+                items.append((str(pdf_path), NUMBER_TYPE_MAP.get(matched_number)))
+            if items:
+                groups[folder.name] = items
+        
+        print(f"\n{'='*60}")
+        print(f"目录批量提取 - 共 {len(groups)} 个采购项目, "
+              f"{sum(len(items) for items in groups.values())} 个PDF, "
+              f"工作进程数 {self.engine.max_workers}")
+        print(f"{'='*60}")
+        
+        outcomes = self.engine.extract_groups(groups)
+        
+        results = {}
+        for name, outcome in outcomes.items():
+            merged_data = outcome['merged_data']
+            errors = [
+                {'file': Path(r['path']).name, 'error': r['error']}
+                for r in outcome['files'] if r['error']
+            ]
+            results[name] = {
+                'status': 'error' if errors else 'success',
+                'pdf_files': outcome['pdf_files'],
+                'extracted_data': merged_data,
+                'requires_confirmation': outcome['requires_confirmation'],
+                'skipped_files': skipped.get(name, []),
+                'errors': errors,
+                'statistics': {
+                    'total_fields': len(merged_data),
+                    'extracted_fields': sum(1 for v in merged_data.values() if v is not None),
+                },
+            }
+            print(f"  [{results[name]['status']}] {name}: "
+                  f"{results[name]['statistics']['extracted_fields']} 个字段")
+        
+        return results
+    
     def save_results_to_json(self, results: Any, output_path: str) -> None:
         """
         保存结果到JSON文件
@@ -203,7 +281,7 @@ class PDFBatchExtractor:
 
 
 def main():
-    """主函数 - 处理指定的5个样本PDF文件"""
+    """主函数 - 处理指定的5个样本PDF文件（未指定 --dir 时的默认模式）"""
     
     # 定义样本PDF文件路径
     docs_dir = Path(__file__).parent.parent / 'docs'
@@ -312,9 +390,43 @@ def main():
     print("="*60)
 
 
+def main_directory(args):
+    """目录批量模式 - 每个子文件夹作为一个采购项目并行提取"""
+    root = Path(args.dir)
+    if not root.is_dir():
+        print(f"错误: 目录不存在 {root}")
+        return
+    
+    extractor = PDFBatchExtractor(cache_dir=args.cache_dir, max_workers=args.workers)
+    try:
+        results = extractor.process_directory(str(root))
+    finally:
+        shutdown_process_pool()
+    
+    output_path = args.output or (
+        Path(__file__).parent.parent / 'data' / 'extraction_results'
+        / f'directory_extraction_{datetime.now().strftime("%Y%m%d_%H%M%S")}.json'
+    )
+    extractor.save_results_to_json(results, output_path)
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description='PDF智能提取 - 独立运行脚本')
+    parser.add_argument('--dir', help='批量模式：采购项目文件夹所在目录（每个子文件夹为一个采购项目）')
+    parser.add_argument('--workers', type=int, default=None,
+                        help='并行提取的工作进程数（默认按CPU核数，1 表示顺序执行）')
+    parser.add_argument('--output', help='结果JSON文件路径（默认保存到 data/extraction_results/）')
+    parser.add_argument('--cache-dir', default=None, help='PDF解析结果持久化目录（可选）')
+    return parser.parse_args(argv)
+
+
 if __name__ == '__main__':
     try:
-        main()
+        cli_args = parse_args()
+        if cli_args.dir:
+            main_directory(cli_args)
+        else:
+            main()
     except KeyboardInterrupt:
         print("\n\n用户中断执行")
     except Exception as e:
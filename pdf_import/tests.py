@@ -0,0 +1,259 @@
+"""
+PDF导入模块单元测试
+"""
+import re
+import shutil
+import tempfile
+from concurrent.futures.process import BrokenProcessPool
+from pathlib import Path
+from unittest import mock
+
+import fitz
+import pdfplumber
+from django.test import SimpleTestCase, TestCase, override_settings
+
+from pdf_import.core.document_cache import DocumentCache, compute_content_hash
+from pdf_import.core import parallel_extractor
+from pdf_import.core.field_extractor import FieldExtractor
+from pdf_import.core.parallel_extractor import ParallelExtractor
+from pdf_import.core.pdf_detector import PDFDetector
+from pdf_import.utils.cell_detector import CellDetector
+
+
+def write_pdf(path, pages):
+    """
+    生成测试PDF，pages 为每页的文本行列表
+
+    ASCII 片段使用 helv、中文片段使用 china-s 分段写入：
+    整行使用 china-s 时，fitz 提取的 ASCII 字符之间会带空格。
+    """
+    with fitz.open() as doc:
+        for lines in pages:
+            page = doc.new_page()
+            for index, line in enumerate(lines):
+                x = 72
+                for run in re.findall(r'[\x00-\x7f]+|[^\x00-\x7f]+', line):
+                    fontname = 'helv' if run.isascii() else 'china-s'
+                    page.insert_text((x, 72 + index * 20), run, fontname=fontname)
+                    x += fitz.get_text_length(run, fontname=fontname)
+        doc.save(str(path))
+    return str(path)
+
+
+class _StubConfigLoader:
+    """字段配置桩：单元格键值对 + 正则两个字段"""
+
+    def get_fields_by_pdf_type(self, pdf_type):
+        return {
+            'project_name': {
+                'source': {'extraction': {'method': 'horizontal_keyvalue', 'key': 'Project Name'}},
+            },
+            'project_code': {
+                'source': {'extraction': {'method': 'regex', 'pattern': r'Code:\s*(\S+)'}},
+            },
+        }
+
+
+class DocumentCacheTests(SimpleTestCase):
+    """PDF解析结果缓存：按内容哈希复用、LRU 淘汰、持久化，检测/提取/单元格检测共用一次解析"""
+
+    def setUp(self):
+        self.tmpdir = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, self.tmpdir, ignore_errors=True)
+        self.pdf_path = write_pdf(self.tmpdir / 'notice.pdf', [
+            ['Project Name: Road Repair', 'Code: CG-001'],
+            ['Page two'],
+        ])
+
+    def test_keyed_by_content_hash(self):
+        copy_path = self.tmpdir / 'copy.pdf'
+        shutil.copyfile(self.pdf_path, copy_path)
+        other_path = write_pdf(self.tmpdir / 'other.pdf', [['Other document']])
+        cache = DocumentCache()
+
+        document = cache.get(self.pdf_path)
+        self.assertEqual(document.content_hash, compute_content_hash(self.pdf_path))
+        # 内容相同的不同路径共用同一解析结果
+        self.assertIs(cache.get(copy_path), document)
+        self.assertEqual(len(cache), 1)
+        self.assertIsNot(cache.get(other_path), document)
+        self.assertEqual(len(cache), 2)
+
+    def test_lru_eviction_at_capacity(self):
+        paths = [write_pdf(self.tmpdir / f'doc{i}.pdf', [[f'Document {i}']]) for i in range(3)]
+        cache = DocumentCache(max_documents=2)
+
+        first = cache.get(paths[0])
+        second = cache.get(paths[1])
+        cache.get(paths[0])  # 访问后 first 变为最近使用
+        cache.get(paths[2])  # 超出容量，淘汰最久未使用的 second
+
+        self.assertEqual(len(cache), 2)
+        self.assertIs(cache.get(paths[0]), first)
+        self.assertIsNot(cache.get(paths[1]), second)
+
+    def test_persisted_results_reload_without_parsing(self):
+        cache_dir = self.tmpdir / 'cache'
+        document = DocumentCache(cache_dir=str(cache_dir)).get(self.pdf_path)
+        text = document.text()
+        words = document.page_words(5.0, 3.0)
+        self.assertIn('Road Repair', text)
+
+        # 新实例从磁盘加载，不再打开PDF
+        with mock.patch('fitz.open', side_effect=AssertionError('不应重新解析')), \
+                mock.patch('pdfplumber.open', side_effect=AssertionError('不应重新解析')):
+            reloaded = DocumentCache(cache_dir=str(cache_dir)).get(self.pdf_path)
+            self.assertIsNot(reloaded, document)
+            self.assertEqual(reloaded.text(), text)
+            self.assertEqual(reloaded.page_words(5.0, 3.0), words)
+
+    def test_tampered_cache_file_is_ignored(self):
+        import json
+        import pickle
+
+        cache_dir = self.tmpdir / 'cache'
+        DocumentCache(cache_dir=str(cache_dir)).get(self.pdf_path).text()
+        cache_file, = cache_dir.iterdir()
+        with open(cache_file, encoding='utf-8') as f:
+            self.assertEqual(json.load(f)['content_hash'], compute_content_hash(self.pdf_path))
+
+        # 持久化目录位于上传目录下：写入的 pickle 数据不会被反序列化执行
+        cache_file.write_bytes(pickle.dumps(mock.sentinel.payload))
+        with mock.patch('pickle.load', side_effect=AssertionError('不应反序列化 pickle')), \
+                self.assertLogs('pdf_import.core.document_cache', level='WARNING'):
+            document = DocumentCache(cache_dir=str(cache_dir)).get(self.pdf_path)
+        self.assertIn('Road Repair', document.text())
+
+    def test_pdf_parsed_once_across_detector_extractor_and_cell_detector(self):
+        cache = DocumentCache()
+        detector = PDFDetector(document_cache=cache)
+        extractor = FieldExtractor(config_loader=_StubConfigLoader(), document_cache=cache)
+
+        with mock.patch('fitz.open', wraps=fitz.open) as fitz_open, \
+                mock.patch('pdfplumber.open', wraps=pdfplumber.open) as plumber_open:
+            detector.detect(self.pdf_path)
+            result = extractor.extract(self.pdf_path, 'procurement_notice')
+            CellDetector().extract_cells_from_pdf(self.pdf_path, document=cache.get(self.pdf_path))
+            # 第二个提取器共用缓存，同样不再解析
+            FieldExtractor(config_loader=_StubConfigLoader(), document_cache=cache).extract(
+                self.pdf_path, 'procurement_notice'
+            )
+
+        self.assertEqual(result['project_code'], 'CG-001')
+        self.assertEqual(fitz_open.call_count, 1)
+        self.assertEqual(plumber_open.call_count, 1)
+
+
+class ParallelExtractorTests(SimpleTestCase):
+    """并行提取：进程池合并结果与 extract_all_from_pdfs 一致，单文件或进程池不可用时顺序执行"""
+
+    def setUp(self):
+        self.tmpdir = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, self.tmpdir, ignore_errors=True)
+        # 控制价同时出现在采购公告与控制价审批中，按优先级应取采购公告
+        self.pdf_files = {
+            'control_price_approval': write_pdf(self.tmpdir / '2-21.pdf', [['采购上限价 2000.00']]),
+            'procurement_request': write_pdf(self.tmpdir / '2-23.pdf', [['采购方式 公开询价']]),
+            'procurement_notice': write_pdf(self.tmpdir / '2-24.pdf', [['采购控制价(元) ￥1000.00']]),
+        }
+
+    def _items(self):
+        # 采购公告排在最后，合并顺序不依赖输入顺序
+        order = ['procurement_notice', 'control_price_approval', 'procurement_request']
+        return [(self.pdf_files[pdf_type], pdf_type) for pdf_type in reversed(order)]
+
+    def test_process_pool_merge_matches_extract_all_from_pdfs(self):
+        expected_data, expected_confirmation = FieldExtractor().extract_all_from_pdfs(self.pdf_files)
+        self.assertEqual(expected_data['control_price'], '1000.00')
+
+        self.addCleanup(parallel_extractor.shutdown_process_pool)
+        with mock.patch.object(parallel_extractor, 'process_file',
+                               side_effect=AssertionError('应在工作进程中执行')):
+            outcome = ParallelExtractor(max_workers=2).extract_group(self._items())
+
+        self.assertEqual([item['error'] for item in outcome['files']], [None] * len(self.pdf_files))
+        self.assertEqual(outcome['pdf_files'], self.pdf_files)
+        self.assertEqual(outcome['merged_data'], expected_data)
+        self.assertEqual(outcome['requires_confirmation'], expected_confirmation)
+        self.assertEqual(outcome['merged_data']['procurement_method'], '公开询价')
+
+    def test_control_price_falls_back_to_approval(self):
+        pdf_files = dict(self.pdf_files, procurement_notice=write_pdf(self.tmpdir / 'notice.pdf', [['询价公告']]))
+        expected_data, _ = FieldExtractor().extract_all_from_pdfs(pdf_files)
+
+        with mock.patch.object(parallel_extractor, '_get_process_pool', side_effect=OSError('进程池不可用')):
+            outcome = ParallelExtractor(max_workers=2).extract_group(
+                [(path, pdf_type) for pdf_type, path in pdf_files.items()]
+            )
+
+        self.assertEqual(outcome['merged_data'], expected_data)
+        self.assertEqual(outcome['merged_data']['control_price'], '2000.00')
+
+    def test_broken_pool_falls_back_to_sequential(self):
+        pool = mock.Mock()
+        pool.submit.return_value.result.side_effect = BrokenProcessPool('工作进程异常退出')
+        expected_data, _ = FieldExtractor().extract_all_from_pdfs(self.pdf_files)
+
+        with mock.patch.object(parallel_extractor, '_get_process_pool', return_value=pool), \
+                mock.patch.object(parallel_extractor, '_discard_broken_pool') as discard:
+            outcome = ParallelExtractor(max_workers=2).extract_group(self._items())
+
+        discard.assert_called_once_with()
+        self.assertEqual(outcome['merged_data'], expected_data)
+        self.assertEqual([item['pdf_type'] for item in outcome['files']],
+                         [pdf_type for _, pdf_type in self._items()])
+
+    def test_single_file_runs_in_current_process(self):
+        path = self.pdf_files['procurement_request']
+        with mock.patch.object(parallel_extractor, '_get_process_pool',
+                               side_effect=AssertionError('单个文件不应创建进程池')):
+            outcome = ParallelExtractor(max_workers=4).extract_group([(path, None)])
+            sequential = ParallelExtractor(max_workers=1).process_files(
+                [(path, 'procurement_request'), (self.pdf_files['procurement_notice'], 'procurement_notice')]
+            )
+
+        self.assertEqual(len(outcome['files']), 1)
+        self.assertIsNone(outcome['files'][0]['error'])
+        self.assertEqual([item['pdf_type'] for item in sequential], ['procurement_request', 'procurement_notice'])
+        self.assertEqual(sequential[1]['extracted']['control_price'], '1000.00')
+
+
+@override_settings(PDF_IMPORT_CONFIG={'EXTRACT_WORKERS': 1})
+class ExtractDataViewTests(TestCase):
+    """提取视图：单个文件处理失败时记录该文件，其余文件照常提取"""
+
+    def setUp(self):
+        from django.contrib.auth.models import User
+        from pdf_import.models import PDFImportSession
+
+        self.tmpdir = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, self.tmpdir, ignore_errors=True)
+        self.bad_path = write_pdf(self.tmpdir / 'broken.pdf', [['Broken']])
+        user = User.objects.create_user(username='importer', password='pass')
+        self.client.force_login(user)
+        self.session = PDFImportSession.objects.create(created_by=user, pdf_files=[
+            {'name': '2-23.pdf', 'path': write_pdf(self.tmpdir / '2-23.pdf', [['采购方式 公开询价']]),
+             'matched_number': '2-23'},
+            {'name': 'broken.pdf', 'path': self.bad_path},
+        ])
+
+    def test_failed_file_is_recorded_and_others_extracted(self):
+        from pdf_import.models import PDFImportSession
+
+        original_detect = PDFDetector.detect
+
+        def detect(detector, pdf_path):
+            if pdf_path == self.bad_path:
+                raise ValueError('文件已损坏')
+            return original_detect(detector, pdf_path)
+
+        with mock.patch.object(PDFDetector, 'detect', autospec=True, side_effect=detect):
+            response = self.client.get(f'/pdf-import/extract/{self.session.pk}/')
+
+        self.assertRedirects(response, f'/pdf-import/preview/{self.session.pk}/', fetch_redirect_response=False)
+        self.session.refresh_from_db()
+        self.assertEqual(self.session.status, PDFImportSession.STATUS_PENDING_REVIEW)
+        self.assertEqual(self.session.extracted_data['procurement_method'], '公开询价')
+        self.assertEqual(self.session.pdf_files[1]['error'], '文件已损坏')
+        failed = [item for item in self.session.requires_confirmation if item['field'] == '__pdf_file__']
+        self.assertEqual([item['extracted_value'] for item in failed], ['broken.pdf'])
@@ -2,11 +2,16 @@
 单元格检测器 - 基于pdfplumber的精确单元格识别
 核心功能：识别PDF中的单元格结构，建立空间索引，支持右侧/下方键值对识别
 """
+import math
 import pdfplumber
 from typing import List, Dict, Any, Optional, Tuple
 from dataclasses import dataclass
 from collections import defaultdict
 
+# 网格索引的格子边长（PDF坐标单位）：一行文字高约10-15，右侧/下方搜索距离为100-200
+GRID_SIZE = 50.0
+GRID_EPSILON = 1e-6
+
 
 @dataclass
 class Cell:
@@ -42,6 +47,35 @@ class Cell:
         return f"Cell('{self.text[:20]}...', x={self.x0:.1f}, y={self.y0:.1f})"
 
 
+class _GridIndex:
+    """
+    均匀网格索引：按 (页码, 带宽坐标, 位置坐标) 分格存放单元格序号
+
+    右侧查询以 (center_y, x0) 建格，下方查询以 (center_x, y0) 建格，
+    查询只访问与搜索范围相交的少数格子，格内序号保持升序（即原始单元格顺序）。
+    """
+
+    def __init__(self, grid_size: float = GRID_SIZE):
+        self.grid_size = grid_size
+        self.buckets: Dict[Tuple[int, int, int], List[int]] = defaultdict(list)
+
+    def _bucket(self, value: float) -> int:
+        return math.floor(value / self.grid_size)
+
+    def add(self, page_num: int, band: float, pos: float, index: int):
+        self.buckets[(page_num, self._bucket(band), self._bucket(pos))].append(index)
+
+    def query(self, page_num: int, band_lo: float, band_hi: float,
+              pos_lo: float, pos_hi: float):
+        """返回可能落在 [band_lo, band_hi] x [pos_lo, pos_hi] 范围内的单元格序号（需调用方精确过滤）"""
+        # 范围略微放宽，避免边界上的浮点误差漏掉格子
+        band_lo, band_hi = band_lo - GRID_EPSILON, band_hi + GRID_EPSILON
+        pos_lo, pos_hi = pos_lo - GRID_EPSILON, pos_hi + GRID_EPSILON
+        for band_key in range(self._bucket(band_lo), self._bucket(band_hi) + 1):
+            for pos_key in range(self._bucket(pos_lo), self._bucket(pos_hi) + 1):
+                yield from self.buckets.get((page_num, band_key, pos_key), ())
+
+
 class CellDetector:
     """单元格检测器 - 核心类"""
     
@@ -57,19 +91,33 @@ class CellDetector:
         self.tolerance_y = tolerance_y
         self.cells: List[Cell] = []
         self.spatial_index: Dict[str, List[Cell]] = {}
+        # 文本索引：完全匹配 文本 -> 首个单元格序号；n-gram -> 单元格序号列表（升序）
+        self._text_exact: Dict[str, int] = {}
+        self._text_ngrams: Dict[str, List[int]] = {}
+        self._right_grid = _GridIndex()
+        self._below_grid = _GridIndex()
     
-    def extract_cells_from_pdf(self, pdf_path: str) -> List[Cell]:
+    def extract_cells_from_pdf(self, pdf_path: str, document=None) -> List[Cell]:
         """
         从PDF提取所有单元格
         
         Args:
             pdf_path: PDF文件路径
+            document: 已缓存的解析结果（ParsedDocument），提供时直接复用其文字块，不再打开PDF
             
         Returns:
             单元格列表
         """
         cells = []
         
+        if document is not None:
+            # 表格单元格目前不产出结果（见 _extract_cells_from_tables），只需文字块
+            for page_num, words in enumerate(document.page_words(self.tolerance_x, self.tolerance_y)):
+                cells.extend(self._extract_cells_from_words(words, page_num))
+            self.cells = cells
+            self._build_spatial_index()
+            return cells
+        
         with pdfplumber.open(pdf_path) as pdf:
             for page_num, page in enumerate(pdf.pages):
                 # 方法1: 从表格提取单元格
@@ -145,6 +193,33 @@ class CellDetector:
             # 按列索引（X坐标分组）
             col_key = round(cell.center_x / self.tolerance_x) * self.tolerance_x
             self.spatial_index['by_col'][col_key].append(cell)
+        
+        self._build_text_index()
+        
+        # 方向查询网格：右侧邻居按 (行中心Y, 左边界X) 分格，下方邻居按 (列中心X, 上边界Y) 分格
+        self._right_grid = _GridIndex()
+        self._below_grid = _GridIndex()
+        for index, cell in enumerate(self.cells):
+            self._right_grid.add(cell.page_num, cell.center_y, cell.x0, index)
+            self._below_grid.add(cell.page_num, cell.center_x, cell.y0, index)
+    
+    def _build_text_index(self):
+        """
+        构建文本索引
+        
+        - 完全匹配：文本 -> 首次出现的单元格序号
+        - 模糊匹配（查询词是单元格文本的子串）：单字与二元组 -> 包含它的单元格序号列表
+        """
+        self._text_exact = {}
+        self._text_ngrams = defaultdict(list)
+        
+        for index, cell in enumerate(self.cells):
+            text = cell.text
+            self._text_exact.setdefault(text, index)
+            grams = set(text)
+            grams.update(text[i:i + 2] for i in range(len(text) - 1))
+            for gram in grams:
+                self._text_ngrams[gram].append(index)
     
     def find_cell_by_text(self, text: str, fuzzy: bool = True) -> Optional[Cell]:
         """
@@ -152,19 +227,36 @@ class CellDetector:
         
         Args:
             text: 要查找的文本
-            fuzzy: 是否模糊匹配
+            fuzzy: 是否模糊匹配（查询词包含于单元格文本，或单元格文本包含于查询词）
             
         Returns:
-            匹配的单元格，未找到返回None
+            匹配的单元格（按单元格顺序的第一个），未找到返回None
         """
-        for cell in self.cells:
-            if fuzzy:
-                if text in cell.text or cell.text in text:
-                    return cell
-            else:
-                if cell.text == text:
-                    return cell
-        return None
+        if not fuzzy:
+            index = self._text_exact.get(text)
+            return self.cells[index] if index is not None else None
+        
+        candidates = []
+        
+        # 情况1：单元格文本是查询词的子串 —— 枚举查询词的所有子串做完全匹配
+        for start in range(len(text) + 1):
+            for end in range(start, len(text) + 1):
+                index = self._text_exact.get(text[start:end])
+                if index is not None:
+                    candidates.append(index)
+        
+        # 情况2：查询词是单元格文本的子串 —— 取最稀有的 n-gram 倒排列表逐个校验
+        if text:
+            grams = [text[i:i + 2] for i in range(len(text) - 1)] or [text]
+            postings = min((self._text_ngrams.get(gram, ()) for gram in grams), key=len)
+            for index in postings:
+                if text in self.cells[index].text:
+                    candidates.append(index)
+                    break
+        elif self.cells:
+            candidates.append(0)
+        
+        return self.cells[min(candidates)] if candidates else None
     
     def find_right_cell(self, anchor_cell: Cell, 
                        max_distance: float = 200.0) -> Optional[Cell]:
@@ -178,12 +270,15 @@ class CellDetector:
         Returns:
             右侧最近的单元格
         """
-        candidates = []
+        band = self.tolerance_y * 2
+        best = None
         
-        for cell in self.cells:
-            # 必须在同一页
-            if cell.page_num != anchor_cell.page_num:
-                continue
+        for index in self._right_grid.query(
+            anchor_cell.page_num,
+            anchor_cell.center_y - band, anchor_cell.center_y + band,
+            anchor_cell.x1, anchor_cell.x1 + max_distance,
+        ):
+            cell = self.cells[index]
             
             # 必须在右侧
             if cell.x0 <= anchor_cell.x1:
@@ -191,7 +286,7 @@ class CellDetector:
             
             # 检查是否在同一行（Y坐标接近）
             y_diff = abs(cell.center_y - anchor_cell.center_y)
-            if y_diff > self.tolerance_y * 2:
+            if y_diff > band:
                 continue
             
             # 计算距离
@@ -199,14 +294,12 @@ class CellDetector:
             if distance > max_distance:
                 continue
             
-            candidates.append((distance, cell))
+            # 距离相同时取单元格顺序靠前的
+            if best is None or (distance, index) < best:
+                best = (distance, index)
         
         # 返回最近的单元格
-        if candidates:
-            candidates.sort(key=lambda x: x[0])
-            return candidates[0][1]
-        
-        return None
+        return self.cells[best[1]] if best else None
     
     def find_below_cell(self, anchor_cell: Cell, 
                        max_distance: float = 100.0) -> Optional[Cell]:
@@ -220,12 +313,15 @@ class CellDetector:
         Returns:
             下方最近的单元格
         """
-        candidates = []
+        band = self.tolerance_x * 2
+        best = None
         
-        for cell in self.cells:
-            # 必须在同一页
-            if cell.page_num != anchor_cell.page_num:
-                continue
+        for index in self._below_grid.query(
+            anchor_cell.page_num,
+            anchor_cell.center_x - band, anchor_cell.center_x + band,
+            anchor_cell.y1, anchor_cell.y1 + max_distance,
+        ):
+            cell = self.cells[index]
             
             # 必须在下方
             if cell.y0 <= anchor_cell.y1:
@@ -233,7 +329,7 @@ class CellDetector:
             
             # 检查是否在同一列（X坐标接近）
             x_diff = abs(cell.center_x - anchor_cell.center_x)
-            if x_diff > self.tolerance_x * 2:
+            if x_diff > band:
                 continue
             
             # 计算距离
@@ -241,14 +337,12 @@ class CellDetector:
             if distance > max_distance:
                 continue
             
-            candidates.append((distance, cell))
+            # 距离相同时取单元格顺序靠前的
+            if best is None or (distance, index) < best:
+                best = (distance, index)
         
         # 返回最近的单元格
-        if candidates:
-            candidates.sort(key=lambda x: x[0])
-            return candidates[0][1]
-        
-        return None
+        return self.cells[best[1]] if best else None
     
     def extract_keyvalue_pair(self, key_text: str, 
                              direction: str = 'right',
@@ -236,11 +236,35 @@ class TextParser:
         
         return None
     
+    @staticmethod
+    def _iter_marked_tables(pdf_path: str, table_markers: List[str], document=None):
+        """
+        逐个返回包含任一表格标识词的页面中的表格
+
+        提供 document（ParsedDocument）时复用其缓存的页面文本与表格，否则直接打开PDF解析。
+        """
+        if document is not None:
+            for page_index, page_text in enumerate(document.plumber_page_texts()):
+                if any(marker in page_text for marker in table_markers):
+                    yield from document.page_tables(page_index)
+            return
+
+        import pdfplumber
+
+        with pdfplumber.open(pdf_path) as pdf:
+            for page in pdf.pages:
+                # 检查页面是否包含表格标记
+                page_text = page.extract_text() or ""
+                if not any(marker in page_text for marker in table_markers):
+                    continue
+                yield from page.extract_tables()
+
     @staticmethod
     def extract_from_table(pdf_path: str, 
                           table_markers: List[str],
                           row_identifier: Dict[str, str],
-                          target_column: str) -> Optional[str]:
+                          target_column: str,
+                          document=None) -> Optional[str]:
         """
         从PDF表格中提取单元格值
         
@@ -249,6 +273,7 @@ class TextParser:
             table_markers: 表格标识词列表（用于定位表格）
             row_identifier: 行标识 {"column": "key_column", "value": "key_value"}
             target_column: 目标列名
+            document: 已缓存的解析结果（可选）
             
         Returns:
             目标单元格的值
@@ -262,38 +287,27 @@ class TextParser:
             ) → "XX科技有限公司"
         """
         try:
-            import pdfplumber
-            
-            with pdfplumber.open(pdf_path) as pdf:
-                for page in pdf.pages:
-                    # 检查页面是否包含表格标记
-                    page_text = page.extract_text() or ""
-                    if not any(marker in page_text for marker in table_markers):
-                        continue
-                    
-                    # 提取表格
-                    tables = page.extract_tables()
-                    for table in tables:
-                        if not table or len(table) < 2:
-                            continue
-                        
-                        # 假设第一行是表头
-                        headers = [cell.strip() if cell else "" for cell in table[0]]
-                        
-                        # 查找目标列索引
-                        try:
-                            target_col_idx = headers.index(target_column)
-                            key_col_idx = headers.index(row_identifier["column"])
-                        except ValueError:
-                            continue
-                        
-                        # 查找匹配的行
-                        for row in table[1:]:
-                            if len(row) > max(target_col_idx, key_col_idx):
-                                if row[key_col_idx] and row_identifier["value"] in str(row[key_col_idx]):
-                                    target_value = row[target_col_idx]
-                                    if target_value:
-                                        return target_value.strip()
+            for table in TextParser._iter_marked_tables(pdf_path, table_markers, document):
+                if not table or len(table) < 2:
+                    continue
+                
+                # 假设第一行是表头
+                headers = [cell.strip() if cell else "" for cell in table[0]]
+                
+                # 查找目标列索引
+                try:
+                    target_col_idx = headers.index(target_column)
+                    key_col_idx = headers.index(row_identifier["column"])
+                except ValueError:
+                    continue
+                
+                # 查找匹配的行
+                for row in table[1:]:
+                    if len(row) > max(target_col_idx, key_col_idx):
+                        if row[key_col_idx] and row_identifier["value"] in str(row[key_col_idx]):
+                            target_value = row[target_col_idx]
+                            if target_value:
+                                return target_value.strip()
             
             return None
             
@@ -304,7 +318,8 @@ class TextParser:
     @staticmethod
     def extract_table_first_data_row(pdf_path: str,
                                     table_marker: str,
-                                    column_name: str) -> Optional[str]:
+                                    column_name: str,
+                                    document=None) -> Optional[str]:
         """
         提取表格第一个数据行的指定列值（简化版）
         
@@ -312,37 +327,29 @@ class TextParser:
             pdf_path: PDF文件路径
             table_marker: 表格标识词
             column_name: 列名
+            document: 已缓存的解析结果（可选）
             
         Returns:
             第一个数据行的该列值
         """
         try:
-            import pdfplumber
-            
-            with pdfplumber.open(pdf_path) as pdf:
-                for page in pdf.pages:
-                    page_text = page.extract_text() or ""
-                    if table_marker not in page_text:
-                        continue
-                    
-                    tables = page.extract_tables()
-                    for table in tables:
-                        if not table or len(table) < 2:
-                            continue
-                        
-                        headers = [cell.strip() if cell else "" for cell in table[0]]
-                        
-                        # 查找列索引
-                        try:
-                            col_idx = headers.index(column_name)
-                        except ValueError:
-                            continue
-                        
-                        # 返回第一个数据行的值
-                        if len(table) > 1 and len(table[1]) > col_idx:
-                            value = table[1][col_idx]
-                            if value:
-                                return value.strip()
+            for table in TextParser._iter_marked_tables(pdf_path, [table_marker], document):
+                if not table or len(table) < 2:
+                    continue
+                
+                headers = [cell.strip() if cell else "" for cell in table[0]]
+                
+                # 查找列索引
+                try:
+                    col_idx = headers.index(column_name)
+                except ValueError:
+                    continue
+                
+                # 返回第一个数据行的值
+                if len(table) > 1 and len(table[1]) > col_idx:
+                    value = table[1][col_idx]
+                    if value:
+                        return value.strip()
             
             return None
             
@@ -64,6 +64,22 @@ def validate_pdf_file(uploaded_file):
             uploaded_file.seek(original_pos or 0)
 
 
+def _extract_workers():
+    """并行提取的工作进程数（PDF_IMPORT_CONFIG['EXTRACT_WORKERS']，未配置时按CPU核数）"""
+    from .core.parallel_extractor import default_max_workers
+
+    config = getattr(settings, 'PDF_IMPORT_CONFIG', {})
+    return config.get('EXTRACT_WORKERS') or default_max_workers()
+
+
+def _parse_cache_dir(session_id):
+    """会话的PDF解析结果持久化目录（PDF_IMPORT_CONFIG['PERSIST_PARSE_CACHE'] 未开启时返回None）"""
+    config = getattr(settings, 'PDF_IMPORT_CONFIG', {})
+    if not config.get('PERSIST_PARSE_CACHE', False):
+        return None
+    return Path(settings.MEDIA_ROOT) / 'pdf_uploads' / str(session_id) / '.parse_cache'
+
+
 @login_required
 def upload_pdf(request):
     """
@@ -191,56 +207,49 @@ def extract_data(request, session_id):
         return redirect('pdf_import:preview', session_id=session_id)
     
     try:
-        from .core.pdf_detector import PDFDetector
-        from .core.field_extractor import FieldExtractor
+        from .core.parallel_extractor import NUMBER_TYPE_MAP, ParallelExtractor
 
-        detector = PDFDetector()
-        extractor = FieldExtractor()
+        # 各PDF的类型识别与字段提取分发到多进程并行执行，再按优先级合并
+        engine = ParallelExtractor(
+            max_workers=_extract_workers(),
+            cache_dir=_parse_cache_dir(session_id),
+        )
 
         # 1. 识别PDF类型
         #    优先使用上传阶段提取的文件编号 matched_number 映射为 pdf_type，
         #    若缺失或无法映射，再退回 PDFDetector 进行基于文件名 / 内容的识别。
-        number_type_map = {
-            '2-21': 'control_price_approval',
-            '2-23': 'procurement_request',
-            '2-24': 'procurement_notice',
-            '2-25': 'procurement_notice',  # 虽然 2-25 已在过滤器中排除，这里仍保持映射以兼容历史数据
-            '2-44': 'procurement_result_oa',
-            '2-45': 'candidate_publicity',
-            '2-47': 'result_publicity',
-        }
-
-        pdf_files_by_type = {}
-        requires_confirmation = []
-
-        for pdf_info in session.pdf_files:
-            pdf_path = pdf_info.get('path')
-            if not pdf_path:
-                continue
+        pdf_infos = [pdf_info for pdf_info in session.pdf_files if pdf_info.get('path')]
+        items = [
+            (pdf_info['path'], NUMBER_TYPE_MAP.get(pdf_info.get('matched_number')))
+            for pdf_info in pdf_infos
+        ]
 
-            pdf_type = None
-            confidence = 0.0
-            method = 'none'
+        # 2. 提取字段（从所有PDF合并）
+        outcome = engine.extract_group(items)
+        extracted_data = outcome['merged_data']
+        field_confirmation = outcome['requires_confirmation']
 
-            matched_number = pdf_info.get('matched_number')
-            if matched_number and matched_number in number_type_map:
-                # 由文件编号直接推导 PDF 类型（最高优先级）
-                pdf_type = number_type_map[matched_number]
-                confidence = 1.0
-                method = 'filename_number'
-            else:
-                # 回退到内容/文件名识别
-                pdf_type, confidence, method = detector.detect(pdf_path)
+        requires_confirmation = []
+        failed_files = []
+        for pdf_info, result in zip(pdf_infos, outcome['files']):
+            pdf_type = result['pdf_type']
 
             # 更新PDF信息，便于前端展示与排查
             pdf_info['detected_type'] = pdf_type
-            pdf_info['confidence'] = confidence
-            pdf_info['method'] = method
+            pdf_info['confidence'] = result['confidence']
+            pdf_info['method'] = result['method']
+            pdf_info['error'] = result['error']
 
-            # 按类型分组（只保留识别成功的类型）
-            if pdf_type and pdf_type != 'unknown':
-                pdf_files_by_type[pdf_type] = pdf_path
-            else:
+            if result['error']:
+                # 单个文件处理失败不影响其他文件，加入需确认列表由用户核对
+                failed_files.append(pdf_info.get('name'))
+                requires_confirmation.append({
+                    'field': '__pdf_file__',
+                    'extracted_value': pdf_info.get('name'),
+                    'mapped_value': None,
+                    'reason': f"PDF处理失败: {result['error']}",
+                })
+            elif not pdf_type or pdf_type == 'unknown':
                 # 类型无法识别的文件加入需确认列表
                 requires_confirmation.append({
                     'field': '__pdf_file__',
@@ -249,9 +258,6 @@ def extract_data(request, session_id):
                     'reason': '无法识别PDF类型',
                 })
 
-        # 2. 提取字段（从所有PDF合并）
-        extracted_data, field_confirmation = extractor.extract_all_from_pdfs(pdf_files_by_type)
-
         # 3. 标记需要确认的字段（合并类型识别与字段级别提醒）
         requires_confirmation.extend(field_confirmation)
 
@@ -264,6 +270,8 @@ def extract_data(request, session_id):
         # 显示提取成功消息
         extracted_count = len([v for v in extracted_data.values() if v])
         messages.success(request, f'成功提取 {extracted_count} 个字段！')
+        if failed_files:
+            messages.warning(request, f"以下文件处理失败，已跳过: {'、'.join(failed_files)}")
         
         return redirect('pdf_import:preview', session_id=session_id)
         
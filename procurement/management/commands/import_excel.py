@@ -4,7 +4,9 @@
 """
 import os
 import csv
+import copy
 import re
+import time
 import logging
 import chardet
 from collections import defaultdict
@@ -18,13 +20,17 @@ from django.db.models import Q
 from django.utils import timezone
 from project.models import Project
 from procurement.models import Procurement
-from contract.models import Contract
+from contract.models import Contract, refresh_contract_rollups
 from payment.models import Payment
 from settlement.models import Settlement
 from supplier_eval.models import SupplierEvaluation
 from project.validators import validate_code_field, check_url_safe_string
 from project.enums import FilePositioning, get_enum_values, ENUM_ALIASES
 from payment.validators import PaymentDataValidator
+from project.models_update_event import refresh_contract_update_events, refresh_update_events
+from project.services.dimension_options import invalidate_dimension_options
+from project.services.search_index import SEARCH_INDEX_FIELDS, refresh_search_index
+from project.signals import invalidate_statistics_cache
 
 logger = logging.getLogger(__name__)
 
@@ -32,6 +38,16 @@ logger = logging.getLogger(__name__)
 class Command(BaseCommand):
     help = '从Excel/CSV文件导入采购台账数据（支持长表和宽表转换）'
 
+    # 长表批量模式支持的模块及对应模型
+    BULK_MODELS = {
+        'project': Project,
+        'procurement': Procurement,
+        'contract': Contract,
+    }
+
+    # 关联记录预取结果：{(模型, 字段): {值: 实例}}，仅批量模式下按批次填充
+    _prefetched = {}
+
     def add_arguments(self, parser):
         parser.add_argument(
             'file_path',
@@ -85,6 +101,12 @@ class Command(BaseCommand):
             action='store_true',
             help='以JSON格式输出统计汇总（提供给API使用）'
         )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=0,
+            help='长表批量模式每批行数（项目/采购/合同模块）；0=逐行导入（默认）'
+        )
 
     def handle(self, *args, **options):
         file_path = options['file_path']
@@ -96,6 +118,8 @@ class Command(BaseCommand):
         conflict_mode = options['conflict_mode']
         project_code = options.get('project_code')
         self.json_output = options.get('json_output', False) or options.get('json-output', False)
+        self.batch_size = max(0, options.get('batch_size') or 0)
+        self._started_at = time.monotonic()
 
         # 验证replace模式必须提供project_code
         if conflict_mode == 'replace':
@@ -273,11 +297,321 @@ class Command(BaseCommand):
     def _handle_long_table(self, file_path, module, encoding, skip_errors, dry_run, conflict_mode):
         """处理长表格式导入"""
         # 如果是合同模块，使用两遍导入策略
-        if module == 'contract':
+        if getattr(self, 'batch_size', 0) and module in self.BULK_MODELS:
+            self._handle_long_table_bulk(file_path, module, encoding, skip_errors, dry_run, conflict_mode)
+        elif module == 'contract':
             self._handle_contract_two_pass(file_path, encoding, skip_errors, dry_run, conflict_mode)
         else:
+            if getattr(self, 'batch_size', 0):
+                self.stdout.write(self.style.WARNING(
+                    f'{self._get_module_name(module)}模块暂不支持批量模式，使用逐行导入'
+                ))
             self._handle_long_table_single_pass(file_path, module, encoding, skip_errors, dry_run, conflict_mode)
 
+    def _iter_data_rows(self, file_path, encoding, stats=None):
+        """
+        逐行读取CSV，产出 (行号, 行数据)
+        
+        过滤模板说明列，跳过空行与模板说明行；传入 stats 时累计空行/模板说明行数。
+        """
+        with open(file_path, 'r', encoding=encoding) as csvfile:
+            reader = csv.DictReader(csvfile)
+            for row_num, row in enumerate(reader, start=2):  # 从第2行开始计数(第1行是表头)
+                if not any(v.strip() for v in row.values() if v):
+                    if stats is not None:
+                        stats['empty_rows'] += 1
+                    continue
+                if self._is_template_note_row(row):
+                    if stats is not None:
+                        stats['template_rows'] += 1
+                    continue
+                row.pop('模板说明', None)
+                yield row_num, row
+
+    def _handle_long_table_bulk(self, file_path, module, encoding, skip_errors, dry_run, conflict_mode):
+        """
+        处理长表格式导入（批量模式）
+        
+        单遍读取文件，按 --batch-size 分块：每块先逐行解析校验，
+        再用一次查询预取已存在记录与关联数据，最后在一个事务内 bulk_create/bulk_update。
+        合同模块仍按"主合同 → 补充/解除协议"两遍处理，保证主合同先入库。
+        """
+        stats = {
+            'total_rows': 0,
+            'success_rows': 0,
+            'error_rows': 0,
+            'created': 0,
+            'updated': 0,
+            'skipped': 0,
+            'empty_rows': 0,
+            'template_rows': 0,
+        }
+        errors = []
+        error_details = {
+            '数据验证错误': [],
+            '关联数据不存在': [],
+            '数据格式错误': [],
+            '其他错误': [],
+        }
+        # 预演模式下已校验但未入库的记录（供第二遍查找主合同）
+        self._staged = {}
+        
+        self.stdout.write(f'批量模式：每批 {self.batch_size} 行')
+        
+        if module == 'contract':
+            main_value = FilePositioning.MAIN_CONTRACT.value
+            passes = [
+                ('导入主合同', lambda row: self._row_file_positioning(row) == main_value),
+                ('导入补充协议和解除协议', lambda row: self._row_file_positioning(row) != main_value),
+            ]
+        else:
+            passes = [(None, None)]
+        
+        for pass_idx, (title, row_filter) in enumerate(passes):
+            if title:
+                self.stdout.write(self.style.SUCCESS(f'\n>>> 第{pass_idx + 1}遍：{title}'))
+            chunk = []
+            for row_num, row in self._iter_data_rows(file_path, encoding, stats if pass_idx == 0 else None):
+                if row_filter and not row_filter(row):
+                    continue
+                stats['total_rows'] += 1
+                chunk.append((row_num, row))
+                if len(chunk) >= self.batch_size:
+                    self._import_long_chunk(chunk, module, skip_errors, dry_run, conflict_mode,
+                                            stats, errors, error_details)
+                    chunk = []
+            if chunk:
+                self._import_long_chunk(chunk, module, skip_errors, dry_run, conflict_mode,
+                                        stats, errors, error_details)
+        
+        if stats['total_rows'] == 0:
+            self.stdout.write(self.style.WARNING('没有可导入的有效数据'))
+            return
+        
+        self._print_enhanced_summary(stats, errors, error_details, module)
+
+    def _row_file_positioning(self, row):
+        """获取行的文件定位，默认为主合同"""
+        value = (row.get('文件定位') or '').strip()
+        return value or FilePositioning.MAIN_CONTRACT.value
+
+    def _import_long_chunk(self, chunk, module, skip_errors, dry_run, conflict_mode, stats, errors, error_details):
+        """批量导入一个分块：解析校验 → 预取 → 单事务批量写入"""
+        model = self.BULK_MODELS[module]
+        parse_key = getattr(self, f'_parse_{module}_key')
+        
+        def record_error(row_num, row, error_msg):
+            stats['error_rows'] += 1
+            error_category = self._categorize_error(error_msg)
+            error_details[error_category].append({
+                'row': row_num,
+                'message': error_msg,
+                'data': self._get_key_fields(row, module)
+            })
+            errors.append(f'第 {row_num} 行: {error_msg}')
+            logger.error(f'第 {row_num} 行错误: {error_msg}')
+            if not skip_errors:
+                raise CommandError(f'第 {row_num} 行错误: {error_msg}')
+            self.stdout.write(self.style.ERROR(f'✗ 第 {row_num} 行错误: {error_msg}'))
+        
+        # 第一步：解析主键
+        parsed = []
+        for row_num, row in chunk:
+            try:
+                parsed.append((row_num, row, parse_key(row)))
+            except Exception as e:
+                record_error(row_num, row, str(e))
+        
+        # 第二步：一次查询预取本批已存在记录及关联数据
+        existing = model.objects.in_bulk([key for _, _, key in parsed])
+        if dry_run:
+            existing.update({key: obj for key, obj in self._staged.items() if isinstance(obj, model)})
+        self._prefetched = self._prefetch_lookups(module, [row for _, row, _ in parsed])
+        
+        # 第三步：逐行构建并校验实例（不访问数据库）
+        to_create, to_update = {}, {}
+        outcomes = []
+        update_fields = set()
+        try:
+            for row_num, row, key in parsed:
+                base = to_create.get(key) or to_update.get(key) or existing.get(key)
+                if base is not None and conflict_mode == 'skip':
+                    outcomes.append((row_num, row, key, 'skipped'))
+                    continue
+                try:
+                    defaults = (
+                        self._build_contract_defaults(row, key) if module == 'contract'
+                        else getattr(self, f'_build_{module}_defaults')(row)
+                    )
+                    if conflict_mode not in ['update', 'replace']:
+                        # skip模式，不创建新记录
+                        outcomes.append((row_num, row, key, 'skipped'))
+                        continue
+                    instance = copy.copy(base) if base is not None else model(pk=key)
+                    for field_name, value in defaults.items():
+                        setattr(instance, field_name, value)
+                    self._validate_for_bulk(instance)
+                except Exception as e:
+                    record_error(row_num, row, str(e))
+                    continue
+                
+                update_fields.update(defaults)
+                # 是否新增只看数据库中是否已有该记录；同一批内重复出现的新记录仍由 bulk_create 写入，
+                # 与逐行导入一致：第一次出现计为新增，之后的行相当于更新刚新增的记录
+                if key in existing:
+                    to_update[key] = instance
+                    outcome = 'updated'
+                else:
+                    outcome = 'updated' if key in to_create else 'created'
+                    to_create[key] = instance
+                outcomes.append((row_num, row, key, outcome))
+        finally:
+            self._prefetched = {}
+        
+        # 第四步：单事务批量写入
+        if dry_run:
+            self._staged.update(to_create)
+            self._staged.update(to_update)
+        elif to_create or to_update:
+            try:
+                with transaction.atomic():
+                    if to_create:
+                        model.objects.bulk_create(list(to_create.values()), batch_size=self.batch_size)
+                    if to_update:
+                        now = timezone.now()
+                        for instance in to_update.values():
+                            instance.updated_at = now
+                        model.objects.bulk_update(
+                            list(to_update.values()),
+                            sorted(update_fields) + ['updated_at'],
+                            batch_size=self.batch_size
+                        )
+            except Exception as e:
+                first_row, last_row = chunk[0][0], chunk[-1][0]
+                error_msg = f'第 {first_row}-{last_row} 行批量写入失败: {e}'
+                logger.error(error_msg)
+                if not skip_errors:
+                    raise CommandError(error_msg)
+                # 降级为逐行导入，定位具体出错行
+                self.stdout.write(self.style.WARNING(f'{error_msg}，改为逐行导入该批数据'))
+                for row_num, row, key, outcome in outcomes:
+                    try:
+                        with transaction.atomic():
+                            outcome = self._import_long_row(row, module, conflict_mode)
+                    except Exception as row_error:
+                        record_error(row_num, row, str(row_error))
+                        continue
+                    self._count_outcome(stats, outcome)
+                self._invalidate_for(module, to_create, to_update)
+                return
+            self._invalidate_for(module, to_create, to_update)
+        
+        for _, _, _, outcome in outcomes:
+            if dry_run and outcome != 'skipped':
+                stats['success_rows'] += 1
+            else:
+                self._count_outcome(stats, outcome)
+        
+        processed = stats['success_rows'] + stats['skipped'] + stats['error_rows']
+        self.stdout.write(
+            f'进度: 已处理 {processed} 行 | '
+            f'成功: {stats["success_rows"]} | '
+            f'新增: {stats["created"]} | '
+            f'更新: {stats["updated"]} | '
+            f'跳过: {stats["skipped"]} | '
+            f'错误: {stats["error_rows"]}'
+        )
+
+    def _count_outcome(self, stats, outcome):
+        """按单行导入结果累计统计"""
+        if outcome == 'created':
+            stats['created'] += 1
+            stats['success_rows'] += 1
+        elif outcome == 'updated':
+            stats['updated'] += 1
+            stats['success_rows'] += 1
+        elif outcome == 'skipped':
+            stats['skipped'] += 1
+
+    def _validate_for_bulk(self, instance):
+        """
+        批量模式下的模型校验，与 save() 中的清洗和 full_clean 等价
+        
+        外键已在预取阶段解析，唯一性由主键预取保证，因此跳过这两类逐行查询的校验。
+        """
+        clean_strings = getattr(instance, '_clean_string_fields', None)
+        if clean_strings:
+            clean_strings()
+        foreign_keys = [f.name for f in instance._meta.concrete_fields if f.is_relation]
+        instance.full_clean(exclude=foreign_keys, validate_unique=False, validate_constraints=False)
+
+    def _prefetch_lookups(self, module, rows):
+        """一次查询预取本批行引用的项目、采购与主合同"""
+        def collect(column):
+            return {value for value in ((row.get(column) or '').strip() for row in rows) if value}
+        
+        project_codes = collect('项目编码')
+        prefetched = {
+            (Project, 'project_code'): Project.objects.in_bulk(project_codes) if project_codes else {},
+        }
+        if module != 'contract':
+            return prefetched
+        
+        procurement_codes = collect('关联采购编号')
+        prefetched[(Procurement, 'procurement_code')] = (
+            Procurement.objects.in_bulk(procurement_codes) if procurement_codes else {}
+        )
+        
+        parent_refs = collect('关联主合同编号')
+        by_sequence, by_code = {}, {}
+        if parent_refs:
+            parents = Contract.objects.filter(
+                Q(contract_sequence__in=parent_refs) | Q(contract_code__in=parent_refs)
+            ).select_related('procurement', 'project')
+            staged = [obj for obj in getattr(self, '_staged', {}).values() if isinstance(obj, Contract)]
+            for contract in list(parents) + staged:
+                if contract.contract_sequence:
+                    by_sequence.setdefault(contract.contract_sequence, contract)
+                by_code.setdefault(contract.contract_code, contract)
+        prefetched[(Contract, 'contract_sequence')] = by_sequence
+        prefetched[(Contract, 'contract_code')] = by_code
+        return prefetched
+
+    def _lookup(self, model, field, value):
+        """按字段查找关联记录；批量模式下使用本批预取结果，不再逐行查询"""
+        prefetched = self._prefetched.get((model, field))
+        if prefetched is not None:
+            return prefetched.get(value)
+        try:
+            return model.objects.get(**{field: value})
+        except model.DoesNotExist:
+            return None
+
+    def _invalidate_for(self, module, *instance_maps):
+        """批量写入不触发模型信号，需显式失效统计与维度选项缓存、重算更新事件与全文检索索引（合同还需重算财务汇总）"""
+        codes = set()
+        contract_codes = set()
+        record_codes = set()
+        labels = set()
+        for instances in instance_maps:
+            for instance in instances.values():
+                codes.add(instance.pk if module == 'project' else instance.project_id)
+                record_codes.add(instance.pk)
+                labels.add(instance._meta.label)
+                if module == 'contract':
+                    contract_codes.update((instance.pk, instance.parent_contract_id))
+        invalidate_statistics_cache(codes)
+        if contract_codes:
+            refresh_contract_rollups(contract_codes)
+        if module == 'contract':
+            refresh_contract_update_events(record_codes)
+        elif module in ('procurement', 'payment', 'settlement'):
+            refresh_update_events(module, record_codes)
+        for label in labels & set(SEARCH_INDEX_FIELDS):
+            refresh_search_index(label, record_codes)
+        if module == 'project':
+            invalidate_dimension_options()
+
     def _handle_long_table_single_pass(self, file_path, module, encoding, skip_errors, dry_run, conflict_mode):
         """处理长表格式导入（单遍导入）"""
         stats = {
@@ -838,6 +1172,7 @@ class Command(BaseCommand):
                     existing_payment = existing_in_month[0]  # 一个月只应有一条记录
                     prepared_entries.append({
                         'payment_code': existing_payment.payment_code,  # 保持原有编号
+                        'existing': existing_payment,
                         'contract': contract,
                         'payment_amount': record['payment_amount'],
                         'payment_date': payment_date,
@@ -848,9 +1183,9 @@ class Command(BaseCommand):
                         'is_update': True,  # 标记为更新操作
                     })
                 else:
-                    # 新增付款记录，不生成编号（让模型的save方法自动生成）
+                    # 新增付款记录，不生成编号（批量创建时统一分配）
                     prepared_entries.append({
-                        'payment_code': None,  # 让Payment模型自动生成
+                        'payment_code': None,  # 由 bulk_create_with_codes 分配
                         'contract': contract,
                         'payment_amount': record['payment_amount'],
                         'payment_date': payment_date,
@@ -870,8 +1205,8 @@ class Command(BaseCommand):
 
         for entry in prepared_entries:
             if entry.get('is_update'):
-                # 更新现有记录
-                existing = Payment.objects.filter(payment_code=entry['payment_code']).first()
+                # 更新现有记录（复用已加载的付款，不再逐条查询）
+                existing = entry['existing']
                 if existing:
                     existing.contract = entry['contract']
                     existing.payment_amount = entry['payment_amount']
@@ -884,9 +1219,9 @@ class Command(BaseCommand):
                     to_update.append(existing)
                     stats['updated'] += 1
             else:
-                # 创建新记录，让Payment模型自动生成编号
+                # 创建新记录，编号在批量创建时按合同统一分配
                 payment_obj = Payment(
-                    payment_code=None,  # 让模型自动生成
+                    payment_code=None,
                     contract=entry['contract'],
                     payment_amount=entry['payment_amount'],
                     payment_date=entry['payment_date'],
@@ -911,19 +1246,32 @@ class Command(BaseCommand):
                     )
                     logger.info(f'成功更新 {len(to_update)} 条付款记录')
 
+                    invalidate_statistics_cache({p.contract.project_id for p in to_update})
+                    refresh_contract_rollups({p.contract_id for p in to_update})
+                    refresh_update_events('payment', {p.pk for p in to_update})
+
                 if to_create:
-                    # 使用循环保存，让每个对象自动生成编号
-                    created_count = 0
-                    for payment in to_create:
-                        try:
-                            payment.save()
-                            created_count += 1
-                        except Exception as e:
-                            error_msg = f'创建付款记录失败: {str(e)}'
-                            logger.error(error_msg)
-                            errors.append(error_msg)
-                            stats['created'] -= 1
-                            stats['error_rows'] += 1
+                    # 每个合同一次有序查询分配编号，一次批量写入
+                    try:
+                        Payment.objects.bulk_create_with_codes(
+                            to_create, batch_size=getattr(self, 'batch_size', 0) or None
+                        )
+                        created_count = len(to_create)
+                    except ValidationError as e:
+                        # 批量校验失败（如编号冲突）时回退逐条保存，逐条记录错误
+                        logger.warning(f'付款批量创建失败，回退逐条保存: {e}')
+                        created_count = 0
+                        for payment in to_create:
+                            payment.payment_code = None
+                            try:
+                                payment.save()
+                                created_count += 1
+                            except Exception as e:
+                                error_msg = f'创建付款记录失败: {str(e)}'
+                                logger.error(error_msg)
+                                errors.append(error_msg)
+                                stats['created'] -= 1
+                                stats['error_rows'] += 1
                     
                     if created_count > 0:
                         logger.info(f'成功创建 {created_count} 条付款记录')
@@ -1062,6 +1410,27 @@ class Command(BaseCommand):
 
     def _import_project_long(self, row, conflict_mode='update'):
         """导入项目长表数据"""
+        project_code = self._parse_project_key(row)
+        
+        # 检查是否已存在
+        existing = Project.objects.filter(project_code=project_code).first()
+        
+        if existing:
+            if conflict_mode == 'skip':
+                return 'skipped'
+        
+        if conflict_mode in ['update', 'replace']:
+            obj, created = Project.objects.update_or_create(
+                project_code=project_code,
+                defaults=self._build_project_defaults(row)
+            )
+            return 'created' if created else 'updated'
+        else:
+            # skip模式，不创建新记录
+            return 'skipped'
+
+    def _parse_project_key(self, row):
+        """解析并校验项目编码"""
         project_code = row.get('项目编码', '').strip()
         project_name = row.get('项目名称', '').strip()
         
@@ -1075,37 +1444,45 @@ class Command(BaseCommand):
             validate_code_field(project_code)
         except ValidationError as e:
             raise ValueError(f'项目编码格式错误: {e.message}')
+        return project_code
+
+    def _build_project_defaults(self, row):
+        """构建项目字段值"""
+        return {
+            'project_name': row.get('项目名称', '').strip(),
+            'description': row.get('项目描述', '').strip(),
+            'project_manager': row.get('项目负责人', '').strip(),
+            'status': row.get('项目状态', '进行中').strip(),
+            'remarks': row.get('备注', '').strip(),
+        }
+
+    def _import_procurement_long(self, row, conflict_mode='update'):
+        """导入采购长表数据"""
+        procurement_code = self._parse_procurement_key(row)
         
         # 检查是否已存在
-        existing = Project.objects.filter(project_code=project_code).first()
+        existing = Procurement.objects.filter(procurement_code=procurement_code).first()
         
         if existing:
             if conflict_mode == 'skip':
                 return 'skipped'
         
+        defaults = self._build_procurement_defaults(row)
+        
         if conflict_mode in ['update', 'replace']:
-            obj, created = Project.objects.update_or_create(
-                project_code=project_code,
-                defaults={
-                    'project_name': project_name,
-                    'description': row.get('项目描述', '').strip(),
-                    'project_manager': row.get('项目负责人', '').strip(),
-                    'status': row.get('项目状态', '进行中').strip(),
-                    'remarks': row.get('备注', '').strip(),
-                }
+            obj, created = Procurement.objects.update_or_create(
+                procurement_code=procurement_code,
+                defaults=defaults
             )
             return 'created' if created else 'updated'
         else:
             # skip模式，不创建新记录
             return 'skipped'
 
-    def _import_procurement_long(self, row, conflict_mode='update'):
-        """导入采购长表数据"""
-        from project.models import Project
-        
+    def _parse_procurement_key(self, row):
+        """解析并校验招采编号"""
         procurement_code = row.get('招采编号', '').strip()
         project_name = row.get('采购项目名称', '').strip()
-        project_code = row.get('项目编码', '').strip()
         
         if not procurement_code:
             raise ValueError('招采编号不能为空')
@@ -1117,74 +1494,82 @@ class Command(BaseCommand):
             validate_code_field(procurement_code)
         except ValidationError as e:
             raise ValueError(f'招采编号格式错误: {e.message}')
+        return procurement_code
+
+    def _build_procurement_defaults(self, row):
+        """构建采购字段值（含项目关联解析）"""
+        project_code = row.get('项目编码', '').strip()
+        
+        # 处理项目关联
+        project = None
+        if project_code:
+            project = self._lookup(Project, 'project_code', project_code)
+            if project is None:
+                # 如果项目不存在，记录警告但继续导入
+                self.stdout.write(self.style.WARNING(f'项目编码不存在: {project_code}，将不关联项目'))
+        
+        return {
+            'project': project,
+            'project_name': row.get('采购项目名称', '').strip(),
+            'procurement_unit': row.get('采购单位', '').strip(),
+            'procurement_category': self._clean_enum_field(row.get('采购类别', ''), 'procurement_category'),
+            'procurement_platform': row.get('采购平台', '').strip(),
+            'procurement_method': self._clean_enum_field(row.get('采购方式', ''), 'procurement_method'),
+            'qualification_review_method': self._clean_enum_field(row.get('资格审查方式', ''), 'qualification_review_method'),
+            'bid_evaluation_method': self._clean_enum_field(row.get('评标谈判方式', ''), 'bid_evaluation_method'),
+            'bid_awarding_method': self._clean_enum_field(row.get('定标方法', ''), 'bid_awarding_method'),
+            'budget_amount': self._parse_decimal(row.get('采购预算金额（元）') or row.get('采购预算金额(元)')),
+            'control_price': self._parse_decimal(row.get('采购控制价（元）')),
+            'winning_amount': self._parse_decimal(row.get('中标金额（元）')),
+            'procurement_officer': row.get('采购经办人', '').strip(),
+            'demand_department': row.get('需求部门', '').strip(),
+            'demand_contact': row.get('申请人联系电话（需求部门）', '').strip(),
+            'winning_bidder': row.get('中标单位', '').strip(),
+            'winning_contact': row.get('中标单位联系人及方式', '').strip(),
+            'planned_completion_date': self._parse_date(row.get('计划结束采购时间')),
+            'requirement_approval_date': self._parse_date(row.get('采购需求书审批完成日期（OA）')),
+            'announcement_release_date': self._parse_date(row.get('公告发布时间')),
+            'registration_deadline': self._parse_date(row.get('报名截止时间')),
+            'bid_opening_date': self._parse_date(row.get('开标时间')),
+            'candidate_publicity_end_date': self._parse_date(row.get('候选人公示结束时间')),
+            'result_publicity_release_date': self._parse_date(row.get('结果公示发布时间')),
+            'notice_issue_date': self._parse_date(row.get('中标通知书发放日期')),
+            'archive_date': self._parse_date(row.get('资料归档日期')),
+            'evaluation_committee': row.get('评标委员会成员', '').strip(),
+            'bid_guarantee': row.get('投标担保形式及金额（元）', '').strip(),
+            'bid_guarantee_return_date': self._parse_date(row.get('投标担保退回日期')),
+            'performance_guarantee': row.get('履约担保形式及金额（元）', '').strip(),
+            'candidate_publicity_issue': row.get('候选人公示期质疑情况', '').strip(),
+            'non_bidding_explanation': row.get('应招未招说明（由公开转单一或邀请的情况）', '').strip(),
+        }
+
+    def _import_contract_long(self, row, conflict_mode='update'):
+        """导入合同长表数据"""
+        contract_code = self._parse_contract_key(row)
         
         # 检查是否已存在
-        existing = Procurement.objects.filter(procurement_code=procurement_code).first()
+        existing = Contract.objects.filter(contract_code=contract_code).first()
         
         if existing:
             if conflict_mode == 'skip':
                 return 'skipped'
         
-        # 处理项目关联
-        project = None
-        if project_code:
-            try:
-                project = Project.objects.get(project_code=project_code)
-            except Project.DoesNotExist:
-                # 如果项目不存在，记录警告但继续导入
-                self.stdout.write(self.style.WARNING(f'项目编码不存在: {project_code}，将不关联项目'))
+        defaults = self._build_contract_defaults(row, contract_code)
         
         if conflict_mode in ['update', 'replace']:
-            obj, created = Procurement.objects.update_or_create(
-                procurement_code=procurement_code,
-                defaults={
-                    'project': project,
-                    'project_name': project_name,
-                    'procurement_unit': row.get('采购单位', '').strip(),
-                    'procurement_category': self._clean_enum_field(row.get('采购类别', ''), 'procurement_category'),
-                    'procurement_platform': row.get('采购平台', '').strip(),
-                    'procurement_method': self._clean_enum_field(row.get('采购方式', ''), 'procurement_method'),
-                    'qualification_review_method': self._clean_enum_field(row.get('资格审查方式', ''), 'qualification_review_method'),
-                    'bid_evaluation_method': self._clean_enum_field(row.get('评标谈判方式', ''), 'bid_evaluation_method'),
-                    'bid_awarding_method': self._clean_enum_field(row.get('定标方法', ''), 'bid_awarding_method'),
-                    'budget_amount': self._parse_decimal(row.get('采购预算金额（元）') or row.get('采购预算金额(元)')),
-                    'control_price': self._parse_decimal(row.get('采购控制价（元）')),
-                    'winning_amount': self._parse_decimal(row.get('中标金额（元）')),
-                    'procurement_officer': row.get('采购经办人', '').strip(),
-                    'demand_department': row.get('需求部门', '').strip(),
-                    'demand_contact': row.get('申请人联系电话（需求部门）', '').strip(),
-                    'winning_bidder': row.get('中标单位', '').strip(),
-                    'winning_contact': row.get('中标单位联系人及方式', '').strip(),
-                    'planned_completion_date': self._parse_date(row.get('计划结束采购时间')),
-                    'requirement_approval_date': self._parse_date(row.get('采购需求书审批完成日期（OA）')),
-                    'announcement_release_date': self._parse_date(row.get('公告发布时间')),
-                    'registration_deadline': self._parse_date(row.get('报名截止时间')),
-                    'bid_opening_date': self._parse_date(row.get('开标时间')),
-                    'candidate_publicity_end_date': self._parse_date(row.get('候选人公示结束时间')),
-                    'result_publicity_release_date': self._parse_date(row.get('结果公示发布时间')),
-                    'notice_issue_date': self._parse_date(row.get('中标通知书发放日期')),
-                    'archive_date': self._parse_date(row.get('资料归档日期')),
-                    'evaluation_committee': row.get('评标委员会成员', '').strip(),
-                    'bid_guarantee': row.get('投标担保形式及金额（元）', '').strip(),
-                    'bid_guarantee_return_date': self._parse_date(row.get('投标担保退回日期')),
-                    'performance_guarantee': row.get('履约担保形式及金额（元）', '').strip(),
-                    'candidate_publicity_issue': row.get('候选人公示期质疑情况', '').strip(),
-                    'non_bidding_explanation': row.get('应招未招说明（由公开转单一或邀请的情况）', '').strip(),
-                }
+            obj, created = Contract.objects.update_or_create(
+                contract_code=contract_code,
+                defaults=defaults
             )
             return 'created' if created else 'updated'
         else:
             # skip模式，不创建新记录
             return 'skipped'
 
-    def _import_contract_long(self, row, conflict_mode='update'):
-        """导入合同长表数据"""
-        from project.models import Project
-        from procurement.models import Procurement
-        
+    def _parse_contract_key(self, row):
+        """解析并校验合同编号"""
         contract_code = row.get('合同编号', '').strip()
         contract_name = row.get('合同名称', '').strip()
-        project_code = row.get('项目编码', '').strip()
         
         if not contract_code:
             raise ValueError('合同编号不能为空')
@@ -1196,13 +1581,12 @@ class Command(BaseCommand):
             validate_code_field(contract_code)
         except ValidationError as e:
             raise ValueError(f'合同编号格式错误: {e.message}')
-        
-        # 检查是否已存在
-        existing = Contract.objects.filter(contract_code=contract_code).first()
-        
-        if existing:
-            if conflict_mode == 'skip':
-                return 'skipped'
+        return contract_code
+
+    def _build_contract_defaults(self, row, contract_code):
+        """构建合同字段值（含项目、采购、主合同关联解析及继承规则）"""
+        contract_name = row.get('合同名称', '').strip()
+        project_code = row.get('项目编码', '').strip()
         
         # 解析合同序号（保持为字符串，支持 BHHY-NH-014 格式）
         contract_sequence = row.get('合同序号', '').strip() or None
@@ -1217,18 +1601,16 @@ class Command(BaseCommand):
         # 处理项目关联
         project = None
         if project_code:
-            try:
-                project = Project.objects.get(project_code=project_code)
-            except Project.DoesNotExist:
+            project = self._lookup(Project, 'project_code', project_code)
+            if project is None:
                 self.stdout.write(self.style.WARNING(f'项目编码不存在: {project_code}，将不关联项目'))
         
         # 处理采购关联（优先使用CSV中的关联采购编号）
         procurement = None
         procurement_code = row.get('关联采购编号', '').strip()
         if procurement_code:
-            try:
-                procurement = Procurement.objects.get(procurement_code=procurement_code)
-            except Procurement.DoesNotExist:
+            procurement = self._lookup(Procurement, 'procurement_code', procurement_code)
+            if procurement is None:
                 self.stdout.write(self.style.WARNING(f'采购编号不存在: {procurement_code}，将不关联采购'))
         
         # 获取文件定位（第3列），默认为主合同
@@ -1269,18 +1651,16 @@ class Command(BaseCommand):
         
         if parent_contract_sequence:
             # 优先按合同序号查找（支持字符串格式如 BHHY-NH-014）
-            try:
-                parent_contract = Contract.objects.get(contract_sequence=parent_contract_sequence)
-                parent_contract_found = True
-            except Contract.DoesNotExist:
+            parent_contract = self._lookup(Contract, 'contract_sequence', parent_contract_sequence)
+            if parent_contract is None:
                 # 如果序号查找失败，尝试按合同编号查找（向后兼容）
-                try:
-                    parent_contract = Contract.objects.get(contract_code=parent_contract_sequence)
-                    parent_contract_found = True
-                except Contract.DoesNotExist:
-                    self.stdout.write(self.style.WARNING(
-                        f'主合同序号/编号不存在: {parent_contract_sequence}，将不关联主合同'
-                    ))
+                parent_contract = self._lookup(Contract, 'contract_code', parent_contract_sequence)
+            if parent_contract is not None:
+                parent_contract_found = True
+            else:
+                self.stdout.write(self.style.WARNING(
+                    f'主合同序号/编号不存在: {parent_contract_sequence}，将不关联主合同'
+                ))
         
         # 验证文件定位与关联关系的一致性，并自动继承关联数据
         if file_positioning == FilePositioning.MAIN_CONTRACT.value:
@@ -1354,40 +1734,32 @@ class Command(BaseCommand):
         # 获取支付方式
         payment_method = row.get('支付方式', '').strip()
         
-        if conflict_mode in ['update', 'replace']:
-            obj, created = Contract.objects.update_or_create(
-                contract_code=contract_code,
-                defaults={
-                    'project': project,
-                    'contract_name': contract_name,
-                    'file_positioning': file_positioning,
-                    'contract_type': contract_type,
-                    'contract_source': contract_source,
-                    'parent_contract': parent_contract,
-                    'procurement': procurement,
-                    'contract_sequence': contract_sequence,
-                    'contract_officer': row.get('合同签订经办人', '').strip(),
-                    'party_a': row.get('甲方', '').strip(),
-                    'party_b': row.get('乙方', '').strip(),
-                    # 新的联系人字段（迁移0007之后）
-                    'party_a_legal_representative': row.get('甲方法定代表人及联系方式', '').strip(),
-                    'party_a_contact_person': row.get('甲方联系人及联系方式', '').strip(),
-                    'party_a_manager': row.get('甲方负责人及联系方式', '').strip(),
-                    'party_b_legal_representative': row.get('乙方法定代表人及联系方式', '').strip(),
-                    'party_b_contact_person': row.get('乙方联系人及联系方式', '').strip(),
-                    'party_b_manager': row.get('乙方负责人及联系方式', '').strip(),
-                    'contract_amount': self._parse_decimal(row.get('含税签约合同价（元）')),
-                    'signing_date': self._parse_date(row.get('合同签订日期')),
-                    'duration': row.get('合同工期/服务期限', '').strip(),
-                    'payment_method': payment_method,
-                    'performance_guarantee_return_date': self._parse_date(row.get('履约担保退回时间')),
-                    'archive_date': self._parse_date(row.get('资料归档日期')),
-                }
-            )
-            return 'created' if created else 'updated'
-        else:
-            # skip模式，不创建新记录
-            return 'skipped'
+        return {
+            'project': project,
+            'contract_name': contract_name,
+            'file_positioning': file_positioning,
+            'contract_type': contract_type,
+            'contract_source': contract_source,
+            'parent_contract': parent_contract,
+            'procurement': procurement,
+            'contract_sequence': contract_sequence,
+            'contract_officer': row.get('合同签订经办人', '').strip(),
+            'party_a': row.get('甲方', '').strip(),
+            'party_b': row.get('乙方', '').strip(),
+            # 新的联系人字段（迁移0007之后）
+            'party_a_legal_representative': row.get('甲方法定代表人及联系方式', '').strip(),
+            'party_a_contact_person': row.get('甲方联系人及联系方式', '').strip(),
+            'party_a_manager': row.get('甲方负责人及联系方式', '').strip(),
+            'party_b_legal_representative': row.get('乙方法定代表人及联系方式', '').strip(),
+            'party_b_contact_person': row.get('乙方联系人及联系方式', '').strip(),
+            'party_b_manager': row.get('乙方负责人及联系方式', '').strip(),
+            'contract_amount': self._parse_decimal(row.get('含税签约合同价（元）')),
+            'signing_date': self._parse_date(row.get('合同签订日期')),
+            'duration': row.get('合同工期/服务期限', '').strip(),
+            'payment_method': payment_method,
+            'performance_guarantee_return_date': self._parse_date(row.get('履约担保退回时间')),
+            'archive_date': self._parse_date(row.get('资料归档日期')),
+        }
 
     def _import_payment_long(self, row, conflict_mode='update'):
         """导入付款长表数据"""
@@ -1821,6 +2193,13 @@ class Command(BaseCommand):
     
     def _print_enhanced_summary(self, stats, errors, error_details, module):
         """打印增强的导入统计摘要"""
+        # 导入耗时与处理速度（行/秒）
+        started_at = getattr(self, '_started_at', None)
+        if started_at is not None:
+            elapsed = time.monotonic() - started_at
+            stats['elapsed_seconds'] = round(elapsed, 2)
+            stats['rows_per_second'] = round(stats['total_rows'] / elapsed, 1) if elapsed > 0 else 0
+        
         # 当需要JSON输出时，直接输出JSON并返回
         if getattr(self, 'json_output', False):
             import json as _json
@@ -1874,6 +2253,13 @@ class Command(BaseCommand):
             error_rate = (stats["error_rows"] / stats["total_rows"] * 100) if stats["total_rows"] > 0 else 0
             self.stdout.write(self.style.ERROR(f'  ✗ 导入失败:     {stats["error_rows"]} 条 ({error_rate:.1f}%)'))
         
+        if 'rows_per_second' in stats:
+            self.stdout.write(self.style.SUCCESS('\n【导入性能】'))
+            self.stdout.write(f'  导入耗时:       {stats["elapsed_seconds"]} 秒')
+            self.stdout.write(f'  处理速度:       {stats["rows_per_second"]} 行/秒')
+            if getattr(self, 'batch_size', 0):
+                self.stdout.write(f'  批量模式:       每批 {self.batch_size} 行')
+        
         # 错误详情分类展示
         if stats["error_rows"] > 0 and error_details:
             self.stdout.write(self.style.ERROR('\n【错误详情】'))
@@ -0,0 +1,21 @@
+# Generated by Django 5.2.7 on 2026-10-16 20:42
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('procurement', '0011_procurement_current_stage_and_more'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='procurement',
+            index=models.Index(fields=['project', 'result_publicity_release_date', 'procurement_officer'], name='procurement_project_9b32fe_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='procurement',
+            index=models.Index(fields=['result_publicity_release_date', 'procurement_officer'], name='procurement_result__b664c5_idx'),
+        ),
+    ]
@@ -373,6 +373,9 @@ class Procurement(BaseModel):
             models.Index(fields=['project', 'procurement_officer']),
             models.Index(fields=['winning_bidder', 'bid_opening_date']),
             models.Index(fields=['procurement_method', 'budget_amount']),
+            # 年度区间筛选（项目 + 结果公示日期 + 经办人），覆盖按经办人/项目分组的统计
+            models.Index(fields=['project', 'result_publicity_release_date', 'procurement_officer']),
+            models.Index(fields=['result_publicity_release_date', 'procurement_officer']),
         ]
 
     def clean(self):
@@ -0,0 +1,156 @@
+"""
+采购模块单元测试
+"""
+import csv
+import os
+import tempfile
+from io import StringIO
+
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import TestCase
+
+from contract.models import Contract
+from payment.models import Payment
+from procurement.models import Procurement
+from project.enums import ContractSource
+from project.models import Project
+
+
+class ImportExcelBulkModeTests(TestCase):
+    """import_excel 长表批量模式测试"""
+
+    def setUp(self):
+        Project.objects.create(project_code='PRJ-001', project_name='测试项目')
+
+    def _write_csv(self, header, rows):
+        handle = tempfile.NamedTemporaryFile(
+            mode='w', suffix='.csv', delete=False, encoding='utf-8', newline=''
+        )
+        with handle:
+            writer = csv.writer(handle)
+            writer.writerow(header)
+            writer.writerows(rows)
+        self.addCleanup(os.unlink, handle.name)
+        return handle.name
+
+    def _import(self, path, module, *extra):
+        out = StringIO()
+        call_command(
+            'import_excel', path, '--module', module, '--encoding', 'utf-8',
+            '--batch-size', '2', *extra, stdout=out, stderr=out
+        )
+        return out.getvalue()
+
+    def test_procurement_bulk_create_update_and_skip_errors(self):
+        header = ['招采编号', '采购项目名称', '项目编码', '采购经办人', '结果公示发布时间']
+        path = self._write_csv(header, [
+            ['CG-001', '采购一', 'PRJ-001', '张三', '2025-01-10'],
+            ['CG-002', '采购二', 'PRJ-001', '李四', '2025/02/01'],
+            ['', '缺少编号', 'PRJ-001', '', ''],
+            ['CG-001', '采购一（更新）', 'PRJ-001', '王五', '2025-01-10'],
+            ['CG-003', '采购三', 'NOT-EXIST', '', ''],
+        ])
+
+        output = self._import(path, 'procurement', '--skip-errors')
+
+        self.assertEqual(Procurement.objects.count(), 3)
+        updated = Procurement.objects.get(pk='CG-001')
+        self.assertEqual(updated.project_name, '采购一（更新）')
+        self.assertEqual(updated.procurement_officer, '王五')
+        self.assertEqual(updated.project_id, 'PRJ-001')
+        self.assertIsNone(Procurement.objects.get(pk='CG-003').project)
+        self.assertIn('第 4 行错误: 招采编号不能为空', output)
+        self.assertIn('行/秒', output)
+
+    def test_duplicate_key_in_chunk_counts_like_row_mode(self):
+        import json
+
+        header = ['招采编号', '采购项目名称', '项目编码']
+        path = self._write_csv(header, [
+            ['CG-201', '采购一', 'PRJ-001'],
+            ['CG-201', '采购一（重复）', 'PRJ-001'],
+            ['CG-202', '采购二', 'PRJ-001'],
+        ])
+
+        def import_stats(*extra):
+            out = StringIO()
+            call_command(
+                'import_excel', path, '--module', 'procurement', '--encoding', 'utf-8', '--json-output',
+                *extra, stdout=out, stderr=StringIO()
+            )
+            stats = json.loads(out.getvalue().strip().splitlines()[-1])['stats']
+            return {key: stats[key] for key in ('created', 'updated', 'skipped', 'success_rows')}
+
+        bulk_stats = import_stats('--batch-size', '2')
+        self.assertEqual(Procurement.objects.get(pk='CG-201').project_name, '采购一（重复）')
+        Procurement.objects.all().delete()
+        row_stats = import_stats()
+
+        self.assertEqual(bulk_stats, row_stats)
+        self.assertEqual(bulk_stats['created'], Procurement.objects.count())
+
+    def test_error_without_skip_errors_stops_import(self):
+        header = ['招采编号', '采购项目名称', '项目编码']
+        path = self._write_csv(header, [
+            ['CG-101', '采购一', 'PRJ-001'],
+            ['CG-102', '', 'PRJ-001'],
+        ])
+
+        with self.assertRaises(CommandError):
+            self._import(path, 'procurement')
+        self.assertFalse(Procurement.objects.exists())
+
+    def test_contract_supplement_resolves_parent_from_previous_pass(self):
+        header = ['合同编号', '合同名称', '项目编码', '文件定位', '合同类型', '合同来源', '关联主合同编号', '合同序号']
+        path = self._write_csv(header, [
+            ['HT-002', '补充协议', '', '补充协议', '', '', 'SEQ-001', ''],
+            ['HT-001', '主合同', 'PRJ-001', '主合同', '工程', '直接签订', '', 'SEQ-001'],
+        ])
+
+        self._import(path, 'contract')
+
+        supplement = Contract.objects.get(pk='HT-002')
+        self.assertEqual(supplement.parent_contract_id, 'HT-001')
+        self.assertEqual(supplement.project_id, 'PRJ-001')
+        self.assertEqual(supplement.contract_type, '工程')
+
+
+class ImportPaymentWideTests(TestCase):
+    """import_excel 付款宽表：新增付款批量分配编号"""
+
+    def setUp(self):
+        project = Project.objects.create(project_code='PRJ-001', project_name='测试项目')
+        self.contract = Contract.objects.create(
+            contract_code='HT-001',
+            contract_sequence='XH-001',
+            contract_name='测试合同',
+            contract_source=ContractSource.DIRECT.value,
+            project=project,
+            contract_amount='1000000.00',
+            signing_date='2025-01-01',
+        )
+        Payment.objects.create(
+            contract=self.contract, payment_amount='100.00', payment_date='2025-01-01'
+        )
+
+    def test_wide_import_updates_month_and_numbers_new_payments(self):
+        handle = tempfile.NamedTemporaryFile(
+            mode='w', suffix='.csv', delete=False, encoding='utf-8', newline=''
+        )
+        with handle:
+            writer = csv.writer(handle)
+            writer.writerow(['合同序号', '2025年1月', '2025年2月', '2025年3月'])
+            writer.writerow(['XH-001', '150', '200', '300'])
+        self.addCleanup(os.unlink, handle.name)
+
+        call_command(
+            'import_excel', handle.name, '--module', 'payment', '--mode', 'wide',
+            '--encoding', 'utf-8', stdout=StringIO(), stderr=StringIO()
+        )
+
+        payments = list(
+            Payment.objects.order_by('payment_date').values_list('payment_code', 'payment_amount')
+        )
+        self.assertEqual([code for code, _ in payments], ['XH-001-FK-001', 'XH-001-FK-002', 'XH-001-FK-003'])
+        self.assertEqual(payments[0][1], 150)
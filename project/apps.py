@@ -4,3 +4,7 @@ from django.apps import AppConfig
 class ProjectConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'project'
+
+    def ready(self):
+        """应用启动时注册信号"""
+        import project.signals  # noqa: F401
@@ -3,8 +3,10 @@ from __future__ import annotations
 from datetime import datetime
 from typing import Dict, List
 
-from .models import Project
+from django.utils.functional import SimpleLazyObject
+
 from .constants import BASE_YEAR, get_current_year
+from .services.dimension_options import get_project_options
 
 
 def _resolve_selected_year(request, current_year: int) -> str:
@@ -24,6 +26,8 @@ def global_filter_options(request) -> Dict[str, object]:
     """
     为全局筛选组件提供项目和年度选项。
 
+    项目选项为惰性对象，仅在模板实际渲染全局筛选栏时才读取（命中维度选项缓存时不查询数据库）。
+
     返回结构：
         {
             "global_filter_projects": [{"code": "...", "name": "..."}],
@@ -37,10 +41,10 @@ def global_filter_options(request) -> Dict[str, object]:
     year_end = current_year + 1
     year_options: List[int] = list(range(year_start, year_end + 1))
 
-    project_options = [
-        {"code": project.project_code, "name": project.project_name}
-        for project in Project.objects.all().order_by("project_name")
-    ]
+    project_options = SimpleLazyObject(lambda: [
+        {"code": project["project_code"], "name": project["project_name"]}
+        for project in get_project_options()
+    ])
 
     selected_year_value = _resolve_selected_year(request, current_year)
     return {
@@ -5,6 +5,7 @@
 """
 from project.filter_registry import filter_registry
 from project.enums import get_enum_display_dict
+from project.services.dimension_options import get_enum_options, get_project_options
 
 
 def _get_enum_options(module_name, filter_key):
@@ -21,11 +22,7 @@ def _get_enum_options(module_name, filter_key):
     filters = filter_registry.get_filters(module_name)
     for filter_config in filters:
         if filter_config['key'] == filter_key and 'enum' in filter_config:
-            enum_class = filter_config['enum']
-            return [
-                {'value': choice.value, 'label': choice.label}
-                for choice in enum_class
-            ]
+            return get_enum_options(filter_config['enum'])
     return []
 
 
@@ -648,8 +645,6 @@ def resolve_monitoring_year(request):
 
 def get_monitoring_filter_config(request, year_context=None):
     """获取监控中心的筛选配置"""
-    from .models import Project
-    
     if year_context is None:
         year_context = resolve_monitoring_year(request)
     selected_project = request.GET.get('global_project') or request.GET.get('project', '')
@@ -659,7 +654,7 @@ def get_monitoring_filter_config(request, year_context=None):
     if not project_values:
         project_values = ['']
     
-    projects = list(Project.objects.all().order_by('project_name'))
+    projects = get_project_options()
     
     quick_filters = [
         {
@@ -685,7 +680,7 @@ def get_monitoring_filter_config(request, year_context=None):
             'options': [
                 {'value': '', 'label': '全部项目'}
             ] + [
-                {'value': p.project_code, 'label': p.project_name}
+                {'value': p['project_code'], 'label': p['project_name']}
                 for p in projects
             ]
         }
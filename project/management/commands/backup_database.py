@@ -0,0 +1,51 @@
+"""
+定时备份数据库（SQLite 在线备份）
+
+用途：由 cron / 计划任务定期调用，替代手工复制 backups/database 下的文件；
+备份产物附带 SHA-256 与行数清单，超出保留份数的旧定时备份自动删除（手动备份不受影响）。
+
+使用方法：
+    python manage.py backup_database                          # 使用默认压缩方式与保留份数
+    python manage.py backup_database --keep=14 --verify       # 保留 14 份，并在完成后校验产物
+"""
+from django.core.management.base import BaseCommand, CommandError
+
+from project.services import db_backup
+
+
+class Command(BaseCommand):
+    help = '在线备份 SQLite 数据库（供计划任务调用），并按 DATABASE_BACKUP_KEEP 清理旧的定时备份'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--name', default='daily', help='备份名称（文件名会自动加 auto_ 前缀与时间戳）')
+        parser.add_argument(
+            '--compression',
+            choices=list(db_backup.BACKUP_SUFFIXES),
+            help='压缩方式，默认使用 DATABASE_BACKUP_COMPRESSION',
+        )
+        parser.add_argument('--keep', type=int, help='保留的定时备份份数，默认使用 DATABASE_BACKUP_KEEP')
+        parser.add_argument('--verify', action='store_true', help='备份完成后重新读取产物并校验')
+
+    def handle(self, *args, **options):
+        db_path = db_backup.get_sqlite_path()
+        if not db_path or not db_path.exists():
+            raise CommandError('当前数据库不是 SQLite 或数据库文件不存在')
+
+        try:
+            manifest = db_backup.create_backup(
+                db_path, options['name'], compression=options['compression'], scheduled=True
+            )
+        except db_backup.BackupError as exc:
+            raise CommandError(f'备份失败：{exc}') from exc
+        self.stdout.write(self.style.SUCCESS(
+            f"备份完成：{manifest['file_name']}（{manifest['size_bytes']} 字节，SHA-256 {manifest['sha256'][:12]}…）"
+        ))
+
+        if options['verify']:
+            result = db_backup.verify_backup(db_backup.backup_root() / manifest['file_name'])
+            if not result['ok']:
+                raise CommandError(f"备份校验失败：{'；'.join(result['errors'])}")
+            self.stdout.write(self.style.SUCCESS('备份校验通过'))
+
+        removed = db_backup.prune_backups(options['keep'])
+        self.stdout.write(f'清理过期定时备份 {len(removed)} 份')
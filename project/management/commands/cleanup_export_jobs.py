@@ -0,0 +1,14 @@
+"""清理过期的后台导出任务及其ZIP文件"""
+from django.core.management.base import BaseCommand
+
+from project.tasks import cleanup_expired_export_jobs
+
+
+class Command(BaseCommand):
+    help = '清理过期的后台导出任务及其ZIP文件'
+
+    def handle(self, *args, **options):
+        cleaned_count = cleanup_expired_export_jobs()
+        self.stdout.write(
+            self.style.SUCCESS(f'成功清理 {cleaned_count} 个过期导出任务')
+        )
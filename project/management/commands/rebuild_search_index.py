@@ -0,0 +1,47 @@
+"""
+重建全文检索索引（SQLite FTS5）
+
+用途：
+1. 批量导入、直接改库等绕过信号的操作后修复索引
+2. 定期校准
+
+使用方法：
+    python manage.py rebuild_search_index                                 # 全量重建
+    python manage.py rebuild_search_index --model=contract.Contract       # 只重建指定模型（可重复）
+"""
+from django.core.management.base import BaseCommand, CommandError
+from django.db import OperationalError, connection
+
+from project.services.search_index import (
+    CREATE_TABLE_SQL,
+    SEARCH_INDEX_FIELDS,
+    rebuild_search_index,
+    reset_search_index_availability,
+)
+
+
+class Command(BaseCommand):
+    help = '重建全文检索索引（采购、合同、项目、供应商评价的可搜索文本字段）'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--model',
+            action='append',
+            dest='labels',
+            choices=list(SEARCH_INDEX_FIELDS),
+            help='只重建指定模型，可重复指定',
+        )
+
+    def handle(self, *args, **options):
+        if connection.vendor != 'sqlite':
+            raise CommandError('全文检索索引仅支持 SQLite 数据库')
+        # 索引表被误删时重新建立
+        try:
+            with connection.cursor() as cursor:
+                cursor.execute(CREATE_TABLE_SQL)
+        except OperationalError as exc:
+            raise CommandError(f'当前 SQLite 不支持 FTS5 trigram 分词，无法建立全文检索索引：{exc}')
+        reset_search_index_availability()
+
+        count = rebuild_search_index(options.get('labels'))
+        self.stdout.write(self.style.SUCCESS(f'已重建 {count} 条索引记录'))
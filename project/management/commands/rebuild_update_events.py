@@ -0,0 +1,32 @@
+"""
+重建更新事件表（UpdateEventFact）
+
+用途：
+1. 首次上线或批量导入、直接改库等绕过信号的操作后回填事件数据
+2. 定期校准
+
+使用方法：
+    python manage.py rebuild_update_events                         # 全量重建
+    python manage.py rebuild_update_events --module=payment        # 只重建指定模块（可重复）
+"""
+from django.core.management.base import BaseCommand
+
+from project.models_update_event import UPDATE_EVENT_SOURCES, UpdateEventFact
+
+
+class Command(BaseCommand):
+    help = '重建更新监控事件表（业务日期、更新日期、截止日期、是否按时）'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--module',
+            action='append',
+            dest='modules',
+            choices=list(UPDATE_EVENT_SOURCES),
+            help='只重建指定业务模块，可重复指定',
+        )
+
+    def handle(self, *args, **options):
+        modules = options.get('modules')
+        count = UpdateEventFact.objects.rebuild(modules)
+        self.stdout.write(self.style.SUCCESS(f'已重建 {count} 条更新事件'))
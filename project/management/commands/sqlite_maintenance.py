@@ -0,0 +1,84 @@
+"""
+SQLite 连接参数检查与定期维护
+
+用途：
+1. 查看当前连接实际生效的 PRAGMA（与 SQLITE_PRAGMAS 配置对照）、WAL 文件大小与检查点统计
+2. 由计划任务定期执行 PRAGMA optimize / ANALYZE，保持查询规划器的统计信息最新
+
+使用方法：
+    python manage.py sqlite_maintenance                        # 报告 PRAGMA、WAL 大小，并执行一次 PASSIVE 检查点
+    python manage.py sqlite_maintenance --optimize             # 另执行 PRAGMA optimize（建议每天）
+    python manage.py sqlite_maintenance --analyze              # 另执行全量 ANALYZE（建议每周或大批量导入后）
+    python manage.py sqlite_maintenance --checkpoint=truncate  # 检查点完成后截断 WAL 文件
+"""
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+# 报告的 PRAGMA（除 SQLITE_PRAGMAS 中配置的项外）
+REPORTED_PRAGMAS = ['foreign_keys', 'page_size', 'page_count', 'freelist_count', 'wal_autocheckpoint']
+# 以数字返回的 PRAGMA 对应的名称
+PRAGMA_VALUE_NAMES = {
+    'synchronous': {0: 'OFF', 1: 'NORMAL', 2: 'FULL', 3: 'EXTRA'},
+    'temp_store': {0: 'DEFAULT', 1: 'FILE', 2: 'MEMORY'},
+}
+# PRAGMA optimize 单表分析的行数上限，避免大表上耗时过长
+ANALYSIS_LIMIT = 1000
+
+
+class Command(BaseCommand):
+    help = '报告 SQLite 连接参数、WAL 大小与检查点统计，并可执行 PRAGMA optimize / ANALYZE'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--checkpoint',
+            choices=['passive', 'full', 'restart', 'truncate'],
+            default='passive',
+            help='WAL 检查点模式（默认 passive，不阻塞读写）',
+        )
+        parser.add_argument('--optimize', action='store_true', help='执行 PRAGMA optimize')
+        parser.add_argument('--analyze', action='store_true', help='执行全量 ANALYZE')
+
+    def handle(self, *args, **options):
+        if connection.vendor != 'sqlite':
+            raise CommandError('该命令仅支持 SQLite 数据库')
+
+        configured = getattr(settings, 'SQLITE_PRAGMAS', {})
+        with connection.cursor() as cursor:
+            self.stdout.write('PRAGMA（实际值 / 配置值）：')
+            for name in [*configured, *[p for p in REPORTED_PRAGMAS if p not in configured]]:
+                cursor.execute(f'PRAGMA {name}')
+                row = cursor.fetchone()
+                actual = row[0] if row else ''
+                actual = PRAGMA_VALUE_NAMES.get(name, {}).get(actual, actual)
+                expected = f' / {configured[name]}' if name in configured else ''
+                self.stdout.write(f'  {name}: {actual}{expected}')
+
+            wal_path = Path(f"{connection.settings_dict['NAME']}-wal")
+            wal_size = wal_path.stat().st_size if wal_path.exists() else 0
+            self.stdout.write(f'WAL 文件大小：{wal_size} 字节')
+
+            cursor.execute('PRAGMA journal_mode')
+            if cursor.fetchone()[0].lower() == 'wal':
+                cursor.execute(f"PRAGMA wal_checkpoint({options['checkpoint'].upper()})")
+                busy, log_frames, checkpointed = cursor.fetchone()
+                self.stdout.write(
+                    f"检查点（{options['checkpoint']}）：busy={busy}，WAL 帧数={log_frames}，已写回帧数={checkpointed}"
+                )
+            else:
+                self.stdout.write('未启用 WAL，跳过检查点')
+
+            # 全量 ANALYZE 先于 optimize 执行，且显式取消行数上限，避免被 analysis_limit 限制为抽样分析
+            if options['analyze']:
+                cursor.execute('PRAGMA analysis_limit = 0')
+                cursor.execute('ANALYZE')
+                self.stdout.write(self.style.SUCCESS('已执行 ANALYZE'))
+            if options['optimize']:
+                cursor.execute(f'PRAGMA analysis_limit = {ANALYSIS_LIMIT}')
+                try:
+                    cursor.execute('PRAGMA optimize')
+                finally:
+                    cursor.execute('PRAGMA analysis_limit = 0')
+                self.stdout.write(self.style.SUCCESS('已执行 PRAGMA optimize'))
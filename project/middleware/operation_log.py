@@ -1,8 +1,145 @@
-"""操作日志中间件"""
+"""
+操作日志中间件
+
+请求内只解析操作与字段变更并放入缓冲写入器（见 project/utils/operation_log_writer.py），
+对象描述查询、描述生成与落库在后台按批完成：
+- OPERATION_LOG_SINK = 'thread'（默认）：后台线程批量 bulk_create；
+- OPERATION_LOG_SINK = 'rq'：后台线程攒批后投递到 django-rq 队列，Redis 不可用时退回直接写入；
+- OPERATION_LOG_SINK = 'sync'：在请求内立即写入（调试、测试）。
+"""
+import atexit
 import json
+import logging
+import threading
+import time
+
+from django.conf import settings
+from django.core.signals import setting_changed
+from django.dispatch import receiver
 from django.utils.deprecation import MiddlewareMixin
 from project.models_operation_log import OperationLog
 from project.utils.operation_log_helpers import get_client_ip
+from project.utils.operation_log_writer import OperationLogWriter
+
+logger = logging.getLogger(__name__)
+
+# 对象类型 -> (模型路径, 业务编号字段)
+OBJECT_MODELS = {
+    "project": ("project.Project", "project_code"),
+    "procurement": ("procurement.Procurement", "procurement_code"),
+    "contract": ("contract.Contract", "contract_code"),
+    "payment": ("payment.Payment", "payment_code"),
+}
+
+# 连接 Redis 失败后，在该时间内直接写库，避免每批都等待连接重试（秒）
+RQ_RETRY_INTERVAL = 5 * 60
+
+_writer = None
+_writer_lock = threading.Lock()
+_rq_unavailable_until = 0.0
+
+
+def resolve_object_reprs(ids_by_type):
+    """按对象类型批量查询对象描述，返回 {(object_type, object_id): str(obj)}"""
+    from django.apps import apps
+
+    reprs = {}
+    for object_type, object_ids in ids_by_type.items():
+        if object_type not in OBJECT_MODELS or not object_ids:
+            continue
+        model_label, field_name = OBJECT_MODELS[object_type]
+        model = apps.get_model(model_label)
+        try:
+            objects = model.objects.in_bulk(list(object_ids), field_name=field_name)
+        except Exception:
+            continue
+        for object_id, obj in objects.items():
+            reprs[(object_type, object_id)] = str(obj)
+    return reprs
+
+
+def write_operation_logs(entries):
+    """
+    将一批日志条目写入数据库，返回写入条数
+
+    每种对象类型一次查询取对象描述，全部日志一次 bulk_create；
+    也作为 django-rq 任务函数使用，条目需为可序列化的字典。
+    """
+    ids_by_type = {}
+    for entry in entries:
+        if entry["object_id"]:
+            ids_by_type.setdefault(entry["object_type"], set()).add(entry["object_id"])
+    reprs = resolve_object_reprs(ids_by_type)
+
+    describer = OperationLogMiddleware(lambda request: None)
+    logs = []
+    for entry in entries:
+        object_id = entry["object_id"]
+        object_repr = reprs.get((entry["object_type"], object_id), object_id) if object_id else ""
+        logs.append(OperationLog(
+            user_id=entry["user_id"],
+            operation_type=entry["operation_type"],
+            object_type=entry["object_type"],
+            object_id=object_id,
+            object_repr=object_repr,
+            description=describer._generate_description(
+                entry["username"],
+                entry["operation_type"],
+                entry["object_type"],
+                object_repr,
+                entry["changes"],
+            ),
+            ip_address=entry["ip_address"],
+            changes=entry["changes"],
+        ))
+    OperationLog.objects.bulk_create(logs)
+    return len(logs)
+
+
+def _enqueue_operation_logs(entries):
+    """投递到 django-rq 队列，Redis 不可用时退回直接写库"""
+    global _rq_unavailable_until
+    if time.monotonic() >= _rq_unavailable_until:
+        try:
+            import django_rq
+
+            queue_name = getattr(settings, "OPERATION_LOG_RQ_QUEUE", "low")
+            django_rq.get_queue(queue_name).enqueue(write_operation_logs, entries)
+            return len(entries)
+        except Exception as exc:
+            _rq_unavailable_until = time.monotonic() + RQ_RETRY_INTERVAL
+            logger.warning("RQ 队列不可用，操作日志改为直接写入: %s", exc)
+    return write_operation_logs(entries)
+
+
+def get_operation_log_writer():
+    """按 settings 创建进程内唯一的日志写入器，并在进程退出时写出剩余条目"""
+    global _writer
+    if _writer is None:
+        with _writer_lock:
+            if _writer is None:
+                sink = getattr(settings, "OPERATION_LOG_SINK", "thread")
+                _writer = OperationLogWriter(
+                    _enqueue_operation_logs if sink == "rq" else write_operation_logs,
+                    batch_size=getattr(settings, "OPERATION_LOG_BATCH_SIZE", 50),
+                    flush_interval=getattr(settings, "OPERATION_LOG_FLUSH_INTERVAL_MS", 500) / 1000,
+                    max_buffer=getattr(settings, "OPERATION_LOG_MAX_BUFFER", 5000),
+                    background=sink != "sync",
+                )
+                atexit.register(_writer.stop)
+    return _writer
+
+
+@receiver(setting_changed)
+def _reset_operation_log_writer(setting, **kwargs):
+    """OPERATION_LOG_* 设置变化时（如测试中 override_settings）写出剩余条目并按新设置重建写入器"""
+    global _writer
+    if not setting.startswith("OPERATION_LOG_"):
+        return
+    with _writer_lock:
+        writer, _writer = _writer, None
+    if writer is not None:
+        writer.stop()
 
 
 class OperationLogMiddleware(MiddlewareMixin):
@@ -43,30 +180,16 @@ class OperationLogMiddleware(MiddlewareMixin):
         if operation_type == "update" and not changes:
             return response
 
-        # 异步记录日志(使用try-except避免日志记录失败影响主请求)
-        try:
-            object_repr = self._get_object_repr(object_type, object_id)
-            description = self._generate_description(
-                request.user.username,
-                operation_type,
-                object_type,
-                object_repr,
-                changes,
-            )
-
-            OperationLog.objects.create(
-                user=request.user,
-                operation_type=operation_type,
-                object_type=object_type,
-                object_id=object_id or "",
-                object_repr=object_repr,
-                description=description,
-                ip_address=self._get_client_ip(request),
-                changes=changes,
-            )
-        except Exception:
-            # 静默失败,不影响主请求
-            pass
+        # 只在请求内收集条目，对象描述查询与落库由后台写入器批量完成
+        get_operation_log_writer().submit({
+            "user_id": request.user.pk,
+            "username": request.user.username,
+            "operation_type": operation_type,
+            "object_type": object_type,
+            "object_id": object_id or "",
+            "ip_address": self._get_client_ip(request),
+            "changes": changes,
+        })
 
         return response
 
@@ -129,34 +252,6 @@ class OperationLogMiddleware(MiddlewareMixin):
 
         return None
 
-    def _get_object_repr(self, object_type, object_id):
-        """获取对象的字符串表示"""
-        if not object_id:
-            return ""
-
-        try:
-            if object_type == "project":
-                from project.models import Project
-
-                obj = Project.objects.get(project_code=object_id)
-            elif object_type == "procurement":
-                from procurement.models import Procurement
-
-                obj = Procurement.objects.get(procurement_code=object_id)
-            elif object_type == "contract":
-                from contract.models import Contract
-
-                obj = Contract.objects.get(contract_code=object_id)
-            elif object_type == "payment":
-                from payment.models import Payment
-
-                obj = Payment.objects.get(payment_code=object_id)
-            else:
-                return ""
-            return str(obj)
-        except Exception:
-            return object_id
-
     def _get_client_ip(self, request):
         """获取客户端IP地址"""
         return get_client_ip(request)
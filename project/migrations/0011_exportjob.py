@@ -0,0 +1,43 @@
+# Generated by Django 5.2.7 on 2026-10-16 19:57
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('project', '0010_add_procurement_method_field_config'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ExportJob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('status', models.CharField(choices=[('pending', '排队中'), ('running', '导出中'), ('succeeded', '已完成'), ('failed', '失败'), ('expired', '已过期')], default='pending', help_text='任务当前状态', max_length=10, verbose_name='状态')),
+                ('project_codes', models.JSONField(default=list, help_text='本次导出的项目编码', verbose_name='项目编码列表')),
+                ('business_start_date', models.DateField(blank=True, help_text='业务发生时间筛选起点', null=True, verbose_name='业务开始日期')),
+                ('business_end_date', models.DateField(blank=True, help_text='业务发生时间筛选终点', null=True, verbose_name='业务结束日期')),
+                ('total_projects', models.PositiveIntegerField(default=0, verbose_name='项目总数')),
+                ('processed_projects', models.PositiveIntegerField(default=0, verbose_name='已完成项目数')),
+                ('current_project', models.CharField(blank=True, help_text='正在导出的项目名称', max_length=200, verbose_name='当前项目')),
+                ('file_path', models.CharField(blank=True, help_text='生成的ZIP文件路径', max_length=500, verbose_name='产物路径')),
+                ('file_size', models.PositiveBigIntegerField(default=0, verbose_name='文件大小(字节)')),
+                ('error_message', models.TextField(blank=True, verbose_name='错误信息')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='提交时间')),
+                ('started_at', models.DateTimeField(blank=True, null=True, verbose_name='开始时间')),
+                ('finished_at', models.DateTimeField(blank=True, null=True, verbose_name='结束时间')),
+                ('expires_at', models.DateTimeField(blank=True, help_text='超过该时间后产物文件会被清理', null=True, verbose_name='过期时间')),
+                ('user', models.ForeignKey(blank=True, help_text='提交导出任务的用户', null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='export_jobs', to=settings.AUTH_USER_MODEL, verbose_name='提交用户')),
+            ],
+            options={
+                'verbose_name': '导出任务',
+                'verbose_name_plural': '导出任务',
+                'ordering': ['-created_at'],
+                'indexes': [models.Index(fields=['user', '-created_at'], name='project_exp_user_id_cca30f_idx'), models.Index(fields=['status', 'expires_at'], name='project_exp_status_5b10cf_idx')],
+            },
+        ),
+    ]
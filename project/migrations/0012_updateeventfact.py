@@ -0,0 +1,53 @@
+# Generated by Django 5.2.7 on 2026-10-16 20:20
+
+import django.db.models.deletion
+import project.models_update_event
+from django.db import migrations, models
+
+
+def build_update_events(apps, schema_editor):
+    """按现有采购、合同、付款、结算数据生成更新事件行"""
+    UpdateEventFact = apps.get_model('project', 'UpdateEventFact')
+    UpdateEventFact.objects.rebuild()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('project', '0011_exportjob'),
+        ('procurement', '0011_procurement_current_stage_and_more'),
+        ('contract', '0015_contractfinancialsummary'),
+        ('payment', '0010_alter_payment_created_at_and_more'),
+        ('settlement', '0005_alter_settlement_created_at_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='UpdateEventFact',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('module', models.CharField(choices=[('procurement', '采购'), ('contract', '合同'), ('payment', '付款'), ('settlement', '结算')], max_length=20, verbose_name='业务模块')),
+                ('source_code', models.CharField(max_length=50, verbose_name='业务编号')),
+                ('name', models.CharField(blank=True, help_text='采购为采购项目名称，合同为合同名称，付款/结算为关联合同名称', max_length=200, verbose_name='业务名称')),
+                ('responsible_person', models.CharField(blank=True, help_text='采购为采购经办人，合同为合同经办人，付款/结算为关联合同的经办人', max_length=50, null=True, verbose_name='负责人')),
+                ('handler', models.CharField(help_text='依次取经办人、更新人、创建人中第一个非空值', max_length=50, verbose_name='经办人')),
+                ('is_main_contract', models.BooleanField(default=True, help_text='合同模块标记是否为主合同，其他模块恒为是', verbose_name='主合同')),
+                ('event_date', models.DateField(verbose_name='业务日期')),
+                ('update_date', models.DateField(blank=True, null=True, verbose_name='更新日期')),
+                ('update_days', models.IntegerField(blank=True, null=True, verbose_name='更新天数')),
+                ('deadline', models.DateField(verbose_name='更新截止日期')),
+                ('is_timely', models.BooleanField(default=False, verbose_name='按时更新')),
+                ('project', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='update_events', to='project.project', verbose_name='所属项目')),
+            ],
+            options={
+                'verbose_name': '更新事件',
+                'verbose_name_plural': '更新事件',
+                'indexes': [models.Index(fields=['module', 'event_date'], name='project_upd_module_b4f869_idx'), models.Index(fields=['project', 'module', 'event_date'], name='project_upd_project_468331_idx'), models.Index(fields=['responsible_person', 'module', 'event_date'], name='project_upd_respons_469580_idx')],
+                'constraints': [models.UniqueConstraint(fields=('module', 'source_code'), name='uniq_update_event_source')],
+            },
+            managers=[
+                ('objects', project.models_update_event.UpdateEventFactManager()),
+            ],
+        ),
+        migrations.RunPython(build_update_events, migrations.RunPython.noop),
+    ]
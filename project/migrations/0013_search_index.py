@@ -0,0 +1,48 @@
+import logging
+
+from django.db import OperationalError, migrations, transaction
+
+from project.services.search_index import (
+    CREATE_TABLE_SQL,
+    DROP_TABLE_SQL,
+    rebuild_search_index,
+    reset_search_index_availability,
+)
+
+logger = logging.getLogger(__name__)
+
+
+def create_search_index(apps, schema_editor):
+    """建立 FTS5 全文检索表并按现有数据填充（仅 SQLite）"""
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    try:
+        with transaction.atomic(using=schema_editor.connection.alias):
+            schema_editor.execute(CREATE_TABLE_SQL)
+    except OperationalError as exc:
+        # SQLite 未编译 FTS5 或低于 3.34（不支持 trigram 分词）：不建索引，模糊筛选继续使用 icontains
+        logger.warning('全文检索索引未建立，模糊筛选将使用 icontains：%s', exc)
+        return
+    reset_search_index_availability()
+    rebuild_search_index(using=schema_editor.connection.alias, apps=apps)
+
+
+def drop_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    schema_editor.execute(DROP_TABLE_SQL)
+    reset_search_index_availability()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('project', '0012_updateeventfact'),
+        ('procurement', '0011_procurement_current_stage_and_more'),
+        ('contract', '0015_contractfinancialsummary'),
+        ('supplier_eval', '0008_alter_supplierevaluation_evaluation_type'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
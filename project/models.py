@@ -10,6 +10,8 @@ from project.validators import validate_code_field, validate_and_clean_code
 from project.enums import ProjectStatus
 from project.models_completeness_config import CompletenessFieldConfig
 from project.models_operation_log import OperationLog
+from project.models_export_job import ExportJob
+from project.models_update_event import UpdateEventFact
 
 if TYPE_CHECKING:
     from django.db.models import QuerySet
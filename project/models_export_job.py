@@ -0,0 +1,142 @@
+"""后台导出任务模型"""
+from django.db import models
+from django.contrib.auth.models import User
+
+
+class ExportJob(models.Model):
+    """后台导出任务 - 记录多项目导出的状态、进度与ZIP产物"""
+
+    STATUS_PENDING = 'pending'
+    STATUS_RUNNING = 'running'
+    STATUS_SUCCEEDED = 'succeeded'
+    STATUS_FAILED = 'failed'
+    STATUS_EXPIRED = 'expired'
+
+    STATUS_CHOICES = [
+        (STATUS_PENDING, '排队中'),
+        (STATUS_RUNNING, '导出中'),
+        (STATUS_SUCCEEDED, '已完成'),
+        (STATUS_FAILED, '失败'),
+        (STATUS_EXPIRED, '已过期'),
+    ]
+
+    user = models.ForeignKey(
+        User,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='export_jobs',
+        verbose_name='提交用户',
+        help_text='提交导出任务的用户'
+    )
+
+    status = models.CharField(
+        '状态',
+        max_length=10,
+        choices=STATUS_CHOICES,
+        default=STATUS_PENDING,
+        help_text='任务当前状态'
+    )
+
+    project_codes = models.JSONField(
+        '项目编码列表',
+        default=list,
+        help_text='本次导出的项目编码'
+    )
+
+    business_start_date = models.DateField(
+        '业务开始日期',
+        null=True,
+        blank=True,
+        help_text='业务发生时间筛选起点'
+    )
+
+    business_end_date = models.DateField(
+        '业务结束日期',
+        null=True,
+        blank=True,
+        help_text='业务发生时间筛选终点'
+    )
+
+    total_projects = models.PositiveIntegerField(
+        '项目总数',
+        default=0
+    )
+
+    processed_projects = models.PositiveIntegerField(
+        '已完成项目数',
+        default=0
+    )
+
+    current_project = models.CharField(
+        '当前项目',
+        max_length=200,
+        blank=True,
+        help_text='正在导出的项目名称'
+    )
+
+    file_path = models.CharField(
+        '产物路径',
+        max_length=500,
+        blank=True,
+        help_text='生成的ZIP文件路径'
+    )
+
+    file_size = models.PositiveBigIntegerField(
+        '文件大小(字节)',
+        default=0
+    )
+
+    error_message = models.TextField(
+        '错误信息',
+        blank=True
+    )
+
+    created_at = models.DateTimeField(
+        '提交时间',
+        auto_now_add=True
+    )
+
+    started_at = models.DateTimeField(
+        '开始时间',
+        null=True,
+        blank=True
+    )
+
+    finished_at = models.DateTimeField(
+        '结束时间',
+        null=True,
+        blank=True
+    )
+
+    expires_at = models.DateTimeField(
+        '过期时间',
+        null=True,
+        blank=True,
+        help_text='超过该时间后产物文件会被清理'
+    )
+
+    class Meta:
+        verbose_name = '导出任务'
+        verbose_name_plural = '导出任务'
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['user', '-created_at']),
+            models.Index(fields=['status', 'expires_at']),
+        ]
+
+    def __str__(self):
+        return f"导出任务#{self.pk} {self.get_status_display()} ({self.processed_projects}/{self.total_projects})"
+
+    @property
+    def progress_percent(self):
+        """导出进度百分比"""
+        if self.status == self.STATUS_SUCCEEDED:
+            return 100
+        if not self.total_projects:
+            return 0
+        return int(self.processed_projects * 100 / self.total_projects)
+
+    @property
+    def is_downloadable(self):
+        return self.status == self.STATUS_SUCCEEDED and bool(self.file_path)
@@ -0,0 +1,236 @@
+"""更新监控事件事实表"""
+import calendar
+from datetime import date
+
+from django.db import models, transaction
+
+from project.enums import FilePositioning
+from project.services.shared.utils import in_query_batches
+
+# 经办人全部为空时的显示值
+UNMARKED_HANDLER = '未标记'
+
+# 各业务模块的事件来源：业务日期、所属项目、显示名称、负责人、经办人候选字段
+UPDATE_EVENT_SOURCES = {
+    'procurement': {
+        'model': ('procurement', 'Procurement'),
+        'event_field': 'result_publicity_release_date',
+        'project_path': 'project_id',
+        'name_path': 'project_name',
+        'person_path': 'procurement_officer',
+        'handler_fields': ['procurement_officer', 'updated_by', 'created_by'],
+        'main_contract_path': None,
+    },
+    'contract': {
+        'model': ('contract', 'Contract'),
+        'event_field': 'signing_date',
+        'project_path': 'project_id',
+        'name_path': 'contract_name',
+        'person_path': 'contract_officer',
+        'handler_fields': ['contract_officer', 'updated_by', 'created_by'],
+        'main_contract_path': 'file_positioning',
+    },
+    'payment': {
+        'model': ('payment', 'Payment'),
+        'event_field': 'payment_date',
+        'project_path': 'contract__project_id',
+        'name_path': 'contract__contract_name',
+        'person_path': 'contract__contract_officer',
+        'handler_fields': ['updated_by', 'created_by'],
+        'main_contract_path': None,
+    },
+    'settlement': {
+        'model': ('settlement', 'Settlement'),
+        'event_field': 'completion_date',
+        'project_path': 'main_contract__project_id',
+        'name_path': 'main_contract__contract_name',
+        'person_path': 'main_contract__contract_officer',
+        'handler_fields': ['updated_by', 'created_by'],
+        'main_contract_path': None,
+    },
+}
+
+
+def calculate_update_deadline(event_date):
+    """更新截止日期：业务发生次月的最后一天"""
+    year, month = (event_date.year + 1, 1) if event_date.month == 12 else (event_date.year, event_date.month + 1)
+    return date(year, month, calendar.monthrange(year, month)[1])
+
+
+class UpdateEventFactQuerySet(models.QuerySet):
+    """更新事件查询集 - 按业务编号批量重算事件行"""
+
+    def refresh(self, module, codes):
+        """
+        重算指定模块、指定业务编号的事件行，返回写入的行数
+
+        先删除旧行再按业务表当前数据写入；业务记录已删除或没有业务日期时不再保留事件行。
+        """
+        return sum(self._refresh_batch(module, batch) for batch in in_query_batches(codes))
+
+    def rebuild(self, modules=None):
+        """全量重建指定模块（默认全部模块）的事件行，返回写入的行数"""
+        apps = self.model._meta.apps
+        written = 0
+        with transaction.atomic(using=self.db):
+            for module in modules or UPDATE_EVENT_SOURCES:
+                source = apps.get_model(*UPDATE_EVENT_SOURCES[module]['model'])
+                self.filter(module=module).delete()
+                written += self.refresh(module, source.objects.order_by().values_list('pk', flat=True))
+        return written
+
+    def _refresh_batch(self, module, codes):
+        config = UPDATE_EVENT_SOURCES[module]
+        source = self.model._meta.apps.get_model(*config['model'])
+        handler_fields = config['handler_fields']
+        main_contract_path = config['main_contract_path']
+
+        value_fields = [
+            'pk', config['event_field'], config['project_path'], config['name_path'],
+            config['person_path'], 'updated_at', 'created_at', *handler_fields,
+        ]
+        if main_contract_path:
+            value_fields.append(main_contract_path)
+        rows = (
+            source.objects.filter(pk__in=codes, **{f"{config['event_field']}__isnull": False})
+            .order_by().values(*value_fields)
+        )
+
+        facts = []
+        for row in rows:
+            event_date = row[config['event_field']]
+            update_datetime = row['updated_at'] or row['created_at']
+            update_date = update_datetime.date() if update_datetime else None
+            deadline = calculate_update_deadline(event_date)
+            handler = next(
+                (str(row[field]).strip() for field in handler_fields
+                 if row[field] and str(row[field]).strip()),
+                UNMARKED_HANDLER,
+            )
+            facts.append(self.model(
+                module=module,
+                source_code=row['pk'],
+                project_id=row[config['project_path']],
+                name=row[config['name_path']] or '',
+                responsible_person=row[config['person_path']],
+                handler=handler,
+                is_main_contract=(
+                    row[main_contract_path] == FilePositioning.MAIN_CONTRACT.value if main_contract_path else True
+                ),
+                event_date=event_date,
+                update_date=update_date,
+                update_days=(update_date - event_date).days if update_date else None,
+                deadline=deadline,
+                is_timely=update_date is not None and update_date <= deadline,
+            ))
+
+        with transaction.atomic(using=self.db):
+            self.filter(module=module, source_code__in=codes).delete()
+            self.bulk_create(facts)
+        return len(facts)
+
+
+class UpdateEventFactManager(models.Manager.from_queryset(UpdateEventFactQuerySet)):
+    use_in_migrations = True
+
+
+class UpdateEventFact(models.Model):
+    """
+    更新事件事实 - 每条有业务日期的采购/合同/付款/结算记录一行
+
+    保存业务日期、更新日期、截止日期与是否按时等紧凑字段，
+    更新监控（热力图快照、项目/经办人统计、超期检测）直接对本表做分组查询，不再扫描业务表。
+    由各业务模型的保存/删除信号增量维护（见 project/signals.py），
+    批量写入等不触发信号的操作需调用 refresh_update_events，全量重建见 rebuild_update_events 命令。
+    """
+
+    MODULE_CHOICES = [
+        ('procurement', '采购'),
+        ('contract', '合同'),
+        ('payment', '付款'),
+        ('settlement', '结算'),
+    ]
+
+    module = models.CharField('业务模块', max_length=20, choices=MODULE_CHOICES)
+    source_code = models.CharField('业务编号', max_length=50)
+    project = models.ForeignKey(
+        'project.Project',
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        related_name='update_events',
+        verbose_name='所属项目',
+    )
+    name = models.CharField(
+        '业务名称',
+        max_length=200,
+        blank=True,
+        help_text='采购为采购项目名称，合同为合同名称，付款/结算为关联合同名称'
+    )
+    responsible_person = models.CharField(
+        '负责人',
+        max_length=50,
+        null=True,
+        blank=True,
+        help_text='采购为采购经办人，合同为合同经办人，付款/结算为关联合同的经办人'
+    )
+    handler = models.CharField(
+        '经办人',
+        max_length=50,
+        help_text='依次取经办人、更新人、创建人中第一个非空值'
+    )
+    is_main_contract = models.BooleanField(
+        '主合同',
+        default=True,
+        help_text='合同模块标记是否为主合同，其他模块恒为是'
+    )
+
+    event_date = models.DateField('业务日期')
+    update_date = models.DateField('更新日期', null=True, blank=True)
+    update_days = models.IntegerField('更新天数', null=True, blank=True)
+    deadline = models.DateField('更新截止日期')
+    is_timely = models.BooleanField('按时更新', default=False)
+
+    objects = UpdateEventFactManager()
+
+    class Meta:
+        verbose_name = '更新事件'
+        verbose_name_plural = '更新事件'
+        constraints = [
+            models.UniqueConstraint(fields=['module', 'source_code'], name='uniq_update_event_source'),
+        ]
+        indexes = [
+            models.Index(fields=['module', 'event_date']),
+            models.Index(fields=['project', 'module', 'event_date']),
+            models.Index(fields=['responsible_person', 'module', 'event_date']),
+        ]
+
+    def __str__(self):
+        return f"{self.get_module_display()} {self.source_code} ({self.event_date})"
+
+
+def refresh_update_events(module, codes):
+    """重算指定业务记录的更新事件行，供不触发信号的批量操作显式调用"""
+    return UpdateEventFact.objects.refresh(module, codes)
+
+
+def refresh_contract_update_events(contract_codes):
+    """
+    重算合同及其付款、结算的更新事件行
+
+    付款/结算事件的项目、名称、负责人取自关联合同，合同变更后需要一并重算。
+    """
+    from payment.models import Payment
+    from settlement.models import Settlement
+
+    codes = {code for code in contract_codes if code}
+    if not codes:
+        return 0
+    written = refresh_update_events('contract', codes)
+    written += refresh_update_events(
+        'payment', Payment.objects.filter(contract_id__in=codes).values_list('pk', flat=True)
+    )
+    written += refresh_update_events(
+        'settlement', Settlement.objects.filter(main_contract_id__in=codes).values_list('pk', flat=True)
+    )
+    return written
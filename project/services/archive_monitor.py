@@ -2,12 +2,17 @@
 归档监控服务
 监控采购、合同、结算资料的归档情况
 """
+import heapq
+from itertools import islice
+
 from django.utils import timezone
 from datetime import timedelta
 from django.db.models import Count, Avg, Q, F, ExpressionWrapper, fields
 from procurement.models import Procurement
 from contract.models import Contract
 from project.enums import FilePositioning
+from project.services.monitors.config import ARCHIVE_RULES
+from project.utils.date_helpers import period_q
 
 
 class ArchiveMonitorService:
@@ -59,7 +64,7 @@ class ArchiveMonitorService:
         """按当前服务配置返回过滤后的采购查询集。"""
         qs = Procurement.objects.filter(result_publicity_release_date__isnull=False)
         if self.year:
-            qs = qs.filter(result_publicity_release_date__year=self.year)
+            qs = qs.filter(period_q('result_publicity_release_date', self.year))
         if self.project_codes:
             qs = qs.filter(project__project_code__in=self.project_codes)
         return qs
@@ -71,209 +76,107 @@ class ArchiveMonitorService:
             signing_date__isnull=False
         )
         if self.year:
-            qs = qs.filter(signing_date__year=self.year)
+            qs = qs.filter(period_q('signing_date', self.year))
         if self.project_codes:
             qs = qs.filter(project__project_code__in=self.project_codes)
         return qs
 
-    def _get_procurement_archive_stats(self):
+    def _archive_aggregates(self, module):
         """
-        采购归档统计
-        
-        统计规则：
-        - 应归档项数 = 已完成公示的采购项目数（有result_publicity_release_date的记录）
-        - 已归档项数 = 有archive_date的记录数
-        - 逾期标准 = 公示后40天
-        - 及时归档标准 = 在公示后40天内完成归档
-        
-        Returns:
-            dict: 采购归档统计数据
+        归档统计的条件聚合（由 ARCHIVE_RULES 驱动）
+
+        应归档数、已归档数、及时归档数、平均归档周期与各级逾期数在一次查询中得出；
+        需配合 _annotate_archive_days 使用。逾期按基准日期距今天数减规定周期计算，
+        严重/中度取 severity_thresholds 的前两级，其余逾期计为轻微。
         """
-        base_qs = self._get_filtered_procurements()
-        
-        # 应归档总数
-        total = base_qs.count()
-        
-        # 已归档数量
-        archived_qs = base_qs.filter(archive_date__isnull=False)
-        archived = archived_qs.count()
-        
-        # 计算归档及时率（在40天内完成归档的比例）
-        timely_archived = 0
-        avg_archive_days = 0
-        
-        if archived > 0:
-            # 使用数据库聚合计算归档周期和及时归档数量，避免 N+1 查询
-            archived_with_dates = archived_qs.filter(
-                archive_date__isnull=False,
-                result_publicity_release_date__isnull=False,
-            ).annotate(
-                days_to_archive=ExpressionWrapper(
-                    F("archive_date") - F("result_publicity_release_date"),
-                    output_field=fields.IntegerField(),
-                )
-            )
+        rule = ARCHIVE_RULES[module]
+        today = timezone.now().date()
+        severe_days, moderate_days = rule['severity_thresholds'][:2]
+        archived = Q(**{f"{rule['archive_field']}__isnull": False})
+
+        def overdue_at_least(days):
+            return Q(**{
+                f"{rule['archive_field']}__isnull": True,
+                f"{rule['date_field']}__lte": today - timedelta(days=rule['deadline_days'] + days),
+            })
+
+        return {
+            'total': Count('pk'),
+            'archived': Count('pk', filter=archived),
+            'timely_archived': Count(
+                'pk', filter=archived & Q(archive_days__lte=timedelta(days=rule['deadline_days']))
+            ),
+            'avg_archive_duration': Avg('archive_days', filter=archived),
+            'overdue': Count('pk', filter=overdue_at_least(0)),
+            'overdue_moderate_or_worse': Count('pk', filter=overdue_at_least(moderate_days)),
+            'overdue_severe': Count('pk', filter=overdue_at_least(severe_days)),
+        }
 
-            stats = archived_with_dates.aggregate(
-                timely_archived=Count("id", filter=Q(days_to_archive__lte=40)),
-                avg_archive_days=Avg("days_to_archive"),
+    def _annotate_archive_days(self, queryset, module):
+        """附加归档周期 archive_days = 归档日期 - 基准日期"""
+        rule = ARCHIVE_RULES[module]
+        return queryset.annotate(
+            archive_days=ExpressionWrapper(
+                F(rule['archive_field']) - F(rule['date_field']),
+                output_field=fields.DurationField(),
             )
+        )
 
-            timely_archived = stats.get("timely_archived") or 0
-            avg_value = stats.get("avg_archive_days")
-            if avg_value is not None:
-                avg_archive_days = round(avg_value, 1)
-        
-        timely_rate = round((timely_archived / archived * 100), 2) if archived > 0 else 0
-        
-        # 逾期统计（公示后40天）
-        if total > 0:
-            deadline = timezone.now().date() - timedelta(days=40)
-            overdue = base_qs.filter(
-                result_publicity_release_date__lte=deadline,
-                archive_date__isnull=True
-            ).count()
-            
-            # 分级预警
-            severe_deadline = timezone.now().date() - timedelta(days=70)  # 超过30天
-            moderate_deadline = timezone.now().date() - timedelta(days=56)  # 超过16天
-            mild_deadline = deadline  # 超过1天
-            
-            severe_overdue = base_qs.filter(
-                result_publicity_release_date__lte=severe_deadline,
-                archive_date__isnull=True
-            ).count()
-            
-            moderate_overdue = base_qs.filter(
-                result_publicity_release_date__lte=moderate_deadline,
-                result_publicity_release_date__gt=severe_deadline,
-                archive_date__isnull=True
-            ).count()
-            
-            mild_overdue = base_qs.filter(
-                result_publicity_release_date__lte=mild_deadline,
-                result_publicity_release_date__gt=moderate_deadline,
-                archive_date__isnull=True
-            ).count()
-        else:
-            overdue = 0
-            severe_overdue = 0
-            moderate_overdue = 0
-            mild_overdue = 0
-        
+    def _build_archive_stats(self, row):
+        """将聚合结果换算为归档统计字典"""
+        total = row['total']
+        archived = row['archived']
+        timely_archived = row['timely_archived']
+        avg_duration = row['avg_archive_duration']
+        avg_archive_days = round(avg_duration.total_seconds() / 86400, 1) if archived and avg_duration is not None else 0
         return {
             'total': total,
             'archived': archived,
             'unarchived': total - archived,
             'rate': round((archived / total * 100), 2) if total > 0 else 0,
             'timely_archived': timely_archived,
-            'timely_rate': timely_rate,
+            'timely_rate': round((timely_archived / archived * 100), 2) if archived > 0 else 0,
             'avg_archive_days': avg_archive_days,
-            'overdue': overdue,
+            'overdue': row['overdue'],
             'overdue_breakdown': {
-                'severe': severe_overdue,  # 红色：30天以上
-                'moderate': moderate_overdue,  # 橙色：16-30天
-                'mild': mild_overdue  # 黄色：1-15天
+                'severe': row['overdue_severe'],  # 红色：30天以上
+                'moderate': row['overdue_moderate_or_worse'] - row['overdue_severe'],  # 橙色：16-30天
+                'mild': row['overdue'] - row['overdue_moderate_or_worse']  # 黄色：1-15天
             }
         }
-    
+
+    def _get_procurement_archive_stats(self):
+        """
+        采购归档统计
+
+        统计规则：
+        - 应归档项数 = 已完成公示的采购项目数（有result_publicity_release_date的记录）
+        - 已归档项数 = 有archive_date的记录数
+        - 逾期标准 = 公示后40天
+        - 及时归档标准 = 在公示后40天内完成归档
+
+        Returns:
+            dict: 采购归档统计数据
+        """
+        queryset = self._annotate_archive_days(self._get_filtered_procurements(), 'procurement')
+        return self._build_archive_stats(queryset.aggregate(**self._archive_aggregates('procurement')))
+
     def _get_contract_archive_stats(self):
         """
         合同归档统计
-        
+
         统计规则：
         - 只统计主合同（不统计补充协议和解除协议）
         - 应归档项数 = 已签订的主合同数
         - 逾期标准 = 签订后30天
         - 及时归档标准 = 在签订后30天内完成归档
-        
+
         Returns:
             dict: 合同归档统计数据
         """
-        base_qs = self._get_filtered_contracts()
-        
-        # 应归档总数
-        total = base_qs.count()
-        
-        # 已归档数量
-        archived_qs = base_qs.filter(archive_date__isnull=False)
-        archived = archived_qs.count()
-        
-        # 计算归档及时率（在30天内完成归档的比例）
-        timely_archived = 0
-        avg_archive_days = 0
-        
-        if archived > 0:
-            # 统计及时归档的数量
-            for contract in archived_qs:
-                if contract.archive_date and contract.signing_date:
-                    days_to_archive = (contract.archive_date - contract.signing_date).days
-                    if days_to_archive <= 30:
-                        timely_archived += 1
-            
-            # 计算平均归档周期
-            archive_days_list = []
-            for contract in archived_qs:
-                if contract.archive_date and contract.signing_date:
-                    days = (contract.archive_date - contract.signing_date).days
-                    archive_days_list.append(days)
-            
-            if archive_days_list:
-                avg_archive_days = round(sum(archive_days_list) / len(archive_days_list), 1)
-        
-        timely_rate = round((timely_archived / archived * 100), 2) if archived > 0 else 0
-        
-        # 逾期统计（签订后30天）
-        if total > 0:
-            deadline = timezone.now().date() - timedelta(days=30)
-            overdue = base_qs.filter(
-                signing_date__lte=deadline,
-                archive_date__isnull=True
-            ).count()
-            
-            # 分级预警
-            severe_deadline = timezone.now().date() - timedelta(days=60)  # 超过30天
-            moderate_deadline = timezone.now().date() - timedelta(days=46)  # 超过16天
-            mild_deadline = deadline  # 超过1天
-            
-            severe_overdue = base_qs.filter(
-                signing_date__lte=severe_deadline,
-                archive_date__isnull=True
-            ).count()
-            
-            moderate_overdue = base_qs.filter(
-                signing_date__lte=moderate_deadline,
-                signing_date__gt=severe_deadline,
-                archive_date__isnull=True
-            ).count()
-            
-            mild_overdue = base_qs.filter(
-                signing_date__lte=mild_deadline,
-                signing_date__gt=moderate_deadline,
-                archive_date__isnull=True
-            ).count()
-        else:
-            overdue = 0
-            severe_overdue = 0
-            moderate_overdue = 0
-            mild_overdue = 0
-        
-        return {
-            'total': total,
-            'archived': archived,
-            'unarchived': total - archived,
-            'rate': round((archived / total * 100), 2) if total > 0 else 0,
-            'timely_archived': timely_archived,
-            'timely_rate': timely_rate,
-            'avg_archive_days': avg_archive_days,
-            'overdue': overdue,
-            'overdue_breakdown': {
-                'severe': severe_overdue,
-                'moderate': moderate_overdue,
-                'mild': mild_overdue
-            }
-        }
-    
+        queryset = self._annotate_archive_days(self._get_filtered_contracts(), 'contract')
+        return self._build_archive_stats(queryset.aggregate(**self._archive_aggregates('contract')))
+
     def _get_settlement_archive_stats(self):
         """
         结算归档统计
@@ -342,17 +245,19 @@ class ArchiveMonitorService:
         """
         获取项目维度的归档表现数据，包含各项目的归档完成率与及时率。
 
+        采购、合同各一次按项目分组的聚合查询。
+
         Returns:
             list: 每个项目的统计数据
         """
         project_stats = {}
 
-        def ensure_entry(project_obj):
-            key = project_obj.project_code if project_obj else '__unassigned__'
+        def ensure_entry(project_code, project_name):
+            key = project_code or '__unassigned__'
             if key not in project_stats:
                 project_stats[key] = {
-                    'project_code': project_obj.project_code if project_obj else '',
-                    'project_name': project_obj.project_name if project_obj else '未关联项目',
+                    'project_code': project_code or '',
+                    'project_name': project_name if project_code else '未关联项目',
                     'procurement_total': 0,
                     'procurement_archived': 0,
                     'procurement_timely': 0,
@@ -362,23 +267,26 @@ class ArchiveMonitorService:
                 }
             return project_stats[key]
 
-        # 采购维度
-        for proc in self._get_filtered_procurements().select_related('project'):
-            entry = ensure_entry(proc.project)
-            entry['procurement_total'] += 1
-            if proc.archive_date:
-                entry['procurement_archived'] += 1
-                if proc.result_publicity_release_date and (proc.archive_date - proc.result_publicity_release_date).days <= 40:
-                    entry['procurement_timely'] += 1
-
-        # 合同维度
-        for contract in self._get_filtered_contracts().select_related('project'):
-            entry = ensure_entry(contract.project)
-            entry['contract_total'] += 1
-            if contract.archive_date:
-                entry['contract_archived'] += 1
-                if contract.signing_date and (contract.archive_date - contract.signing_date).days <= 30:
-                    entry['contract_timely'] += 1
+        for module, queryset in (
+            ('procurement', self._get_filtered_procurements()),
+            ('contract', self._get_filtered_contracts()),
+        ):
+            aggregates = self._archive_aggregates(module)
+            rows = (
+                self._annotate_archive_days(queryset, module)
+                .order_by('project_id')
+                .values('project_id', 'project__project_name')
+                .annotate(
+                    total=aggregates['total'],
+                    archived=aggregates['archived'],
+                    timely=aggregates['timely_archived'],
+                )
+            )
+            for row in rows:
+                entry = ensure_entry(row['project_id'], row['project__project_name'])
+                entry[f'{module}_total'] += row['total']
+                entry[f'{module}_archived'] += row['archived']
+                entry[f'{module}_timely'] += row['timely']
 
         performance_list = []
         for entry in project_stats.values():
@@ -400,70 +308,90 @@ class ArchiveMonitorService:
         performance_list.sort(key=lambda item: item['procurement_rate'], reverse=True)
         return performance_list
 
-    def get_overdue_list(self, module=None, severity=None, project_id=None):
+    def get_overdue_list(self, module=None, severity=None, project_id=None, limit=None):
         """
         获取逾期项目列表
-        
+
+        各模块在数据库中按逾期天数降序（即基准日期升序）取数，严重程度换算为基准日期区间过滤，
+        指定 limit 时每个模块最多读取 limit 条，再按逾期天数归并。
+
         Args:
             module: 模块类型 ('procurement'/'contract'/'settlement')
             severity: 严重程度 ('mild'/'moderate'/'severe')
             project_id: 项目ID，用于筛选特定项目
-            
+            limit: 最多返回条数，None 表示全部
+
         Returns:
-            list: 逾期项目列表
+            list: 逾期项目列表（按逾期天数降序）
         """
-        overdue_list = []
-        
         # 如果指定模块，只返回该模块；否则返回全部
         modules = [module] if module else ['procurement', 'contract']
-        
+
+        streams = []
         for mod in modules:
             if mod == 'procurement':
-                overdue_list.extend(
-                    self._get_procurement_overdue_list(severity, project_id)
-                )
+                streams.append(self._get_procurement_overdue_list(severity, project_id, limit))
             elif mod == 'contract':
-                overdue_list.extend(
-                    self._get_contract_overdue_list(severity, project_id)
-                )
-        
-        # 按逾期天数降序排序
-        overdue_list.sort(key=lambda x: x['overdue_days'], reverse=True)
-        
-        return overdue_list
-    
-    def _get_procurement_overdue_list(self, severity=None, project_id=None):
-        """获取采购逾期列表"""
-        deadline = timezone.now().date() - timedelta(days=40)
-        
-        queryset = self._get_filtered_procurements().filter(
-            result_publicity_release_date__lte=deadline,
-            archive_date__isnull=True
-        ).select_related('project')
-        
+                streams.append(self._get_contract_overdue_list(severity, project_id, limit))
+
+        merged = heapq.merge(*streams, key=lambda x: x['overdue_days'], reverse=True)
+        return list(islice(merged, limit))
+
+    def _overdue_queryset(self, queryset, module, severity=None, project_id=None, limit=None):
+        """未归档且已逾期的记录，按基准日期升序（逾期天数降序）"""
+        rule = ARCHIVE_RULES[module]
+        date_field = rule['date_field']
+        today = timezone.now().date()
+        severe_days, moderate_days = rule['severity_thresholds'][:2]
+
+        def reference_date(overdue_days):
+            """逾期 overdue_days 天对应的基准日期"""
+            return today - timedelta(days=rule['deadline_days'] + overdue_days)
+
+        # 严重程度对应的逾期天数区间 [下限, 上限)
+        bounds = {
+            None: (0, None),
+            'severe': (severe_days, None),
+            'moderate': (moderate_days, severe_days),
+            'mild': (0, moderate_days),
+        }
+        if severity not in bounds:
+            return queryset.none()
+        lower, upper = bounds[severity]
+        queryset = queryset.filter(**{
+            f"{rule['archive_field']}__isnull": True,
+            f'{date_field}__lte': reference_date(lower),
+        })
+        if upper is not None:
+            queryset = queryset.filter(**{f'{date_field}__gt': reference_date(upper)})
+
         # 单项目筛选（用于详情页）
         if project_id:
             queryset = queryset.filter(project_id=project_id)
-        
-        overdue_list = []
-        for proc in queryset:
-            if not proc.result_publicity_release_date:
-                continue
-            overdue_days = (timezone.now().date() - proc.result_publicity_release_date).days - 40
-            
-            # 确定严重程度
-            if overdue_days > 30:
-                level = 'severe'
-            elif overdue_days > 15:
-                level = 'moderate'
-            else:
-                level = 'mild'
-            
-            # 如果指定了严重程度，只返回匹配的
-            if severity and level != severity:
-                continue
-            
-            overdue_list.append({
+
+        queryset = queryset.select_related('project').order_by(date_field, 'pk')
+        if limit is not None:
+            queryset = queryset[:limit]
+        return queryset
+
+    def _overdue_level(self, overdue_days, module):
+        severe_days, moderate_days = ARCHIVE_RULES[module]['severity_thresholds'][:2]
+        if overdue_days >= severe_days:
+            return 'severe'
+        if overdue_days >= moderate_days:
+            return 'moderate'
+        return 'mild'
+
+    def _get_procurement_overdue_list(self, severity=None, project_id=None, limit=None):
+        """获取采购逾期列表（生成器，逾期天数降序）"""
+        deadline_days = ARCHIVE_RULES['procurement']['deadline_days']
+        today = timezone.now().date()
+        queryset = self._overdue_queryset(
+            self._get_filtered_procurements(), 'procurement', severity, project_id, limit
+        )
+        for proc in queryset.iterator(chunk_size=200):
+            overdue_days = (today - proc.result_publicity_release_date).days - deadline_days
+            yield {
                 'module': '采购',
                 'code': proc.procurement_code,
                 'name': proc.project_name,
@@ -471,46 +399,22 @@ class ArchiveMonitorService:
                 'project_name': proc.project.project_name if proc.project else '',
                 'reference_date': proc.result_publicity_release_date,
                 'reference_date_label': '平台公示完成日期',
-                'deadline_days': 40,
+                'deadline_days': deadline_days,
                 'overdue_days': overdue_days,
-                'severity': level,
+                'severity': self._overdue_level(overdue_days, 'procurement'),
                 'officer': proc.procurement_officer
-            })
-        
-        return overdue_list
-    
-    def _get_contract_overdue_list(self, severity=None, project_id=None):
-        """获取合同逾期列表"""
-        deadline = timezone.now().date() - timedelta(days=30)
-        
-        queryset = self._get_filtered_contracts().filter(
-            signing_date__lte=deadline,
-            archive_date__isnull=True
-        ).select_related('project')
-        
-        # 单项目筛选（用于详情页）
-        if project_id:
-            queryset = queryset.filter(project_id=project_id)
-        
-        overdue_list = []
-        for contract in queryset:
-            if not contract.signing_date:
-                continue
-            overdue_days = (timezone.now().date() - contract.signing_date).days - 30
-            
-            # 确定严重程度
-            if overdue_days > 30:
-                level = 'severe'
-            elif overdue_days > 15:
-                level = 'moderate'
-            else:
-                level = 'mild'
-            
-            # 如果指定了严重程度，只返回匹配的
-            if severity and level != severity:
-                continue
-            
-            overdue_list.append({
+            }
+
+    def _get_contract_overdue_list(self, severity=None, project_id=None, limit=None):
+        """获取合同逾期列表（生成器，逾期天数降序）"""
+        deadline_days = ARCHIVE_RULES['contract']['deadline_days']
+        today = timezone.now().date()
+        queryset = self._overdue_queryset(
+            self._get_filtered_contracts(), 'contract', severity, project_id, limit
+        )
+        for contract in queryset.iterator(chunk_size=200):
+            overdue_days = (today - contract.signing_date).days - deadline_days
+            yield {
                 'module': '合同',
                 'code': contract.contract_code,
                 'name': contract.contract_name,
@@ -518,10 +422,8 @@ class ArchiveMonitorService:
                 'project_name': contract.project.project_name if contract.project else '',
                 'reference_date': contract.signing_date,
                 'reference_date_label': '合同签订日期',
-                'deadline_days': 30,
+                'deadline_days': deadline_days,
                 'overdue_days': overdue_days,
-                'severity': level,
+                'severity': self._overdue_level(overdue_days, 'contract'),
                 'officer': contract.contract_officer
-            })
-        
-        return overdue_list
+            }
@@ -12,6 +12,8 @@ from payment.models import Payment
 from settlement.models import Settlement
 from project.enums import FilePositioning, ContractSource
 from project.utils.completeness_checker import ProcurementCompletenessChecker
+from project.services.completeness_engine import CompletenessEngine
+from project.utils.date_helpers import period_q
 
 
 def get_enabled_fields(model_type):
@@ -25,13 +27,15 @@ def get_enabled_fields(model_type):
         list: 启用的字段名列表
     """
     # 从数据库获取启用的字段配置
-    configs = CompletenessFieldConfig.objects.filter(
-        model_type=model_type,
-        is_enabled=True
-    ).order_by('sort_order', 'field_name')
+    field_names = list(
+        CompletenessFieldConfig.objects.filter(
+            model_type=model_type,
+            is_enabled=True
+        ).order_by('sort_order', 'field_name').values_list('field_name', flat=True)
+    )
 
-    if configs.exists():
-        return [config.field_name for config in configs]
+    if field_names:
+        return field_names
 
     # 如果数据库中没有配置，返回默认字段列表
     if model_type == 'procurement':
@@ -80,100 +84,16 @@ def check_procurement_field_completeness(year=None, project_codes=None):
     Returns:
         dict: 采购字段齐全性统计
     """
-    # 从数据库获取启用的字段列表
-    required_fields = get_enabled_fields('procurement')
+    engine = CompletenessEngine.for_model_type('procurement')
     
-    # 应用筛选条件 - 使用select_related和only优化查询
-    all_procurements = Procurement.objects.select_related('project').only(
-        'procurement_code', 'project_name', 'procurement_unit', 'procurement_category',
-        'procurement_platform', 'procurement_method', 'qualification_review_method',
-        'bid_evaluation_method', 'bid_awarding_method', 'budget_amount', 'control_price',
-        'winning_amount', 'procurement_officer', 'demand_department', 'demand_contact',
-        'winning_bidder', 'winning_contact', 'planned_completion_date', 'requirement_approval_date',
-        'announcement_release_date', 'registration_deadline', 'bid_opening_date',
-        'candidate_publicity_end_date', 'result_publicity_release_date', 'notice_issue_date',
-        'evaluation_committee', 'bid_guarantee', 'bid_guarantee_return_date',
-        'performance_guarantee', 'archive_date', 'project__project_code'
-    )
+    all_procurements = Procurement.objects.all()
     if year:
-        all_procurements = all_procurements.filter(result_publicity_release_date__year=year)
+        all_procurements = all_procurements.filter(period_q('result_publicity_release_date', year))
     if project_codes:
         all_procurements = all_procurements.filter(project__project_code__in=project_codes)
-    total_count = all_procurements.count()
-    
-    if total_count == 0:
-        return {
-            'total_count': 0,
-            'completeness_rate': 0.0,
-            'field_count': len(required_fields),
-            'field_stats': [],
-            'incomplete_records': [],
-            'incomplete_count': 0
-        }
-    
-    # 统计每个字段的填写情况
-    field_stats = []
-    for field_name in required_fields:
-        filled_count = 0
-        for procurement in all_procurements:
-            value = getattr(procurement, field_name, None)
-            # 判断字段是否已填写（非空且不是空字符串）
-            if value is not None and value != '':
-                filled_count += 1
-        
-        fill_rate = (filled_count / total_count) * 100 if total_count > 0 else 0
-        field_stats.append({
-            'field_name': field_name,
-            'field_label': Procurement._meta.get_field(field_name).verbose_name,
-            'filled_count': filled_count,
-            'fill_rate': round(fill_rate, 2)
-        })
-    
-    # 计算每条采购记录的齐全率
-    incomplete_records = []
-    for procurement in all_procurements:
-        filled_fields = 0
-        missing_fields = []
-        
-        for field_name in required_fields:
-            value = getattr(procurement, field_name, None)
-            if value is not None and value != '':
-                filled_fields += 1
-            else:
-                field_label = Procurement._meta.get_field(field_name).verbose_name
-                missing_fields.append(field_label)
-        
-        completeness = (filled_fields / len(required_fields)) * 100
-        
-        # 只记录齐全率低于100%的记录
-        if completeness < 100:
-            incomplete_records.append({
-                'code': procurement.procurement_code,
-                'name': procurement.project_name,
-                'project_code': procurement.project.project_code if procurement.project else '',
-                'completeness': round(completeness, 2),
-                'filled_count': filled_fields,
-                'total_fields': len(required_fields),
-                'missing_fields': missing_fields[:5],  # 只显示前5个缺失字段
-                'missing_count': len(missing_fields)
-            })
-    
-    # 按齐全率排序，最低的在前
-    incomplete_records.sort(key=lambda x: x['completeness'])
-    
-    # 计算总体齐全率
-    total_filled = sum(stat['filled_count'] for stat in field_stats)
-    total_cells = total_count * len(required_fields)
-    overall_completeness = (total_filled / total_cells) * 100 if total_cells > 0 else 100.0
     
-    return {
-        'total_count': total_count,
-        'completeness_rate': round(overall_completeness, 2),
-        'field_count': len(required_fields),
-        'field_stats': field_stats,
-        'incomplete_records': incomplete_records[:50],  # 只返回前50条
-        'incomplete_count': len(incomplete_records)
-    }
+    # 字段统计一次聚合查询，不完整记录只取齐全率最低的前50条
+    return engine.field_completeness(all_procurements, 'procurement_code', 'project_name')
 
 
 def check_contract_field_completeness(year=None, project_codes=None):
@@ -188,98 +108,16 @@ def check_contract_field_completeness(year=None, project_codes=None):
     Returns:
         dict: 合同字段齐全性统计
     """
-    # 从数据库获取启用的字段列表
-    required_fields = get_enabled_fields('contract')
+    engine = CompletenessEngine.for_model_type('contract')
     
-    # 应用筛选条件 - 使用select_related和only优化查询
-    all_contracts = Contract.objects.select_related('project').only(
-        'contract_code', 'contract_name', 'contract_sequence', 'file_positioning',
-        'contract_type', 'contract_source', 'party_a', 'party_b',
-        'party_a_legal_representative', 'party_a_contact_person', 'party_a_manager',
-        'party_b_legal_representative', 'party_b_contact_person', 'party_b_manager',
-        'contract_amount', 'signing_date', 'duration', 'contract_officer',
-        'payment_method', 'performance_guarantee_return_date', 'archive_date',
-        'project__project_code'
-    )
+    all_contracts = Contract.objects.all()
     if year:
-        all_contracts = all_contracts.filter(signing_date__year=year)
+        all_contracts = all_contracts.filter(period_q('signing_date', year))
     if project_codes:
         all_contracts = all_contracts.filter(project__project_code__in=project_codes)
-    total_count = all_contracts.count()
-    
-    if total_count == 0:
-        return {
-            'total_count': 0,
-            'completeness_rate': 0.0,
-            'field_count': len(required_fields),
-            'field_stats': [],
-            'incomplete_records': [],
-            'incomplete_count': 0
-        }
-    
-    # 统计每个字段的填写情况
-    field_stats = []
-    for field_name in required_fields:
-        filled_count = 0
-        for contract in all_contracts:
-            value = getattr(contract, field_name, None)
-            # 判断字段是否已填写（非空且不是空字符串）
-            if value is not None and value != '':
-                filled_count += 1
-        
-        fill_rate = (filled_count / total_count) * 100 if total_count > 0 else 0
-        field_stats.append({
-            'field_name': field_name,
-            'field_label': Contract._meta.get_field(field_name).verbose_name,
-            'filled_count': filled_count,
-            'fill_rate': round(fill_rate, 2)
-        })
-    
-    # 计算每条合同记录的齐全率
-    incomplete_records = []
-    for contract in all_contracts:
-        filled_fields = 0
-        missing_fields = []
-        
-        for field_name in required_fields:
-            value = getattr(contract, field_name, None)
-            if value is not None and value != '':
-                filled_fields += 1
-            else:
-                field_label = Contract._meta.get_field(field_name).verbose_name
-                missing_fields.append(field_label)
-        
-        completeness = (filled_fields / len(required_fields)) * 100
-        
-        # 只记录齐全率低于100%的记录
-        if completeness < 100:
-            incomplete_records.append({
-                'code': contract.contract_code,
-                'name': contract.contract_name,
-                'project_code': contract.project.project_code if contract.project else '',
-                'completeness': round(completeness, 2),
-                'filled_count': filled_fields,
-                'total_fields': len(required_fields),
-                'missing_fields': missing_fields[:5],  # 只显示前5个缺失字段
-                'missing_count': len(missing_fields)
-            })
-    
-    # 按齐全率排序，最低的在前
-    incomplete_records.sort(key=lambda x: x['completeness'])
     
-    # 计算总体齐全率
-    total_filled = sum(stat['filled_count'] for stat in field_stats)
-    total_cells = total_count * len(required_fields)
-    overall_completeness = (total_filled / total_cells) * 100 if total_cells > 0 else 100.0
-    
-    return {
-        'total_count': total_count,
-        'completeness_rate': round(overall_completeness, 2),
-        'field_count': len(required_fields),
-        'field_stats': field_stats,
-        'incomplete_records': incomplete_records[:50],  # 只返回前50条
-        'incomplete_count': len(incomplete_records)
-    }
+    # 字段统计一次聚合查询，不完整记录只取齐全率最低的前50条
+    return engine.field_completeness(all_contracts, 'contract_code', 'contract_name')
 
 
 def check_contract_completeness():
@@ -682,54 +520,30 @@ def get_project_completeness_ranking(year=None, project_codes=None):
     if project_codes:
         projects = projects.filter(project_code__in=project_codes)
     
-    rankings = []
+    procurements = Procurement.objects.all()
+    contracts = Contract.objects.all()
+    if year:
+        procurements = procurements.filter(period_q('result_publicity_release_date', year))
+        contracts = contracts.filter(period_q('signing_date', year))
     
-    for project in projects:
-        # 获取该项目的采购记录
-        procurements = Procurement.objects.filter(project=project)
-        if year:
-            procurements = procurements.filter(result_publicity_release_date__year=year)
-        
-        # 获取该项目的合同记录
-        contracts = Contract.objects.filter(project=project)
-        if year:
-            contracts = contracts.filter(signing_date__year=year)
-        
-        # 计算采购齐全率
-        procurement_rate = 0
-        procurement_count = procurements.count()
-        if procurement_count > 0:
-            # 从数据库获取启用的采购字段
-            procurement_fields = get_enabled_fields('procurement')
-            
-            total_cells = procurement_count * len(procurement_fields)
-            filled_cells = 0
-            
-            for proc in procurements:
-                for field_name in procurement_fields:
-                    value = getattr(proc, field_name, None)
-                    if value is not None and value != '':
-                        filled_cells += 1
-            
-            procurement_rate = round((filled_cells / total_cells) * 100, 2) if total_cells > 0 else 0
-        
-        # 计算合同齐全率
-        contract_rate = 0
-        contract_count = contracts.count()
-        if contract_count > 0:
-            # 从数据库获取启用的合同字段
-            contract_fields = get_enabled_fields('contract')
-            
-            total_cells = contract_count * len(contract_fields)
-            filled_cells = 0
-            
-            for contract in contracts:
-                for field_name in contract_fields:
-                    value = getattr(contract, field_name, None)
-                    if value is not None and value != '':
-                        filled_cells += 1
-            
-            contract_rate = round((filled_cells / total_cells) * 100, 2) if total_cells > 0 else 0
+    # 采购、合同各一次分组聚合查询
+    procurement_groups = CompletenessEngine.for_model_type('procurement').group_statistics(
+        procurements, 'project_id'
+    )
+    contract_groups = CompletenessEngine.for_model_type('contract').group_statistics(
+        contracts, 'project_id'
+    )
+    
+    rankings = []
+    empty = {'total_count': 0, 'completeness_rate': 0}
+    
+    for project_code, project_name in projects.values_list('project_code', 'project_name'):
+        procurement_stats = procurement_groups.get(project_code, empty)
+        contract_stats = contract_groups.get(project_code, empty)
+        procurement_count = procurement_stats['total_count']
+        contract_count = contract_stats['total_count']
+        procurement_rate = procurement_stats['completeness_rate']
+        contract_rate = contract_stats['completeness_rate']
         
         # 计算综合齐全率（采购和合同的平均值）
         if procurement_count > 0 and contract_count > 0:
@@ -744,8 +558,8 @@ def get_project_completeness_ranking(year=None, project_codes=None):
         # 只有当项目有数据时才加入排行榜
         if procurement_count > 0 or contract_count > 0:
             rankings.append({
-                'project_code': project.project_code,
-                'project_name': project.project_name,
+                'project_code': project_code,
+                'project_name': project_name,
                 'procurement_rate': procurement_rate,
                 'contract_rate': contract_rate,
                 'overall_rate': overall_rate,
@@ -790,7 +604,7 @@ def check_procurement_completeness_by_method(year=None, project_codes=None):
     # 获取采购数据
     procurements = Procurement.objects.all()
     if year:
-        procurements = procurements.filter(result_publicity_release_date__year=year)
+        procurements = procurements.filter(period_q('result_publicity_release_date', year))
     if project_codes:
         procurements = procurements.filter(project__project_code__in=project_codes)
     
@@ -813,7 +627,7 @@ def check_procurement_completeness_by_method(year=None, project_codes=None):
     if 'overall' not in result or not result['overall']:
         procurements = Procurement.objects.all()
         if year:
-            procurements = procurements.filter(result_publicity_release_date__year=year)
+            procurements = procurements.filter(period_q('result_publicity_release_date', year))
         if project_codes:
             procurements = procurements.filter(project__project_code__in=project_codes)
         stats_by_method = checker.calculate_type_statistics(procurements)
@@ -844,7 +658,7 @@ def get_procurement_method_completeness_detail(year=None, project_codes=None, me
     # 获取采购数据
     procurements = Procurement.objects.all()
     if year:
-        procurements = procurements.filter(result_publicity_release_date__year=year)
+        procurements = procurements.filter(period_q('result_publicity_release_date', year))
     if project_codes:
         procurements = procurements.filter(project__project_code__in=project_codes)
     
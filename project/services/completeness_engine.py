@@ -0,0 +1,202 @@
+"""
+齐全性统计引擎
+由 CompletenessFieldConfig 配置的字段生成SQL条件，在数据库中完成填写计数：
+- 字段级填写数：一次聚合查询，每个字段一个条件 Count(filter=...)
+- 记录级缺失数：注解表达式，支持按项目/经办人分组聚合
+- 不完整记录：按填写数升序只取前N条，再在Python中列出缺失字段
+"""
+from functools import reduce
+from operator import add
+
+from django.core.exceptions import FieldDoesNotExist
+from django.db.models import Case, Count, IntegerField, Q, Sum, Value, When
+
+
+class CompletenessEngine:
+    """
+    单个模型的字段齐全性计算
+
+    字段“已填写”的判定与逐条 getattr 检查一致：值非空，且字符串类字段不为空字符串。
+    配置中不存在于模型的字段视为始终未填写。
+    """
+
+    def __init__(self, model, field_names):
+        self.model = model
+        self.field_names = list(field_names)
+        self._fields = {}
+        for field_name in self.field_names:
+            try:
+                self._fields[field_name] = model._meta.get_field(field_name)
+            except FieldDoesNotExist:
+                self._fields[field_name] = None
+
+    @classmethod
+    def for_model_type(cls, model_type):
+        """按 CompletenessFieldConfig.model_type 创建引擎（'procurement' 或 'contract'）"""
+        from contract.models import Contract
+        from procurement.models import Procurement
+        from project.services.completeness import get_enabled_fields
+
+        model = Procurement if model_type == 'procurement' else Contract
+        return cls(model, get_enabled_fields(model_type))
+
+    @property
+    def field_count(self):
+        return len(self.field_names)
+
+    def field_label(self, field_name):
+        field = self._fields.get(field_name)
+        return field.verbose_name if field is not None else field_name
+
+    def filled_q(self, field_name):
+        """字段已填写的查询条件"""
+        field = self._fields.get(field_name)
+        if field is None:
+            # 模型中不存在的字段：恒为未填写
+            return Q(pk__isnull=True)
+        lookup = field.attname if field.is_relation else field.name
+        condition = Q(**{f'{lookup}__isnull': False})
+        if field.empty_strings_allowed and not field.is_relation:
+            condition &= ~Q(**{lookup: ''})
+        return condition
+
+    def all_filled_q(self):
+        """所有字段均已填写的查询条件"""
+        return reduce(lambda a, b: a & b, (self.filled_q(name) for name in self.field_names), Q())
+
+    def filled_count_expression(self):
+        """单条记录已填写字段数的表达式"""
+        if not self.field_names:
+            return Value(0, output_field=IntegerField())
+        return reduce(add, (
+            Case(When(self.filled_q(name), then=Value(1)), default=Value(0), output_field=IntegerField())
+            for name in self.field_names
+        ))
+
+    def field_statistics(self, queryset):
+        """
+        一次聚合查询返回记录数、完整记录数与各字段填写数
+
+        Returns:
+            (total_count, complete_count, {field_name: filled_count})
+        """
+        aggregates = {
+            '_total': Count('pk'),
+            '_complete': Count('pk', filter=self.all_filled_q()),
+        }
+        for index, field_name in enumerate(self.field_names):
+            aggregates[f'_f{index}'] = Count('pk', filter=self.filled_q(field_name))
+        row = queryset.order_by().aggregate(**aggregates)
+        filled = {
+            field_name: row[f'_f{index}'] for index, field_name in enumerate(self.field_names)
+        }
+        return row['_total'], row['_complete'], filled
+
+    def group_statistics(self, queryset, group_field):
+        """
+        按分组字段（如 project_id / procurement_officer）一次查询统计
+
+        Returns:
+            {分组值: {'total_count', 'complete_count', 'filled_cells', 'completeness_rate'}}
+        """
+        rows = (
+            queryset.order_by()
+            .values(group_field)
+            .annotate(
+                _total=Count('pk'),
+                _complete=Count('pk', filter=self.all_filled_q()),
+                _filled=Sum(self.filled_count_expression()),
+            )
+        )
+        result = {}
+        for row in rows:
+            total_cells = row['_total'] * self.field_count
+            filled_cells = row['_filled'] or 0
+            result[row[group_field]] = {
+                'total_count': row['_total'],
+                'complete_count': row['_complete'],
+                'filled_cells': filled_cells,
+                'completeness_rate': round(filled_cells / total_cells * 100, 2) if total_cells > 0 else 0,
+            }
+        return result
+
+    def lowest_records(self, queryset, limit, code_field, name_field):
+        """
+        齐全率最低的不完整记录（只查询前 limit 条）
+
+        同齐全率的记录保持模型默认排序。
+        """
+        ordering = list(self.model._meta.ordering) + ['pk']
+        existing = [name for name in self.field_names if self._fields[name] is not None]
+        value_fields = {code_field, name_field, 'project_id', *[self._fields[n].attname for n in existing]}
+        rows = (
+            queryset.annotate(_filled=self.filled_count_expression())
+            .filter(_filled__lt=self.field_count)
+            .order_by('_filled', *ordering)
+            .values(*value_fields, '_filled')[:limit]
+        )
+
+        records = []
+        for row in rows:
+            missing_fields = []
+            for field_name in self.field_names:
+                field = self._fields[field_name]
+                value = row.get(field.attname) if field is not None else None
+                if value is None or value == '':
+                    missing_fields.append(self.field_label(field_name))
+            filled = row['_filled']
+            records.append({
+                'code': row[code_field],
+                'name': row[name_field],
+                'project_code': row['project_id'] or '',
+                'completeness': round(filled / self.field_count * 100, 2),
+                'filled_count': filled,
+                'total_fields': self.field_count,
+                'missing_fields': missing_fields[:5],  # 只显示前5个缺失字段
+                'missing_count': len(missing_fields)
+            })
+        return records
+
+    def field_completeness(self, queryset, code_field, name_field, limit=50):
+        """
+        字段齐全性完整结果（字段统计 + 最低齐全率的不完整记录），结构与原逐条检查一致
+        """
+        total_count, complete_count, filled = self.field_statistics(queryset)
+
+        if total_count == 0:
+            return {
+                'total_count': 0,
+                'completeness_rate': 0.0,
+                'field_count': self.field_count,
+                'field_stats': [],
+                'incomplete_records': [],
+                'incomplete_count': 0
+            }
+
+        field_stats = [
+            {
+                'field_name': field_name,
+                'field_label': self.field_label(field_name),
+                'filled_count': filled[field_name],
+                'fill_rate': round(filled[field_name] / total_count * 100, 2)
+            }
+            for field_name in self.field_names
+        ]
+
+        incomplete_count = total_count - complete_count if self.field_names else 0
+        incomplete_records = (
+            self.lowest_records(queryset, limit, code_field, name_field) if incomplete_count else []
+        )
+
+        total_cells = total_count * self.field_count
+        total_filled = sum(filled.values())
+        overall_completeness = (total_filled / total_cells) * 100 if total_cells > 0 else 100.0
+
+        return {
+            'total_count': total_count,
+            'completeness_rate': round(overall_completeness, 2),
+            'field_count': self.field_count,
+            'field_stats': field_stats,
+            'incomplete_records': incomplete_records,
+            'incomplete_count': incomplete_count
+        }
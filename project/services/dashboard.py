@@ -0,0 +1,130 @@
+"""
+数据概览（首页）汇总服务
+
+首页每个用户登录都会访问，数据按 (年度, 项目) 与数据代数缓存在统计缓存别名中（跨进程共享）：
+- 顶部指标：项目、采购、合同各一次聚合查询；
+- 最近项目卡片：一次查询取前 5 个项目，采购数量、合同数量、合同总额以关联子查询同时计算；
+- 最近采购：一次查询。
+未命中缓存时共 5 次查询，命中时不查询数据库。
+"""
+from __future__ import annotations
+
+from decimal import Decimal
+from typing import Dict, Optional
+
+from django.db.models import Count, DecimalField, IntegerField, OuterRef, Subquery, Sum, Value
+from django.db.models.functions import Coalesce
+
+from contract.models import Contract
+from procurement.models import Procurement
+from project.models import Project
+from project.services.metrics import DEFAULT_CACHE_TIMEOUT
+from project.services.shared.utils import (
+    build_cache_key, normalize_project_codes, normalize_year, statistics_cache,
+)
+from project.utils.date_helpers import period_q
+
+
+class DashboardSummaryService:
+    """首页统计数据、最近项目卡片与最近采购"""
+
+    RECENT_PROJECT_LIMIT = 5
+    RECENT_PROCUREMENT_LIMIT = 10
+
+    def __init__(self, year: Optional[int] = None, project_code: Optional[str] = None):
+        self.year = normalize_year(year)
+        self.project_codes = normalize_project_codes([project_code] if project_code else None)
+
+    def get_summary(self, *, use_cache: bool = True) -> Dict:
+        """
+        返回 {'stats': {...}, 'projects': [Project], 'recent_procurements': [Procurement]}
+
+        项目卡片上附加 procurement_count、contract_count、contract_total 属性。
+        """
+        cache = statistics_cache()
+        cache_key = build_cache_key('summary', self.year, self.project_codes, namespace='dashboard')
+        if use_cache:
+            cached = cache.get(cache_key)
+            if cached is not None:
+                return cached
+
+        data = {
+            'stats': self._header_stats(),
+            'projects': self._project_cards(),
+            'recent_procurements': self._recent_procurements(),
+        }
+        if use_cache:
+            cache.set(cache_key, data, DEFAULT_CACHE_TIMEOUT)
+        return data
+
+    def _project_scope(self):
+        projects = Project.objects.all()
+        if self.project_codes:
+            projects = projects.filter(project_code__in=self.project_codes)
+        return projects
+
+    def _procurement_scope(self):
+        procurements = Procurement.objects.all()
+        if self.project_codes:
+            procurements = procurements.filter(project_id__in=self.project_codes)
+        if self.year is not None:
+            procurements = procurements.filter(period_q('result_publicity_release_date', self.year))
+        return procurements
+
+    def _contract_scope(self):
+        contracts = Contract.objects.all()
+        if self.project_codes:
+            contracts = contracts.filter(project_id__in=self.project_codes)
+        if self.year is not None:
+            contracts = contracts.filter(period_q('signing_date', self.year))
+        return contracts
+
+    def _header_stats(self) -> Dict:
+        contract_totals = self._contract_scope().aggregate(
+            contract_count=Count('pk'),
+            total_amount=Sum('contract_amount'),
+        )
+        total_amount_yuan = contract_totals['total_amount'] or 0
+        return {
+            'project_count': self._project_scope().count(),
+            'procurement_count': self._procurement_scope().count(),
+            'contract_count': contract_totals['contract_count'],
+            'total_amount': total_amount_yuan,
+            'total_amount_wan': round(float(total_amount_yuan) / 10000, 2),  # 转换为万元
+        }
+
+    def _project_cards(self) -> list:
+        """最近创建的项目及其本年度采购数量、合同数量与合同总额（关联子查询，一次查询）"""
+        procurement_counts = (
+            self._procurement_scope().filter(project=OuterRef('pk'))
+            .order_by().values('project').annotate(total=Count('pk')).values('total')
+        )
+        contract_rows = (
+            self._contract_scope().filter(project=OuterRef('pk'))
+            .order_by().values('project')
+        )
+        zero_amount = Value(Decimal('0'), output_field=DecimalField(max_digits=18, decimal_places=2))
+        return list(
+            self._project_scope()
+            .annotate(
+                procurement_count=Coalesce(Subquery(procurement_counts, output_field=IntegerField()), 0),
+                contract_count=Coalesce(
+                    Subquery(contract_rows.annotate(total=Count('pk')).values('total'), output_field=IntegerField()),
+                    0,
+                ),
+                contract_total=Coalesce(
+                    Subquery(
+                        contract_rows.annotate(total=Sum('contract_amount')).values('total'),
+                        output_field=DecimalField(max_digits=18, decimal_places=2),
+                    ),
+                    zero_amount,
+                ),
+            )
+            .order_by('-created_at')[:self.RECENT_PROJECT_LIMIT]
+        )
+
+    def _recent_procurements(self) -> list:
+        return list(
+            self._procurement_scope().select_related('project')
+            .order_by('-result_publicity_release_date', '-created_at')[:self.RECENT_PROCUREMENT_LIMIT]
+        )
@@ -0,0 +1,551 @@
+"""
+SQLite 数据库备份与恢复
+
+基于 sqlite3 在线备份 API（Connection.backup）按页增量复制，复制期间不阻塞业务写入：
+- 每步复制 BACKUP_PAGES_PER_STEP 页并回调进度；进入复制、检查、压缩各阶段时回调阶段，阶段内定期发送心跳；
+- 复制完成后在副本上执行 PRAGMA integrity_check 并统计各表行数；
+- 按配置以 gzip（或已安装 zstandard 时的 zstd）分块流式压缩，边写边计算 SHA-256；
+- 产物先写入 .part 临时文件再原子替换，同名的 .manifest.json 记录校验和、行数与完整性结果。
+恢复时先把备份解压到数据库同目录的临时文件并校验，再用备份 API 一次性写回在线数据库（单个写事务），
+不替换数据库文件、不删除 -wal/-shm，其他进程与线程中已打开的连接在下次读取时即看到恢复后的数据。
+后台备份任务的状态写入备份目录下 .jobs/<任务编号>.json，多个工作进程轮询时都能读到。
+定时备份（scheduled）按 DATABASE_BACKUP_KEEP 保留最近若干份，手动备份不参与自动清理。
+"""
+from __future__ import annotations
+
+import gzip
+import hashlib
+import json
+import logging
+import os
+import re
+import sqlite3
+import time
+import uuid
+from contextlib import closing
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+from django.conf import settings
+from django.utils import timezone
+
+try:
+    import zstandard  # 可选依赖：安装后支持 zstd 压缩
+except ImportError:  # pragma: no cover - 未安装时只提供 gzip
+    zstandard = None
+
+logger = logging.getLogger(__name__)
+
+# 每步复制的页数（默认页大小 4KB，约 4MB/步）
+BACKUP_PAGES_PER_STEP = 1024
+# 流式压缩/校验的分块大小
+CHUNK_SIZE = 1024 * 1024
+# 检查与压缩阶段的心跳间隔（秒），须远小于 JOB_STALE_SECONDS
+HEARTBEAT_SECONDS = 30
+# 完整性检查/行数统计期间每执行多少条 SQLite 虚拟机指令检查一次心跳
+INSPECT_PROGRESS_OPS = 100000
+
+# 备份阶段
+BACKUP_PHASE_COPY = 'copy'
+BACKUP_PHASE_INSPECT = 'inspect'
+BACKUP_PHASE_COMPRESS = 'compress'
+
+COMPRESSION_NONE = 'none'
+COMPRESSION_GZIP = 'gzip'
+COMPRESSION_ZSTD = 'zstd'
+
+# 压缩方式 -> 备份文件后缀
+BACKUP_SUFFIXES = {
+    COMPRESSION_NONE: '.sqlite3',
+    COMPRESSION_GZIP: '.sqlite3.gz',
+    COMPRESSION_ZSTD: '.sqlite3.zst',
+}
+MANIFEST_SUFFIX = '.manifest.json'
+# 定时备份的文件名前缀（仅这些文件参与保留数量清理）
+SCHEDULED_PREFIX = 'auto'
+
+# 后台备份任务状态
+JOB_STATUS_PENDING = 'pending'
+JOB_STATUS_RUNNING = 'running'
+JOB_STATUS_SUCCEEDED = 'succeeded'
+JOB_STATUS_FAILED = 'failed'
+JOB_STATUS_DIR = '.jobs'
+# 执行中的任务超过该时长未更新进度，视为进程已退出（秒）
+JOB_STALE_SECONDS = 10 * 60
+# 任务状态文件保留时长（秒）
+JOB_RETENTION_SECONDS = 24 * 60 * 60
+
+_JOB_ID_PATTERN = re.compile(r'^[0-9a-f]{32}$')
+_INVALID_NAME_CHARS = re.compile(r'[<>:"/\\|?*]')
+
+ProgressCallback = Callable[[int, int], None]
+PhaseCallback = Callable[[str], None]
+
+
+class BackupError(Exception):
+    """备份、校验或恢复失败"""
+
+
+def get_sqlite_path(using: str = 'default') -> Optional[Path]:
+    """数据库文件的绝对路径；非 SQLite 或未配置文件名时返回 None"""
+    db_settings = settings.DATABASES.get(using, {})
+    name = db_settings.get('NAME')
+    if not db_settings.get('ENGINE', '').endswith('sqlite3') or not name:
+        return None
+    path = Path(name)
+    if not path.is_absolute():
+        path = Path(settings.BASE_DIR) / path
+    return path.resolve()
+
+
+def backup_root() -> Path:
+    root = Path(getattr(settings, 'DATABASE_BACKUP_ROOT', Path(settings.BASE_DIR) / 'backups' / 'database'))
+    root.mkdir(parents=True, exist_ok=True)
+    return root
+
+
+def available_compressions() -> List[str]:
+    methods = [COMPRESSION_NONE, COMPRESSION_GZIP]
+    if zstandard is not None:
+        methods.append(COMPRESSION_ZSTD)
+    return methods
+
+
+def default_compression() -> str:
+    method = getattr(settings, 'DATABASE_BACKUP_COMPRESSION', COMPRESSION_GZIP)
+    return method if method in available_compressions() else COMPRESSION_GZIP
+
+
+def clean_backup_name(name: str) -> str:
+    """去除文件名中的非法字符与已有的备份后缀；结果为空表示名称无效"""
+    cleaned = _INVALID_NAME_CHARS.sub('_', name or '').strip('. ')
+    return split_backup_name(cleaned)[0] if cleaned else ''
+
+
+def split_backup_name(file_name: str):
+    """拆分为 (名称, 后缀)；不是备份文件时后缀为空字符串"""
+    for suffix in sorted(BACKUP_SUFFIXES.values(), key=len, reverse=True):
+        if file_name.lower().endswith(suffix):
+            return file_name[:-len(suffix)], suffix
+    return file_name, ''
+
+
+def compression_for(path: Path) -> str:
+    suffix = split_backup_name(path.name)[1]
+    for method, method_suffix in BACKUP_SUFFIXES.items():
+        if suffix == method_suffix:
+            return method
+    raise BackupError(f'不是有效的备份文件：{path.name}')
+
+
+def manifest_path(path: Path) -> Path:
+    return path.with_name(path.name + MANIFEST_SUFFIX)
+
+
+def read_manifest(path: Path) -> Optional[Dict]:
+    try:
+        with open(manifest_path(path), encoding='utf-8') as fh:
+            return json.load(fh)
+    except (OSError, ValueError):
+        return None
+
+
+def resolve_backup(file_name: str, root: Optional[Path] = None) -> Path:
+    """备份目录内的备份文件路径；拒绝目录穿越与非备份文件"""
+    root = root or backup_root()
+    path = (root / file_name).resolve()
+    if path.parent != root.resolve() or not split_backup_name(path.name)[1]:
+        raise BackupError(f'无效的备份文件名：{file_name}')
+    return path
+
+
+class _HashingWriter:
+    """写入文件的同时计算 SHA-256（供压缩流作为底层文件对象）"""
+
+    def __init__(self, fh):
+        self._fh = fh
+        self.sha256 = hashlib.sha256()
+        self.size = 0
+
+    def write(self, data):
+        self.sha256.update(data)
+        self.size += len(data)
+        return self._fh.write(data)
+
+    def flush(self):
+        self._fh.flush()
+
+
+def _open_compressed_writer(fileobj, compression: str):
+    if compression == COMPRESSION_GZIP:
+        return gzip.GzipFile(fileobj=fileobj, mode='wb', compresslevel=6)
+    if compression == COMPRESSION_ZSTD:
+        return zstandard.ZstdCompressor(level=3).stream_writer(fileobj, closefd=False)
+    return None
+
+
+def _open_decompressed_reader(path: Path):
+    compression = compression_for(path)
+    if compression == COMPRESSION_GZIP:
+        return gzip.open(path, 'rb')
+    if compression == COMPRESSION_ZSTD:
+        if zstandard is None:
+            raise BackupError('未安装 zstandard，无法读取 zstd 压缩的备份')
+        return zstandard.ZstdDecompressor().stream_reader(open(path, 'rb'), closefd=True)
+    return open(path, 'rb')
+
+
+def _readonly_uri(path: Path) -> str:
+    """只读打开数据库的 URI（as_uri 会转义 ?、#、% 并处理 Windows 盘符）"""
+    return Path(path).resolve().as_uri() + '?mode=ro'
+
+
+def file_sha256(path: Path) -> str:
+    digest = hashlib.sha256()
+    with open(path, 'rb') as fh:
+        for chunk in iter(lambda: fh.read(CHUNK_SIZE), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def inspect_database(path: Path, heartbeat: Optional[Callable[[], None]] = None) -> Dict:
+    """在数据库文件上执行完整性检查并统计各表行数；heartbeat 在执行期间被定期调用"""
+    with closing(sqlite3.connect(_readonly_uri(path), uri=True)) as conn:
+        if heartbeat is not None:
+            # 返回 0 表示继续执行
+            conn.set_progress_handler(lambda: heartbeat() or 0, INSPECT_PROGRESS_OPS)
+        messages = [row[0] for row in conn.execute('PRAGMA integrity_check')]
+        tables = [
+            row[0] for row in conn.execute(
+                "SELECT name FROM sqlite_master WHERE type = 'table' AND name NOT LIKE 'sqlite_%' ORDER BY name"
+            )
+        ]
+        row_counts = {
+            table: conn.execute(f'SELECT COUNT(*) FROM "{table}"').fetchone()[0]
+            for table in tables
+        }
+        page_count = conn.execute('PRAGMA page_count').fetchone()[0]
+    return {
+        'integrity': 'ok' if messages == ['ok'] else '; '.join(messages),
+        'row_counts': row_counts,
+        'page_count': page_count,
+    }
+
+
+class _PhaseReporter:
+    """进入新阶段时立即回调；同一阶段内的心跳至多每 HEARTBEAT_SECONDS 秒回调一次"""
+
+    def __init__(self, callback: Optional[PhaseCallback]):
+        self._callback = callback
+        self._phase = ''
+        self._reported_at = 0.0
+
+    def enter(self, phase: str) -> None:
+        self._phase = phase
+        self._report()
+
+    def heartbeat(self) -> None:
+        if time.monotonic() - self._reported_at >= HEARTBEAT_SECONDS:
+            self._report()
+
+    def _report(self) -> None:
+        self._reported_at = time.monotonic()
+        if self._callback is not None:
+            self._callback(self._phase)
+
+
+def _write_json_atomic(path: Path, data: Dict) -> None:
+    part = path.with_name(path.name + '.part')
+    with open(part, 'w', encoding='utf-8') as fh:
+        json.dump(data, fh, ensure_ascii=False, indent=2)
+    os.replace(part, path)
+
+
+def create_backup(
+    db_path: Path,
+    name: str,
+    *,
+    root: Optional[Path] = None,
+    compression: Optional[str] = None,
+    scheduled: bool = False,
+    description: str = '',
+    progress: Optional[ProgressCallback] = None,
+    phase: Optional[PhaseCallback] = None,
+) -> Dict:
+    """
+    在线备份数据库，返回清单（manifest）
+
+    progress(已复制页数, 总页数) 在每步复制后回调；phase(阶段) 在进入复制/检查/压缩阶段时回调，
+    检查与压缩期间每隔 HEARTBEAT_SECONDS 秒以当前阶段再次回调（心跳）。
+    副本完整性检查不通过时删除产物并抛出 BackupError。
+    """
+    root = root or backup_root()
+    compression = compression or default_compression()
+    if compression not in available_compressions():
+        raise BackupError(f'不支持的压缩方式：{compression}')
+    base_name = clean_backup_name(name)
+    if not base_name:
+        raise BackupError('备份名称无效')
+    if scheduled:
+        base_name = f'{SCHEDULED_PREFIX}_{base_name}'
+
+    timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+    final_path = root / f'{base_name}_{timestamp}{BACKUP_SUFFIXES[compression]}'
+    copy_path = root / f'.{final_path.name}.copy'
+    part_path = final_path.with_name(final_path.name + '.part')
+
+    def on_step(status, remaining, total):
+        if progress is not None:
+            progress(total - remaining, total)
+
+    reporter = _PhaseReporter(phase)
+    try:
+        reporter.enter(BACKUP_PHASE_COPY)
+        with closing(sqlite3.connect(_readonly_uri(db_path), uri=True)) as source, \
+                closing(sqlite3.connect(copy_path)) as target:
+            source.backup(target, pages=BACKUP_PAGES_PER_STEP, progress=on_step)
+        reporter.enter(BACKUP_PHASE_INSPECT)
+        inspection = inspect_database(copy_path, heartbeat=reporter.heartbeat)
+        if inspection['integrity'] != 'ok':
+            raise BackupError(f'备份副本完整性检查失败：{inspection["integrity"]}')
+
+        reporter.enter(BACKUP_PHASE_COMPRESS)
+        raw_digest = hashlib.sha256()
+        with open(copy_path, 'rb') as src, open(part_path, 'wb') as out:
+            writer = _HashingWriter(out)
+            stream = _open_compressed_writer(writer, compression)
+            for chunk in iter(lambda: src.read(CHUNK_SIZE), b''):
+                raw_digest.update(chunk)
+                (stream or writer).write(chunk)
+                reporter.heartbeat()
+            if stream is not None:
+                stream.close()
+        os.replace(part_path, final_path)
+    except BaseException:
+        part_path.unlink(missing_ok=True)
+        raise
+    finally:
+        copy_path.unlink(missing_ok=True)
+
+    manifest = {
+        'file_name': final_path.name,
+        'created_at': timezone.now().isoformat(),
+        'source': str(db_path),
+        'description': description,
+        'scheduled': scheduled,
+        'compression': compression,
+        'size_bytes': writer.size,
+        'sha256': writer.sha256.hexdigest(),
+        'database_sha256': raw_digest.hexdigest(),
+        'page_count': inspection['page_count'],
+        'integrity': inspection['integrity'],
+        'row_counts': inspection['row_counts'],
+    }
+    _write_json_atomic(manifest_path(final_path), manifest)
+    logger.info('数据库备份完成: %s (%s 字节, %s 页)', final_path.name, writer.size, inspection['page_count'])
+    return manifest
+
+
+def _extract(backup_path: Path, target: Path) -> str:
+    """把备份解压/复制为数据库文件，返回数据库文件的 SHA-256"""
+    digest = hashlib.sha256()
+    with _open_decompressed_reader(backup_path) as src, open(target, 'wb') as out:
+        for chunk in iter(lambda: src.read(CHUNK_SIZE), b''):
+            digest.update(chunk)
+            out.write(chunk)
+    return digest.hexdigest()
+
+
+def _check_extracted(backup_path: Path, extracted: Path, database_sha256: str, manifest: Optional[Dict]) -> Dict:
+    """校验解压后的数据库：清单中的校验和、行数与 integrity_check；返回检查结果"""
+    errors = []
+    if manifest and manifest.get('database_sha256') and manifest['database_sha256'] != database_sha256:
+        errors.append('数据库内容校验和与清单不一致')
+    inspection = inspect_database(extracted)
+    if inspection['integrity'] != 'ok':
+        errors.append(f'完整性检查失败：{inspection["integrity"]}')
+    if manifest and manifest.get('row_counts') is not None and manifest['row_counts'] != inspection['row_counts']:
+        errors.append('各表行数与清单不一致')
+    return {'file_name': backup_path.name, 'ok': not errors, 'errors': errors, **inspection}
+
+
+def verify_backup(backup_path: Path) -> Dict:
+    """校验备份文件：文件 SHA-256、解压后的数据库完整性与行数清单"""
+    manifest = read_manifest(backup_path)
+    if manifest and manifest.get('sha256') and manifest['sha256'] != file_sha256(backup_path):
+        return {'file_name': backup_path.name, 'ok': False, 'errors': ['备份文件校验和与清单不一致']}
+
+    extracted = backup_path.with_name(f'.{backup_path.name}.verify')
+    try:
+        database_sha256 = _extract(backup_path, extracted)
+        return _check_extracted(backup_path, extracted, database_sha256, manifest)
+    except (OSError, EOFError, sqlite3.DatabaseError) as exc:
+        return {'file_name': backup_path.name, 'ok': False, 'errors': [f'无法读取备份：{exc}']}
+    finally:
+        extracted.unlink(missing_ok=True)
+
+
+def restore_backup(backup_path: Path, db_path: Path) -> Dict:
+    """
+    从备份恢复数据库
+
+    备份先解压到数据库同目录的临时文件并校验，通过后以 sqlite3 备份 API 把临时库整体写回在线数据库：
+    一次复制全部页（pages=-1），在单个写事务内完成，要么全部生效要么保持原样；
+    数据库文件本身不被替换，WAL 由 SQLite 正常维护，已打开的连接无需重连即可读到恢复后的数据。
+    校验失败时数据库保持不变并抛出 BackupError。
+    """
+    manifest = read_manifest(backup_path)
+    if manifest and manifest.get('sha256') and manifest['sha256'] != file_sha256(backup_path):
+        raise BackupError('备份文件校验和与清单不一致，已取消恢复')
+
+    staging = db_path.with_name(f'.{db_path.name}.restore')
+    busy_timeout = getattr(settings, 'SQLITE_PRAGMAS', {}).get('busy_timeout', 20000) / 1000
+    try:
+        try:
+            database_sha256 = _extract(backup_path, staging)
+            result = _check_extracted(backup_path, staging, database_sha256, manifest)
+        except (OSError, EOFError, sqlite3.DatabaseError) as exc:
+            raise BackupError(f'无法读取备份：{exc}') from exc
+        if not result['ok']:
+            raise BackupError('；'.join(result['errors']))
+
+        try:
+            with closing(sqlite3.connect(_readonly_uri(staging), uri=True)) as source, \
+                    closing(sqlite3.connect(db_path, timeout=busy_timeout)) as live:
+                source.backup(live, pages=-1)
+        except sqlite3.Error as exc:
+            raise BackupError(f'写回数据库失败：{exc}') from exc
+    finally:
+        staging.unlink(missing_ok=True)
+
+    from project.services.dimension_options import DIMENSION_GENERATION_KEY
+    from project.services.search_index import reset_search_index_availability
+    from project.services.shared.utils import bump_cache_generation, bump_generation
+
+    # 恢复绕过了模型信号，需直接递增统计与维度选项代数（不在事务内，无需等待提交）
+    reset_search_index_availability()
+    bump_cache_generation()
+    bump_generation(DIMENSION_GENERATION_KEY)
+    logger.info('数据库已从备份恢复: %s', backup_path.name)
+    return result
+
+
+def list_backups(root: Optional[Path] = None) -> List[Dict]:
+    """备份文件列表（含清单信息），按修改时间倒序"""
+    root = root or backup_root()
+    backups = []
+    for path in root.iterdir():
+        if not path.is_file() or path.name.startswith('.') or not split_backup_name(path.name)[1]:
+            continue
+        stat = path.stat()
+        manifest = read_manifest(path) or {}
+        backups.append({
+            'path': path,
+            'name': path.name,
+            'size_bytes': stat.st_size,
+            'modified_at': timezone.make_aware(datetime.fromtimestamp(stat.st_mtime)),
+            'compression': compression_for(path),
+            'scheduled': manifest.get('scheduled', path.name.startswith(f'{SCHEDULED_PREFIX}_')),
+            'description': manifest.get('description', ''),
+            'sha256': manifest.get('sha256', ''),
+            'integrity': manifest.get('integrity', ''),
+            'row_counts': manifest.get('row_counts'),
+        })
+    backups.sort(key=lambda item: item['modified_at'], reverse=True)
+    return backups
+
+
+def delete_backup(backup_path: Path) -> None:
+    backup_path.unlink()
+    manifest_path(backup_path).unlink(missing_ok=True)
+
+
+def rename_backup(backup_path: Path, new_name: str) -> Path:
+    """重命名备份（保留压缩后缀，清单随之改名）；返回新路径"""
+    base_name = clean_backup_name(new_name)
+    if not base_name:
+        raise BackupError('新文件名无效')
+    new_path = backup_path.with_name(base_name + split_backup_name(backup_path.name)[1])
+    if new_path.exists():
+        raise BackupError(f'文件名已存在：{new_path.name}')
+    backup_path.rename(new_path)
+    old_manifest = manifest_path(backup_path)
+    if old_manifest.exists():
+        manifest = read_manifest(backup_path) or {}
+        manifest['file_name'] = new_path.name
+        _write_json_atomic(manifest_path(new_path), manifest)
+        old_manifest.unlink()
+    return new_path
+
+
+def prune_backups(keep: Optional[int] = None, root: Optional[Path] = None) -> List[str]:
+    """定时备份只保留最近 keep 份（默认 DATABASE_BACKUP_KEEP），返回删除的文件名"""
+    keep = getattr(settings, 'DATABASE_BACKUP_KEEP', 7) if keep is None else keep
+    scheduled = [item for item in list_backups(root) if item['scheduled']]
+    removed = []
+    for item in scheduled[max(keep, 0):]:
+        try:
+            delete_backup(item['path'])
+            removed.append(item['name'])
+        except OSError as exc:
+            logger.error('删除过期备份失败 %s: %s', item['name'], exc)
+    return removed
+
+
+def _job_status_path(job_id: str, root: Optional[Path] = None) -> Optional[Path]:
+    if not _JOB_ID_PATTERN.match(job_id or ''):
+        return None
+    return (root or backup_root()) / JOB_STATUS_DIR / f'{job_id}.json'
+
+
+def create_job_status(name: str, root: Optional[Path] = None) -> str:
+    """登记新的后台备份任务（排队中），顺带清理过期的任务状态文件；返回任务编号"""
+    jobs_dir = (root or backup_root()) / JOB_STATUS_DIR
+    jobs_dir.mkdir(parents=True, exist_ok=True)
+    expire_before = time.time() - JOB_RETENTION_SECONDS
+    for path in jobs_dir.glob('*.json'):
+        try:
+            if path.stat().st_mtime < expire_before:
+                path.unlink()
+        except OSError:
+            pass
+
+    job_id = uuid.uuid4().hex
+    _write_json_atomic(jobs_dir / f'{job_id}.json', {
+        'job_id': job_id,
+        'status': JOB_STATUS_PENDING,
+        'name': name,
+        'phase': '',
+        'copied_pages': 0,
+        'total_pages': 0,
+        'file_name': '',
+        'error_message': '',
+        'updated_at': time.time(),
+    })
+    return job_id
+
+
+def update_job_status(job_id: str, root: Optional[Path] = None, **fields) -> None:
+    """更新任务状态（只由执行该任务的线程写入）"""
+    path = _job_status_path(job_id, root)
+    status = read_job_status(job_id, root)
+    if path is None or status is None:
+        return
+    status.update(fields, updated_at=time.time())
+    _write_json_atomic(path, status)
+
+
+def read_job_status(job_id: str, root: Optional[Path] = None) -> Optional[Dict]:
+    """读取任务状态；不存在时返回 None，执行中但长时间未更新的任务按中断处理"""
+    path = _job_status_path(job_id, root)
+    if path is None:
+        return None
+    try:
+        with open(path, encoding='utf-8') as fh:
+            status = json.load(fh)
+    except (OSError, ValueError):
+        return None
+    if status['status'] == JOB_STATUS_RUNNING and time.time() - status['updated_at'] > JOB_STALE_SECONDS:
+        status.update(status=JOB_STATUS_FAILED, error_message='备份任务已中断（执行进程已退出）')
+    return status
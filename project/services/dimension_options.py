@@ -0,0 +1,73 @@
+"""
+维度选项缓存
+
+全局筛选栏、监控中心筛选等共用的维度选项（项目、枚举）：
+- 项目选项缓存在统计缓存别名中（跨进程共享），缓存键附带维度代数；
+- 项目保存或删除时递增维度代数（见 project/signals.py），所有进程同时失效；
+- 枚举选项不依赖数据库，进程内缓存。
+"""
+from __future__ import annotations
+
+from functools import lru_cache
+from typing import Dict, List
+
+from django.db import transaction
+
+from project.services.shared.utils import bump_generation, get_generation, statistics_cache
+
+DIMENSION_GENERATION_KEY = 'cachegen:dimensions'
+DIMENSION_CACHE_TIMEOUT = 6 * 60 * 60  # 6 小时
+
+
+def _load_projects() -> List[Dict[str, str]]:
+    from project.models import Project
+
+    return list(
+        Project.objects.order_by('project_name').values('project_code', 'project_name')
+    )
+
+
+_LOADERS = {
+    'projects': _load_projects,
+}
+
+DIMENSIONS = tuple(_LOADERS)
+
+
+def get_dimension_options(dimension: str) -> list:
+    """
+    读取维度选项，未命中时查询数据库并写入缓存
+
+    - projects: [{'project_code': ..., 'project_name': ...}]，按项目名称排序
+    """
+    loader = _LOADERS[dimension]
+    cache = statistics_cache()
+    cache_key = f'dimensions:{dimension}:{get_generation(DIMENSION_GENERATION_KEY)}'
+    options = cache.get(cache_key)
+    if options is None:
+        options = loader()
+        cache.set(cache_key, options, DIMENSION_CACHE_TIMEOUT)
+    return options
+
+
+def get_project_options() -> List[Dict[str, str]]:
+    return get_dimension_options('projects')
+
+
+@lru_cache(maxsize=None)
+def _enum_options(enum_class) -> tuple:
+    return tuple({'value': choice.value, 'label': choice.label} for choice in enum_class)
+
+
+def get_enum_options(enum_class) -> List[Dict[str, str]]:
+    """枚举选项 [{'value': ..., 'label': ...}]，返回副本以免调用方修改共享数据"""
+    return [dict(option) for option in _enum_options(enum_class)]
+
+
+def invalidate_dimension_options() -> None:
+    """
+    在事务提交后递增维度代数
+
+    bulk_create / update 等不触发信号的批量操作需显式调用本函数。
+    """
+    transaction.on_commit(lambda: bump_generation(DIMENSION_GENERATION_KEY))
@@ -1,3 +1,4 @@
+from collections import defaultdict
 from io import BytesIO
 from datetime import datetime, date
 import pandas as pd
@@ -5,8 +6,9 @@ import re
 from decimal import Decimal
 from django.db import transaction
 from django.db.models import Subquery, Exists, DecimalField, OuterRef
+from openpyxl import Workbook
 
-from project.utils.excel_beautifier import beautify_worksheet
+from project.utils.excel_beautifier import write_styled_sheet
 from procurement.models import Procurement
 from contract.models import Contract
 from payment.models import Payment
@@ -106,12 +108,99 @@ def sort_contract_list(contracts):
     return sorted(contracts, key=sort_key)
 
 
+def _format_date(value):
+    return value.strftime('%Y-%m-%d') if value else ''
+
+
+def _format_amount(value):
+    return float(value) if value else ''
+
+
+# 采购表字段：(表头, 字段, 格式化方式)，参照procurement导入模板定义的字段顺序
+_PROCUREMENT_EXPORT_FIELDS = [
+    ('招采编号', 'procurement_code', None),
+    ('采购项目名称', 'project_name', None),
+    ('采购单位', 'procurement_unit', 'text'),
+    ('中标单位', 'winning_bidder', 'text'),
+    ('中标单位联系人及方式', 'winning_contact', 'text'),
+    ('采购方式', 'procurement_method', 'text'),
+    ('采购类别', 'procurement_category', 'text'),
+    ('采购预算金额(元)', 'budget_amount', 'amount'),
+    ('采购控制价（元）', 'control_price', 'amount'),
+    ('中标金额（元）', 'winning_amount', 'amount'),
+    ('计划结束采购时间', 'planned_completion_date', 'date'),
+    ('候选人公示结束时间', 'candidate_publicity_end_date', 'date'),
+    ('结果公示发布时间', 'result_publicity_release_date', 'date'),
+    ('中标通知书发放日期', 'notice_issue_date', 'date'),
+    ('采购经办人', 'procurement_officer', 'text'),
+    ('需求部门', 'demand_department', 'text'),
+    ('申请人联系电话（需求部门）', 'demand_contact', 'text'),
+    ('采购需求书审批完成日期（OA）', 'requirement_approval_date', 'date'),
+    ('采购平台', 'procurement_platform', 'text'),
+    ('资格审查方式', 'qualification_review_method', 'text'),
+    ('评标谈判方式', 'bid_evaluation_method', 'text'),
+    ('定标方法', 'bid_awarding_method', 'text'),
+    ('公告发布时间', 'announcement_release_date', 'date'),
+    ('报名截止时间', 'registration_deadline', 'date'),
+    ('开标时间', 'bid_opening_date', 'date'),
+    ('评标委员会成员', 'evaluation_committee', 'text'),
+    ('投标担保形式及金额（元）', 'bid_guarantee', 'text'),
+    ('投标担保退回日期', 'bid_guarantee_return_date', 'date'),
+    ('履约担保形式及金额（元）', 'performance_guarantee', 'text'),
+    ('候选人公示期质疑情况', 'candidate_publicity_issue', 'text'),
+    ('应招未招说明（由公开转单一或邀请的情况）', 'non_bidding_explanation', 'text'),
+    ('资料归档日期', 'archive_date', 'date'),
+]
+
+# 合同表字段，参照contract导入模板定义的字段顺序
+_CONTRACT_EXPORT_FIELDS = [
+    ('关联采购编号', 'procurement_id', 'text'),
+    ('文件定位', 'file_positioning', None),
+    ('合同来源', 'contract_source', None),
+    ('关联主合同编号', 'parent_contract_id', 'text'),
+    ('合同序号', 'contract_sequence', 'text'),
+    ('合同编号', 'contract_code', None),
+    ('合同名称', 'contract_name', None),
+    ('合同类型', 'contract_type', 'text'),
+    ('甲方', 'party_a', 'text'),
+    ('乙方', 'party_b', None),
+    ('含税签约合同价（元）', 'contract_amount', 'amount'),
+    ('合同签订日期', 'signing_date', 'date'),
+    ('甲方法定代表人及联系方式', 'party_a_legal_representative', 'text'),
+    ('甲方联系人及联系方式', 'party_a_contact_person', 'text'),
+    ('甲方负责人及联系方式', 'party_a_manager', 'text'),
+    ('乙方法定代表人及联系方式', 'party_b_legal_representative', 'text'),
+    ('乙方联系人及联系方式', 'party_b_contact_person', 'text'),
+    ('乙方负责人及联系方式', 'party_b_manager', 'text'),
+    ('合同工期/服务期限', 'duration', 'text'),
+    ('合同签订经办人', 'contract_officer', 'text'),
+    ('支付方式', 'payment_method', 'text'),
+    ('履约担保退回时间', 'performance_guarantee_return_date', 'date'),
+    ('资料归档日期', 'archive_date', 'date'),
+]
+
+_EXPORT_FORMATTERS = {
+    None: lambda value: value,
+    'text': lambda value: value or '',
+    'amount': _format_amount,
+    'date': _format_date,
+}
+
+
+def _export_row(project_code, record, fields):
+    """按字段定义把 values_list(named=True) 记录转换为一行导出数据（首列为项目编码）"""
+    return (project_code,) + tuple(
+        _EXPORT_FORMATTERS[kind](getattr(record, field)) for _, field, kind in fields
+    )
+
+
 def generate_project_excel(
     project,
     user,
     year_filter: int | None = None,
     business_start_date: date | None = None,
     business_end_date: date | None = None,
+    output=None,
 ):
     """为单个项目生成 Excel 文件,返回 BytesIO。
 
@@ -126,6 +215,11 @@ def generate_project_excel(
     - 付款表：付款日期（payment_date）
     - 结算表：结算完成日期（Settlement.completion_date）
     - 供应商管理表：履约评价记录创建时间（SupplierEvaluation.created_at）
+
+    使用 openpyxl 只写模式逐行写入并在写入时应用样式，记录通过 values_list 分批读取，
+    不再构建 DataFrame、也不再重新加载工作簿美化。
+    提供 output（文件路径或二进制文件对象，如临时文件）时直接写入该目标并返回它，
+    大项目导出应配合临时文件使用，使内存占用不随项目规模增长。
     """
     from settlement.models import Settlement
     from supplier_eval.models import SupplierEvaluation
@@ -135,332 +229,95 @@ def generate_project_excel(
         business_start_date = date(year_filter, 1, 1)
         business_end_date = date(year_filter, 12, 31)
 
-    output = BytesIO()
-    with pd.ExcelWriter(output, engine='openpyxl') as writer:
-        # ========== 1. 采购表 ==========
-        # 参照procurement导入模板定义的字段顺序
-        procurement_headers = [
-            '项目编码', '招采编号', '采购项目名称', '采购单位', '中标单位',
-            '中标单位联系人及方式', '采购方式', '采购类别', '采购预算金额(元)',
-            '采购控制价（元）', '中标金额（元）', '计划结束采购时间',
-            '候选人公示结束时间', '结果公示发布时间', '中标通知书发放日期',
-            '采购经办人', '需求部门', '申请人联系电话（需求部门）',
-            '采购需求书审批完成日期（OA）', '采购平台', '资格审查方式',
-            '评标谈判方式', '定标方法', '公告发布时间', '报名截止时间',
-            '开标时间', '评标委员会成员', '投标担保形式及金额（元）',
-            '投标担保退回日期', '履约担保形式及金额（元）', '候选人公示期质疑情况',
-            '应招未招说明（由公开转单一或邀请的情况）', '资料归档日期'
-        ]
-        procurement_rows = []
-        # 使用 iterator 分批获取记录，降低大项目导出时的内存占用
-        procurements_qs = Procurement.objects.filter(project=project)
-        # 按业务发生时间（结果公示发布时间）应用业务时间段筛选
-        if business_start_date is not None:
-            procurements_qs = procurements_qs.filter(
-                result_publicity_release_date__gte=business_start_date
-            )
-        if business_end_date is not None:
-            procurements_qs = procurements_qs.filter(
-                result_publicity_release_date__lte=business_end_date
-            )
-        sorted_procurements = sort_procurement_list(
-            procurements_qs.iterator(chunk_size=1000)
-        )
+    project_code = project.project_code
+    workbook = Workbook(write_only=True)
 
-        for procurement in sorted_procurements:
-            procurement_rows.append({
-                '项目编码': project.project_code,
-                '招采编号': procurement.procurement_code,
-                '采购项目名称': procurement.project_name,
-                '采购单位': procurement.procurement_unit or '',
-                '中标单位': procurement.winning_bidder or '',
-                '中标单位联系人及方式': procurement.winning_contact or '',
-                '采购方式': procurement.procurement_method or '',
-                '采购类别': procurement.procurement_category or '',
-                '采购预算金额(元)': float(procurement.budget_amount) if procurement.budget_amount else '',
-                '采购控制价（元）': float(procurement.control_price) if procurement.control_price else '',
-                '中标金额（元）': float(procurement.winning_amount) if procurement.winning_amount else '',
-                '计划结束采购时间': procurement.planned_completion_date.strftime('%Y-%m-%d') if procurement.planned_completion_date else '',
-                '候选人公示结束时间': procurement.candidate_publicity_end_date.strftime('%Y-%m-%d') if procurement.candidate_publicity_end_date else '',
-                '结果公示发布时间': procurement.result_publicity_release_date.strftime('%Y-%m-%d') if procurement.result_publicity_release_date else '',
-                '中标通知书发放日期': procurement.notice_issue_date.strftime('%Y-%m-%d') if procurement.notice_issue_date else '',
-                '采购经办人': procurement.procurement_officer or '',
-                '需求部门': procurement.demand_department or '',
-                '申请人联系电话（需求部门）': procurement.demand_contact or '',
-                '采购需求书审批完成日期（OA）': procurement.requirement_approval_date.strftime('%Y-%m-%d') if procurement.requirement_approval_date else '',
-                '采购平台': procurement.procurement_platform or '',
-                '资格审查方式': procurement.qualification_review_method or '',
-                '评标谈判方式': procurement.bid_evaluation_method or '',
-                '定标方法': procurement.bid_awarding_method or '',
-                '公告发布时间': procurement.announcement_release_date.strftime('%Y-%m-%d') if procurement.announcement_release_date else '',
-                '报名截止时间': procurement.registration_deadline.strftime('%Y-%m-%d') if procurement.registration_deadline else '',
-                '开标时间': procurement.bid_opening_date.strftime('%Y-%m-%d') if procurement.bid_opening_date else '',
-                '评标委员会成员': procurement.evaluation_committee or '',
-                '投标担保形式及金额（元）': procurement.bid_guarantee or '',
-                '投标担保退回日期': procurement.bid_guarantee_return_date.strftime('%Y-%m-%d') if procurement.bid_guarantee_return_date else '',
-                '履约担保形式及金额（元）': procurement.performance_guarantee or '',
-                '候选人公示期质疑情况': procurement.candidate_publicity_issue or '',
-                '应招未招说明（由公开转单一或邀请的情况）': procurement.non_bidding_explanation or '',
-                '资料归档日期': procurement.archive_date.strftime('%Y-%m-%d') if procurement.archive_date else '',
-            })
-
-        # 如果没有数据，创建空DataFrame但保留表头
-        if procurement_rows:
-            df_procurement = pd.DataFrame(procurement_rows)
-        else:
-            df_procurement = pd.DataFrame(columns=procurement_headers)
-        df_procurement.to_excel(writer, sheet_name='采购表', index=False)
-
-        # ========== 2. 合同表 ==========
-        # 参照contract导入模板定义的字段顺序
-        contract_headers = [
-            '项目编码', '关联采购编号', '文件定位', '合同来源', '关联主合同编号',
-            '合同序号', '合同编号', '合同名称', '合同类型', '甲方', '乙方',
-            '含税签约合同价（元）', '合同签订日期', '甲方法定代表人及联系方式',
-            '甲方联系人及联系方式', '甲方负责人及联系方式', '乙方法定代表人及联系方式',
-            '乙方联系人及联系方式', '乙方负责人及联系方式', '合同工期/服务期限',
-            '合同签订经办人', '支付方式', '履约担保退回时间', '资料归档日期'
-        ]
-        contract_rows = []
-        contracts_qs = Contract.objects.filter(project=project).select_related(
-            'project', 'procurement', 'parent_contract'
+    # ========== 1. 采购表 ==========
+    procurement_headers = ['项目编码'] + [header for header, _, _ in _PROCUREMENT_EXPORT_FIELDS]
+    procurements_qs = Procurement.objects.filter(project=project)
+    # 按业务发生时间（结果公示发布时间）应用业务时间段筛选
+    if business_start_date is not None:
+        procurements_qs = procurements_qs.filter(
+            result_publicity_release_date__gte=business_start_date
         )
-        # 按业务发生时间（合同签订日期）应用业务时间段筛选
-        if business_start_date is not None:
-            contracts_qs = contracts_qs.filter(signing_date__gte=business_start_date)
-        if business_end_date is not None:
-            contracts_qs = contracts_qs.filter(signing_date__lte=business_end_date)
-        sorted_contracts = sort_contract_list(
-            contracts_qs.iterator(chunk_size=1000)
+    if business_end_date is not None:
+        procurements_qs = procurements_qs.filter(
+            result_publicity_release_date__lte=business_end_date
         )
-
-        for contract in sorted_contracts:
-            contract_rows.append({
-                '项目编码': project.project_code,
-                '关联采购编号': contract.procurement.procurement_code if contract.procurement else '',
-                '文件定位': contract.file_positioning,
-                '合同来源': contract.contract_source,
-                '关联主合同编号': contract.parent_contract.contract_code if contract.parent_contract else '',
-                '合同序号': contract.contract_sequence or '',
-                '合同编号': contract.contract_code,
-                '合同名称': contract.contract_name,
-                '合同类型': contract.contract_type or '',
-                '甲方': contract.party_a or '',
-                '乙方': contract.party_b,
-                '含税签约合同价（元）': float(contract.contract_amount) if contract.contract_amount else '',
-                '合同签订日期': contract.signing_date.strftime('%Y-%m-%d') if contract.signing_date else '',
-                '甲方法定代表人及联系方式': contract.party_a_legal_representative or '',
-                '甲方联系人及联系方式': contract.party_a_contact_person or '',
-                '甲方负责人及联系方式': contract.party_a_manager or '',
-                '乙方法定代表人及联系方式': contract.party_b_legal_representative or '',
-                '乙方联系人及联系方式': contract.party_b_contact_person or '',
-                '乙方负责人及联系方式': contract.party_b_manager or '',
-                '合同工期/服务期限': contract.duration or '',
-                '合同签订经办人': contract.contract_officer or '',
-                '支付方式': contract.payment_method or '',
-                '履约担保退回时间': contract.performance_guarantee_return_date.strftime('%Y-%m-%d') if contract.performance_guarantee_return_date else '',
-                '资料归档日期': contract.archive_date.strftime('%Y-%m-%d') if contract.archive_date else '',
-            })
-
-        if contract_rows:
-            df_contract = pd.DataFrame(contract_rows)
-        else:
-            df_contract = pd.DataFrame(columns=contract_headers)
-        df_contract.to_excel(writer, sheet_name='合同表', index=False)
-
-        # ========== 3. 付款表（宽表） ==========
-        # 宽表结构：每行一个合同，列为月份/半年度 + 累计付款金额 + 累计付款比例
-        # 列顺序与历史数据宽表导入保持兼容：
-        # 第1列 = 合同序号（或合同编号），第2列 = 结算价，第3列 = 是否已结算，之后为动态期间列，最后为累计字段。
-        payments_qs = (
-            Payment.objects.filter(contract__project=project)
-            .select_related('contract')
-            .order_by('payment_date', 'created_at')
+    # 排序规则依赖编号解析（前缀、主编号、子编号），无法在 SQL 中表达，
+    # 只读取导出字段的轻量元组后在内存中排序；排序结果只由行生成器持有，工作表写完即释放
+    procurement_rows = (
+        _export_row(project_code, p, _PROCUREMENT_EXPORT_FIELDS)
+        for p in sort_procurement_list(
+            procurements_qs.values_list(
+                *(field for _, field, _ in _PROCUREMENT_EXPORT_FIELDS), named=True
+            ).iterator(chunk_size=1000)
         )
-        # 按业务发生时间（付款日期）应用业务时间段筛选
-        if business_start_date is not None:
-            payments_qs = payments_qs.filter(payment_date__gte=business_start_date)
-        if business_end_date is not None:
-            payments_qs = payments_qs.filter(payment_date__lte=business_end_date)
-
-        from collections import defaultdict
-
-        if payments_qs.exists():
-            # 收集所有期间（按月），并按合同汇总每个期间的付款金额
-            periods_set = set()
-            period_key_map = {}
-            contract_payments = defaultdict(lambda: defaultdict(Decimal))
-            total_paid_by_contract = defaultdict(Decimal)
-            contract_ids = set()
-
-            for payment in payments_qs.iterator(chunk_size=1000):
-                contract = payment.contract
-                if not contract or not payment.payment_date or payment.payment_amount is None:
-                    continue
-                contract_ids.add(contract.pk)
-
-                year = payment.payment_date.year
-                month = payment.payment_date.month
-                label = f'{year}年{month}月'  # 与宽表导入的日期识别规则兼容
-                periods_set.add(label)
-                period_key_map[label] = (year, month)
-
-                amount = Decimal(payment.payment_amount)
-                contract_payments[contract.pk][label] += amount
-                total_paid_by_contract[contract.pk] += amount
-
-            # 按时间顺序排序所有期间列
-            sorted_periods = (
-                sorted(periods_set, key=lambda lbl: period_key_map[lbl]) if periods_set else []
-            )
-
-            # 获取合同的结算价和结算状态、计算基数（优先结算价，其次合同价）
-            settlement_record_subquery = Settlement.objects.filter(
-                main_contract=OuterRef('pk')
-            ).values('final_amount')[:1]
-
-            settlement_payment_subquery = (
-                Payment.objects.filter(
-                    contract=OuterRef('pk'),
-                    is_settled=True,
-                    settlement_amount__isnull=False,
-                )
-                .order_by('-payment_date')
-                .values('settlement_amount')[:1]
-            )
-
-            contracts_qs = (
-                Contract.objects.filter(pk__in=contract_ids)
-                .annotate(
-                    settlement_final_amount=Subquery(
-                        settlement_record_subquery,
-                        output_field=DecimalField(max_digits=15, decimal_places=2),
-                    ),
-                    settlement_payment_amount=Subquery(
-                        settlement_payment_subquery,
-                        output_field=DecimalField(max_digits=15, decimal_places=2),
-                    ),
-                    has_settlement_record=Exists(
-                        Settlement.objects.filter(main_contract=OuterRef('pk'))
-                    ),
-                    has_settlement_payment=Exists(
-                        Payment.objects.filter(contract=OuterRef('pk'), is_settled=True)
-                    ),
-                )
-            )
-
-            contract_info = {}
-            for c in contracts_qs.iterator(chunk_size=1000):
-                settlement_amount = c.settlement_final_amount
-                if settlement_amount is None:
-                    settlement_amount = c.settlement_payment_amount
-
-                contract_amount = c.contract_amount or Decimal('0')
-                # 计算基数：优先使用结算价，其次合同价
-                base_amount = settlement_amount if settlement_amount not in (None, Decimal('0')) else contract_amount
-                if base_amount is None:
-                    base_amount = Decimal('0')
-
-                is_settled = bool(
-                    getattr(c, 'has_settlement_record', False)
-                    or getattr(c, 'has_settlement_payment', False)
-                )
-
-                contract_info[c.pk] = {
-                    'contract': c,
-                    'settlement_amount': settlement_amount,
-                    'contract_amount': contract_amount,
-                    'base_amount': base_amount,
-                    'is_settled': is_settled,
-                }
-
-            # 构造宽表表头：合同序号 / 合同名称 / 是否已结算 / 结算价 / 累计字段 / 动态期间列
-            payment_headers = [
-                '合同序号',
-                '合同名称',
-                '是否已结算',
-                '结算价',
-                '累计付款金额',
-                '累计付款比例',
-            ]
-            payment_headers.extend(sorted_periods)
-
-            payment_rows = []
-            for contract_pk, period_amounts in contract_payments.items():
-                info = contract_info.get(contract_pk)
-                if not info:
-                    continue
-
-                c = info['contract']
-                identifier = (c.contract_sequence or c.contract_code or '').strip()
-                settlement_amount = info['settlement_amount']
-                base_amount = info['base_amount']
-                total_paid = total_paid_by_contract.get(contract_pk, Decimal('0'))
-
-                row = {
-                    '合同序号': identifier,
-                    '结算价': float(settlement_amount) if settlement_amount not in (None, Decimal('0')) else '',
-                    '是否已结算': '是' if info['is_settled'] else '否',
-                    '合同名称': c.contract_name or '',
-                }
-
-                # 各期间金额列
-                for label in sorted_periods:
-                    amount = period_amounts.get(label, Decimal('0'))
-                    row[label] = float(amount) if amount != 0 else ''
-
-                # 累计付款金额：始终输出数值（无付款则为0）
-                row['累计付款金额'] = float(total_paid) if total_paid is not None else 0.0
-
-                # 累计付款比例：累计付款金额 / 计算基数 × 100
-                if base_amount and base_amount > 0:
-                    ratio = (total_paid / base_amount * Decimal('100')).quantize(Decimal('0.01'))
-                    row['累计付款比例'] = float(ratio)
-                else:
-                    row['累计付款比例'] = 0.0
-
-                payment_rows.append(row)
-
-            df_payment = pd.DataFrame(payment_rows, columns=payment_headers)
-        else:
-            # 无任何付款记录时，输出仅包含基础字段的空表
-            payment_headers = [
-                '合同序号', '合同名称', '是否已结算', '结算价', '累计付款金额', '累计付款比例'
-            ]
-            df_payment = pd.DataFrame(columns=payment_headers)
-
-        df_payment.to_excel(writer, sheet_name='付款表', index=False)
-
-        # ========== 4. 结算表 ==========
-        # 需求：包含全部合同（已结算和未结算），包含字段：序号、关联合同名称、关联合同序号、是否已结算、最终结算金额(元)、结算完成时间、结算资料归档时间
-        settlement_headers = [
-            '序号', '关联合同名称', '关联合同序号', '是否已结算', '最终结算金额(元)', '结算完成时间', '结算资料归档时间'
-        ]
-        settlement_rows = []
-
-        # 获取所有主合同（结算只能关联主合同）
-        main_contracts_qs = (
-            Contract.objects.filter(
-                project=project,
-                file_positioning=FilePositioning.MAIN_CONTRACT.value,
-            )
-            .select_related('project')
-            .order_by('contract_sequence', 'contract_code')
+    )
+    write_styled_sheet(workbook, '采购表', procurement_headers, procurement_rows)
+
+    # ========== 2. 合同表 ==========
+    contract_headers = ['项目编码'] + [header for header, _, _ in _CONTRACT_EXPORT_FIELDS]
+    contracts_qs = Contract.objects.filter(project=project)
+    # 按业务发生时间（合同签订日期）应用业务时间段筛选
+    if business_start_date is not None:
+        contracts_qs = contracts_qs.filter(signing_date__gte=business_start_date)
+    if business_end_date is not None:
+        contracts_qs = contracts_qs.filter(signing_date__lte=business_end_date)
+    # 关联采购、主合同的主键即为其编号，无需关联查询
+    # 排序结果只由行生成器持有，工作表写完即释放
+    contract_rows = (
+        _export_row(project_code, c, _CONTRACT_EXPORT_FIELDS)
+        for c in sort_contract_list(
+            contracts_qs.values_list(
+                *(field for _, field, _ in _CONTRACT_EXPORT_FIELDS), named=True
+            ).iterator(chunk_size=1000)
         )
-
-        # 如果指定业务时间段，则仅导出在该时间段内完成结算的主合同
-        if business_start_date is not None:
-            main_contracts_qs = main_contracts_qs.filter(
-                settlement__completion_date__gte=business_start_date
-            )
-        if business_end_date is not None:
-            main_contracts_qs = main_contracts_qs.filter(
-                settlement__completion_date__lte=business_end_date
-            )
-
-        # 为导出结算表注入结算状态和金额，保持与合同列表页的结算规则一致：
-        # - 有 Settlement 记录视为已结算
-        # - 或存在 is_settled=True 的付款记录也视为已结算
+    )
+    write_styled_sheet(workbook, '合同表', contract_headers, contract_rows)
+
+    # ========== 3. 付款表（宽表） ==========
+    # 宽表结构：每行一个合同，列为月份/半年度 + 累计付款金额 + 累计付款比例
+    # 列顺序与历史数据宽表导入保持兼容：
+    # 第1列 = 合同序号（或合同编号），第2列 = 结算价，第3列 = 是否已结算，之后为动态期间列，最后为累计字段。
+    payments_qs = (
+        Payment.objects.filter(contract__project=project)
+        .order_by('payment_date', 'created_at')
+    )
+    # 按业务发生时间（付款日期）应用业务时间段筛选
+    if business_start_date is not None:
+        payments_qs = payments_qs.filter(payment_date__gte=business_start_date)
+    if business_end_date is not None:
+        payments_qs = payments_qs.filter(payment_date__lte=business_end_date)
+
+    # 收集所有期间（按月），并按合同汇总每个期间的付款金额（内存占用与合同数×期间数相关，与付款笔数无关）
+    periods_set = set()
+    period_key_map = {}
+    contract_payments = defaultdict(lambda: defaultdict(Decimal))
+    total_paid_by_contract = defaultdict(Decimal)
+
+    for contract_pk, payment_date, payment_amount in payments_qs.values_list(
+        'contract_id', 'payment_date', 'payment_amount'
+    ).iterator(chunk_size=1000):
+        if not contract_pk or not payment_date or payment_amount is None:
+            continue
+
+        year = payment_date.year
+        month = payment_date.month
+        label = f'{year}年{month}月'  # 与宽表导入的日期识别规则兼容
+        periods_set.add(label)
+        period_key_map[label] = (year, month)
+
+        amount = Decimal(payment_amount)
+        contract_payments[contract_pk][label] += amount
+        total_paid_by_contract[contract_pk] += amount
+
+    # 按时间顺序排序所有期间列
+    sorted_periods = sorted(periods_set, key=lambda lbl: period_key_map[lbl])
+
+    # 获取合同的结算价和结算状态、计算基数（优先结算价，其次合同价）
+    contract_info = {}
+    if contract_payments:
         settlement_record_subquery = Settlement.objects.filter(
             main_contract=OuterRef('pk')
         ).values('final_amount')[:1]
@@ -474,191 +331,274 @@ def generate_project_excel(
             .order_by('-payment_date')
             .values('settlement_amount')[:1]
         )
-        
-        # 获取结算完成时间（从付款记录中）
-        settlement_completion_date_subquery = (
-            Payment.objects.filter(
-                contract=OuterRef('pk'),
-                is_settled=True,
-                settlement_completion_date__isnull=False,
+
+        contracts_qs = (
+            Contract.objects.filter(pk__in=list(contract_payments))
+            .annotate(
+                settlement_final_amount=Subquery(
+                    settlement_record_subquery,
+                    output_field=DecimalField(max_digits=15, decimal_places=2),
+                ),
+                settlement_payment_amount=Subquery(
+                    settlement_payment_subquery,
+                    output_field=DecimalField(max_digits=15, decimal_places=2),
+                ),
+                has_settlement_record=Exists(
+                    Settlement.objects.filter(main_contract=OuterRef('pk'))
+                ),
+                has_settlement_payment=Exists(
+                    Payment.objects.filter(contract=OuterRef('pk'), is_settled=True)
+                ),
             )
-            .order_by('-payment_date')
-            .values('settlement_completion_date')[:1]
-        )
-        
-        # 获取结算归档时间（从付款记录中）
-        settlement_archive_date_subquery = (
-            Payment.objects.filter(
-                contract=OuterRef('pk'),
-                is_settled=True,
-                settlement_archive_date__isnull=False,
+            .values_list(
+                'pk', 'contract_sequence', 'contract_code', 'contract_name', 'contract_amount',
+                'settlement_final_amount', 'settlement_payment_amount',
+                'has_settlement_record', 'has_settlement_payment',
+                named=True,
             )
-            .order_by('-payment_date')
-            .values('settlement_archive_date')[:1]
         )
 
-        main_contracts_qs = main_contracts_qs.annotate(
-            settlement_final_amount=Subquery(
-                settlement_record_subquery,
-                output_field=DecimalField(max_digits=15, decimal_places=2),
-            ),
-            settlement_payment_amount=Subquery(
-                settlement_payment_subquery,
-                output_field=DecimalField(max_digits=15, decimal_places=2),
-            ),
-            settlement_completion_date_value=Subquery(
-                settlement_completion_date_subquery,
-            ),
-            settlement_archive_date_value=Subquery(
-                settlement_archive_date_subquery,
-            ),
-            has_settlement_record=Exists(
-                Settlement.objects.filter(main_contract=OuterRef('pk'))
-            ),
-            has_settlement_payment=Exists(
-                Payment.objects.filter(contract=OuterRef('pk'), is_settled=True)
-            ),
-        )
+        for c in contracts_qs.iterator(chunk_size=1000):
+            settlement_amount = c.settlement_final_amount
+            if settlement_amount is None:
+                settlement_amount = c.settlement_payment_amount
+
+            contract_amount = c.contract_amount or Decimal('0')
+            # 计算基数：优先使用结算价，其次合同价
+            base_amount = settlement_amount if settlement_amount not in (None, Decimal('0')) else contract_amount
+            if base_amount is None:
+                base_amount = Decimal('0')
+
+            contract_info[c.pk] = {
+                'identifier': (c.contract_sequence or c.contract_code or '').strip(),
+                'contract_name': c.contract_name or '',
+                'settlement_amount': settlement_amount,
+                'base_amount': base_amount,
+                'is_settled': bool(c.has_settlement_record or c.has_settlement_payment),
+            }
 
-        for idx, contract in enumerate(
-            main_contracts_qs.iterator(chunk_size=1000), start=1
-        ):
-            # 先根据结算记录或付款记录判断是否已结算
-            has_settlement = bool(
-                getattr(contract, 'has_settlement_record', False)
-                or getattr(contract, 'has_settlement_payment', False)
+    # 宽表表头：合同序号 / 合同名称 / 是否已结算 / 结算价 / 累计字段 / 动态期间列
+    payment_headers = [
+        '合同序号', '合同名称', '是否已结算', '结算价', '累计付款金额', '累计付款比例'
+    ] + sorted_periods
+
+    def payment_rows():
+        for contract_pk, period_amounts in contract_payments.items():
+            info = contract_info.get(contract_pk)
+            if not info:
+                continue
+
+            settlement_amount = info['settlement_amount']
+            base_amount = info['base_amount']
+            total_paid = total_paid_by_contract.get(contract_pk, Decimal('0'))
+
+            # 累计付款比例：累计付款金额 / 计算基数 × 100
+            if base_amount and base_amount > 0:
+                ratio = float((total_paid / base_amount * Decimal('100')).quantize(Decimal('0.01')))
+            else:
+                ratio = 0.0
+
+            yield (
+                info['identifier'],
+                info['contract_name'],
+                '是' if info['is_settled'] else '否',
+                float(settlement_amount) if settlement_amount not in (None, Decimal('0')) else '',
+                # 累计付款金额：始终输出数值（无付款则为0）
+                float(total_paid) if total_paid is not None else 0.0,
+                ratio,
+            ) + tuple(
+                # 各期间金额列
+                float(period_amounts[label]) if period_amounts.get(label, 0) != 0 else ''
+                for label in sorted_periods
             )
-            is_settled = '是' if has_settlement else '否'
 
-            # 结算金额优先使用 Settlement.final_amount，其次使用付款中的 settlement_amount
-            settlement_amount = getattr(contract, 'settlement_final_amount', None)
-            if settlement_amount is None:
-                settlement_amount = getattr(contract, 'settlement_payment_amount', None)
-            final_amount = float(settlement_amount) if settlement_amount is not None else ''
+    write_styled_sheet(workbook, '付款表', payment_headers, payment_rows())
 
-            # 获取结算完成时间和归档时间
-            completion_date = getattr(contract, 'settlement_completion_date_value', None)
-            archive_date = getattr(contract, 'settlement_archive_date_value', None)
-            
-            settlement_rows.append({
-                '序号': idx,
-                '关联合同名称': contract.contract_name,
-                '关联合同序号': contract.contract_sequence or contract.contract_code,
-                '是否已结算': is_settled,
-                '最终结算金额(元)': final_amount,
-                '结算完成时间': completion_date.strftime('%Y-%m-%d') if completion_date else '',
-                '结算资料归档时间': archive_date.strftime('%Y-%m-%d') if archive_date else '',
-            })
-
-        if settlement_rows:
-            df_settlement = pd.DataFrame(settlement_rows)
-        else:
-            df_settlement = pd.DataFrame(columns=settlement_headers)
-        df_settlement.to_excel(writer, sheet_name='结算表', index=False)
-
-        # ========== 5. 供应商管理表 ==========
-        # 需求：导出模板与“供应商履约评价导入模板（动态年度版）”的命名规则一致，
-        #       年度评价列和不定期评价列根据实际数据动态扩展，同时保留供应商名称，便于直接查看。
-        # 基础字段：序号、合同序号、合同名称、供应商名称、履约综合评价得分、末次评价得分、备注
-        supplier_eval_headers = [
-            '序号',
-            '合同序号',
-            '合同名称',
-            '供应商名称',
-            '履约综合评价得分',
-            '末次评价得分',
-        ]
-
-        # 获取所有评价记录
-        evaluations_qs = (
-            SupplierEvaluation.objects.filter(contract__project=project)
-            .select_related('contract')
-            .order_by('contract__contract_sequence', 'contract__contract_code')
+    # ========== 4. 结算表 ==========
+    # 需求：包含全部合同（已结算和未结算），包含字段：序号、关联合同名称、关联合同序号、是否已结算、最终结算金额(元)、结算完成时间、结算资料归档时间
+    settlement_headers = [
+        '序号', '关联合同名称', '关联合同序号', '是否已结算', '最终结算金额(元)', '结算完成时间', '结算资料归档时间'
+    ]
+
+    # 获取所有主合同（结算只能关联主合同）
+    main_contracts_qs = (
+        Contract.objects.filter(
+            project=project,
+            file_positioning=FilePositioning.MAIN_CONTRACT.value,
         )
-        # 按业务发生时间（评价创建时间）应用业务时间段筛选
-        if business_start_date is not None:
-            evaluations_qs = evaluations_qs.filter(created_at__gte=business_start_date)
-        if business_end_date is not None:
-            evaluations_qs = evaluations_qs.filter(created_at__lte=business_end_date)
-
-        # 动态收集所有年度评价年份和不定期评价的最大次数
-        all_years = set()
-        max_irregular_count = 0
-        for evaluation in evaluations_qs.iterator(chunk_size=1000):
-            if evaluation.annual_scores:
-                all_years.update(evaluation.annual_scores.keys())
-            if evaluation.irregular_scores:
-                indices = [int(k) for k in evaluation.irregular_scores.keys() if str(k).isdigit()]
-                if indices:
-                    max_irregular_count = max(max_irregular_count, max(indices))
-
-        # 年度评价列（按年份排序），命名规则与导入模板一致："{年份}年度评价得分"
-        sorted_years = sorted(int(y) for y in all_years) if all_years else []
-        for year in sorted_years:
-            supplier_eval_headers.append(f'{year}年度评价得分')
-
-        # 不定期评价列："第{次数}次不定期评价得分"
-        for i in range(1, max_irregular_count + 1):
-            supplier_eval_headers.append(f'第{i}次不定期评价得分')
-
-        # 最后统一追加备注列
-        supplier_eval_headers.append('备注')
-
-        supplier_eval_rows = []
-        for idx, evaluation in enumerate(
-            evaluations_qs.iterator(chunk_size=1000), start=1
-        ):
-            contract = evaluation.contract
-            row = {
-                '序号': idx,
-                '合同序号': contract.contract_code if contract else '',
-                '合同名称': contract.contract_name if contract else '',
-                '供应商名称': evaluation.supplier_name,
-                '履约综合评价得分': float(evaluation.comprehensive_score) if evaluation.comprehensive_score is not None else '',
-                '末次评价得分': float(evaluation.last_evaluation_score) if evaluation.last_evaluation_score is not None else '',
-                '备注': evaluation.remarks or '',
-            }
+        .order_by('contract_sequence', 'contract_code')
+    )
 
-            # 填充年度评价得分（动态年份）
-            for year in sorted_years:
-                year_key = str(year)
-                score = evaluation.annual_scores.get(year_key) if evaluation.annual_scores else None
-                header = f'{year}年度评价得分'
-                row[header] = float(score) if score is not None else ''
-
-            # 填充不定期评价得分（动态次数）
-            for i in range(1, max_irregular_count + 1):
-                key = str(i)
-                header = f'第{i}次不定期评价得分'
-                score = evaluation.irregular_scores.get(key) if evaluation.irregular_scores else None
-                row[header] = float(score) if score is not None else ''
-
-            supplier_eval_rows.append(row)
-
-        if supplier_eval_rows:
-            df_supplier_eval = pd.DataFrame(supplier_eval_rows)
-        else:
-            df_supplier_eval = pd.DataFrame(columns=supplier_eval_headers)
-        df_supplier_eval.to_excel(writer, sheet_name='供应商管理表', index=False)
-
-    # 在 ExcelWriter 上下文内美化样式
-    output.seek(0)
-    from openpyxl import load_workbook
-    wb = load_workbook(output)
-    
-    # 确保至少有一个工作表可见
-    for sheet_name in wb.sheetnames:
-        ws = wb[sheet_name]
-        ws.sheet_state = 'visible'  # 显式设置为可见
-        beautify_worksheet(ws)
-    
-    # 保存美化后的工作簿
-    final_output = BytesIO()
-    wb.save(final_output)
-    final_output.seek(0)
-    return final_output
+    # 如果指定业务时间段，则仅导出在该时间段内完成结算的主合同
+    if business_start_date is not None:
+        main_contracts_qs = main_contracts_qs.filter(
+            settlement__completion_date__gte=business_start_date
+        )
+    if business_end_date is not None:
+        main_contracts_qs = main_contracts_qs.filter(
+            settlement__completion_date__lte=business_end_date
+        )
+
+    # 为导出结算表注入结算状态和金额，保持与合同列表页的结算规则一致：
+    # - 有 Settlement 记录视为已结算
+    # - 或存在 is_settled=True 的付款记录也视为已结算
+    settlement_record_subquery = Settlement.objects.filter(
+        main_contract=OuterRef('pk')
+    ).values('final_amount')[:1]
+
+    settlement_payment_subquery = (
+        Payment.objects.filter(
+            contract=OuterRef('pk'),
+            is_settled=True,
+            settlement_amount__isnull=False,
+        )
+        .order_by('-payment_date')
+        .values('settlement_amount')[:1]
+    )
+
+    # 获取结算完成时间（从付款记录中）
+    settlement_completion_date_subquery = (
+        Payment.objects.filter(
+            contract=OuterRef('pk'),
+            is_settled=True,
+            settlement_completion_date__isnull=False,
+        )
+        .order_by('-payment_date')
+        .values('settlement_completion_date')[:1]
+    )
+
+    # 获取结算归档时间（从付款记录中）
+    settlement_archive_date_subquery = (
+        Payment.objects.filter(
+            contract=OuterRef('pk'),
+            is_settled=True,
+            settlement_archive_date__isnull=False,
+        )
+        .order_by('-payment_date')
+        .values('settlement_archive_date')[:1]
+    )
+
+    main_contracts_qs = main_contracts_qs.annotate(
+        settlement_final_amount=Subquery(
+            settlement_record_subquery,
+            output_field=DecimalField(max_digits=15, decimal_places=2),
+        ),
+        settlement_payment_amount=Subquery(
+            settlement_payment_subquery,
+            output_field=DecimalField(max_digits=15, decimal_places=2),
+        ),
+        settlement_completion_date_value=Subquery(
+            settlement_completion_date_subquery,
+        ),
+        settlement_archive_date_value=Subquery(
+            settlement_archive_date_subquery,
+        ),
+        has_settlement_record=Exists(
+            Settlement.objects.filter(main_contract=OuterRef('pk'))
+        ),
+        has_settlement_payment=Exists(
+            Payment.objects.filter(contract=OuterRef('pk'), is_settled=True)
+        ),
+    ).values_list(
+        'contract_name', 'contract_sequence', 'contract_code',
+        'settlement_final_amount', 'settlement_payment_amount',
+        'settlement_completion_date_value', 'settlement_archive_date_value',
+        'has_settlement_record', 'has_settlement_payment',
+        named=True,
+    )
+
+    def settlement_rows():
+        for idx, contract in enumerate(main_contracts_qs.iterator(chunk_size=1000), start=1):
+            # 结算金额优先使用 Settlement.final_amount，其次使用付款中的 settlement_amount
+            settlement_amount = contract.settlement_final_amount
+            if settlement_amount is None:
+                settlement_amount = contract.settlement_payment_amount
+
+            yield (
+                idx,
+                contract.contract_name,
+                contract.contract_sequence or contract.contract_code,
+                # 根据结算记录或付款记录判断是否已结算
+                '是' if (contract.has_settlement_record or contract.has_settlement_payment) else '否',
+                float(settlement_amount) if settlement_amount is not None else '',
+                _format_date(contract.settlement_completion_date_value),
+                _format_date(contract.settlement_archive_date_value),
+            )
+
+    write_styled_sheet(workbook, '结算表', settlement_headers, settlement_rows())
+
+    # ========== 5. 供应商管理表 ==========
+    # 需求：导出模板与“供应商履约评价导入模板（动态年度版）”的命名规则一致，
+    #       年度评价列和不定期评价列根据实际数据动态扩展，同时保留供应商名称，便于直接查看。
+    # 基础字段：序号、合同序号、合同名称、供应商名称、履约综合评价得分、末次评价得分、备注
+    evaluations_qs = (
+        SupplierEvaluation.objects.filter(contract__project=project)
+        .order_by('contract__contract_sequence', 'contract__contract_code')
+    )
+    # 按业务发生时间（评价创建时间）应用业务时间段筛选
+    if business_start_date is not None:
+        evaluations_qs = evaluations_qs.filter(created_at__gte=business_start_date)
+    if business_end_date is not None:
+        evaluations_qs = evaluations_qs.filter(created_at__lte=business_end_date)
+
+    # 动态收集所有年度评价年份和不定期评价的最大次数
+    all_years = set()
+    max_irregular_count = 0
+    for annual_scores, irregular_scores in evaluations_qs.values_list(
+        'annual_scores', 'irregular_scores'
+    ).iterator(chunk_size=1000):
+        if annual_scores:
+            all_years.update(annual_scores.keys())
+        if irregular_scores:
+            indices = [int(k) for k in irregular_scores.keys() if str(k).isdigit()]
+            if indices:
+                max_irregular_count = max(max_irregular_count, max(indices))
+
+    # 年度评价列（按年份排序），命名规则与导入模板一致："{年份}年度评价得分"
+    sorted_years = sorted(int(y) for y in all_years)
+    # 列顺序：基础字段、备注、年度评价列、不定期评价列（"第{次数}次不定期评价得分"）
+    supplier_eval_headers = [
+        '序号', '合同序号', '合同名称', '供应商名称', '履约综合评价得分', '末次评价得分', '备注',
+    ]
+    supplier_eval_headers.extend(f'{year}年度评价得分' for year in sorted_years)
+    supplier_eval_headers.extend(f'第{i}次不定期评价得分' for i in range(1, max_irregular_count + 1))
+
+    evaluations_qs = evaluations_qs.values_list(
+        'contract__contract_code', 'contract__contract_name', 'supplier_name',
+        'comprehensive_score', 'last_evaluation_score', 'remarks',
+        'annual_scores', 'irregular_scores',
+        named=True,
+    )
+
+    def supplier_eval_rows():
+        for idx, evaluation in enumerate(evaluations_qs.iterator(chunk_size=1000), start=1):
+            annual_scores = evaluation.annual_scores or {}
+            irregular_scores = evaluation.irregular_scores or {}
+            yield (
+                idx,
+                evaluation.contract__contract_code or '',
+                evaluation.contract__contract_name or '',
+                evaluation.supplier_name,
+                float(evaluation.comprehensive_score) if evaluation.comprehensive_score is not None else '',
+                float(evaluation.last_evaluation_score) if evaluation.last_evaluation_score is not None else '',
+                evaluation.remarks or '',
+            ) + tuple(
+                # 年度评价得分（动态年份）
+                float(annual_scores[str(year)]) if annual_scores.get(str(year)) is not None else ''
+                for year in sorted_years
+            ) + tuple(
+                # 不定期评价得分（动态次数）
+                float(irregular_scores[str(i)]) if irregular_scores.get(str(i)) is not None else ''
+                for i in range(1, max_irregular_count + 1)
+            )
 
+    write_styled_sheet(workbook, '供应商管理表', supplier_eval_headers, supplier_eval_rows())
 
+    target = output if output is not None else BytesIO()
+    workbook.save(target)
+    if hasattr(target, 'seek'):
+        target.seek(0)
+    return target
 
 
 def import_project_excel(file_obj, project_code, user=None):
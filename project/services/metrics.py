@@ -1,12 +1,12 @@
 from __future__ import annotations
 
-from functools import lru_cache
 from typing import Dict, Iterable, Optional, Sequence, Tuple
 
-from django.core.cache import cache
+from project.services.shared.utils import statistics_cache
 
 
-DEFAULT_CACHE_TIMEOUT = 300  # 5 分钟
+# 缓存键包含数据代数（见 project/signals.py），数据变更即失效，因此可以使用较长的 TTL
+DEFAULT_CACHE_TIMEOUT = 6 * 60 * 60  # 6 小时
 
 
 def _normalize_year(year: Optional[int]) -> Optional[int]:
@@ -22,12 +22,11 @@ def _normalize_project_codes(codes: Optional[Sequence[str]]) -> Tuple[str, ...]:
 
 
 def _build_cache_key(prefix: str, year: Optional[int], project_codes: Tuple[str, ...]) -> str:
-    # 使用 shared 工具构造相同格式的键：metrics:{prefix}:{year|all}:{codes|all}
+    # 使用 shared 工具构造相同格式的键：metrics:{prefix}:{year|all}:{codes|all}:{generation}
     from project.services.shared.utils import build_cache_key
     return build_cache_key(prefix, year, project_codes, namespace='metrics')
 
 
-@lru_cache(maxsize=128)
 def _compute_combined_statistics(year: Optional[int], project_codes: Tuple[str, ...]) -> Dict[str, Dict]:
     # 统一通过 ReportDataService 聚合统计，避免直接散落调用（SRP/DRY）
     from datetime import date
@@ -57,11 +56,11 @@ def get_combined_statistics(
     cache_key = _build_cache_key('combined', normalized_year, normalized_codes)
 
     if use_cache:
-        cached = cache.get(cache_key)
+        cached = statistics_cache().get(cache_key)
         if cached is not None:
             return cached
 
     data = _compute_combined_statistics(normalized_year, normalized_codes)
     if use_cache:
-        cache.set(cache_key, data, DEFAULT_CACHE_TIMEOUT)
+        statistics_cache().set(cache_key, data, DEFAULT_CACHE_TIMEOUT)
     return data
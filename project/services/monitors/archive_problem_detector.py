@@ -3,6 +3,7 @@ from datetime import timedelta
 from django.utils import timezone
 from django.db.models import Q
 from .config import ARCHIVE_RULES, SEVERITY_CONFIG
+from project.utils.date_helpers import period_q
 
 
 class ArchiveProblemDetector:
@@ -54,7 +55,7 @@ class ArchiveProblemDetector:
 
         # 应用年度筛选
         if filters.get('year_filter'):
-            queryset = queryset.filter(result_publicity_release_date__year=filters['year_filter'])
+            queryset = queryset.filter(period_q('result_publicity_release_date', filters['year_filter']))
 
         # 应用项目筛选
         if filters.get('project'):
@@ -113,7 +114,7 @@ class ArchiveProblemDetector:
 
         # 应用年度筛选
         if filters.get('year_filter'):
-            queryset = queryset.filter(signing_date__year=filters['year_filter'])
+            queryset = queryset.filter(period_q('signing_date', filters['year_filter']))
 
         # 应用项目筛选
         if filters.get('project'):
@@ -169,7 +170,7 @@ class ArchiveProblemDetector:
 
         # 应用年度筛选
         if filters.get('year_filter'):
-            queryset = queryset.filter(completion_date__year=filters['year_filter'])
+            queryset = queryset.filter(period_q('completion_date', filters['year_filter']))
 
         # 应用项目筛选
         if filters.get('project'):
@@ -273,9 +274,9 @@ class ArchiveProblemDetector:
         # 应用年度筛选
         if filters.get('year_filter'):
             year = filters['year_filter']
-            procurement_qs = procurement_qs.filter(result_publicity_release_date__year=year)
-            contract_qs = contract_qs.filter(signing_date__year=year)
-            settlement_qs = settlement_qs.filter(completion_date__year=year)
+            procurement_qs = procurement_qs.filter(period_q('result_publicity_release_date', year))
+            contract_qs = contract_qs.filter(period_q('signing_date', year))
+            settlement_qs = settlement_qs.filter(period_q('completion_date', year))
 
         # 应用项目筛选
         if filters.get('project'):
@@ -2,6 +2,7 @@
 归档统计服务
 负责计算项目和个人的归档周期统计数据
 """
+from collections import defaultdict
 from datetime import datetime, timedelta
 from django.utils import timezone
 from django.db.models import Avg, Count, Q, F, ExpressionWrapper, fields
@@ -10,6 +11,7 @@ from procurement.models import Procurement
 from contract.models import Contract
 from project.enums import FilePositioning
 from .config import ARCHIVE_RULES
+from project.utils.date_helpers import period_q
 
 
 class ArchiveStatisticsService:
@@ -152,7 +154,7 @@ class ArchiveStatisticsService:
         if global_project:
             queryset = queryset.filter(project_id=global_project)
         if year_filter and year_filter != 'all':
-            queryset = queryset.filter(result_publicity_release_date__year=int(year_filter))
+            queryset = queryset.filter(period_q('result_publicity_release_date', year_filter))
 
         # 计算归档周期
         queryset = queryset.annotate(
@@ -200,7 +202,7 @@ class ArchiveStatisticsService:
         if global_project:
             queryset = queryset.filter(project_id=global_project)
         if year_filter and year_filter != 'all':
-            queryset = queryset.filter(signing_date__year=int(year_filter))
+            queryset = queryset.filter(period_q('signing_date', year_filter))
 
         # 计算归档周期
         queryset = queryset.annotate(
@@ -250,6 +252,45 @@ class ArchiveStatisticsService:
         Returns:
             list: [{'date': '2025-05-15', 'cycle_days': 35, 'code': 'CG-001', 'name': '...', 'person': '...'}, ...]
         """
+        queryset = self._trend_queryset(
+            model, year_filter=year_filter, global_project=global_project,
+            date_field=date_field, archive_field=archive_field
+        )
+        if project_code:
+            queryset = queryset.filter(project_id=project_code)
+        if person_name and person_field:
+            queryset = queryset.filter(**{person_field: person_name})
+
+        scatter_data = [
+            point for point in (self._scatter_point(item, model, archive_field) for item in queryset) if point
+        ]
+        # 按日期排序
+        scatter_data.sort(key=lambda x: x['date'])
+        return scatter_data
+
+    def _calculate_trend_series(self, model, series_field, series_values, year_filter=None,
+                                global_project=None, date_field='', archive_field=''):
+        """
+        一次查询取出多条序列的散点数据（多人/多项目趋势），按 series_field 分组
+
+        与逐个序列调用 _calculate_trend 的结果一致，返回 {序列值: [散点, ...]}，没有数据的序列不出现。
+        """
+        queryset = self._trend_queryset(
+            model, year_filter=year_filter, global_project=global_project,
+            date_field=date_field, archive_field=archive_field
+        ).filter(**{f'{series_field}__in': list(series_values)})
+
+        series = defaultdict(list)
+        for item in queryset:
+            point = self._scatter_point(item, model, archive_field)
+            if point:
+                series[getattr(item, series_field)].append(point)
+        for points in series.values():
+            points.sort(key=lambda x: x['date'])
+        return series
+
+    def _trend_queryset(self, model, year_filter=None, global_project=None, date_field='', archive_field=''):
+        """散点数据的公共查询：业务日期与归档日期齐全的记录（合同仅主合同），附带 archive_cycle"""
         queryset = model.objects.filter(
             **{f'{date_field}__isnull': False, f'{archive_field}__isnull': False}
         )
@@ -259,55 +300,45 @@ class ArchiveStatisticsService:
             queryset = queryset.filter(file_positioning=FilePositioning.MAIN_CONTRACT.value)
 
         # 应用筛选
-        if project_code:
-            queryset = queryset.filter(project_id=project_code)
-        if person_name and person_field:
-            queryset = queryset.filter(**{person_field: person_name})
         if global_project:
             queryset = queryset.filter(project_id=global_project)
         if year_filter and year_filter != 'all':
-            queryset = queryset.filter(**{f'{archive_field}__year': int(year_filter)})
+            queryset = queryset.filter(period_q(archive_field, year_filter))
 
-        # 计算归档周期并获取散点数据
-        queryset = queryset.annotate(
+        # 计算归档周期
+        return queryset.annotate(
             archive_cycle=ExpressionWrapper(
                 F(archive_field) - F(date_field),
                 output_field=fields.DurationField()
             )
         ).select_related('project')
 
-        # 转换为散点数据格式
-        scatter_data = []
-        for item in queryset:
-            archive_date_value = getattr(item, archive_field, None)
-            
-            if not archive_date_value:
-                continue
-                
-            cycle_days = item.archive_cycle.days if item.archive_cycle else 0
-            
-            # 获取业务编码和名称
-            if model == Procurement:
-                code = getattr(item, 'procurement_code', '')
-                name = getattr(item, 'project_name', '')
-                person = getattr(item, 'procurement_officer', '')
-            else:  # Contract
-                code = getattr(item, 'contract_code', '')
-                name = getattr(item, 'contract_name', '')
-                person = getattr(item, 'contract_officer', '')
-            
-            scatter_data.append({
-                'date': archive_date_value.isoformat(),
-                'cycle_days': cycle_days,
-                'code': code,
-                'name': name,
-                'person': person,
-                'project_code': item.project_id if hasattr(item, 'project_id') else ''
-            })
+    def _scatter_point(self, item, model, archive_field):
+        """把一条记录转换为散点；归档日期为空时返回 None"""
+        archive_date_value = getattr(item, archive_field, None)
+        if not archive_date_value:
+            return None
 
-        # 按日期排序
-        scatter_data.sort(key=lambda x: x['date'])
-        return scatter_data
+        cycle_days = item.archive_cycle.days if item.archive_cycle else 0
+
+        # 获取业务编码和名称
+        if model == Procurement:
+            code = getattr(item, 'procurement_code', '')
+            name = getattr(item, 'project_name', '')
+            person = getattr(item, 'procurement_officer', '')
+        else:  # Contract
+            code = getattr(item, 'contract_code', '')
+            name = getattr(item, 'contract_name', '')
+            person = getattr(item, 'contract_officer', '')
+
+        return {
+            'date': archive_date_value.isoformat(),
+            'cycle_days': cycle_days,
+            'code': code,
+            'name': name,
+            'person': person,
+            'project_code': item.project_id if hasattr(item, 'project_id') else ''
+        }
 
     def _group_by_month(self, queryset):
         """委托公共实现，保持对外行为不变（DRY）。"""
@@ -347,92 +378,58 @@ class ArchiveStatisticsService:
           'contract': [{'name': '张三', 'points': [{date, cycle_days, ...}]}, ...]
         }
         """
-        # 选人（按业务量排序取前N名）
+        # 选人（按业务量排序取前N名，一次分组查询）
         person_list = self.get_person_list(year_filter=year_filter, global_project=project_filter)
         person_names = [p['name'] for p in person_list[:top_n]]
 
-        # 逐人计算散点数据
-        result = {'procurement': [], 'contract': []}
-        for name in person_names:
-            t_p = self._calculate_trend(
-                model=Procurement,
-                person_name=name,
-                year_filter=year_filter,
-                global_project=project_filter,
-                date_field='result_publicity_release_date',
-                archive_field='archive_date',
-                person_field='procurement_officer'
-            )
-            t_c = self._calculate_trend(
-                model=Contract,
-                person_name=name,
-                year_filter=year_filter,
-                global_project=project_filter,
-                date_field='signing_date',
-                archive_field='archive_date',
-                person_field='contract_officer'
-            )
-            
-            # 只添加有数据的人
-            if t_p:
-                result['procurement'].append({
-                    'name': name,
-                    'points': t_p
-                })
-            if t_c:
-                result['contract'].append({
-                    'name': name,
-                    'points': t_c
-                })
-        
-        return result
+        # 采购、合同各一次查询取出全部经办人的散点数据
+        proc_series = self._calculate_trend_series(
+            Procurement, 'procurement_officer', person_names,
+            year_filter=year_filter,
+            global_project=project_filter,
+            date_field='result_publicity_release_date',
+            archive_field='archive_date'
+        )
+        cont_series = self._calculate_trend_series(
+            Contract, 'contract_officer', person_names,
+            year_filter=year_filter,
+            global_project=project_filter,
+            date_field='signing_date',
+            archive_field='archive_date'
+        )
+        # 只添加有数据的人
+        return self._build_multi_trend(person_names, proc_series, person_names, cont_series)
 
     def get_projects_multi_trend(self, year_filter=None, top_n=10):
         """
         获取多项目趋势：按项目分别计算采购/合同的散点数据（取前N个项目）
         """
         from project.models import Project
-        projects = list(Project.objects.all())
-        # 简化：依据合同+采购总量排序
-        scored = []
-        for p in projects:
-            p_total = self._get_procurement_total_count(project_code=p.project_code, year_filter=year_filter)
-            c_total = self._get_contract_total_count(project_code=p.project_code, year_filter=year_filter)
-            scored.append((p, p_total + c_total))
+        # 简化：依据合同+采购总量排序（采购、合同各一次分组计数）
+        p_totals = self._count_by(self._procurement_total_queryset(year_filter=year_filter), 'project_id')
+        c_totals = self._count_by(self._contract_total_queryset(year_filter=year_filter), 'project_id')
+        scored = [
+            (code, p_totals.get(code, 0) + c_totals.get(code, 0))
+            for code in Project.objects.values_list('project_code', flat=True)
+        ]
         scored.sort(key=lambda x: x[1], reverse=True)
-        top_projects = [p.project_code for p, _ in scored[:top_n]]
-
-        # 计算散点数据
-        result = {'procurement': [], 'contract': []}
-        for code in top_projects:
-            t_p = self._calculate_trend(
-                model=Procurement,
-                project_code=code,
-                year_filter=year_filter,
-                date_field='result_publicity_release_date',
-                archive_field='archive_date'
-            )
-            t_c = self._calculate_trend(
-                model=Contract,
-                project_code=code,
-                year_filter=year_filter,
-                date_field='signing_date',
-                archive_field='archive_date'
-            )
-            
-            # 只添加有数据的项目
-            if t_p:
-                result['procurement'].append({
-                    'name': code,
-                    'points': t_p
-                })
-            if t_c:
-                result['contract'].append({
-                    'name': code,
-                    'points': t_c
-                })
-        
-        return result
+        top_projects = [code for code, _ in scored[:top_n]]
+
+        # 计算散点数据（采购、合同各一次查询）
+        proc_series = self._calculate_trend_series(
+            Procurement, 'project_id', top_projects,
+            year_filter=year_filter,
+            date_field='result_publicity_release_date',
+            archive_field='archive_date'
+        )
+        cont_series = self._calculate_trend_series(
+            Contract, 'project_id', top_projects,
+            year_filter=year_filter,
+            date_field='signing_date',
+            archive_field='archive_date'
+        )
+        # 只添加有数据的项目
+        return self._build_multi_trend(top_projects, proc_series, top_projects, cont_series)
 
     def get_project_officers_multi_trend(self, project_code, year_filter=None, top_n=10):
         """
@@ -453,49 +450,45 @@ class ArchiveStatisticsService:
         p_names = [x for x in p_names if x]
         c_names = [x for x in c_names if x]
 
-        # 排序（依据业务量）
-        def sort_by_volume(names, is_proc):
-            scored = []
-            for n in names:
-                if is_proc:
-                    cnt = self._get_procurement_total_count(person_name=n, year_filter=year_filter, global_project=project_code)
-                else:
-                    cnt = self._get_contract_total_count(person_name=n, year_filter=year_filter, global_project=project_code)
-                scored.append((n, cnt))
+        # 排序（依据业务量，采购、合同各一次分组计数）
+        def sort_by_volume(names, counts):
+            scored = [(n, counts.get(n, 0)) for n in names]
             scored.sort(key=lambda x: x[1], reverse=True)
             return [n for n, _ in scored[:top_n]]
 
-        p_names = sort_by_volume(p_names, True)
-        c_names = sort_by_volume(c_names, False)
+        p_counts = self._count_by(
+            self._procurement_total_queryset(year_filter=year_filter, global_project=project_code),
+            'procurement_officer'
+        )
+        c_counts = self._count_by(
+            self._contract_total_queryset(year_filter=year_filter, global_project=project_code),
+            'contract_officer'
+        )
+        p_names = sort_by_volume(p_names, p_counts)
+        c_names = sort_by_volume(c_names, c_counts)
 
-        result = {'procurement': [], 'contract': []}
-        for n in p_names:
-            t = self._calculate_trend(
-                model=Procurement,
-                person_name=n,
-                year_filter=year_filter,
-                global_project=project_code,
-                date_field='result_publicity_release_date',
-                archive_field='archive_date',
-                person_field='procurement_officer'
-            )
-            if t:
-                result['procurement'].append({'name': n, 'points': t})
-        
-        for n in c_names:
-            t = self._calculate_trend(
-                model=Contract,
-                person_name=n,
-                year_filter=year_filter,
-                global_project=project_code,
-                date_field='signing_date',
-                archive_field='archive_date',
-                person_field='contract_officer'
-            )
-            if t:
-                result['contract'].append({'name': n, 'points': t})
-        
-        return result
+        proc_series = self._calculate_trend_series(
+            Procurement, 'procurement_officer', p_names,
+            year_filter=year_filter,
+            global_project=project_code,
+            date_field='result_publicity_release_date',
+            archive_field='archive_date'
+        )
+        cont_series = self._calculate_trend_series(
+            Contract, 'contract_officer', c_names,
+            year_filter=year_filter,
+            global_project=project_code,
+            date_field='signing_date',
+            archive_field='archive_date'
+        )
+        return self._build_multi_trend(p_names, proc_series, c_names, cont_series)
+
+    def _build_multi_trend(self, proc_names, proc_series, cont_names, cont_series):
+        """按选定顺序组装多序列散点数据，只保留有数据的序列"""
+        return {
+            'procurement': [{'name': n, 'points': proc_series[n]} for n in proc_names if n in proc_series],
+            'contract': [{'name': n, 'points': cont_series[n]} for n in cont_names if n in cont_series],
+        }
 
     def get_projects_archive_overview(self, year_filter=None, project_filter=None):
         """
@@ -614,7 +607,7 @@ class ArchiveStatisticsService:
         # 采购经办人
         procurement_qs = Procurement.objects.filter(procurement_officer__isnull=False)
         if year_filter and year_filter != 'all':
-            procurement_qs = procurement_qs.filter(result_publicity_release_date__year=int(year_filter))
+            procurement_qs = procurement_qs.filter(period_q('result_publicity_release_date', year_filter))
         if project_filter:
             procurement_qs = procurement_qs.filter(project_id=project_filter)
         person_names.update(procurement_qs.values_list('procurement_officer', flat=True).distinct())
@@ -625,7 +618,7 @@ class ArchiveStatisticsService:
             file_positioning=FilePositioning.MAIN_CONTRACT.value
         )
         if year_filter and year_filter != 'all':
-            contract_qs = contract_qs.filter(signing_date__year=int(year_filter))
+            contract_qs = contract_qs.filter(period_q('signing_date', year_filter))
         if project_filter:
             contract_qs = contract_qs.filter(project_id=project_filter)
         person_names.update(contract_qs.values_list('contract_officer', flat=True).distinct())
@@ -995,7 +988,7 @@ class ArchiveStatisticsService:
         if global_project:
             qs = qs.filter(project_id=global_project)
         if year_filter and year_filter != 'all':
-            qs = qs.filter(result_publicity_release_date__year=int(year_filter))
+            qs = qs.filter(period_q('result_publicity_release_date', year_filter))
 
         qs = qs.order_by('-result_publicity_release_date')[:limit]
 
@@ -1048,7 +1041,7 @@ class ArchiveStatisticsService:
         if global_project:
             qs = qs.filter(project_id=global_project)
         if year_filter and year_filter != 'all':
-            qs = qs.filter(signing_date__year=int(year_filter))
+            qs = qs.filter(period_q('signing_date', year_filter))
 
         qs = qs.order_by('-signing_date')[:limit]
 
@@ -1087,9 +1080,9 @@ class ArchiveStatisticsService:
 
         return records
 
-    def _get_procurement_total_count(self, project_code=None, person_name=None,
-                                     year_filter=None, global_project=None):
-        """获取采购总数（包括未归档的）"""
+    def _procurement_total_queryset(self, project_code=None, person_name=None,
+                                    year_filter=None, global_project=None):
+        """采购总数的统计范围（包括未归档的）"""
         queryset = Procurement.objects.filter(result_publicity_release_date__isnull=False)
         
         if project_code:
@@ -1099,13 +1092,13 @@ class ArchiveStatisticsService:
         if global_project:
             queryset = queryset.filter(project_id=global_project)
         if year_filter and year_filter != 'all':
-            queryset = queryset.filter(result_publicity_release_date__year=int(year_filter))
+            queryset = queryset.filter(period_q('result_publicity_release_date', year_filter))
         
-        return queryset.count()
+        return queryset
 
-    def _get_contract_total_count(self, project_code=None, person_name=None,
-                                  year_filter=None, global_project=None):
-        """获取合同总数（包括未归档的，仅主合同）"""
+    def _contract_total_queryset(self, project_code=None, person_name=None,
+                                 year_filter=None, global_project=None):
+        """合同总数的统计范围（包括未归档的，仅主合同）"""
         queryset = Contract.objects.filter(
             signing_date__isnull=False,
             file_positioning=FilePositioning.MAIN_CONTRACT.value
@@ -1118,9 +1111,30 @@ class ArchiveStatisticsService:
         if global_project:
             queryset = queryset.filter(project_id=global_project)
         if year_filter and year_filter != 'all':
-            queryset = queryset.filter(signing_date__year=int(year_filter))
+            queryset = queryset.filter(period_q('signing_date', year_filter))
         
-        return queryset.count()
+        return queryset
+
+    def _get_procurement_total_count(self, project_code=None, person_name=None,
+                                     year_filter=None, global_project=None):
+        """获取采购总数（包括未归档的）"""
+        return self._procurement_total_queryset(
+            project_code=project_code, person_name=person_name,
+            year_filter=year_filter, global_project=global_project
+        ).count()
+
+    def _get_contract_total_count(self, project_code=None, person_name=None,
+                                  year_filter=None, global_project=None):
+        """获取合同总数（包括未归档的，仅主合同）"""
+        return self._contract_total_queryset(
+            project_code=project_code, person_name=person_name,
+            year_filter=year_filter, global_project=global_project
+        ).count()
+
+    def _count_by(self, queryset, group_field):
+        """按字段分组计数（一次查询），返回 {字段值: 数量}"""
+        rows = queryset.order_by().values(group_field).annotate(total=Count('pk'))
+        return {row[group_field]: row['total'] for row in rows}
 
     def _get_person_project_count(self, person_name, year_filter=None, global_project=None):
         """获取经办人负责的项目数"""
@@ -1129,7 +1143,7 @@ class ArchiveStatisticsService:
         # 从采购中获取项目
         procurement_qs = Procurement.objects.filter(procurement_officer=person_name)
         if year_filter and year_filter != 'all':
-            procurement_qs = procurement_qs.filter(result_publicity_release_date__year=int(year_filter))
+            procurement_qs = procurement_qs.filter(period_q('result_publicity_release_date', year_filter))
         if global_project:
             procurement_qs = procurement_qs.filter(project_id=global_project)
         project_ids.update(procurement_qs.values_list('project_id', flat=True).distinct())
@@ -1137,7 +1151,7 @@ class ArchiveStatisticsService:
         # 从合同中获取项目
         contract_qs = Contract.objects.filter(contract_officer=person_name)
         if year_filter and year_filter != 'all':
-            contract_qs = contract_qs.filter(signing_date__year=int(year_filter))
+            contract_qs = contract_qs.filter(period_q('signing_date', year_filter))
         if global_project:
             contract_qs = contract_qs.filter(project_id=global_project)
         project_ids.update(contract_qs.values_list('project_id', flat=True).distinct())
@@ -1,5 +1,6 @@
 """齐全性检查器 - 遵循单一职责原则（SRP）"""
 from django.db.models import Q
+from project.utils.date_helpers import period_q
 
 
 class CompletenessChecker:
@@ -56,7 +57,7 @@ class CompletenessChecker:
 
         # 应用年度筛选
         if filters.get('year_filter'):
-            queryset = queryset.filter(result_publicity_release_date__year=filters['year_filter'])
+            queryset = queryset.filter(period_q('result_publicity_release_date', filters['year_filter']))
 
         # 应用项目筛选
         if filters.get('project'):
@@ -110,7 +111,7 @@ class CompletenessChecker:
 
         # 应用年度筛选
         if filters.get('year_filter'):
-            queryset = queryset.filter(signing_date__year=filters['year_filter'])
+            queryset = queryset.filter(period_q('signing_date', filters['year_filter']))
 
         # 应用项目筛选
         if filters.get('project'):
@@ -171,7 +172,7 @@ class CompletenessChecker:
 
         # 应用年度筛选
         if filters.get('year_filter'):
-            supplements_without_parent = supplements_without_parent.filter(signing_date__year=filters['year_filter'])
+            supplements_without_parent = supplements_without_parent.filter(period_q('signing_date', filters['year_filter']))
 
         # 应用项目筛选
         if filters.get('project'):
@@ -199,7 +200,7 @@ class CompletenessChecker:
 
         # 应用年度筛选
         if filters.get('year_filter'):
-            contracts_with_payments = contracts_with_payments.filter(signing_date__year=filters['year_filter'])
+            contracts_with_payments = contracts_with_payments.filter(period_q('signing_date', filters['year_filter']))
 
         # 应用项目筛选
         if filters.get('project'):
@@ -265,8 +266,8 @@ class CompletenessChecker:
         # 应用年度筛选
         if filters.get('year_filter'):
             year = filters['year_filter']
-            procurement_qs = procurement_qs.filter(result_publicity_release_date__year=year)
-            contract_qs = contract_qs.filter(signing_date__year=year)
+            procurement_qs = procurement_qs.filter(period_q('result_publicity_release_date', year))
+            contract_qs = contract_qs.filter(period_q('signing_date', year))
 
         # 应用项目筛选
         if filters.get('project'):
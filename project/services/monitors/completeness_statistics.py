@@ -3,16 +3,22 @@
 负责计算项目和个人的字段齐全性统计数据
 参照归档监控的成功设计模式
 """
+from collections import defaultdict
+
 from django.db.models import Q, Count, Avg
 from procurement.models import Procurement
 from contract.models import Contract
 from project.models import Project
 from project.enums import FilePositioning
 from project.services.completeness import (
-    get_enabled_fields,
     check_procurement_field_completeness,
     check_contract_field_completeness
 )
+from project.services.completeness_engine import CompletenessEngine
+from project.utils.date_helpers import period_q
+
+# 无记录时的分组统计
+EMPTY_STATS = {'total_count': 0, 'complete_count': 0, 'completeness_rate': 0}
 
 
 class CompletenessStatisticsService:
@@ -40,24 +46,23 @@ class CompletenessStatisticsService:
         if project_filter:
             projects_qs = projects_qs.filter(project_code=project_filter)
         
+        # 采购、合同各一次按项目分组的聚合查询
+        procurement_groups = self._procurement_engine().group_statistics(
+            self._procurement_queryset(year_filter, project_filter), 'project_id'
+        )
+        contract_groups = self._contract_engine().group_statistics(
+            self._contract_queryset(year_filter, project_filter), 'project_id'
+        )
+        
         projects_data = []
         total_procurement_count = 0
         total_procurement_complete = 0
         total_contract_count = 0
         total_contract_complete = 0
         
-        for project in projects_qs:
-            # 计算该项目的采购齐全性
-            procurement_stats = self._calculate_project_procurement_completeness(
-                project_code=project.project_code,
-                year_filter=year_filter
-            )
-            
-            # 计算该项目的合同齐全性
-            contract_stats = self._calculate_project_contract_completeness(
-                project_code=project.project_code,
-                year_filter=year_filter
-            )
+        for project_code, project_name in projects_qs.values_list('project_code', 'project_name'):
+            procurement_stats = procurement_groups.get(project_code, EMPTY_STATS)
+            contract_stats = contract_groups.get(project_code, EMPTY_STATS)
             
             # 计算综合齐全率
             total_records = procurement_stats['total_count'] + contract_stats['total_count']
@@ -73,8 +78,8 @@ class CompletenessStatisticsService:
             # 只有当项目有数据时才加入列表
             if total_records > 0:
                 projects_data.append({
-                    'project_code': project.project_code,
-                    'project_name': project.project_name,
+                    'project_code': project_code,
+                    'project_name': project_name,
                     'procurement_count': procurement_stats['total_count'],
                     'procurement_complete': procurement_stats['complete_count'],
                     'procurement_rate': round(procurement_stats['completeness_rate'], 2),
@@ -133,27 +138,16 @@ class CompletenessStatisticsService:
                 'persons': [{经办人列表}]
             }
         """
-        # 获取所有经办人名单
-        person_names = set()
-        
-        # 采购经办人
-        procurement_qs = Procurement.objects.filter(procurement_officer__isnull=False)
-        if year_filter and year_filter != 'all':
-            procurement_qs = procurement_qs.filter(result_publicity_release_date__year=int(year_filter))
-        if project_filter:
-            procurement_qs = procurement_qs.filter(project_id=project_filter)
-        person_names.update(procurement_qs.values_list('procurement_officer', flat=True).distinct())
-        
-        # 合同经办人
-        contract_qs = Contract.objects.filter(
-            contract_officer__isnull=False,
-            file_positioning=FilePositioning.MAIN_CONTRACT.value
+        # 采购、合同各一次按经办人分组的聚合查询（经办人名单即分组结果）
+        procurement_groups = self._procurement_engine().group_statistics(
+            self._procurement_queryset(year_filter, project_filter).filter(procurement_officer__isnull=False),
+            'procurement_officer'
         )
-        if year_filter and year_filter != 'all':
-            contract_qs = contract_qs.filter(signing_date__year=int(year_filter))
-        if project_filter:
-            contract_qs = contract_qs.filter(project_id=project_filter)
-        person_names.update(contract_qs.values_list('contract_officer', flat=True).distinct())
+        contract_groups = self._contract_engine().group_statistics(
+            self._contract_queryset(year_filter, project_filter).filter(contract_officer__isnull=False),
+            'contract_officer'
+        )
+        person_project_ids = self._get_person_project_ids(year_filter, project_filter)
         
         persons_data = []
         total_procurement_count = 0
@@ -161,27 +155,12 @@ class CompletenessStatisticsService:
         total_contract_count = 0
         total_contract_complete = 0
         
-        for person_name in person_names:
-            # 计算该经办人的采购齐全性
-            procurement_stats = self._calculate_person_procurement_completeness(
-                person_name=person_name,
-                year_filter=year_filter,
-                project_filter=project_filter
-            )
-            
-            # 计算该经办人的合同齐全性
-            contract_stats = self._calculate_person_contract_completeness(
-                person_name=person_name,
-                year_filter=year_filter,
-                project_filter=project_filter
-            )
+        for person_name in sorted(set(procurement_groups) | set(contract_groups)):
+            procurement_stats = procurement_groups.get(person_name, EMPTY_STATS)
+            contract_stats = contract_groups.get(person_name, EMPTY_STATS)
             
             # 计算负责的项目数
-            project_count = self._get_person_project_count(
-                person_name=person_name,
-                year_filter=year_filter,
-                project_filter=project_filter
-            )
+            project_count = len(person_project_ids.get(person_name, ()))
             
             # 计算综合齐全率
             total_records = procurement_stats['total_count'] + contract_stats['total_count']
@@ -379,341 +358,64 @@ class CompletenessStatisticsService:
             'contract_incomplete': contract_result['incomplete_records']
         }
 
-    def _calculate_project_procurement_completeness(self, project_code, year_filter=None):
-        """计算项目的采购齐全性"""
-        required_fields = get_enabled_fields('procurement')
-        
-        queryset = Procurement.objects.filter(project_id=project_code)
-        if year_filter and year_filter != 'all':
-            queryset = queryset.filter(result_publicity_release_date__year=int(year_filter))
-        
-        total_count = queryset.count()
-        if total_count == 0:
-            return {'total_count': 0, 'complete_count': 0, 'completeness_rate': 0}
-        
-        # 计算齐全率：总填写单元格数 / 总单元格数
-        total_cells = total_count * len(required_fields)
-        filled_cells = 0
-        complete_count = 0  # 所有字段都填写完整的记录数
-        
-        for record in queryset:
-            filled_in_record = 0
-            for field_name in required_fields:
-                value = getattr(record, field_name, None)
-                if value is not None and value != '':
-                    filled_cells += 1
-                    filled_in_record += 1
-            
-            # 统计完全填写的记录数
-            if filled_in_record == len(required_fields):
-                complete_count += 1
-        
-        completeness_rate = round(filled_cells / total_cells * 100, 2) if total_cells > 0 else 0
-        
-        return {
-            'total_count': total_count,
-            'complete_count': complete_count,
-            'completeness_rate': completeness_rate
-        }
+    def _procurement_engine(self):
+        return CompletenessEngine.for_model_type('procurement')
 
-    def _calculate_project_contract_completeness(self, project_code, year_filter=None):
-        """计算项目的合同齐全性"""
-        required_fields = get_enabled_fields('contract')
-        
-        queryset = Contract.objects.filter(
-            project_id=project_code,
-            file_positioning=FilePositioning.MAIN_CONTRACT.value
-        )
-        if year_filter and year_filter != 'all':
-            queryset = queryset.filter(signing_date__year=int(year_filter))
-        
-        total_count = queryset.count()
-        if total_count == 0:
-            return {'total_count': 0, 'complete_count': 0, 'completeness_rate': 0}
-        
-        # 计算齐全率：总填写单元格数 / 总单元格数
-        total_cells = total_count * len(required_fields)
-        filled_cells = 0
-        complete_count = 0  # 所有字段都填写完整的记录数
-        
-        for record in queryset:
-            filled_in_record = 0
-            for field_name in required_fields:
-                value = getattr(record, field_name, None)
-                if value is not None and value != '':
-                    filled_cells += 1
-                    filled_in_record += 1
-            
-            # 统计完全填写的记录数
-            if filled_in_record == len(required_fields):
-                complete_count += 1
-        
-        completeness_rate = round(filled_cells / total_cells * 100, 2) if total_cells > 0 else 0
-        
-        return {
-            'total_count': total_count,
-            'complete_count': complete_count,
-            'completeness_rate': completeness_rate
-        }
+    def _contract_engine(self):
+        return CompletenessEngine.for_model_type('contract')
 
-    def _calculate_person_procurement_completeness(self, person_name, year_filter=None, project_filter=None):
-        """计算经办人的采购齐全性"""
-        required_fields = get_enabled_fields('procurement')
-        
-        queryset = Procurement.objects.filter(procurement_officer=person_name)
+    def _procurement_queryset(self, year_filter=None, project_filter=None):
+        """采购统计范围（年度按结果公示发布时间）"""
+        queryset = Procurement.objects.all()
         if year_filter and year_filter != 'all':
-            queryset = queryset.filter(result_publicity_release_date__year=int(year_filter))
+            queryset = queryset.filter(period_q('result_publicity_release_date', year_filter))
         if project_filter:
             queryset = queryset.filter(project_id=project_filter)
-        
-        total_count = queryset.count()
-        if total_count == 0:
-            return {'total_count': 0, 'complete_count': 0, 'completeness_rate': 0}
-        
-        # 计算齐全率：总填写单元格数 / 总单元格数
-        total_cells = total_count * len(required_fields)
-        filled_cells = 0
-        complete_count = 0  # 所有字段都填写完整的记录数
-        
-        for record in queryset:
-            filled_in_record = 0
-            for field_name in required_fields:
-                value = getattr(record, field_name, None)
-                if value is not None and value != '':
-                    filled_cells += 1
-                    filled_in_record += 1
-            
-            # 统计完全填写的记录数
-            if filled_in_record == len(required_fields):
-                complete_count += 1
-        
-        completeness_rate = round(filled_cells / total_cells * 100, 2) if total_cells > 0 else 0
-        
-        return {
-            'total_count': total_count,
-            'complete_count': complete_count,
-            'completeness_rate': completeness_rate
-        }
+        return queryset
 
-    def _calculate_person_contract_completeness(self, person_name, year_filter=None, project_filter=None):
-        """计算经办人的合同齐全性"""
-        required_fields = get_enabled_fields('contract')
-        
-        queryset = Contract.objects.filter(
-            contract_officer=person_name,
-            file_positioning=FilePositioning.MAIN_CONTRACT.value
-        )
+    def _contract_queryset(self, year_filter=None, project_filter=None):
+        """合同统计范围（仅主合同，年度按签订日期）"""
+        queryset = Contract.objects.filter(file_positioning=FilePositioning.MAIN_CONTRACT.value)
         if year_filter and year_filter != 'all':
-            queryset = queryset.filter(signing_date__year=int(year_filter))
+            queryset = queryset.filter(period_q('signing_date', year_filter))
         if project_filter:
             queryset = queryset.filter(project_id=project_filter)
-        
-        total_count = queryset.count()
-        if total_count == 0:
-            return {'total_count': 0, 'complete_count': 0, 'completeness_rate': 0}
-        
-        # 计算齐全率：总填写单元格数 / 总单元格数
-        total_cells = total_count * len(required_fields)
-        filled_cells = 0
-        complete_count = 0  # 所有字段都填写完整的记录数
-        
-        for record in queryset:
-            filled_in_record = 0
-            for field_name in required_fields:
-                value = getattr(record, field_name, None)
-                if value is not None and value != '':
-                    filled_cells += 1
-                    filled_in_record += 1
-            
-            # 统计完全填写的记录数
-            if filled_in_record == len(required_fields):
-                complete_count += 1
-        
-        completeness_rate = round(filled_cells / total_cells * 100, 2) if total_cells > 0 else 0
-        
-        return {
-            'total_count': total_count,
-            'complete_count': complete_count,
-            'completeness_rate': completeness_rate
-        }
+        return queryset
 
     def _get_person_procurement_field_stats(self, person_name, year_filter=None, project_filter=None):
         """获取经办人的采购字段统计"""
-        required_fields = get_enabled_fields('procurement')
-        
-        queryset = Procurement.objects.filter(procurement_officer=person_name)
-        if year_filter and year_filter != 'all':
-            queryset = queryset.filter(result_publicity_release_date__year=int(year_filter))
-        if project_filter:
-            queryset = queryset.filter(project_id=project_filter)
-        
-        total_count = queryset.count()
-        if total_count == 0:
-            return {
-                'total_count': 0,
-                'completeness_rate': 0,
-                'field_count': len(required_fields),
-                'field_stats': [],
-                'incomplete_records': []
-            }
-        
-        # 统计每个字段的填写情况
-        field_stats = []
-        for field_name in required_fields:
-            filled_count = 0
-            for record in queryset:
-                value = getattr(record, field_name, None)
-                if value is not None and value != '':
-                    filled_count += 1
-            
-            fill_rate = (filled_count / total_count) * 100 if total_count > 0 else 0
-            field_stats.append({
-                'field_name': field_name,
-                'field_label': Procurement._meta.get_field(field_name).verbose_name,
-                'filled_count': filled_count,
-                'fill_rate': round(fill_rate, 2)
-            })
-        
-        # 计算不完整记录
-        incomplete_records = []
-        for record in queryset:
-            filled_fields = 0
-            missing_fields = []
-            
-            for field_name in required_fields:
-                value = getattr(record, field_name, None)
-                if value is not None and value != '':
-                    filled_fields += 1
-                else:
-                    field_label = Procurement._meta.get_field(field_name).verbose_name
-                    missing_fields.append(field_label)
-            
-            completeness = (filled_fields / len(required_fields)) * 100
-            
-            if completeness < 100:
-                incomplete_records.append({
-                    'code': record.procurement_code,
-                    'name': record.project_name,
-                    'project_code': record.project_id if record.project_id else '',
-                    'completeness': round(completeness, 2),
-                    'filled_count': filled_fields,
-                    'total_fields': len(required_fields),
-                    'missing_fields': missing_fields[:5],
-                    'missing_count': len(missing_fields)
-                })
-        
-        # 计算总体齐全率
-        total_filled = sum(stat['filled_count'] for stat in field_stats)
-        total_cells = total_count * len(required_fields)
-        overall_completeness = (total_filled / total_cells) * 100 if total_cells > 0 else 0
-        
-        return {
-            'total_count': total_count,
-            'completeness_rate': round(overall_completeness, 2),
-            'field_count': len(required_fields),
-            'field_stats': field_stats,
-            'incomplete_records': incomplete_records[:50]
-        }
+        queryset = self._procurement_queryset(year_filter, project_filter).filter(
+            procurement_officer=person_name
+        )
+        return self._procurement_engine().field_completeness(queryset, 'procurement_code', 'project_name')
 
     def _get_person_contract_field_stats(self, person_name, year_filter=None, project_filter=None):
         """获取经办人的合同字段统计"""
-        required_fields = get_enabled_fields('contract')
-        
-        queryset = Contract.objects.filter(
-            contract_officer=person_name,
-            file_positioning=FilePositioning.MAIN_CONTRACT.value
+        queryset = self._contract_queryset(year_filter, project_filter).filter(
+            contract_officer=person_name
         )
-        if year_filter and year_filter != 'all':
-            queryset = queryset.filter(signing_date__year=int(year_filter))
-        if project_filter:
-            queryset = queryset.filter(project_id=project_filter)
-        
-        total_count = queryset.count()
-        if total_count == 0:
-            return {
-                'total_count': 0,
-                'completeness_rate': 0,
-                'field_count': len(required_fields),
-                'field_stats': [],
-                'incomplete_records': []
-            }
-        
-        # 统计每个字段的填写情况
-        field_stats = []
-        for field_name in required_fields:
-            filled_count = 0
-            for record in queryset:
-                value = getattr(record, field_name, None)
-                if value is not None and value != '':
-                    filled_count += 1
-            
-            fill_rate = (filled_count / total_count) * 100 if total_count > 0 else 0
-            field_stats.append({
-                'field_name': field_name,
-                'field_label': Contract._meta.get_field(field_name).verbose_name,
-                'filled_count': filled_count,
-                'fill_rate': round(fill_rate, 2)
-            })
-        
-        # 计算不完整记录
-        incomplete_records = []
-        for record in queryset:
-            filled_fields = 0
-            missing_fields = []
-            
-            for field_name in required_fields:
-                value = getattr(record, field_name, None)
-                if value is not None and value != '':
-                    filled_fields += 1
-                else:
-                    field_label = Contract._meta.get_field(field_name).verbose_name
-                    missing_fields.append(field_label)
-            
-            completeness = (filled_fields / len(required_fields)) * 100
-            
-            if completeness < 100:
-                incomplete_records.append({
-                    'code': record.contract_code,
-                    'name': record.contract_name,
-                    'project_code': record.project_id if record.project_id else '',
-                    'completeness': round(completeness, 2),
-                    'filled_count': filled_fields,
-                    'total_fields': len(required_fields),
-                    'missing_fields': missing_fields[:5],
-                    'missing_count': len(missing_fields)
-                })
-        
-        # 计算总体齐全率
-        total_filled = sum(stat['filled_count'] for stat in field_stats)
-        total_cells = total_count * len(required_fields)
-        overall_completeness = (total_filled / total_cells) * 100 if total_cells > 0 else 0
-        
-        return {
-            'total_count': total_count,
-            'completeness_rate': round(overall_completeness, 2),
-            'field_count': len(required_fields),
-            'field_stats': field_stats,
-            'incomplete_records': incomplete_records[:50]
-        }
+        return self._contract_engine().field_completeness(queryset, 'contract_code', 'contract_name')
 
-    def _get_person_project_count(self, person_name, year_filter=None, project_filter=None):
-        """获取经办人负责的项目数"""
-        project_ids = set()
+    def _get_person_project_ids(self, year_filter=None, project_filter=None):
+        """获取各经办人负责的项目集合 {经办人: {project_id, ...}}（采购、合同各一次查询）"""
+        person_projects = defaultdict(set)
         
         # 从采购中获取项目
-        procurement_qs = Procurement.objects.filter(procurement_officer=person_name)
+        procurement_qs = Procurement.objects.all()
         if year_filter and year_filter != 'all':
-            procurement_qs = procurement_qs.filter(result_publicity_release_date__year=int(year_filter))
+            procurement_qs = procurement_qs.filter(period_q('result_publicity_release_date', year_filter))
         if project_filter:
             procurement_qs = procurement_qs.filter(project_id=project_filter)
-        project_ids.update(procurement_qs.values_list('project_id', flat=True).distinct())
+        for person_name, project_id in procurement_qs.values_list('procurement_officer', 'project_id').distinct():
+            person_projects[person_name].add(project_id)
         
-        # 从合同中获取项目
-        contract_qs = Contract.objects.filter(contract_officer=person_name)
+        # 从合同中获取项目（包含全部合同类型）
+        contract_qs = Contract.objects.all()
         if year_filter and year_filter != 'all':
-            contract_qs = contract_qs.filter(signing_date__year=int(year_filter))
+            contract_qs = contract_qs.filter(period_q('signing_date', year_filter))
         if project_filter:
             contract_qs = contract_qs.filter(project_id=project_filter)
-        project_ids.update(contract_qs.values_list('project_id', flat=True).distinct())
+        for person_name, project_id in contract_qs.values_list('contract_officer', 'project_id').distinct():
+            person_projects[person_name].add(project_id)
         
-        return len(project_ids)
\ No newline at end of file
+        return person_projects
@@ -1,8 +1,10 @@
 """工作周期问题检测器 - 遵循单一职责原则（SRP）"""
 from datetime import timedelta
 from django.utils import timezone
-from django.db.models import Q
-from .config import CYCLE_RULES, SEVERITY_CONFIG
+from django.db.models import Count, Q
+from .config import SEVERITY_CONFIG
+from .cycle_rules import CONTRACT_CYCLE_RULE, PROCUREMENT_CYCLE_RULE
+from project.utils.date_helpers import period_q
 
 
 class CycleProblemDetector:
@@ -10,8 +12,8 @@ class CycleProblemDetector:
 
     def __init__(self):
         self.today = timezone.now().date()
-        self.procurement_rule = CYCLE_RULES['procurement']
-        self.contract_rule = CYCLE_RULES['contract']
+        self.procurement_rule = PROCUREMENT_CYCLE_RULE
+        self.contract_rule = CONTRACT_CYCLE_RULE
 
     def detect_problems(self, filters=None, return_url=None, show_all=False):
         """
@@ -56,7 +58,7 @@ class CycleProblemDetector:
 
         # 应用年度筛选
         if filters.get('year_filter'):
-            queryset = queryset.filter(requirement_approval_date__year=filters['year_filter'])
+            queryset = queryset.filter(period_q('requirement_approval_date', filters['year_filter']))
 
         # 应用项目筛选
         if filters.get('project'):
@@ -66,6 +68,9 @@ class CycleProblemDetector:
         if filters.get('procurement_method'):
             queryset = queryset.filter(procurement_method=filters['procurement_method'])
 
+        # 规定周期由按采购方式的 CASE 表达式在查询中给出
+        queryset = queryset.annotate(deadline_days=rule.deadline_days_expression())
+
         problems = []
         for item in queryset:
             start_date = item.requirement_approval_date
@@ -74,12 +79,8 @@ class CycleProblemDetector:
             if not start_date:
                 continue
 
-            # 获取该采购方式的规定周期
-            deadline_days = rule['deadline_map'].get(
-                item.procurement_method,
-                rule['default_deadline']
-            )
-            
+            deadline_days = item.deadline_days
+
             # 计算实际周期和超期天数
             if end_date:
                 # 已完成
@@ -98,7 +99,7 @@ class CycleProblemDetector:
             problems.append({
                 'project_name': item.project.project_name if item.project else '',
                 'module': 'procurement',
-                'module_label': rule['label'],
+                'module_label': rule.label,
                 'code': item.procurement_code,
                 'name': item.project_name,
                 'procurement_method': item.procurement_method or '',
@@ -108,7 +109,7 @@ class CycleProblemDetector:
                 'deadline_days': deadline_days,
                 'cycle_days': cycle_days,
                 'overdue_days': overdue_days,
-                'severity': self._calculate_severity(overdue_days, rule['severity_thresholds']),
+                'severity': self._calculate_severity(overdue_days, rule.severity_thresholds),
                 'edit_url': edit_url,
                 'is_completed': end_date is not None
             })
@@ -137,7 +138,7 @@ class CycleProblemDetector:
 
         # 应用年度筛选
         if filters.get('year_filter'):
-            queryset = queryset.filter(procurement__result_publicity_release_date__year=filters['year_filter'])
+            queryset = queryset.filter(period_q('procurement__result_publicity_release_date', filters['year_filter']))
 
         # 应用项目筛选
         if filters.get('project'):
@@ -153,8 +154,8 @@ class CycleProblemDetector:
             if not start_date:
                 continue
 
-            deadline_days = rule['deadline_days']
-            
+            deadline_days = rule.default_deadline
+
             # 计算实际周期和超期天数
             if end_date:
                 # 已完成
@@ -173,7 +174,7 @@ class CycleProblemDetector:
             problems.append({
                 'project_name': item.project.project_name if item.project else '',
                 'module': 'contract',
-                'module_label': rule['label'],
+                'module_label': rule.label,
                 'code': item.contract_code,
                 'name': item.contract_name,
                 'responsible_person': item.contract_officer or '',
@@ -182,7 +183,7 @@ class CycleProblemDetector:
                 'deadline_days': deadline_days,
                 'cycle_days': cycle_days,
                 'overdue_days': overdue_days,
-                'severity': self._calculate_severity(overdue_days, rule['severity_thresholds']),
+                'severity': self._calculate_severity(overdue_days, rule.severity_thresholds),
                 'edit_url': edit_url,
                 'is_completed': end_date is not None
             })
@@ -255,8 +256,8 @@ class CycleProblemDetector:
         # 应用年度筛选
         if filters.get('year_filter'):
             year = filters['year_filter']
-            procurement_qs = procurement_qs.filter(requirement_approval_date__year=year)
-            contract_qs = contract_qs.filter(procurement__result_publicity_release_date__year=year)
+            procurement_qs = procurement_qs.filter(period_q('requirement_approval_date', year))
+            contract_qs = contract_qs.filter(period_q('procurement__result_publicity_release_date', year))
 
         # 应用项目筛选
         if filters.get('project'):
@@ -269,17 +270,17 @@ class CycleProblemDetector:
             procurement_method = filters['procurement_method']
             procurement_qs = procurement_qs.filter(procurement_method=procurement_method)
 
-        # 计算总记录数
-        total_records = (
-            procurement_qs.count() +
-            contract_qs.count()
+        # 总记录数与已完成记录数（采购、合同各一次聚合）
+        procurement_counts = procurement_qs.aggregate(
+            total=Count('pk'),
+            completed=Count('pk', filter=Q(result_publicity_release_date__isnull=False))
         )
-
-        # 计算已完成记录数
-        completed_records = (
-            procurement_qs.exclude(result_publicity_release_date__isnull=True).count() +
-            contract_qs.exclude(signing_date__isnull=True).count()
+        contract_counts = contract_qs.aggregate(
+            total=Count('pk'),
+            completed=Count('pk', filter=Q(signing_date__isnull=False))
         )
+        total_records = procurement_counts['total'] + contract_counts['total']
+        completed_records = procurement_counts['completed'] + contract_counts['completed']
 
         # 计算完成率
         completion_rate = (completed_records / total_records * 100) if total_records > 0 else 0
@@ -0,0 +1,91 @@
+"""
+工作周期规则的 SQL 表达式
+
+将 CYCLE_RULES 中的起止字段与规定周期（采购按采购方式查表）编译为数据库表达式，
+周期统计（CycleStatisticsService）、周期问题检测（CycleProblemDetector）与采购周期排名共用，
+按时判断、平均周期等在数据库内完成，不再逐条在 Python 中查表比较。
+"""
+from datetime import timedelta
+
+from django.db.models import Avg, Case, Count, DurationField, ExpressionWrapper, F, IntegerField, Q, Value, When
+
+from .config import CYCLE_RULES
+
+
+class CycleRule:
+    """单个业务模块（采购/合同）的周期规则"""
+
+    def __init__(self, module):
+        self.module = module
+        self.rule = CYCLE_RULES[module]
+        self.start_field = self.rule['start_field']
+        self.end_field = self.rule['end_field']
+        self.person_field = self.rule['person_field']
+        self.label = self.rule['label']
+        self.severity_thresholds = self.rule['severity_thresholds']
+        # 合同为统一规定周期；采购按采购方式查表，未列出的方式使用默认周期
+        self.deadline_map = self.rule.get('deadline_map', {})
+        self.default_deadline = self.rule.get('default_deadline', self.rule.get('deadline_days'))
+
+    def deadline_for(self, procurement_method=None):
+        """规定周期（天）"""
+        return self.deadline_map.get(procurement_method, self.default_deadline)
+
+    def cycle_expression(self):
+        """实际周期：结束日期 - 开始日期（DurationField）"""
+        return ExpressionWrapper(F(self.end_field) - F(self.start_field), output_field=DurationField())
+
+    def deadline_days_expression(self):
+        """规定周期（天）：采购为按采购方式的 CASE 表达式"""
+        if not self.deadline_map:
+            return Value(self.default_deadline, output_field=IntegerField())
+        return Case(
+            *[When(procurement_method=method, then=Value(days)) for method, days in self.deadline_map.items()],
+            default=Value(self.default_deadline),
+            output_field=IntegerField(),
+        )
+
+    def deadline_duration_expression(self):
+        """规定周期（DurationField），用于与实际周期直接比较"""
+        if not self.deadline_map:
+            return Value(timedelta(days=self.default_deadline), output_field=DurationField())
+        return Case(
+            *[
+                When(procurement_method=method, then=Value(timedelta(days=days)))
+                for method, days in self.deadline_map.items()
+            ],
+            default=Value(timedelta(days=self.default_deadline)),
+            output_field=DurationField(),
+        )
+
+    def annotate(self, queryset):
+        """附加 work_cycle（实际周期）与 deadline_duration（规定周期）"""
+        return queryset.annotate(
+            work_cycle=self.cycle_expression(),
+            deadline_duration=self.deadline_duration_expression(),
+        )
+
+    def completed_q(self):
+        return Q(**{f'{self.start_field}__isnull': False, f'{self.end_field}__isnull': False})
+
+    def on_time_q(self):
+        """已完成且实际周期不超过规定周期（需先调用 annotate）"""
+        return self.completed_q() & Q(work_cycle__lte=F('deadline_duration'))
+
+    def aggregates(self, completed=None, prefix=''):
+        """
+        统计用聚合：完成数、平均周期、按时完成数
+
+        completed 为已完成记录的附加条件（例如按结束日期归属年度），需配合 annotate 使用。
+        """
+        completed = self.completed_q() & (completed or Q())
+        on_time = completed & Q(work_cycle__lte=F('deadline_duration'))
+        return {
+            f'{prefix}completed_count': Count('pk', filter=completed),
+            f'{prefix}avg_cycle': Avg('work_cycle', filter=completed),
+            f'{prefix}on_time_count': Count('pk', filter=on_time),
+        }
+
+
+PROCUREMENT_CYCLE_RULE = CycleRule('procurement')
+CONTRACT_CYCLE_RULE = CycleRule('contract')
@@ -2,32 +2,39 @@
 工作周期统计服务
 负责计算项目和个人的工作周期统计数据（采购周期、合同周期）
 """
-from datetime import datetime, timedelta
+from collections import defaultdict
+from datetime import datetime
 from django.utils import timezone
-from django.db.models import Avg, Count, Q, F, ExpressionWrapper, fields
+from django.db.models import Count, Q, F, ExpressionWrapper, fields
 from django.db.models.functions import ExtractYear, ExtractMonth
 from procurement.models import Procurement
 from contract.models import Contract
 from project.enums import FilePositioning
-from .config import CYCLE_RULES
+from .cycle_rules import CONTRACT_CYCLE_RULE, PROCUREMENT_CYCLE_RULE
+from project.utils.date_helpers import period_q
+
+# 分组统计中无记录的项目/经办人
+EMPTY_CYCLE_STATS = {'avg_cycle': 0, 'on_time_rate': 0, 'count': 0, 'excluded_count': 0, 'total': 0}
 
 
 class CycleStatisticsService:
     """工作周期统计服务类（遵循SRP原则）"""
 
     def __init__(self):
-        self.procurement_rule = CYCLE_RULES['procurement']
-        self.contract_rule = CYCLE_RULES['contract']
+        self.procurement_rule = PROCUREMENT_CYCLE_RULE
+        self.contract_rule = CONTRACT_CYCLE_RULE
 
     def get_projects_cycle_overview(self, year_filter=None, project_filter=None, procurement_method=None):
         """
         获取项目维度的工作周期概览
-        
+
+        采购、合同各一次按项目分组的查询，不再逐项目查询。
+
         Args:
             year_filter: str - 年度筛选（'all' 或具体年份）
             project_filter: str or None - 项目编码筛选
             procurement_method: str or None - 采购方式筛选
-        
+
         Returns:
             dict: {
                 'summary': {汇总统计},
@@ -35,49 +42,42 @@ class CycleStatisticsService:
             }
         """
         from project.models import Project
-        
+
         # 获取项目列表
         projects_qs = Project.objects.all()
         if project_filter:
             projects_qs = projects_qs.filter(project_code=project_filter)
-        
+
+        procurement_groups = self._procurement_cycle_groups(
+            'project_id',
+            year_filter=year_filter,
+            global_project=project_filter,
+            procurement_method=procurement_method
+        )
+        contract_groups = self._contract_cycle_groups(
+            'project_id',
+            year_filter=year_filter,
+            global_project=project_filter
+        )
+
         projects_data = []
         total_procurement_count = 0
         total_procurement_completed = 0
         total_contract_count = 0
         total_contract_completed = 0
         excluded_procurement_count = 0  # 缺少结果公示时间的采购数量
-        
+
         for project in projects_qs:
-            # 计算该项目的采购周期统计
-            procurement_stats = self._calculate_procurement_cycle_statistics(
-                project_code=project.project_code,
-                year_filter=year_filter,
-                procurement_method=procurement_method
-            )
-            
-            # 计算该项目的合同周期统计
-            contract_stats = self._calculate_contract_cycle_statistics(
-                project_code=project.project_code,
-                year_filter=year_filter
-            )
-            
-            # 获取采购和合同的总数（包括未完成的）
-            procurement_total = self._get_procurement_total_count(
-                project_code=project.project_code,
-                year_filter=year_filter,
-                procurement_method=procurement_method
-            )
-            contract_total = self._get_contract_total_count(
-                project_code=project.project_code,
-                year_filter=year_filter
-            )
-            
+            procurement_stats = procurement_groups.get(project.project_code, EMPTY_CYCLE_STATS)
+            contract_stats = contract_groups.get(project.project_code, EMPTY_CYCLE_STATS)
+            procurement_total = procurement_stats['total']
+            contract_total = contract_stats['total']
+
             # 计算综合完成率
             total_items = procurement_total + contract_total
             completed_items = procurement_stats['count'] + contract_stats['count']
             overall_completion_rate = round(completed_items / total_items * 100, 1) if total_items > 0 else 0
-            
+
             projects_data.append({
                 'project_code': project.project_code,
                 'project_name': project.project_name,
@@ -90,24 +90,24 @@ class CycleStatisticsService:
                 'contract_avg_cycle': contract_stats['avg_cycle'],
                 'contract_on_time_rate': contract_stats['on_time_rate'],
                 'overall_completion_rate': overall_completion_rate,
-                'excluded_count': procurement_stats.get('excluded_count', 0)
+                'excluded_count': procurement_stats['excluded_count']
             })
-            
+
             # 累加到汇总数据
             total_procurement_count += procurement_total
             total_procurement_completed += procurement_stats['count']
             total_contract_count += contract_total
             total_contract_completed += contract_stats['count']
-            excluded_procurement_count += procurement_stats.get('excluded_count', 0)
-        
+            excluded_procurement_count += procurement_stats['excluded_count']
+
         # 按综合完成率降序排序
         projects_data.sort(key=lambda x: x['overall_completion_rate'], reverse=True)
-        
+
         # 计算汇总统计
         total_all = total_procurement_count + total_contract_count
         completed_all = total_procurement_completed + total_contract_completed
         overall_rate = round(completed_all / total_all * 100, 1) if total_all > 0 else 0
-        
+
         summary = {
             'project_count': len(projects_data),
             'procurement_total': total_procurement_count,
@@ -117,7 +117,7 @@ class CycleStatisticsService:
             'overall_completion_rate': overall_rate,
             'excluded_procurement_count': excluded_procurement_count
         }
-        
+
         return {
             'summary': summary,
             'projects': projects_data
@@ -126,12 +126,14 @@ class CycleStatisticsService:
     def get_persons_cycle_overview(self, year_filter=None, project_filter=None, procurement_method=None):
         """
         获取个人维度的工作周期概览
-        
+
+        采购、合同统计与负责项目数均按经办人分组查询，不再逐人查询。
+
         Args:
             year_filter: str - 年度筛选
             project_filter: str or None - 项目筛选（影响经办人范围）
             procurement_method: str or None - 采购方式筛选
-        
+
         Returns:
             dict: {
                 'summary': {汇总统计},
@@ -140,82 +142,69 @@ class CycleStatisticsService:
         """
         # 获取所有经办人名单
         person_names = set()
-        
+
         # 采购经办人 - 排除NULL和空字符串
         procurement_qs = Procurement.objects.filter(
             procurement_officer__isnull=False
         ).exclude(procurement_officer='')
         if year_filter and year_filter != 'all':
             # 与采购列表保持一致：按结果公示发布时间过滤年度
-            procurement_qs = procurement_qs.filter(result_publicity_release_date__year=int(year_filter))
+            procurement_qs = procurement_qs.filter(period_q('result_publicity_release_date', year_filter))
         if project_filter:
             procurement_qs = procurement_qs.filter(project_id=project_filter)
         if procurement_method and procurement_method != 'all':
             procurement_qs = procurement_qs.filter(procurement_method=procurement_method)
         person_names.update(procurement_qs.values_list('procurement_officer', flat=True).distinct())
-        
+
         # 合同经办人 - 排除NULL和空字符串
         contract_qs = Contract.objects.filter(
             contract_officer__isnull=False,
             file_positioning=FilePositioning.MAIN_CONTRACT.value
         ).exclude(contract_officer='')
         if year_filter and year_filter != 'all':
-            contract_qs = contract_qs.filter(signing_date__year=int(year_filter))
+            contract_qs = contract_qs.filter(period_q('signing_date', year_filter))
         if project_filter:
             contract_qs = contract_qs.filter(project_id=project_filter)
         person_names.update(contract_qs.values_list('contract_officer', flat=True).distinct())
-        
+
         # 额外保障：过滤掉可能的空白字符串
         person_names = {name.strip() for name in person_names if name and name.strip()}
-        
+
+        # 分组结果以经办人字段原值为键，按去除空白后的姓名精确匹配
+        procurement_groups = self._procurement_cycle_groups(
+            'procurement_officer',
+            year_filter=year_filter,
+            global_project=project_filter,
+            procurement_method=procurement_method
+        )
+        contract_groups = self._contract_cycle_groups(
+            'contract_officer',
+            year_filter=year_filter,
+            global_project=project_filter
+        )
+        project_counts = self._get_person_project_counts(
+            year_filter=year_filter,
+            global_project=project_filter
+        )
+
         persons_data = []
         total_procurement_count = 0
         total_procurement_completed = 0
         total_contract_count = 0
         total_contract_completed = 0
         excluded_procurement_count = 0
-        
+
         for person_name in person_names:
-            # 计算该经办人的采购周期统计
-            procurement_stats = self._calculate_procurement_cycle_statistics(
-                person_name=person_name,
-                year_filter=year_filter,
-                global_project=project_filter,
-                procurement_method=procurement_method
-            )
-            
-            # 计算该经办人的合同周期统计
-            contract_stats = self._calculate_contract_cycle_statistics(
-                person_name=person_name,
-                year_filter=year_filter,
-                global_project=project_filter
-            )
-            
-            # 获取总数（包括未完成的）
-            procurement_total = self._get_procurement_total_count(
-                person_name=person_name,
-                year_filter=year_filter,
-                global_project=project_filter,
-                procurement_method=procurement_method
-            )
-            contract_total = self._get_contract_total_count(
-                person_name=person_name,
-                year_filter=year_filter,
-                global_project=project_filter
-            )
-            
-            # 计算负责的项目数
-            project_count = self._get_person_project_count(
-                person_name=person_name,
-                year_filter=year_filter,
-                global_project=project_filter
-            )
-            
+            procurement_stats = procurement_groups.get(person_name, EMPTY_CYCLE_STATS)
+            contract_stats = contract_groups.get(person_name, EMPTY_CYCLE_STATS)
+            procurement_total = procurement_stats['total']
+            contract_total = contract_stats['total']
+
             # 计算综合完成率
             total_items = procurement_total + contract_total
             completed_items = procurement_stats['count'] + contract_stats['count']
             overall_completion_rate = round(completed_items / total_items * 100, 1) if total_items > 0 else 0
-            
+
             persons_data.append({
                 'handler_name': person_name,
                 'procurement_count': procurement_total,
@@ -227,25 +216,25 @@ class CycleStatisticsService:
                 'contract_avg_cycle': contract_stats['avg_cycle'],
                 'contract_on_time_rate': contract_stats['on_time_rate'],
                 'overall_completion_rate': overall_completion_rate,
-                'project_count': project_count,
-                'excluded_count': procurement_stats.get('excluded_count', 0)
+                'project_count': project_counts.get(person_name, 0),
+                'excluded_count': procurement_stats['excluded_count']
             })
-            
+
             # 累加到汇总数据
             total_procurement_count += procurement_total
             total_procurement_completed += procurement_stats['count']
             total_contract_count += contract_total
             total_contract_completed += contract_stats['count']
-            excluded_procurement_count += procurement_stats.get('excluded_count', 0)
-        
+            excluded_procurement_count += procurement_stats['excluded_count']
+
         # 按综合完成率降序排序
         persons_data.sort(key=lambda x: x['overall_completion_rate'], reverse=True)
-        
+
         # 计算汇总统计
         total_all = total_procurement_count + total_contract_count
         completed_all = total_procurement_completed + total_contract_completed
         overall_rate = round(completed_all / total_all * 100, 1) if total_all > 0 else 0
-        
+
         summary = {
             'person_count': len(persons_data),
             'procurement_total': total_procurement_count,
@@ -281,12 +270,11 @@ class CycleStatisticsService:
 
         # 年度筛选：已完成按结果公示时间，未完成按需求书审批日期
         if year_filter and year_filter != 'all':
-            year_int = int(year_filter)
             queryset = queryset.filter(
-                Q(result_publicity_release_date__year=year_int)
-                | Q(
-                    result_publicity_release_date__isnull=True,
-                    requirement_approval_date__year=year_int,
+                period_q('result_publicity_release_date', year_filter)
+                | (
+                    Q(result_publicity_release_date__isnull=True)
+                    & period_q('requirement_approval_date', year_filter)
                 )
             )
 
@@ -367,12 +355,11 @@ class CycleStatisticsService:
 
         # 年度筛选：已完成按 signing_date，未完成按结果公示时间
         if year_filter and year_filter != 'all':
-            year_int = int(year_filter)
             queryset = queryset.filter(
-                Q(signing_date__year=year_int)
-                | Q(
-                    signing_date__isnull=True,
-                    procurement__result_publicity_release_date__year=year_int,
+                period_q('signing_date', year_filter)
+                | (
+                    Q(signing_date__isnull=True)
+                    & period_q('procurement__result_publicity_release_date', year_filter)
                 )
             )
 
@@ -433,146 +420,118 @@ class CycleStatisticsService:
             }
         }
 
-    def _calculate_procurement_cycle_statistics(self, project_code=None, person_name=None,
-                                                year_filter=None, global_project=None, procurement_method=None):
-        """计算采购周期统计"""
-        queryset = Procurement.objects.filter(
-            requirement_approval_date__isnull=False,
-            result_publicity_release_date__isnull=False
-        ).select_related('project')
-
-        # 应用筛选
+    def _scope_filter(self, person_field, project_code=None, person_name=None, global_project=None):
+        """项目/经办人筛选条件"""
+        condition = Q()
         if project_code:
-            queryset = queryset.filter(project_id=project_code)
+            condition &= Q(project_id=project_code)
         if person_name:
-            queryset = queryset.filter(procurement_officer=person_name)
+            condition &= Q(**{person_field: person_name})
         if global_project:
-            queryset = queryset.filter(project_id=global_project)
-        if year_filter and year_filter != 'all':
-            # 与趋势图及采购列表保持一致：按结果公示发布时间过滤年度
-            queryset = queryset.filter(result_publicity_release_date__year=int(year_filter))
-        if procurement_method and procurement_method != 'all':
-            queryset = queryset.filter(procurement_method=procurement_method)
+            condition &= Q(project_id=global_project)
+        return condition
 
-        # 计算工作周期
-        queryset = queryset.annotate(
-            work_cycle=ExpressionWrapper(
-                F('result_publicity_release_date') - F('requirement_approval_date'),
-                output_field=fields.DurationField()
-            )
-        )
-
-        # 统计数据
-        total_count = queryset.count()
-        if total_count == 0:
-            # 统计被排除的记录数（缺少结果公示时间）
-            excluded_qs = Procurement.objects.filter(
-                requirement_approval_date__isnull=False,
-                result_publicity_release_date__isnull=True
-            )
-            if project_code:
-                excluded_qs = excluded_qs.filter(project_id=project_code)
-            if person_name:
-                excluded_qs = excluded_qs.filter(procurement_officer=person_name)
-            if global_project:
-                excluded_qs = excluded_qs.filter(project_id=global_project)
-            if year_filter and year_filter != 'all':
-                # 对于尚未公示结果的记录，仍按需求书审批日期归属年度
-                excluded_qs = excluded_qs.filter(requirement_approval_date__year=int(year_filter))
-            if procurement_method and procurement_method != 'all':
-                excluded_qs = excluded_qs.filter(procurement_method=procurement_method)
-            
-            return {'avg_cycle': 0, 'on_time_rate': 0, 'count': 0, 'excluded_count': excluded_qs.count()}
+    def _group_cycle_statistics(self, queryset, group_field, aggregates):
+        """
+        执行分组聚合并换算为统计结果
 
-        # 平均周期（转换为天数）
-        avg_cycle_timedelta = queryset.aggregate(avg=Avg('work_cycle'))['avg']
-        avg_cycle = avg_cycle_timedelta.days if avg_cycle_timedelta else 0
+        group_field 为空时整体聚合，结果键为 None；
+        平均周期取天数，及时完成率保留一位小数。
+        """
+        if group_field:
+            rows = queryset.order_by().values(group_field).annotate(**aggregates)
+            keyed_rows = ((row[group_field], row) for row in rows)
+        else:
+            keyed_rows = [(None, queryset.aggregate(**aggregates))]
+
+        result = {}
+        for key, row in keyed_rows:
+            completed_count = row['completed_count']
+            avg_cycle = row['avg_cycle']
+            result[key] = {
+                'avg_cycle': avg_cycle.days if avg_cycle and completed_count else 0,
+                'on_time_rate': round(row['on_time_count'] / completed_count * 100, 1) if completed_count else 0,
+                'count': completed_count,
+                'excluded_count': row.get('excluded_count', 0),
+                'total': row['total_count'],
+            }
+        return result
 
-        # 及时完成率（根据采购方式的规定周期）
-        on_time_count = 0
-        for item in queryset:
-            cycle_days = item.work_cycle.days if item.work_cycle else 0
-            deadline = self.procurement_rule['deadline_map'].get(
-                item.procurement_method,
-                self.procurement_rule['default_deadline']
-            )
-            if cycle_days <= deadline:
-                on_time_count += 1
-        
-        on_time_rate = round(on_time_count / total_count * 100, 1) if total_count > 0 else 0
+    def _procurement_cycle_groups(self, group_field=None, project_code=None, person_name=None,
+                                  year_filter=None, global_project=None, procurement_method=None):
+        """
+        采购周期分组统计（一次查询）
 
-        # 统计被排除的记录数
-        excluded_qs = Procurement.objects.filter(
-            requirement_approval_date__isnull=False,
-            result_publicity_release_date__isnull=True
+        返回 {分组值: {'avg_cycle', 'on_time_rate', 'count', 'excluded_count', 'total'}}：
+        - total：已提交需求的采购数（有年度时按结果公示发布时间归属年度）；
+        - count/avg_cycle/on_time_rate：其中已公示的记录，规定周期按采购方式由 CASE 表达式给出；
+        - excluded_count：尚未公示结果的记录（有年度时按需求书审批日期归属年度）。
+        """
+        rule = PROCUREMENT_CYCLE_RULE
+        queryset = Procurement.objects.filter(
+            self._scope_filter('procurement_officer', project_code, person_name, global_project),
+            requirement_approval_date__isnull=False
         )
-        if project_code:
-            excluded_qs = excluded_qs.filter(project_id=project_code)
-        if person_name:
-            excluded_qs = excluded_qs.filter(procurement_officer=person_name)
-        if global_project:
-            excluded_qs = excluded_qs.filter(project_id=global_project)
-        if year_filter and year_filter != 'all':
-            # 对于尚未公示结果的记录，仍按需求书审批日期归属年度
-            excluded_qs = excluded_qs.filter(requirement_approval_date__year=int(year_filter))
         if procurement_method and procurement_method != 'all':
-            excluded_qs = excluded_qs.filter(procurement_method=procurement_method)
+            queryset = queryset.filter(procurement_method=procurement_method)
 
-        return {
-            'avg_cycle': avg_cycle,
-            'on_time_rate': on_time_rate,
-            'count': total_count,
-            'excluded_count': excluded_qs.count()
-        }
+        if year_filter and year_filter != 'all':
+            # 与趋势图及采购列表保持一致：按结果公示发布时间过滤年度
+            counted = period_q('result_publicity_release_date', year_filter)
+            # 对于尚未公示结果的记录，仍按需求书审批日期归属年度
+            excluded = Q(result_publicity_release_date__isnull=True) & period_q('requirement_approval_date', year_filter)
+            queryset = queryset.filter(counted | excluded)
+        else:
+            counted = None
+            excluded = Q(result_publicity_release_date__isnull=True)
+
+        aggregates = rule.aggregates(completed=counted)
+        aggregates['total_count'] = Count('pk', filter=counted)
+        aggregates['excluded_count'] = Count('pk', filter=excluded)
+        return self._group_cycle_statistics(rule.annotate(queryset), group_field, aggregates)
+
+    def _contract_cycle_groups(self, group_field=None, project_code=None, person_name=None,
+                               year_filter=None, global_project=None):
+        """
+        合同周期分组统计（一次查询，仅主合同）
 
-    def _calculate_contract_cycle_statistics(self, project_code=None, person_name=None,
-                                            year_filter=None, global_project=None):
-        """计算合同周期统计"""
+        total 为采购已公示的主合同数，count 为其中已签订的记录，年度按合同签订日期归属。
+        """
+        rule = CONTRACT_CYCLE_RULE
         queryset = Contract.objects.filter(
+            self._scope_filter('contract_officer', project_code, person_name, global_project),
             procurement__result_publicity_release_date__isnull=False,
-            signing_date__isnull=False,
             file_positioning=FilePositioning.MAIN_CONTRACT.value
-        ).select_related('project', 'procurement')
-
-        # 应用筛选
-        if project_code:
-            queryset = queryset.filter(project_id=project_code)
-        if person_name:
-            queryset = queryset.filter(contract_officer=person_name)
-        if global_project:
-            queryset = queryset.filter(project_id=global_project)
-        if year_filter and year_filter != 'all':
-            queryset = queryset.filter(signing_date__year=int(year_filter))
-
-        # 计算工作周期
-        queryset = queryset.annotate(
-            work_cycle=ExpressionWrapper(
-                F('signing_date') - F('procurement__result_publicity_release_date'),
-                output_field=fields.DurationField()
-            )
         )
+        if year_filter and year_filter != 'all':
+            queryset = queryset.filter(period_q('signing_date', year_filter))
 
-        # 统计数据
-        total_count = queryset.count()
-        if total_count == 0:
-            return {'avg_cycle': 0, 'on_time_rate': 0, 'count': 0}
-
-        # 平均周期（转换为天数）
-        avg_cycle_timedelta = queryset.aggregate(avg=Avg('work_cycle'))['avg']
-        avg_cycle = avg_cycle_timedelta.days if avg_cycle_timedelta else 0
+        aggregates = rule.aggregates()
+        aggregates['total_count'] = Count('pk')
+        return self._group_cycle_statistics(rule.annotate(queryset), group_field, aggregates)
 
-        # 及时完成率
-        deadline = self.contract_rule['deadline_days']
-        on_time_count = queryset.filter(
-            work_cycle__lte=timedelta(days=deadline)
-        ).count()
-        on_time_rate = round(on_time_count / total_count * 100, 1) if total_count > 0 else 0
+    def _calculate_procurement_cycle_statistics(self, project_code=None, person_name=None,
+                                                year_filter=None, global_project=None, procurement_method=None):
+        """计算采购周期统计"""
+        stats = self._procurement_cycle_groups(
+            project_code=project_code,
+            person_name=person_name,
+            year_filter=year_filter,
+            global_project=global_project,
+            procurement_method=procurement_method
+        )[None]
+        return {key: stats[key] for key in ('avg_cycle', 'on_time_rate', 'count', 'excluded_count')}
 
-        return {
-            'avg_cycle': avg_cycle,
-            'on_time_rate': on_time_rate,
-            'count': total_count
-        }
+    def _calculate_contract_cycle_statistics(self, project_code=None, person_name=None,
+                                            year_filter=None, global_project=None):
+        """计算合同周期统计"""
+        stats = self._contract_cycle_groups(
+            project_code=project_code,
+            person_name=person_name,
+            year_filter=year_filter,
+            global_project=global_project
+        )[None]
+        return {key: stats[key] for key in ('avg_cycle', 'on_time_rate', 'count')}
 
     def _calculate_trend(self, model, project_code=None, person_name=None,
                         year_filter=None, global_project=None, procurement_method=None,
@@ -594,6 +553,46 @@ class CycleStatisticsService:
         Returns:
             list: [{'date': '2025-05-15', 'cycle_days': 35, 'code': 'CG-001', 'name': '...'}, ...]
         """
+        queryset = self._trend_queryset(
+            model, year_filter=year_filter, global_project=global_project,
+            procurement_method=procurement_method, start_field=start_field, end_field=end_field
+        )
+        if project_code:
+            queryset = queryset.filter(project_id=project_code)
+        if person_name and person_field:
+            queryset = queryset.filter(**{person_field: person_name})
+
+        scatter_data = [
+            point for point in (self._scatter_point(item, model, end_field) for item in queryset) if point
+        ]
+        # 按日期排序
+        scatter_data.sort(key=lambda x: x['date'])
+        return scatter_data
+
+    def _calculate_trend_series(self, model, series_field, series_values, year_filter=None,
+                                global_project=None, procurement_method=None, start_field='', end_field=''):
+        """
+        一次查询取出多条序列的散点数据（多人/多项目趋势），按 series_field 分组
+
+        与逐个序列调用 _calculate_trend 的结果一致，返回 {序列值: [散点, ...]}，没有数据的序列不出现。
+        """
+        queryset = self._trend_queryset(
+            model, year_filter=year_filter, global_project=global_project,
+            procurement_method=procurement_method, start_field=start_field, end_field=end_field
+        ).filter(**{f'{series_field}__in': list(series_values)})
+
+        series = defaultdict(list)
+        for item in queryset:
+            point = self._scatter_point(item, model, end_field)
+            if point:
+                series[getattr(item, series_field)].append(point)
+        for points in series.values():
+            points.sort(key=lambda x: x['date'])
+        return series
+
+    def _trend_queryset(self, model, year_filter=None, global_project=None, procurement_method=None,
+                        start_field='', end_field=''):
+        """散点数据的公共查询：开始/结束日期齐全的记录（合同仅主合同），附带 work_cycle"""
         queryset = model.objects.filter(
             **{f'{start_field}__isnull': False, f'{end_field}__isnull': False}
         )
@@ -603,82 +602,62 @@ class CycleStatisticsService:
             queryset = queryset.filter(file_positioning=FilePositioning.MAIN_CONTRACT.value)
 
         # 应用筛选
-        if project_code:
-            queryset = queryset.filter(project_id=project_code)
-        if person_name and person_field:
-            queryset = queryset.filter(**{person_field: person_name})
         if global_project:
             queryset = queryset.filter(project_id=global_project)
         if procurement_method and procurement_method != 'all' and model == Procurement:
             queryset = queryset.filter(procurement_method=procurement_method)
         if year_filter and year_filter != 'all':
-            queryset = queryset.filter(**{f'{end_field}__year': int(year_filter)})
+            queryset = queryset.filter(period_q(end_field, year_filter))
 
-        # 计算工作周期并获取散点数据
-        queryset = queryset.annotate(
+        # 计算工作周期
+        return queryset.annotate(
             work_cycle=ExpressionWrapper(
                 F(end_field) - F(start_field),
                 output_field=fields.DurationField()
             )
         ).select_related('project')
 
-        # 转换为散点数据格式
-        scatter_data = []
-        seen_ids = set()  # 使用集合追踪已处理的记录ID，防止重复
-        
-        for item in queryset:
-            # 获取记录的唯一标识符（主键）
-            record_id = item.pk
-            
-            # 如果这条记录已经被处理过，跳过
-            if record_id in seen_ids:
-                continue
-            seen_ids.add(record_id)
-            
-            # 正确获取结束日期字段值
-            if '__' in end_field:
-                # 处理关联字段（如 procurement__result_publicity_release_date）
-                parts = end_field.split('__')
-                end_date_value = item
-                for part in parts:
-                    end_date_value = getattr(end_date_value, part, None)
-                    if end_date_value is None:
-                        break
-            else:
-                # 直接字段
-                end_date_value = getattr(item, end_field, None)
-            
-            if not end_date_value:
-                continue
-                
-            cycle_days = item.work_cycle.days if item.work_cycle else 0
-            
-            # 获取业务编码和名称，规范化经办人名称
-            if model == Procurement:
-                code = getattr(item, 'procurement_code', '')
-                name = getattr(item, 'project_name', '')
-                person_raw = getattr(item, 'procurement_officer', '')
-            else:  # Contract
-                code = getattr(item, 'contract_code', '')
-                name = getattr(item, 'contract_name', '')
-                person_raw = getattr(item, 'contract_officer', '')
-            
-            # 规范化经办人名称：去除前后空白
-            person = person_raw.strip() if person_raw else ''
-            
-            scatter_data.append({
-                'date': end_date_value.isoformat(),
-                'cycle_days': cycle_days,
-                'code': code,
-                'name': name,
-                'person': person,  # 使用规范化后的名称
-                'project_code': item.project_id if hasattr(item, 'project_id') else '',
-                'record_id': record_id  # 添加唯一标识符，便于前端调试
-            })
+    def _scatter_point(self, item, model, end_field):
+        """把一条记录转换为散点；结束日期为空时返回 None"""
+        # 正确获取结束日期字段值
+        if '__' in end_field:
+            # 处理关联字段（如 procurement__result_publicity_release_date）
+            end_date_value = item
+            for part in end_field.split('__'):
+                end_date_value = getattr(end_date_value, part, None)
+                if end_date_value is None:
+                    break
+        else:
+            # 直接字段
+            end_date_value = getattr(item, end_field, None)
+
+        if not end_date_value:
+            return None
+
+        cycle_days = item.work_cycle.days if item.work_cycle else 0
+
+        # 获取业务编码和名称，规范化经办人名称
+        if model == Procurement:
+            code = getattr(item, 'procurement_code', '')
+            name = getattr(item, 'project_name', '')
+            person_raw = getattr(item, 'procurement_officer', '')
+        else:  # Contract
+            code = getattr(item, 'contract_code', '')
+            name = getattr(item, 'contract_name', '')
+            person_raw = getattr(item, 'contract_officer', '')
+
+        # 规范化经办人名称：去除前后空白
+        person = person_raw.strip() if person_raw else ''
 
-        # 按日期排序
-        scatter_data.sort(key=lambda x: x['date'])
-        return scatter_data
+        return {
+            'date': end_date_value.isoformat(),
+            'cycle_days': cycle_days,
+            'code': code,
+            'name': name,
+            'person': person,  # 使用规范化后的名称
+            'project_code': item.project_id if hasattr(item, 'project_id') else '',
+            'record_id': item.pk  # 添加唯一标识符，便于前端调试
+        }
 
     def _group_by_month(self, queryset):
         """委托公共实现，保持对外行为不变（DRY）。"""
@@ -947,7 +926,7 @@ class CycleStatisticsService:
             qs = qs.filter(project_id=global_project)
         if year_filter and year_filter != 'all':
             # 与采购列表保持一致：按结果公示发布时间过滤年度
-            qs = qs.filter(result_publicity_release_date__year=int(year_filter))
+            qs = qs.filter(period_q('result_publicity_release_date', year_filter))
         if procurement_method and procurement_method != 'all':
             qs = qs.filter(procurement_method=procurement_method)
 
@@ -961,10 +940,7 @@ class CycleStatisticsService:
             end_date = item.result_publicity_release_date
             
             # 获取该采购方式的规定周期
-            deadline_days = self.procurement_rule['deadline_map'].get(
-                item.procurement_method,
-                self.procurement_rule['default_deadline']
-            )
+            deadline_days = PROCUREMENT_CYCLE_RULE.deadline_for(item.procurement_method)
             
             cycle_days = None
             overdue_days = 0
@@ -1010,12 +986,12 @@ class CycleStatisticsService:
         if global_project:
             qs = qs.filter(project_id=global_project)
         if year_filter and year_filter != 'all':
-            qs = qs.filter(signing_date__year=int(year_filter))
+            qs = qs.filter(period_q('signing_date', year_filter))
 
         qs = qs.order_by('-signing_date')[:limit]
 
         today = timezone.now().date()
-        deadline_days = self.contract_rule['deadline_days']
+        deadline_days = CONTRACT_CYCLE_RULE.deadline_for()
         records = []
         for item in qs:
             start_date = item.procurement.result_publicity_release_date if item.procurement else None
@@ -1047,9 +1023,9 @@ class CycleStatisticsService:
 
         return records
 
-    def _get_procurement_total_count(self, project_code=None, person_name=None,
-                                     year_filter=None, global_project=None, procurement_method=None):
-        """获取采购总数（包括未完成的）"""
+    def _procurement_total_queryset(self, project_code=None, person_name=None,
+                                    year_filter=None, global_project=None, procurement_method=None):
+        """采购总数的统计范围（包括未完成的）"""
         queryset = Procurement.objects.filter(requirement_approval_date__isnull=False)
         
         if project_code:
@@ -1060,15 +1036,15 @@ class CycleStatisticsService:
             queryset = queryset.filter(project_id=global_project)
         if year_filter and year_filter != 'all':
             # 与采购列表保持一致：按结果公示发布时间过滤年度
-            queryset = queryset.filter(result_publicity_release_date__year=int(year_filter))
+            queryset = queryset.filter(period_q('result_publicity_release_date', year_filter))
         if procurement_method and procurement_method != 'all':
             queryset = queryset.filter(procurement_method=procurement_method)
         
-        return queryset.count()
+        return queryset
 
-    def _get_contract_total_count(self, project_code=None, person_name=None,
-                                  year_filter=None, global_project=None):
-        """获取合同总数（包括未完成的，仅主合同）"""
+    def _contract_total_queryset(self, project_code=None, person_name=None,
+                                 year_filter=None, global_project=None):
+        """合同总数的统计范围（包括未完成的，仅主合同）"""
         queryset = Contract.objects.filter(
             procurement__result_publicity_release_date__isnull=False,
             file_positioning=FilePositioning.MAIN_CONTRACT.value
@@ -1081,32 +1057,60 @@ class CycleStatisticsService:
         if global_project:
             queryset = queryset.filter(project_id=global_project)
         if year_filter and year_filter != 'all':
-            queryset = queryset.filter(signing_date__year=int(year_filter))
+            queryset = queryset.filter(period_q('signing_date', year_filter))
         
-        return queryset.count()
+        return queryset
+
+    def _get_procurement_total_count(self, project_code=None, person_name=None,
+                                     year_filter=None, global_project=None, procurement_method=None):
+        """获取采购总数（包括未完成的）"""
+        return self._procurement_total_queryset(
+            project_code=project_code, person_name=person_name, year_filter=year_filter,
+            global_project=global_project, procurement_method=procurement_method
+        ).count()
+
+    def _get_contract_total_count(self, project_code=None, person_name=None,
+                                  year_filter=None, global_project=None):
+        """获取合同总数（包括未完成的，仅主合同）"""
+        return self._contract_total_queryset(
+            project_code=project_code, person_name=person_name,
+            year_filter=year_filter, global_project=global_project
+        ).count()
+
+    def _count_by(self, queryset, group_field):
+        """按字段分组计数（一次查询），返回 {字段值: 数量}"""
+        rows = queryset.order_by().values(group_field).annotate(total=Count('pk'))
+        return {row[group_field]: row['total'] for row in rows}
 
     def _get_person_project_count(self, person_name, year_filter=None, global_project=None):
         """获取经办人负责的项目数"""
-        project_ids = set()
-        
-        # 从采购中获取项目
-        procurement_qs = Procurement.objects.filter(procurement_officer=person_name)
+        return self._get_person_project_counts(
+            year_filter=year_filter,
+            global_project=global_project,
+            person_name=person_name
+        ).get(person_name, 0)
+
+    def _get_person_project_counts(self, year_filter=None, global_project=None, person_name=None):
+        """按经办人统计负责的项目数（采购、合同各一次去重查询），返回 {经办人: 项目数}"""
+        procurement_qs = Procurement.objects.all()
+        contract_qs = Contract.objects.all()
+        if person_name:
+            procurement_qs = procurement_qs.filter(procurement_officer=person_name)
+            contract_qs = contract_qs.filter(contract_officer=person_name)
         if year_filter and year_filter != 'all':
             # 与采购列表保持一致：按结果公示发布时间过滤年度
-            procurement_qs = procurement_qs.filter(result_publicity_release_date__year=int(year_filter))
+            procurement_qs = procurement_qs.filter(period_q('result_publicity_release_date', year_filter))
+            contract_qs = contract_qs.filter(period_q('signing_date', year_filter))
         if global_project:
             procurement_qs = procurement_qs.filter(project_id=global_project)
-        project_ids.update(procurement_qs.values_list('project_id', flat=True).distinct())
-        
-        # 从合同中获取项目
-        contract_qs = Contract.objects.filter(contract_officer=person_name)
-        if year_filter and year_filter != 'all':
-            contract_qs = contract_qs.filter(signing_date__year=int(year_filter))
-        if global_project:
             contract_qs = contract_qs.filter(project_id=global_project)
-        project_ids.update(contract_qs.values_list('project_id', flat=True).distinct())
-        
-        return len(project_ids)
+
+        project_ids = defaultdict(set)
+        pairs = list(procurement_qs.order_by().values_list('procurement_officer', 'project_id').distinct())
+        pairs += list(contract_qs.order_by().values_list('contract_officer', 'project_id').distinct())
+        for officer, project_id in pairs:
+            project_ids[officer].add(project_id)
+        return {officer: len(ids) for officer, ids in project_ids.items()}
 
     # ===== 多序列趋势（多人/多项目/项目内经办人） =====
     def _sort_halfyear_labels(self, labels):
@@ -1138,56 +1142,27 @@ class CycleStatisticsService:
         
         注意：确保每个经办人只出现一次
         """
-        # 选人（按业务量排序取前N名）
+        # 选人（按业务量排序取前N名，一次分组查询）
         person_list = self.get_person_list(year_filter=year_filter, global_project=project_filter, procurement_method=procurement_method)
-        person_names = [p['name'] for p in person_list[:top_n]]
+        person_names = list(dict.fromkeys(p['name'] for p in person_list[:top_n]))
 
-        # 逐人计算散点数据
-        result = {'procurement': [], 'contract': []}
-        
-        # 用于跟踪已添加的人名，防止重复
-        added_proc_names = set()
-        added_cont_names = set()
-        
-        for name in person_names:
-            # 采购数据
-            if name not in added_proc_names:
-                t_p = self._calculate_trend(
-                    model=Procurement,
-                    person_name=name,
-                    year_filter=year_filter,
-                    global_project=project_filter,
-                    procurement_method=procurement_method,
-                    start_field='requirement_approval_date',
-                    end_field='result_publicity_release_date',
-                    person_field='procurement_officer'
-                )
-                if t_p:
-                    result['procurement'].append({
-                        'name': name,
-                        'points': t_p
-                    })
-                    added_proc_names.add(name)
-            
-            # 合同数据
-            if name not in added_cont_names:
-                t_c = self._calculate_trend(
-                    model=Contract,
-                    person_name=name,
-                    year_filter=year_filter,
-                    global_project=project_filter,
-                    start_field='procurement__result_publicity_release_date',
-                    end_field='signing_date',
-                    person_field='contract_officer'
-                )
-                if t_c:
-                    result['contract'].append({
-                        'name': name,
-                        'points': t_c
-                    })
-                    added_cont_names.add(name)
-        
-        return result
+        # 采购、合同各一次查询取出全部经办人的散点数据
+        proc_series = self._calculate_trend_series(
+            Procurement, 'procurement_officer', person_names,
+            year_filter=year_filter,
+            global_project=project_filter,
+            procurement_method=procurement_method,
+            start_field='requirement_approval_date',
+            end_field='result_publicity_release_date'
+        )
+        cont_series = self._calculate_trend_series(
+            Contract, 'contract_officer', person_names,
+            year_filter=year_filter,
+            global_project=project_filter,
+            start_field='procurement__result_publicity_release_date',
+            end_field='signing_date'
+        )
+        return self._build_multi_trend(person_names, proc_series, person_names, cont_series)
 
     def get_projects_multi_trend(self, year_filter=None, procurement_method=None, top_n=10):
         """
@@ -1196,58 +1171,34 @@ class CycleStatisticsService:
         注意：确保每个项目只出现一次
         """
         from project.models import Project
-        projects = list(Project.objects.all())
-        # 简化：依据合同+采购总量排序
-        scored = []
-        for p in projects:
-            p_total = self._get_procurement_total_count(project_code=p.project_code, year_filter=year_filter, procurement_method=procurement_method)
-            c_total = self._get_contract_total_count(project_code=p.project_code, year_filter=year_filter)
-            scored.append((p, p_total + c_total))
+        # 简化：依据合同+采购总量排序（采购、合同各一次分组计数）
+        p_totals = self._count_by(
+            self._procurement_total_queryset(year_filter=year_filter, procurement_method=procurement_method),
+            'project_id'
+        )
+        c_totals = self._count_by(self._contract_total_queryset(year_filter=year_filter), 'project_id')
+        scored = [
+            (code, p_totals.get(code, 0) + c_totals.get(code, 0))
+            for code in Project.objects.values_list('project_code', flat=True)
+        ]
         scored.sort(key=lambda x: x[1], reverse=True)
-        top_projects = [p.project_code for p, _ in scored[:top_n]]
+        top_projects = [code for code, _ in scored[:top_n]]
 
-        # 计算散点数据
-        result = {'procurement': [], 'contract': []}
-        
-        # 用于跟踪已添加的项目，防止重复
-        added_proc_projects = set()
-        added_cont_projects = set()
-        
-        for code in top_projects:
-            # 采购数据
-            if code not in added_proc_projects:
-                t_p = self._calculate_trend(
-                    model=Procurement,
-                    project_code=code,
-                    year_filter=year_filter,
-                    procurement_method=procurement_method,
-                    start_field='requirement_approval_date',
-                    end_field='result_publicity_release_date'
-                )
-                if t_p:
-                    result['procurement'].append({
-                        'name': code,
-                        'points': t_p
-                    })
-                    added_proc_projects.add(code)
-            
-            # 合同数据
-            if code not in added_cont_projects:
-                t_c = self._calculate_trend(
-                    model=Contract,
-                    project_code=code,
-                    year_filter=year_filter,
-                    start_field='procurement__result_publicity_release_date',
-                    end_field='signing_date'
-                )
-                if t_c:
-                    result['contract'].append({
-                        'name': code,
-                        'points': t_c
-                    })
-                    added_cont_projects.add(code)
-        
-        return result
+        # 计算散点数据（采购、合同各一次查询）
+        proc_series = self._calculate_trend_series(
+            Procurement, 'project_id', top_projects,
+            year_filter=year_filter,
+            procurement_method=procurement_method,
+            start_field='requirement_approval_date',
+            end_field='result_publicity_release_date'
+        )
+        cont_series = self._calculate_trend_series(
+            Contract, 'project_id', top_projects,
+            year_filter=year_filter,
+            start_field='procurement__result_publicity_release_date',
+            end_field='signing_date'
+        )
+        return self._build_multi_trend(top_projects, proc_series, top_projects, cont_series)
 
     def get_project_officers_multi_trend(self, project_code, year_filter=None, procurement_method=None, top_n=10):
         """
@@ -1282,62 +1233,45 @@ class CycleStatisticsService:
         p_names = normalize_names(p_names_raw)
         c_names = normalize_names(c_names_raw)
 
-        # 排序（依据业务量）
-        def sort_by_volume(names, is_proc):
-            scored = []
-            for n in names:
-                if is_proc:
-                    cnt = self._get_procurement_total_count(person_name=n, year_filter=year_filter, global_project=project_code, procurement_method=procurement_method)
-                else:
-                    cnt = self._get_contract_total_count(person_name=n, year_filter=year_filter, global_project=project_code)
-                scored.append((n, cnt))
+        # 排序（依据业务量，采购、合同各一次分组计数）
+        def sort_by_volume(names, counts):
+            scored = [(n, counts.get(n, 0)) for n in names]
             scored.sort(key=lambda x: x[1], reverse=True)
             return [n for n, _ in scored[:top_n]]
 
-        p_names = sort_by_volume(p_names, True)
-        c_names = sort_by_volume(c_names, False)
+        p_counts = self._count_by(
+            self._procurement_total_queryset(
+                year_filter=year_filter, global_project=project_code, procurement_method=procurement_method
+            ),
+            'procurement_officer'
+        )
+        c_counts = self._count_by(
+            self._contract_total_queryset(year_filter=year_filter, global_project=project_code),
+            'contract_officer'
+        )
+        p_names = sort_by_volume(p_names, p_counts)
+        c_names = sort_by_volume(c_names, c_counts)
 
-        result = {'procurement': [], 'contract': []}
-        
-        # 用于跟踪已添加的人名，防止重复
-        added_proc_names = set()
-        added_cont_names = set()
-        
-        for n in p_names:
-            # 二次确认：确保不会添加重复的人名
-            if n in added_proc_names:
-                continue
-                
-            t = self._calculate_trend(
-                model=Procurement,
-                person_name=n,
-                year_filter=year_filter,
-                global_project=project_code,
-                procurement_method=procurement_method,
-                start_field='requirement_approval_date',
-                end_field='result_publicity_release_date',
-                person_field='procurement_officer'
-            )
-            if t:
-                result['procurement'].append({'name': n, 'points': t})
-                added_proc_names.add(n)
-        
-        for n in c_names:
-            # 二次确认：确保不会添加重复的人名
-            if n in added_cont_names:
-                continue
-                
-            t = self._calculate_trend(
-                model=Contract,
-                person_name=n,
-                year_filter=year_filter,
-                global_project=project_code,
-                start_field='procurement__result_publicity_release_date',
-                end_field='signing_date',
-                person_field='contract_officer'
-            )
-            if t:
-                result['contract'].append({'name': n, 'points': t})
-                added_cont_names.add(n)
-        
-        return result
+        proc_series = self._calculate_trend_series(
+            Procurement, 'procurement_officer', p_names,
+            year_filter=year_filter,
+            global_project=project_code,
+            procurement_method=procurement_method,
+            start_field='requirement_approval_date',
+            end_field='result_publicity_release_date'
+        )
+        cont_series = self._calculate_trend_series(
+            Contract, 'contract_officer', c_names,
+            year_filter=year_filter,
+            global_project=project_code,
+            start_field='procurement__result_publicity_release_date',
+            end_field='signing_date'
+        )
+        return self._build_multi_trend(p_names, proc_series, c_names, cont_series)
+
+    def _build_multi_trend(self, proc_names, proc_series, cont_names, cont_series):
+        """按选定顺序组装多序列散点数据，只保留有数据的序列"""
+        return {
+            'procurement': [{'name': n, 'points': proc_series[n]} for n in proc_names if n in proc_series],
+            'contract': [{'name': n, 'points': cont_series[n]} for n in cont_names if n in cont_series],
+        }
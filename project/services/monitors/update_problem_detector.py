@@ -1,9 +1,16 @@
 """更新问题检测器 - 遵循单一职责原则（SRP）"""
 from datetime import date, timedelta
+from urllib.parse import urlencode
+
 from django.utils import timezone
-from django.db.models import Q
+from django.db.models import Case, IntegerField, Value, When
+
+from project.models_update_event import UpdateEventFact, calculate_update_deadline
 from .config import UPDATE_RULES
 
+# 检测的业务模块（顺序即问题列表中同剩余天数记录的先后）
+UPDATE_MODULES = list(UPDATE_RULES)
+
 
 class UpdateProblemDetector:
     """更新问题检测器"""
@@ -55,18 +62,7 @@ class UpdateProblemDetector:
 
     def _calculate_update_deadline(self, business_date):
         """计算更新截止日期（次月月底）"""
-        if business_date.month == 12:
-            next_month = date(business_date.year + 1, 1, 1)
-        else:
-            next_month = date(business_date.year, business_date.month + 1, 1)
-
-        # 次月最后一天
-        if next_month.month == 12:
-            deadline = date(next_month.year, 12, 31)
-        else:
-            deadline = date(next_month.year, next_month.month + 1, 1) - timedelta(days=1)
-
-        return deadline
+        return calculate_update_deadline(business_date)
 
     def detect_problems(self, filters=None, return_url=None, show_all=False):
         """
@@ -81,10 +77,7 @@ class UpdateProblemDetector:
         problems = []
 
         # 检测各模块更新问题
-        problems.extend(self._detect_procurement_updates(filters, return_url))
-        problems.extend(self._detect_contract_updates(filters, return_url))
-        problems.extend(self._detect_payment_updates(filters, return_url))
-        problems.extend(self._detect_settlement_updates(filters, return_url))
+        problems.extend(self._detect_updates(filters, return_url))
 
         # 分类：即将到期、已延迟、已完成
         upcoming = []
@@ -110,182 +103,47 @@ class UpdateProblemDetector:
 
         return result
 
-    def _detect_procurement_updates(self, filters, return_url=None):
-        """检测采购更新问题"""
-        from procurement.models import Procurement
-        from urllib.parse import urlencode
+    def _detect_updates(self, filters, return_url=None):
+        """
+        检测各模块更新问题：一次查询更新事件表
 
-        rule = UPDATE_RULES['procurement']
-        queryset = Procurement.objects.select_related('project').filter(
-            result_publicity_release_date__gte=self.start_date,
-            result_publicity_release_date__lte=self.end_date
+        付款、结算的负责人为关联合同的经办人；名称为关联合同名称。
+        """
+        queryset = UpdateEventFact.objects.filter(
+            module__in=UPDATE_MODULES,
+            event_date__gte=self.start_date,
+            event_date__lte=self.end_date,
         )
 
         if filters.get('project'):
             queryset = queryset.filter(project_id=filters['project'])
         if filters.get('responsible_person'):
-            queryset = queryset.filter(procurement_officer=filters['responsible_person'])
-
-        problems = []
-        for item in queryset:
-            business_date = item.result_publicity_release_date
-            if not business_date:
-                continue
-
-            update_deadline = self._calculate_update_deadline(business_date)
-            days_remaining = (update_deadline - self.today).days
+            queryset = queryset.filter(responsible_person=filters['responsible_person'])
 
-            # 构建编辑URL，添加return_url参数
-            edit_url = f'/procurement/{item.procurement_code}/'
-            if return_url:
-                edit_url += f'?{urlencode({"return_url": return_url})}'
-
-            problems.append({
-                'project_name': item.project.project_name if item.project else '',
-                'module': 'procurement',
-                'module_label': rule['label'],
-                'code': item.procurement_code,
-                'name': item.project_name,
-                'responsible_person': item.procurement_officer or '',
-                'business_date': business_date,
-                'update_deadline': update_deadline,
-                'days_remaining': days_remaining,
-                'edit_url': edit_url
-            })
-
-        return problems
-
-    def _detect_contract_updates(self, filters, return_url=None):
-        """检测合同更新问题"""
-        from contract.models import Contract
-        from urllib.parse import urlencode
-
-        rule = UPDATE_RULES['contract']
-        queryset = Contract.objects.select_related('project').filter(
-            signing_date__gte=self.start_date,
-            signing_date__lte=self.end_date
+        module_order = Case(
+            *[When(module=module, then=Value(index)) for index, module in enumerate(UPDATE_MODULES)],
+            output_field=IntegerField(),
         )
-
-        if filters.get('project'):
-            queryset = queryset.filter(project_id=filters['project'])
-        if filters.get('responsible_person'):
-            queryset = queryset.filter(contract_officer=filters['responsible_person'])
-
-        problems = []
-        for item in queryset:
-            business_date = item.signing_date
-            if not business_date:
-                continue
-
-            update_deadline = self._calculate_update_deadline(business_date)
-            days_remaining = (update_deadline - self.today).days
-
-            # 构建编辑URL，添加return_url参数
-            edit_url = f'/contract/{item.contract_code}/'
-            if return_url:
-                edit_url += f'?{urlencode({"return_url": return_url})}'
-
-            problems.append({
-                'project_name': item.project.project_name if item.project else '',
-                'module': 'contract',
-                'module_label': rule['label'],
-                'code': item.contract_code,
-                'name': item.contract_name,
-                'responsible_person': item.contract_officer or '',
-                'business_date': business_date,
-                'update_deadline': update_deadline,
-                'days_remaining': days_remaining,
-                'edit_url': edit_url
-            })
-
-        return problems
-
-    def _detect_payment_updates(self, filters, return_url=None):
-        """检测付款更新问题"""
-        from payment.models import Payment
-        from urllib.parse import urlencode
-
-        rule = UPDATE_RULES['payment']
-        queryset = Payment.objects.select_related('contract__project').filter(
-            payment_date__gte=self.start_date,
-            payment_date__lte=self.end_date
-        )
-
-        if filters.get('project'):
-            queryset = queryset.filter(contract__project_id=filters['project'])
-        if filters.get('responsible_person'):
-            queryset = queryset.filter(contract__contract_officer=filters['responsible_person'])
-
-        problems = []
-        for item in queryset:
-            business_date = item.payment_date
-            if not business_date:
-                continue
-
-            update_deadline = self._calculate_update_deadline(business_date)
-            days_remaining = (update_deadline - self.today).days
-
-            # 构建编辑URL，添加return_url参数
-            edit_url = f'/payment/{item.payment_code}/'
-            if return_url:
-                edit_url += f'?{urlencode({"return_url": return_url})}'
-
-            problems.append({
-                'project_name': item.contract.project.project_name if item.contract and item.contract.project else '',
-                'module': 'payment',
-                'module_label': rule['label'],
-                'code': item.payment_code,
-                'name': item.contract.contract_name if item.contract else '',
-                'responsible_person': item.contract.contract_officer if item.contract else '',
-                'business_date': business_date,
-                'update_deadline': update_deadline,
-                'days_remaining': days_remaining,
-                'edit_url': edit_url
-            })
-
-        return problems
-
-    def _detect_settlement_updates(self, filters, return_url=None):
-        """检测结算更新问题"""
-        from settlement.models import Settlement
-        from urllib.parse import urlencode
-
-        rule = UPDATE_RULES['settlement']
-        queryset = Settlement.objects.select_related('main_contract__project').filter(
-            completion_date__gte=self.start_date,
-            completion_date__lte=self.end_date
+        rows = queryset.order_by(module_order, 'event_date', 'source_code').values_list(
+            'module', 'source_code', 'name', 'responsible_person', 'event_date', 'deadline',
+            'project__project_name',
         )
 
-        if filters.get('project'):
-            queryset = queryset.filter(main_contract__project_id=filters['project'])
-        if filters.get('responsible_person'):
-            queryset = queryset.filter(main_contract__contract_officer=filters['responsible_person'])
-
+        query_string = f'?{urlencode({"return_url": return_url})}' if return_url else ''
         problems = []
-        for item in queryset:
-            business_date = item.completion_date
-            if not business_date:
-                continue
-
-            update_deadline = self._calculate_update_deadline(business_date)
-            days_remaining = (update_deadline - self.today).days
-
-            # 构建编辑URL，添加return_url参数
-            edit_url = f'/settlement/{item.settlement_code}/'
-            if return_url:
-                edit_url += f'?{urlencode({"return_url": return_url})}'
-
+        for module, code, name, person, business_date, update_deadline, project_name in rows:
             problems.append({
-                'project_name': item.main_contract.project.project_name if item.main_contract and item.main_contract.project else '',
-                'module': 'settlement',
-                'module_label': rule['label'],
-                'code': item.settlement_code,
-                'name': item.main_contract.contract_name if item.main_contract else '',
-                'responsible_person': item.main_contract.contract_officer if item.main_contract else '',
+                'project_name': project_name or '',
+                'module': module,
+                'module_label': UPDATE_RULES[module]['label'],
+                'code': code,
+                'name': name,
+                'responsible_person': person or '',
                 'business_date': business_date,
                 'update_deadline': update_deadline,
-                'days_remaining': days_remaining,
-                'edit_url': edit_url
+                'days_remaining': (update_deadline - self.today).days,
+                # 编辑URL，附带return_url参数
+                'edit_url': f'/{module}/{code}/{query_string}',
             })
 
         return problems
@@ -1,16 +1,26 @@
 """
 更新监控统计服务
 参照归档监控页面的成功设计模式，实现双视图架构的更新监控统计功能
+
+统计、趋势与经办人名单基于更新事件表（UpdateEventFact）分组查询，
+项目/经办人概览的查询数量不随项目、经办人数量增长。
 """
-from datetime import datetime, date, timedelta
+from collections import defaultdict
+from datetime import date
 from django.utils import timezone
-from django.db.models import Count, Q, F, ExpressionWrapper, fields, Avg
+from django.db.models import Count, Q, F, ExpressionWrapper, fields, Sum
 from django.db.models.functions import ExtractYear, ExtractMonth
 from procurement.models import Procurement
 from contract.models import Contract
 from payment.models import Payment
 from settlement.models import Settlement
 from project.enums import FilePositioning
+from project.models_update_event import UpdateEventFact
+from project.utils.date_helpers import period_q
+
+UPDATE_MODULES = ('procurement', 'contract', 'payment', 'settlement')
+# 有直接经办人字段、支持按经办人筛选的模块（付款/结算按经办人视图时不筛选，与原口径一致）
+PERSON_MODULES = ('procurement', 'contract')
 
 
 class UpdateStatisticsService:
@@ -33,37 +43,18 @@ class UpdateStatisticsService:
             else None
         )
 
-    def _calculate_update_deadline(self, business_date):
-        """
-        计算更新截止日期（次月月底）
-        参照update_problem_detector的实现
-        """
-        if not business_date:
-            return None
-            
-        if business_date.month == 12:
-            next_month = date(business_date.year + 1, 1, 1)
-        else:
-            next_month = date(business_date.year, business_date.month + 1, 1)
-
-        # 次月最后一天
-        if next_month.month == 12:
-            deadline = date(next_month.year, 12, 31)
-        else:
-            deadline = date(next_month.year, next_month.month + 1, 1) - timedelta(days=1)
-
-        return deadline
-
     def get_projects_update_overview(self, year_filter=None, project_filter=None, start_date=None):
         """
         获取项目维度的更新监控概览
         【完全参照归档监控的get_projects_archive_overview方法】
-        
+
+        各项目各模块统计由一次分组查询得到。
+
         Args:
             year_filter: str - 年度筛选（'all' 或具体年份）
             project_filter: str or None - 项目编码筛选
             start_date: date - 起始日期筛选
-        
+
         Returns:
             dict: {
                 'summary': {汇总统计},
@@ -74,91 +65,37 @@ class UpdateStatisticsService:
         if start_date:
             self.start_date = start_date
         from project.models import Project
-        
+
         # 获取项目列表
         projects_qs = Project.objects.all()
         if project_filter:
             projects_qs = projects_qs.filter(project_code=project_filter)
-        
+
+        grouped = self._grouped_module_stats(
+            'project_id', year_filter=year_filter, project_filter=project_filter
+        )
+
         projects_data = []
-        
-        # 汇总统计初始化
-        total_stats = {
-            'procurement': {'total': 0, 'updated': 0, 'on_time': 0},
-            'contract': {'total': 0, 'updated': 0, 'on_time': 0},
-            'payment': {'total': 0, 'updated': 0, 'on_time': 0},
-            'settlement': {'total': 0, 'updated': 0, 'on_time': 0},
-        }
-        
+        total_stats = self._empty_total_stats()
+
         for project in projects_qs:
-            # 计算该项目各模块的更新统计
-            procurement_stats = self._calculate_module_update_stats(
-                module='procurement',
-                project_code=project.project_code,
-                year_filter=year_filter
-            )
-            contract_stats = self._calculate_module_update_stats(
-                module='contract',
-                project_code=project.project_code,
-                year_filter=year_filter
-            )
-            payment_stats = self._calculate_module_update_stats(
-                module='payment',
-                project_code=project.project_code,
-                year_filter=year_filter
-            )
-            settlement_stats = self._calculate_module_update_stats(
-                module='settlement',
-                project_code=project.project_code,
-                year_filter=year_filter
-            )
-            
-            # 计算综合准时率
-            total_count = (procurement_stats['total'] + contract_stats['total'] + 
-                          payment_stats['total'] + settlement_stats['total'])
-            on_time_count = (procurement_stats['on_time'] + contract_stats['on_time'] + 
-                           payment_stats['on_time'] + settlement_stats['on_time'])
-            overall_on_time_rate = round(on_time_count / total_count * 100, 1) if total_count > 0 else 0
-            
+            module_stats = {
+                module: grouped.get((project.project_code, module)) or self._empty_stats()
+                for module in UPDATE_MODULES
+            }
             projects_data.append({
                 'project_code': project.project_code,
                 'project_name': project.project_name,
-                'procurement_count': procurement_stats['total'],
-                'procurement_updated': procurement_stats['updated'],
-                'procurement_on_time_rate': procurement_stats['on_time_rate'],
-                'procurement_avg_days': procurement_stats['avg_days'],
-                'contract_count': contract_stats['total'],
-                'contract_updated': contract_stats['updated'],
-                'contract_on_time_rate': contract_stats['on_time_rate'],
-                'contract_avg_days': contract_stats['avg_days'],
-                'payment_count': payment_stats['total'],
-                'payment_updated': payment_stats['updated'],
-                'payment_on_time_rate': payment_stats['on_time_rate'],
-                'payment_avg_days': payment_stats['avg_days'],
-                'settlement_count': settlement_stats['total'],
-                'settlement_updated': settlement_stats['updated'],
-                'settlement_on_time_rate': settlement_stats['on_time_rate'],
-                'settlement_avg_days': settlement_stats['avg_days'],
-                'overall_on_time_rate': overall_on_time_rate
+                **self._flatten_module_stats(module_stats),
             })
-            
-            # 累加到汇总统计
-            for module_name, stats in [
-                ('procurement', procurement_stats),
-                ('contract', contract_stats),
-                ('payment', payment_stats),
-                ('settlement', settlement_stats)
-            ]:
-                total_stats[module_name]['total'] += stats['total']
-                total_stats[module_name]['updated'] += stats['updated']
-                total_stats[module_name]['on_time'] += stats['on_time']
-        
+            self._accumulate(total_stats, module_stats)
+
         # 按综合准时率降序排序
         projects_data.sort(key=lambda x: x['overall_on_time_rate'], reverse=True)
-        
+
         # 计算汇总统计
         summary = self._build_summary(total_stats, len(projects_data))
-        
+
         return {
             'summary': summary,
             'projects': projects_data
@@ -168,12 +105,15 @@ class UpdateStatisticsService:
         """
         获取个人维度的更新监控概览
         【完全参照归档监控的get_persons_archive_overview方法】
-        
+
+        采购/合同按经办人一次分组查询；付款/结算没有直接经办人，
+        与原口径一致按全部经办人共用同一份统计。
+
         Args:
             year_filter: str - 年度筛选
             project_filter: str or None - 项目筛选（影响经办人范围）
             start_date: date - 起始日期筛选
-        
+
         Returns:
             dict: {
                 'summary': {汇总统计},
@@ -185,106 +125,112 @@ class UpdateStatisticsService:
             self.start_date = start_date
         # 获取所有经办人名单
         person_names = self._get_all_persons(year_filter, project_filter)
-        
+
+        grouped = self._grouped_module_stats(
+            'responsible_person', modules=PERSON_MODULES,
+            year_filter=year_filter, project_filter=project_filter
+        )
+        shared = self._grouped_module_stats(
+            modules=[m for m in UPDATE_MODULES if m not in PERSON_MODULES],
+            year_filter=year_filter, project_filter=project_filter
+        )
+        project_counts = self._get_person_project_counts(year_filter, project_filter)
+
         persons_data = []
-        
-        # 汇总统计初始化
-        total_stats = {
-            'procurement': {'total': 0, 'updated': 0, 'on_time': 0},
-            'contract': {'total': 0, 'updated': 0, 'on_time': 0},
-            'payment': {'total': 0, 'updated': 0, 'on_time': 0},
-            'settlement': {'total': 0, 'updated': 0, 'on_time': 0},
-        }
-        
+        total_stats = self._empty_total_stats()
+
         for person_name in person_names:
-            # 计算该经办人各模块的更新统计
-            procurement_stats = self._calculate_module_update_stats(
-                module='procurement',
-                person_name=person_name,
-                year_filter=year_filter,
-                project_filter=project_filter
-            )
-            contract_stats = self._calculate_module_update_stats(
-                module='contract',
-                person_name=person_name,
-                year_filter=year_filter,
-                project_filter=project_filter
-            )
-            payment_stats = self._calculate_module_update_stats(
-                module='payment',
-                person_name=person_name,
-                year_filter=year_filter,
-                project_filter=project_filter
-            )
-            settlement_stats = self._calculate_module_update_stats(
-                module='settlement',
-                person_name=person_name,
-                year_filter=year_filter,
-                project_filter=project_filter
-            )
-            
-            # 计算负责的项目数
-            project_count = self._get_person_project_count(
-                person_name, year_filter, project_filter
-            )
-            
-            # 计算综合准时率
-            total_count = (procurement_stats['total'] + contract_stats['total'] + 
-                          payment_stats['total'] + settlement_stats['total'])
-            on_time_count = (procurement_stats['on_time'] + contract_stats['on_time'] + 
-                           payment_stats['on_time'] + settlement_stats['on_time'])
-            overall_on_time_rate = round(on_time_count / total_count * 100, 1) if total_count > 0 else 0
-            
+            module_stats = {}
+            for module in UPDATE_MODULES:
+                key = (person_name, module) if module in PERSON_MODULES else (None, module)
+                source = grouped if module in PERSON_MODULES else shared
+                module_stats[module] = source.get(key) or self._empty_stats()
+
             persons_data.append({
                 'person_name': person_name,
-                'procurement_count': procurement_stats['total'],
-                'procurement_updated': procurement_stats['updated'],
-                'procurement_on_time_rate': procurement_stats['on_time_rate'],
-                'procurement_avg_days': procurement_stats['avg_days'],
-                'contract_count': contract_stats['total'],
-                'contract_updated': contract_stats['updated'],
-                'contract_on_time_rate': contract_stats['on_time_rate'],
-                'contract_avg_days': contract_stats['avg_days'],
-                'payment_count': payment_stats['total'],
-                'payment_updated': payment_stats['updated'],
-                'payment_on_time_rate': payment_stats['on_time_rate'],
-                'payment_avg_days': payment_stats['avg_days'],
-                'settlement_count': settlement_stats['total'],
-                'settlement_updated': settlement_stats['updated'],
-                'settlement_on_time_rate': settlement_stats['on_time_rate'],
-                'settlement_avg_days': settlement_stats['avg_days'],
-                'overall_on_time_rate': overall_on_time_rate,
-                'project_count': project_count,
-                'business_total': total_count
+                **self._flatten_module_stats(module_stats),
+                'project_count': project_counts.get(person_name, 0),
+                'business_total': sum(stats['total'] for stats in module_stats.values()),
             })
-            
-            # 累加到汇总统计
-            for module_name, stats in [
-                ('procurement', procurement_stats),
-                ('contract', contract_stats),
-                ('payment', payment_stats),
-                ('settlement', settlement_stats)
-            ]:
-                total_stats[module_name]['total'] += stats['total']
-                total_stats[module_name]['updated'] += stats['updated']
-                total_stats[module_name]['on_time'] += stats['on_time']
-        
+            self._accumulate(total_stats, module_stats)
+
         # 按综合准时率降序排序
         persons_data.sort(key=lambda x: x['overall_on_time_rate'], reverse=True)
-        
+
         # 计算汇总统计
         summary = self._build_summary(total_stats, len(persons_data), is_person_view=True)
-        
+
         return {
             'summary': summary,
             'persons': persons_data
         }
 
+    def _fact_condition(self, module, project_code=None, person_name=None,
+                        year_filter=None, project_filter=None):
+        """单个模块的更新事件筛选条件（起始日期、维度与年度筛选；合同只含主合同）"""
+        condition = Q(module=module)
+
+        # 应用起始日期筛选（优先级最高）
+        if self.start_date:
+            condition &= Q(event_date__gte=self.start_date)
+
+        # 应用筛选条件
+        if project_code:
+            condition &= Q(project_id=project_code)
+        if person_name and module in PERSON_MODULES:
+            condition &= Q(responsible_person=person_name)
+        if project_filter:
+            condition &= Q(project_id=project_filter)
+        if year_filter and year_filter != 'all':
+            condition &= period_q('event_date', year_filter)
+
+        # 合同只统计主合同
+        if module == 'contract':
+            condition &= Q(is_main_contract=True)
+        return condition
+
+    def _grouped_module_stats(self, group_field=None, modules=UPDATE_MODULES, project_code=None,
+                              person_name=None, year_filter=None, project_filter=None):
+        """
+        一次分组查询计算多个模块的更新统计
+
+        Returns:
+            dict: {(分组值, 模块): 统计}，未指定分组字段时分组值为 None；没有数据的组合不出现
+        """
+        modules = [module for module in modules if self._get_module_config(module)]
+        if not modules:
+            return {}
+
+        # 各模块筛选条件略有不同（经办人、主合同），合并为一次查询
+        condition = Q()
+        for module in modules:
+            condition |= self._fact_condition(
+                module, project_code=project_code, person_name=person_name,
+                year_filter=year_filter, project_filter=project_filter,
+            )
+        queryset = UpdateEventFact.objects.filter(condition)
+
+        group_fields = [group_field, 'module'] if group_field else ['module']
+        rows = (
+            queryset.order_by()
+            .values(*group_fields)
+            .annotate(
+                total=Count('pk'),
+                updated=Count('update_date'),
+                on_time=Count('pk', filter=Q(is_timely=True)),
+                days_sum=Sum('update_days'),
+            )
+        )
+        return {
+            (row[group_field] if group_field else None, row['module']): self._stats_from_row(row)
+            for row in rows
+        }
+
     def _calculate_module_update_stats(self, module, project_code=None, person_name=None,
                                       year_filter=None, project_filter=None):
         """
         计算单个模块的更新统计
-        
+
         Returns:
             dict: {
                 'total': 总数,
@@ -294,83 +240,11 @@ class UpdateStatisticsService:
                 'avg_days': 平均更新天数
             }
         """
-        # 根据模块获取对应的模型和字段配置
-        config = self._get_module_config(module)
-        if not config:
-            return self._empty_stats()
-        
-        # 构建查询集
-        queryset = config['model'].objects.filter(
-            **{f"{config['business_date_field']}__isnull": False}
+        grouped = self._grouped_module_stats(
+            modules=[module], project_code=project_code, person_name=person_name,
+            year_filter=year_filter, project_filter=project_filter,
         )
-        
-        # 应用起始日期筛选（优先级最高）
-        if self.start_date:
-            queryset = queryset.filter(**{f"{config['business_date_field']}__gte": self.start_date})
-        
-        # 应用筛选条件
-        if project_code:
-            queryset = queryset.filter(**{config['project_field']: project_code})
-        if person_name and config.get('person_field'):
-            queryset = queryset.filter(**{config['person_field']: person_name})
-        if project_filter:
-            queryset = queryset.filter(**{config['project_field']: project_filter})
-        if year_filter and year_filter != 'all':
-            queryset = queryset.filter(**{f"{config['business_date_field']}__year": int(year_filter)})
-        
-        # 合同只统计主合同
-        if module == 'contract':
-            queryset = queryset.filter(file_positioning=FilePositioning.MAIN_CONTRACT.value)
-        
-        total_count = queryset.count()
-        if total_count == 0:
-            return self._empty_stats()
-        
-        # 计算更新天数和准时情况
-        on_time_count = 0
-        update_days_list = []
-        
-        for item in queryset:
-            business_date = getattr(item, config['business_date_field'])
-            update_date = getattr(item, config['update_date_field'], None)
-            
-            if not business_date:
-                continue
-                
-            # 计算截止日期
-            deadline = self._calculate_update_deadline(business_date)
-            if not deadline:
-                continue
-            
-            # 如果有更新日期，使用更新日期；否则使用创建日期
-            if not update_date:
-                update_date = getattr(item, 'created_at', None)
-                if update_date:
-                    update_date = update_date.date()
-            elif hasattr(update_date, 'date'):
-                update_date = update_date.date()
-            
-            if update_date:
-                # 计算更新天数
-                update_days = (update_date - business_date).days
-                update_days_list.append(update_days)
-                
-                # 判断是否准时（更新日期 <= 截止日期）
-                if update_date <= deadline:
-                    on_time_count += 1
-        
-        # 计算统计数据
-        updated_count = len(update_days_list)
-        on_time_rate = round(on_time_count / updated_count * 100, 1) if updated_count > 0 else 0
-        avg_days = round(sum(update_days_list) / len(update_days_list), 1) if update_days_list else 0
-        
-        return {
-            'total': total_count,
-            'updated': updated_count,
-            'on_time': on_time_count,
-            'on_time_rate': on_time_rate,
-            'avg_days': avg_days
-        }
+        return grouped.get((None, module)) or self._empty_stats()
 
     def _calculate_module_update_trend(self, module, project_code=None, person_name=None,
                                       year_filter=None, project_filter=None):
@@ -379,53 +253,32 @@ class UpdateStatisticsService:
         返回形式与归档监控的趋势数据保持一致，例如：
         [{'month': 1, 'period': '1月', 'avg_cycle': 3.5, 'count': 10}, ...]
         """
-        config = self._get_module_config(module)
-        if not config:
+        if not self._get_module_config(module):
             return []
 
-        model = config["model"]
-        business_field = config["business_date_field"]
-        update_field = config["update_date_field"]
-
-        # 基础查询：只统计有业务日期的记录
-        queryset = model.objects.filter(**{f"{business_field}__isnull": False})
-
-        # 应用起始日期筛选（保持与统计概览一致）
-        if self.start_date:
-            queryset = queryset.filter(**{f"{business_field}__gte": self.start_date})
-
-        # 维度筛选
-        if project_code:
-            queryset = queryset.filter(**{config["project_field"]: project_code})
-        if person_name and config.get("person_field"):
-            queryset = queryset.filter(**{config["person_field"]: person_name})
-        if project_filter:
-            queryset = queryset.filter(**{config["project_field"]: project_filter})
-
-        # 合同仅统计主合同
-        if module == "contract":
-            queryset = queryset.filter(file_positioning=FilePositioning.MAIN_CONTRACT.value)
-
-        # 仅统计已经有更新日期的数据
-        queryset = queryset.filter(**{f"{update_field}__isnull": False})
-        if not queryset.exists():
-            return []
+        # 仅统计已经有更新日期的事件（起始日期、维度、年度筛选与统计概览一致）
+        queryset = UpdateEventFact.objects.filter(
+            self._fact_condition(
+                module, project_code=project_code, person_name=person_name,
+                year_filter=year_filter, project_filter=project_filter,
+            ),
+            update_date__isnull=False,
+        )
 
-        # 标注业务年份、月份以及“更新周期”
+        # 标注业务年份、月份以及“更新周期”（按日计）
         queryset = queryset.annotate(
             update_cycle=ExpressionWrapper(
-                F(update_field) - F(business_field),
+                F("update_date") - F("event_date"),
                 output_field=fields.DurationField(),
             ),
-            business_year=ExtractYear(business_field),
-            business_month=ExtractMonth(business_field),
+            business_year=ExtractYear("event_date"),
+            business_month=ExtractMonth("event_date"),
         )
 
         # 根据 year_filter 选择按月或按半年度分组
         from .utils.time_grouping import group_by_month, group_by_half_year
 
         if year_filter and year_filter != "all":
-            queryset = queryset.filter(**{f"{business_field}__year": int(year_filter)})
             return group_by_month(queryset, cycle_field="update_cycle")
 
         return group_by_half_year(queryset, cycle_field="update_cycle")
@@ -464,7 +317,7 @@ class UpdateStatisticsService:
         if project_filter:
             queryset = queryset.filter(**{config["project_field"]: project_filter})
         if year_filter and year_filter != "all":
-            queryset = queryset.filter(**{f"{business_field}__year": int(year_filter)})
+            queryset = queryset.filter(period_q(business_field, year_filter))
 
         # 合同仅统计主合同
         if module == "contract":
@@ -571,6 +424,43 @@ class UpdateStatisticsService:
             'avg_days': 0
         }
 
+    def _stats_from_row(self, row):
+        """分组查询结果行 -> 模块统计"""
+        updated_count = row['updated']
+        return {
+            'total': row['total'],
+            'updated': updated_count,
+            'on_time': row['on_time'],
+            'on_time_rate': round(row['on_time'] / updated_count * 100, 1) if updated_count > 0 else 0,
+            'avg_days': round(row['days_sum'] / updated_count, 1) if updated_count > 0 else 0,
+        }
+
+    def _empty_total_stats(self):
+        """汇总统计初始值"""
+        return {module: {'total': 0, 'updated': 0, 'on_time': 0} for module in UPDATE_MODULES}
+
+    def _accumulate(self, total_stats, module_stats):
+        """累加到汇总统计"""
+        for module, stats in module_stats.items():
+            total_stats[module]['total'] += stats['total']
+            total_stats[module]['updated'] += stats['updated']
+            total_stats[module]['on_time'] += stats['on_time']
+
+    def _flatten_module_stats(self, module_stats):
+        """各模块统计展开为列表行字段，并计算综合准时率"""
+        row = {}
+        for module in UPDATE_MODULES:
+            stats = module_stats[module]
+            row[f'{module}_count'] = stats['total']
+            row[f'{module}_updated'] = stats['updated']
+            row[f'{module}_on_time_rate'] = stats['on_time_rate']
+            row[f'{module}_avg_days'] = stats['avg_days']
+
+        total_count = sum(stats['total'] for stats in module_stats.values())
+        on_time_count = sum(stats['on_time'] for stats in module_stats.values())
+        row['overall_on_time_rate'] = round(on_time_count / total_count * 100, 1) if total_count > 0 else 0
+        return row
+
     def _build_summary(self, total_stats, count, is_person_view=False):
         """构建汇总统计
 
@@ -624,59 +514,44 @@ class UpdateStatisticsService:
         return summary
 
     def _get_all_persons(self, year_filter=None, project_filter=None):
-        """获取所有经办人名单"""
-        person_names = set()
-        
-        # 采购经办人
-        procurement_qs = Procurement.objects.filter(procurement_officer__isnull=False)
-        if self.start_date:
-            procurement_qs = procurement_qs.filter(result_publicity_release_date__gte=self.start_date)
-        if year_filter and year_filter != 'all':
-            procurement_qs = procurement_qs.filter(result_publicity_release_date__year=int(year_filter))
-        if project_filter:
-            procurement_qs = procurement_qs.filter(project_id=project_filter)
-        person_names.update(procurement_qs.values_list('procurement_officer', flat=True).distinct())
-        
-        # 合同经办人
-        contract_qs = Contract.objects.filter(
-            contract_officer__isnull=False,
-            file_positioning=FilePositioning.MAIN_CONTRACT.value
+        """获取所有经办人名单（采购经办人 + 主合同经办人）"""
+        condition = Q()
+        for module in PERSON_MODULES:
+            condition |= self._fact_condition(module, year_filter=year_filter, project_filter=project_filter)
+
+        person_names = (
+            UpdateEventFact.objects.filter(condition, responsible_person__isnull=False)
+            .order_by()
+            .values_list('responsible_person', flat=True)
+            .distinct()
         )
-        if self.start_date:
-            contract_qs = contract_qs.filter(signing_date__gte=self.start_date)
-        if year_filter and year_filter != 'all':
-            contract_qs = contract_qs.filter(signing_date__year=int(year_filter))
-        if project_filter:
-            contract_qs = contract_qs.filter(project_id=project_filter)
-        person_names.update(contract_qs.values_list('contract_officer', flat=True).distinct())
-        
         return sorted(person_names)
 
-    def _get_person_project_count(self, person_name, year_filter=None, project_filter=None):
-        """获取经办人负责的项目数"""
-        project_ids = set()
-        
-        # 从采购中获取项目
-        procurement_qs = Procurement.objects.filter(procurement_officer=person_name)
-        if self.start_date:
-            procurement_qs = procurement_qs.filter(result_publicity_release_date__gte=self.start_date)
-        if year_filter and year_filter != 'all':
-            procurement_qs = procurement_qs.filter(result_publicity_release_date__year=int(year_filter))
-        if project_filter:
-            procurement_qs = procurement_qs.filter(project_id=project_filter)
-        project_ids.update(procurement_qs.values_list('project_id', flat=True).distinct())
-        
-        # 从合同中获取项目
-        contract_qs = Contract.objects.filter(contract_officer=person_name)
+    def _get_person_project_counts(self, year_filter=None, project_filter=None):
+        """
+        一次查询获取各经办人负责的项目数
+
+        Returns:
+            dict: {经办人: 项目数}（采购与全部合同中涉及的项目，含未关联项目）
+        """
+        condition = Q(module__in=PERSON_MODULES)
         if self.start_date:
-            contract_qs = contract_qs.filter(signing_date__gte=self.start_date)
+            condition &= Q(event_date__gte=self.start_date)
         if year_filter and year_filter != 'all':
-            contract_qs = contract_qs.filter(signing_date__year=int(year_filter))
+            condition &= period_q('event_date', year_filter)
         if project_filter:
-            contract_qs = contract_qs.filter(project_id=project_filter)
-        project_ids.update(contract_qs.values_list('project_id', flat=True).distinct())
-        
-        return len(project_ids)
+            condition &= Q(project_id=project_filter)
+
+        projects_by_person = defaultdict(set)
+        rows = (
+            UpdateEventFact.objects.filter(condition, responsible_person__isnull=False)
+            .order_by()
+            .values_list('responsible_person', 'project_id')
+            .distinct()
+        )
+        for person_name, project_code in rows:
+            projects_by_person[person_name].add(project_code)
+        return {name: len(codes) for name, codes in projects_by_person.items()}
 
     def get_project_trend_and_problems(self, project_code, year_filter=None, show_all=False):
         """获取单个项目的趋势图和延迟记录
@@ -932,96 +807,36 @@ class UpdateStatisticsService:
         }
 
     def _build_project_summary(self, project_code, year_filter=None):
-        """构建项目统计概要"""
-        procurement_stats = self._calculate_module_update_stats(
-            module='procurement',
-            project_code=project_code,
-            year_filter=year_filter
-        )
-        contract_stats = self._calculate_module_update_stats(
-            module='contract',
-            project_code=project_code,
-            year_filter=year_filter
-        )
-        payment_stats = self._calculate_module_update_stats(
-            module='payment',
-            project_code=project_code,
-            year_filter=year_filter
-        )
-        settlement_stats = self._calculate_module_update_stats(
-            module='settlement',
-            project_code=project_code,
-            year_filter=year_filter
-        )
+        """构建项目统计概要（一次分组查询）"""
+        grouped = self._grouped_module_stats(project_code=project_code, year_filter=year_filter)
+        module_stats = {
+            module: grouped.get((None, module)) or self._empty_stats() for module in UPDATE_MODULES
+        }
 
-        total = (
-            procurement_stats['total'] + contract_stats['total'] +
-            payment_stats['total'] + settlement_stats['total']
-        )
-        updated = (
-            procurement_stats['updated'] + contract_stats['updated'] +
-            payment_stats['updated'] + settlement_stats['updated']
-        )
-        on_time = (
-            procurement_stats['on_time'] + contract_stats['on_time'] +
-            payment_stats['on_time'] + settlement_stats['on_time']
-        )
+        total = sum(stats['total'] for stats in module_stats.values())
+        on_time = sum(stats['on_time'] for stats in module_stats.values())
 
         return {
-            'procurement': procurement_stats,
-            'contract': contract_stats,
-            'payment': payment_stats,
-            'settlement': settlement_stats,
+            **module_stats,
             # 综合准时率：按项目维度将各模块“按时条数/总条数”汇总
             'overall_update_rate': round(on_time / total * 100, 1) if total > 0 else 0,
             # 如有需要未来可以补充 overall_on_time_rate 等其它维度
         }
 
     def _build_person_summary(self, person_name, year_filter=None, project_filter=None):
-        """构建经办人统计概要"""
-        procurement_stats = self._calculate_module_update_stats(
-            module='procurement',
-            person_name=person_name,
-            year_filter=year_filter,
-            project_filter=project_filter
-        )
-        contract_stats = self._calculate_module_update_stats(
-            module='contract',
-            person_name=person_name,
-            year_filter=year_filter,
-            project_filter=project_filter
-        )
-        payment_stats = self._calculate_module_update_stats(
-            module='payment',
-            person_name=person_name,
-            year_filter=year_filter,
-            project_filter=project_filter
-        )
-        settlement_stats = self._calculate_module_update_stats(
-            module='settlement',
-            person_name=person_name,
-            year_filter=year_filter,
-            project_filter=project_filter
+        """构建经办人统计概要（一次分组查询）"""
+        grouped = self._grouped_module_stats(
+            person_name=person_name, year_filter=year_filter, project_filter=project_filter
         )
+        module_stats = {
+            module: grouped.get((None, module)) or self._empty_stats() for module in UPDATE_MODULES
+        }
 
-        total = (
-            procurement_stats['total'] + contract_stats['total'] +
-            payment_stats['total'] + settlement_stats['total']
-        )
-        updated = (
-            procurement_stats['updated'] + contract_stats['updated'] +
-            payment_stats['updated'] + settlement_stats['updated']
-        )
-        on_time = (
-            procurement_stats['on_time'] + contract_stats['on_time'] +
-            payment_stats['on_time'] + settlement_stats['on_time']
-        )
+        total = sum(stats['total'] for stats in module_stats.values())
+        on_time = sum(stats['on_time'] for stats in module_stats.values())
 
         return {
-            'procurement': procurement_stats,
-            'contract': contract_stats,
-            'payment': payment_stats,
-            'settlement': settlement_stats,
+            **module_stats,
             # 综合准时率：按经办人维度汇总
             'overall_update_rate': round(on_time / total * 100, 1) if total > 0 else 0,
         }
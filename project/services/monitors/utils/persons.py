@@ -11,6 +11,7 @@ from typing import List, Dict, Optional
 from procurement.models import Procurement
 from contract.models import Contract
 from django.db.models import Count
+from project.utils.date_helpers import period_q
 
 
 def get_person_list(
@@ -37,7 +38,7 @@ def get_person_list(
 
     if year_filter and year_filter != 'all':
         procurement_officers = procurement_officers.filter(
-            result_publicity_release_date__year=int(year_filter)
+            period_q('result_publicity_release_date', year_filter)
         )
     if global_project:
         procurement_officers = procurement_officers.filter(project_id=global_project)
@@ -50,7 +51,7 @@ def get_person_list(
     ).filter(contract_officer__isnull=False)
 
     if year_filter and year_filter != 'all':
-        contract_officers = contract_officers.filter(signing_date__year=int(year_filter))
+        contract_officers = contract_officers.filter(period_q('signing_date', year_filter))
     if global_project:
         contract_officers = contract_officers.filter(project_id=global_project)
 
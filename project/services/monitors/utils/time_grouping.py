@@ -6,14 +6,150 @@
 """
 from __future__ import annotations
 
-from typing import Iterable, List, Dict, Any
+from collections import defaultdict
+from typing import Iterable, List, Dict, Any, Optional
 
-from django.db.models import Avg
+from django.db.models import Count, Sum
+
+MONTH = 'month'
+HALF_YEAR = 'half_year'
+
+
+class TrendEngine:
+    """
+    趋势计算引擎：一次分组查询得到全部时间段（可选全部序列）的周期合计与数量，
+    再在内存中计算平均周期、排序标签并对齐序列。
+
+    平均周期由“周期合计 / 有周期的记录数”得出，半年度由月度行合并而来，
+    结果与逐月 count() + aggregate(Avg) 一致（按天取整后保留1位小数）。
+
+    用法：
+        engine = TrendEngine(queryset, cycle_field='work_cycle', granularity=HALF_YEAR,
+                             series_field='procurement_officer')
+        engine.series()   # {'张三': [{'year': 2024, 'half': 1, 'period': '2024上半年', ...}], ...}
+        engine.aligned()  # {'labels': [...], 'series': [{'name': '张三', 'data': [...]}]}
+    """
+
+    def __init__(self, queryset, *, cycle_field: str, granularity: str = MONTH,
+                 series_field: Optional[str] = None,
+                 year_field: str = 'business_year', month_field: str = 'business_month'):
+        """
+        Args:
+            queryset: 已带有业务年份/月份字段与周期字段的查询集
+            cycle_field: 周期字段名（如 'archive_cycle' / 'work_cycle' / 'update_cycle'）
+            granularity: MONTH（按月，跨年合并）或 HALF_YEAR（按年+上/下半年）
+            series_field: 序列字段（如经办人、项目编码），为空时只有一条序列
+        """
+        if granularity not in (MONTH, HALF_YEAR):
+            raise ValueError(f'不支持的时间粒度: {granularity}')
+        self.queryset = queryset
+        self.cycle_field = cycle_field
+        self.granularity = granularity
+        self.series_field = series_field
+        self.year_field = year_field
+        self.month_field = month_field
+        self._series = None
+
+    def _rows(self):
+        group_fields = [self.month_field]
+        if self.granularity == HALF_YEAR:
+            group_fields.insert(0, self.year_field)
+        if self.series_field:
+            group_fields.insert(0, self.series_field)
+        return (
+            self.queryset.order_by()
+            .values(*group_fields)
+            .annotate(
+                _count=Count('pk'),
+                _filled=Count(self.cycle_field),
+                _cycle_sum=Sum(self.cycle_field),
+            )
+        )
+
+    def _period_key(self, row):
+        month = row[self.month_field]
+        if self.granularity == MONTH:
+            return (month,)
+        return (row[self.year_field], 1 if month <= 6 else 2)
+
+    @staticmethod
+    def _build_item(key, granularity, count, filled, cycle_sum):
+        avg_td = cycle_sum / filled if filled and cycle_sum is not None else None
+        avg_cycle = round(avg_td.days, 1) if avg_td else 0
+        if granularity == MONTH:
+            month, = key
+            return {'month': month, 'period': f'{month}月', 'avg_cycle': avg_cycle, 'count': count}
+        year, half = key
+        return {
+            'year': year,
+            'half': half,
+            'period': f'{year}{"上" if half == 1 else "下"}半年',
+            'avg_cycle': avg_cycle,
+            'count': count,
+        }
+
+    def series(self) -> Dict[Any, List[Dict[str, Any]]]:
+        """按序列返回趋势列表（序列内按时间排序，只含有数据的时间段）"""
+        if self._series is not None:
+            return self._series
+
+        # {序列: {时间段: [数量, 有周期数量, 周期合计]}}
+        buckets = defaultdict(dict)
+        for row in self._rows():
+            name = row[self.series_field] if self.series_field else None
+            key = self._period_key(row)
+            bucket = buckets[name].setdefault(key, [0, 0, None])
+            bucket[0] += row['_count']
+            bucket[1] += row['_filled']
+            if row['_cycle_sum'] is not None:
+                bucket[2] = row['_cycle_sum'] if bucket[2] is None else bucket[2] + row['_cycle_sum']
+
+        self._series = {
+            name: [
+                self._build_item(key, self.granularity, *periods[key])
+                for key in sorted(periods)
+                if periods[key][0] > 0
+            ]
+            for name, periods in buckets.items()
+        }
+        return self._series
+
+    def trend(self) -> List[Dict[str, Any]]:
+        """单序列趋势（未指定 series_field 时使用）"""
+        if self.series_field:
+            raise ValueError('已指定 series_field，请使用 series() 或 aligned()')
+        return self.series().get(None, [])
+
+    def labels(self) -> List[str]:
+        """全部序列的时间段标签（按时间排序）"""
+        labels = [item['period'] for trend_list in self.series().values() for item in trend_list]
+        if self.granularity == MONTH:
+            return sort_month_labels(labels)
+        return sort_halfyear_labels(labels)
+
+    def aligned(self, names: Optional[Iterable[Any]] = None) -> Dict[str, Any]:
+        """
+        对齐到统一标签序列，缺失位置为 None
+
+        Args:
+            names: 序列顺序（如按业务量排好的前N名），为空时按序列名排序；没有数据的序列跳过
+        """
+        series = self.series()
+        labels = self.labels()
+        if names is None:
+            names = sorted(series, key=lambda name: (name is None, name))
+        return {
+            'labels': labels,
+            'series': [
+                {'name': name, 'data': align_series(series[name], labels)}
+                for name in names if name in series
+            ],
+        }
 
 
 def group_by_month(queryset, *, cycle_field: str) -> List[Dict[str, Any]]:
     """
-    按业务月分组聚合（仅统计有数据的月份）。
+    按业务月分组聚合（仅统计有数据的月份），一次分组查询完成。
 
     Args:
         queryset: 已带有 business_month 字段的查询集
@@ -21,59 +157,16 @@ def group_by_month(queryset, *, cycle_field: str) -> List[Dict[str, Any]]:
     Returns:
         [{'month': 1, 'period': '1月', 'avg_cycle': 12, 'count': 3}, ...]
     """
-    trend: List[Dict[str, Any]] = []
-    for month in range(1, 13):
-        month_qs = queryset.filter(business_month=month)
-        count = month_qs.count()
-        if count > 0:
-            avg_td = month_qs.aggregate(avg=Avg(cycle_field))['avg']
-            avg_cycle = round(avg_td.days, 1) if avg_td else 0
-            trend.append({
-                'month': month,
-                'period': f'{month}月',
-                'avg_cycle': avg_cycle,
-                'count': count,
-            })
-    return trend
+    return TrendEngine(queryset, cycle_field=cycle_field, granularity=MONTH).trend()
 
 
 def group_by_half_year(queryset, *, cycle_field: str) -> List[Dict[str, Any]]:
     """
-    按上/下半年聚合（仅统计有数据的半年）。
+    按上/下半年聚合（仅统计有数据的半年），一次分组查询完成。
 
     要求查询集包含 business_year 和 business_month。
     """
-    trend: List[Dict[str, Any]] = []
-    years = queryset.values_list('business_year', flat=True).distinct().order_by('business_year')
-    for year in years:
-        # 上半年
-        h1_qs = queryset.filter(business_year=year, business_month__lte=6)
-        h1_cnt = h1_qs.count()
-        if h1_cnt > 0:
-            h1_avg_td = h1_qs.aggregate(avg=Avg(cycle_field))['avg']
-            h1_avg = round(h1_avg_td.days, 1) if h1_avg_td else 0
-            trend.append({
-                'year': year,
-                'half': 1,
-                'period': f'{year}上半年',
-                'avg_cycle': h1_avg,
-                'count': h1_cnt,
-            })
-
-        # 下半年
-        h2_qs = queryset.filter(business_year=year, business_month__gt=6)
-        h2_cnt = h2_qs.count()
-        if h2_cnt > 0:
-            h2_avg_td = h2_qs.aggregate(avg=Avg(cycle_field))['avg']
-            h2_avg = round(h2_avg_td.days, 1) if h2_avg_td else 0
-            trend.append({
-                'year': year,
-                'half': 2,
-                'period': f'{year}下半年',
-                'avg_cycle': h2_avg,
-                'count': h2_cnt,
-            })
-    return trend
+    return TrendEngine(queryset, cycle_field=cycle_field, granularity=HALF_YEAR).trend()
 
 
 def sort_halfyear_labels(labels: Iterable[str]) -> List[str]:
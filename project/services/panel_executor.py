@@ -0,0 +1,198 @@
+"""
+面板并发执行器
+
+用于驾驶舱等由多个相互独立的统计面板组成的页面：
+- 在有界线程池中并发计算各面板，页面耗时取决于最慢面板而非所有面板之和；
+- 每个工作线程使用独立数据库连接，任务结束后关闭，避免连接泄漏；
+- 同一面板（相同年度/项目）同时只计算一次：后到的请求等待已在执行或排队的那次计算，
+  不会重复排队占满线程池；
+- 面板结果与降级用的最近一次成功结果存放在统计缓存别名中，各工作进程共享；
+- 每个面板独立缓存、独立超时：超时从面板开始执行时计算，排队等待另有上限；
+  超时或异常时优先返回最近一次成功结果（stale），没有历史结果则返回占位数据（unavailable），
+  不阻塞整个页面；
+- 记录每个面板的耗时与状态，供视图写入响应头。
+"""
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from typing import Any, Callable, Dict, Iterable, Optional, Tuple
+
+from django.db import connections
+
+from project.services.shared.utils import build_cache_key, statistics_cache
+
+logger = logging.getLogger(__name__)
+
+# 线程池大小：面板数量有限，过多线程只会加剧 SQLite 锁竞争
+MAX_PANEL_WORKERS = 4
+# 面板在线程池中排队等待开始执行的最长时间（秒），不计入面板自身的超时
+PANEL_QUEUE_TIMEOUT = 5.0
+# 面板缓存时间（缓存键带数据代数，数据变更后自动失效）
+PANEL_CACHE_TIMEOUT = 10 * 60
+# 最近一次成功结果的保留时间，用于超时/异常时降级展示
+PANEL_STALE_TIMEOUT = 24 * 60 * 60
+
+# 面板状态
+STATUS_FRESH = 'fresh'
+STATUS_CACHED = 'cached'
+STATUS_STALE = 'stale'
+STATUS_UNAVAILABLE = 'unavailable'
+
+_executor: Optional[ThreadPoolExecutor] = None
+# 正在排队或执行的面板计算：缓存键 -> _PanelRun
+_inflight: Dict[str, '_PanelRun'] = {}
+_inflight_lock = threading.Lock()
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    """进程级共享线程池（惰性创建），超时面板在后台继续完成并回填缓存"""
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(max_workers=MAX_PANEL_WORKERS, thread_name_prefix='panel')
+    return _executor
+
+
+class Panel:
+    """
+    面板定义
+
+    Args:
+        name: 面板名称（用于缓存键与响应头）
+        compute: 无参可调用对象，返回面板数据（需可被缓存序列化）
+        timeout: 面板开始执行后等待结果的最长时间（秒）
+        placeholder: 无可用数据时的占位数据工厂
+        queue_timeout: 等待面板开始执行的最长时间（秒），默认 PANEL_QUEUE_TIMEOUT
+        scoped: 面板数据是否随年度/项目筛选变化；为 False 时缓存与在途计算不区分年度与项目
+    """
+
+    def __init__(self, name: str, compute: Callable[[], Any], *, timeout: float = 5.0,
+                 placeholder: Callable[[], Any] = dict, queue_timeout: Optional[float] = None,
+                 scoped: bool = True):
+        self.name = name
+        self.compute = compute
+        self.timeout = timeout
+        self.placeholder = placeholder
+        self.queue_timeout = PANEL_QUEUE_TIMEOUT if queue_timeout is None else queue_timeout
+        self.scoped = scoped
+
+
+class PanelResult:
+    """面板计算结果：数据、状态与耗时（秒）"""
+
+    def __init__(self, name: str, data: Any, status: str, duration: float):
+        self.name = name
+        self.data = data
+        self.status = status
+        self.duration = duration
+
+    @property
+    def is_degraded(self) -> bool:
+        return self.status in (STATUS_STALE, STATUS_UNAVAILABLE)
+
+
+class _PanelRun:
+    """一次面板计算：开始执行的时间点与结果 future，供多个请求共同等待"""
+
+    def __init__(self):
+        self.started = threading.Event()
+        self.started_at: Optional[float] = None
+        self.future = None
+
+
+def _run_in_worker(panel: Panel, cache_key: str, stale_key: str, run: _PanelRun) -> Any:
+    """在工作线程中计算面板并写入缓存，结束后关闭本线程的数据库连接"""
+    run.started_at = time.monotonic()
+    run.started.set()
+    try:
+        data = panel.compute()
+        stats_cache = statistics_cache()
+        stats_cache.set(cache_key, data, PANEL_CACHE_TIMEOUT)
+        stats_cache.set(stale_key, data, PANEL_STALE_TIMEOUT)
+        return data
+    finally:
+        with _inflight_lock:
+            if _inflight.get(cache_key) is run:
+                del _inflight[cache_key]
+        connections.close_all()
+
+
+def _submit(panel: Panel, cache_key: str, stale_key: str) -> _PanelRun:
+    """提交面板计算；同一缓存键已在排队或执行时复用那次计算"""
+    with _inflight_lock:
+        run = _inflight.get(cache_key)
+        if run is None:
+            run = _PanelRun()
+            _inflight[cache_key] = run
+            run.future = _get_executor().submit(_run_in_worker, panel, cache_key, stale_key, run)
+    return run
+
+
+def _wait(panel: Panel, run: _PanelRun, queued_at: float) -> Any:
+    """等待面板结果：先等待开始执行（queue_timeout），再从开始执行时起计算面板超时"""
+    if not run.started.wait(max(0.0, panel.queue_timeout - (time.monotonic() - queued_at))):
+        raise FutureTimeoutError()
+    return run.future.result(timeout=max(0.0, panel.timeout - (time.monotonic() - run.started_at)))
+
+
+def run_panels(
+    panels: Iterable[Panel],
+    year: Optional[int] = None,
+    project_codes: Tuple[str, ...] = (),
+    *,
+    namespace: str = 'panel',
+) -> Dict[str, PanelResult]:
+    """
+    并发计算面板，返回 {面板名称: PanelResult}
+
+    缓存命中的面板直接返回；其余面板提交到线程池（已在计算的面板复用那次计算），
+    按各自超时等待，超时或异常的面板降级为 stale/unavailable。
+    """
+    results: Dict[str, PanelResult] = {}
+    pending = []
+
+    for panel in panels:
+        panel_year, panel_codes = (year, project_codes) if panel.scoped else (None, ())
+        cache_key = build_cache_key(panel.name, panel_year, panel_codes, namespace=namespace)
+        stale_key = f'{namespace}:stale:{panel.name}:{panel_year if panel_year is not None else "all"}:' \
+                    f'{",".join(panel_codes) if panel_codes else "all"}'
+        cached = statistics_cache().get(cache_key)
+        if cached is not None:
+            results[panel.name] = PanelResult(panel.name, cached, STATUS_CACHED, 0.0)
+            continue
+        pending.append((panel, stale_key, _submit(panel, cache_key, stale_key), time.monotonic()))
+
+    for panel, stale_key, run, queued_at in pending:
+        try:
+            data = _wait(panel, run, queued_at)
+            status = STATUS_FRESH
+        except FutureTimeoutError:
+            logger.warning('面板 %s 计算超时（>%.1fs），降级展示', panel.name, panel.timeout)
+            data, status = _fallback(panel, stale_key)
+        except Exception:
+            logger.exception('面板 %s 计算失败，降级展示', panel.name)
+            data, status = _fallback(panel, stale_key)
+        results[panel.name] = PanelResult(panel.name, data, status, time.monotonic() - queued_at)
+
+    return results
+
+
+def _fallback(panel: Panel, stale_key: str) -> Tuple[Any, str]:
+    """降级数据：优先最近一次成功结果，否则为占位数据"""
+    stale = statistics_cache().get(stale_key)
+    if stale is not None:
+        return stale, STATUS_STALE
+    return panel.placeholder(), STATUS_UNAVAILABLE
+
+
+def format_timing_header(results: Dict[str, PanelResult]) -> str:
+    """
+    生成面板耗时响应头（Server-Timing 格式），例如：
+    `archive;dur=120.5;desc="fresh", update;dur=0.0;desc="cached"`
+    """
+    return ', '.join(
+        f'{name};dur={result.duration * 1000:.1f};desc="{result.status}"'
+        for name, result in results.items()
+    )
@@ -3,7 +3,7 @@
 根据指标体系需求文档第6章实现
 提供项目和个人在采购、归档、合同、结算等维度的业务排名功能
 """
-from django.db.models import Count, Q, Avg, F, ExpressionWrapper, fields, Sum, Min, Max, Value, DecimalField
+from django.db.models import Count, Q, Avg, F, ExpressionWrapper, fields, Sum, Min, Max, Value, DecimalField, CharField
 from django.db.models.functions import Coalesce
 from datetime import datetime, timedelta
 from procurement.models import Procurement
@@ -11,7 +11,9 @@ from contract.models import Contract
 from settlement.models import Settlement
 from payment.models import Payment
 from project.models import Project
+from project.services.monitors.cycle_rules import PROCUREMENT_CYCLE_RULE
 from project.services.shared.utils import percent as _percent
+from project.utils.date_helpers import period_q
 
 
 def get_medal(rank):
@@ -34,6 +36,58 @@ def get_medal(rank):
 
 # ==================== 6.3 采购模块业务排名 ====================
 
+def _procurement_on_time_queryset(year=None):
+    """采购准时完成率的基础查询集：仅包含有计划完成日期和实际公示日期的记录"""
+    queryset = Procurement.objects.filter(
+        planned_completion_date__isnull=False,
+        result_publicity_release_date__isnull=False
+    )
+    # 年份筛选 - 基于result_publicity_release_date
+    if year:
+        queryset = queryset.filter(period_q('result_publicity_release_date', year))
+    return queryset
+
+
+def _annotate_procurement_on_time(queryset, *group_fields):
+    """按维度分组统计总数、按时完成数与平均提前天数（单条GROUP BY查询）"""
+    return queryset.values(*group_fields).annotate(
+        total_count=Count('procurement_code'),
+        # 按时完成：result_publicity_release_date <= planned_completion_date
+        on_time_count=Count('procurement_code', filter=Q(
+            result_publicity_release_date__lte=F('planned_completion_date')
+        )),
+        # 计算平均提前天数（负数表示延期）
+        avg_advance_days=Avg(
+            ExpressionWrapper(
+                F('planned_completion_date') - F('result_publicity_release_date'),
+                output_field=fields.DurationField()
+            )
+        )
+    )
+
+
+def _procurement_cycle_queryset(year=None, method=None):
+    """采购周期的基础查询集：仅包含有需求审批日期和公示日期的记录"""
+    queryset = Procurement.objects.filter(
+        requirement_approval_date__isnull=False,
+        result_publicity_release_date__isnull=False
+    )
+    if year:
+        queryset = queryset.filter(period_q('result_publicity_release_date', year))
+    if method:
+        queryset = queryset.filter(procurement_method=method)
+    return queryset
+
+
+def _annotate_procurement_cycle(queryset, *group_fields):
+    """按维度分组统计总数、平均采购周期与按规定周期完成数（单条GROUP BY查询）"""
+    return PROCUREMENT_CYCLE_RULE.annotate(queryset).values(*group_fields).annotate(
+        total_count=Count('procurement_code'),
+        avg_cycle=Avg('work_cycle'),
+        on_time_count=Count('procurement_code', filter=PROCUREMENT_CYCLE_RULE.on_time_q()),
+    )
+
+
 def get_procurement_on_time_ranking(rank_type='project', year=None):
     """
     6.3.1 采购计划准时完成率排名
@@ -49,42 +103,16 @@ def get_procurement_on_time_ranking(rank_type='project', year=None):
     Returns:
         list: 排名列表
     """
-    # 优化查询 - 使用select_related和only
-    queryset = Procurement.objects.select_related('project').only(
-        'procurement_code', 'project_name', 'procurement_officer',
-        'planned_completion_date', 'result_publicity_release_date',
-        'project__project_code', 'project__project_name'
-    )
-    
-    # 年份筛选 - 基于result_publicity_release_date
-    if year:
-        queryset = queryset.filter(result_publicity_release_date__year=year)
-    
-    # 只统计有计划完成日期和实际公示日期的记录
-    queryset = queryset.filter(
-        planned_completion_date__isnull=False,
-        result_publicity_release_date__isnull=False
-    )
+    queryset = _procurement_on_time_queryset(year)
     
     if rank_type == 'project':
         # 获取所有项目
-        all_projects = Project.objects.all()
+        all_projects = Project.objects.only('project_code', 'project_name')
         project_data = {}
         
         # 统计有数据的项目
-        rankings = queryset.values('project__project_code', 'project__project_name').annotate(
-            total_count=Count('procurement_code'),
-            # 按时完成：result_publicity_release_date <= planned_completion_date
-            on_time_count=Count('procurement_code', filter=Q(
-                result_publicity_release_date__lte=F('planned_completion_date')
-            )),
-            # 计算平均提前天数（负数表示延期）
-            avg_advance_days=Avg(
-                ExpressionWrapper(
-                    F('planned_completion_date') - F('result_publicity_release_date'),
-                    output_field=fields.DurationField()
-                )
-            )
+        rankings = _annotate_procurement_on_time(
+            queryset, 'project__project_code', 'project__project_name'
         ).order_by('-on_time_count', '-total_count')
         
         # 构建项目数据字典
@@ -141,17 +169,8 @@ def get_procurement_on_time_ranking(rank_type='project', year=None):
             item['medal'] = get_medal(idx)
     else:
         # 按采购经办人排名
-        rankings = queryset.values('procurement_officer').annotate(
-            total_count=Count('procurement_code'),
-            on_time_count=Count('procurement_code', filter=Q(
-                result_publicity_release_date__lte=F('planned_completion_date')
-            )),
-            avg_advance_days=Avg(
-                ExpressionWrapper(
-                    F('planned_completion_date') - F('result_publicity_release_date'),
-                    output_field=fields.DurationField()
-                )
-            )
+        rankings = _annotate_procurement_on_time(
+            queryset, 'procurement_officer'
         ).order_by('-on_time_count', '-total_count')
         
         result = []
@@ -200,40 +219,16 @@ def get_procurement_cycle_ranking(rank_type='project', year=None, method=None):
     Returns:
         list: 排名列表（按平均周期升序，周期越短排名越高）
     """
-    # 优化查询 - 使用select_related和only
-    queryset = Procurement.objects.select_related('project').only(
-        'procurement_code', 'project_name', 'procurement_officer',
-        'procurement_method', 'requirement_approval_date',
-        'result_publicity_release_date',
-        'project__project_code', 'project__project_name'
-    )
-    
-    if year:
-        queryset = queryset.filter(result_publicity_release_date__year=year)
-    
-    if method:
-        queryset = queryset.filter(procurement_method=method)
-    
-    # 只统计有需求审批日期和公示日期的记录
-    queryset = queryset.filter(
-        requirement_approval_date__isnull=False,
-        result_publicity_release_date__isnull=False
-    )
+    queryset = _procurement_cycle_queryset(year, method)
     
     if rank_type == 'project':
         # 获取所有项目
-        all_projects = Project.objects.all()
+        all_projects = Project.objects.only('project_code', 'project_name')
         project_data = {}
         
         # 统计有数据的项目
-        rankings = queryset.values('project__project_code', 'project__project_name').annotate(
-            total_count=Count('procurement_code'),
-            avg_cycle=Avg(
-                ExpressionWrapper(
-                    F('result_publicity_release_date') - F('requirement_approval_date'),
-                    output_field=fields.DurationField()
-                )
-            )
+        rankings = _annotate_procurement_cycle(
+            queryset, 'project__project_code', 'project__project_name'
         ).order_by('avg_cycle')  # 升序：周期越短排名越高
         
         # 构建项目数据字典
@@ -248,7 +243,8 @@ def get_procurement_cycle_ranking(rank_type='project', year=None, method=None):
             code = project.project_code
             item = project_data.get(code, {
                 'total_count': 0,
-                'avg_cycle': None
+                'avg_cycle': None,
+                'on_time_count': 0
             })
             
             avg_days = item['avg_cycle'].days if item['avg_cycle'] else 0
@@ -259,6 +255,7 @@ def get_procurement_cycle_ranking(rank_type='project', year=None, method=None):
                 'project_code': project.project_code,
                 'total_count': item['total_count'],
                 'avg_cycle_days': avg_days,
+                'on_time_rate': _percent(item['on_time_count'], item['total_count']),
                 'medal': get_medal(rank_idx)
             })
             rank_idx += 1
@@ -271,14 +268,8 @@ def get_procurement_cycle_ranking(rank_type='project', year=None, method=None):
             item['rank'] = idx
             item['medal'] = get_medal(idx)
     else:
-        rankings = queryset.values('procurement_officer').annotate(
-            total_count=Count('procurement_code'),
-            avg_cycle=Avg(
-                ExpressionWrapper(
-                    F('result_publicity_release_date') - F('requirement_approval_date'),
-                    output_field=fields.DurationField()
-                )
-            )
+        rankings = _annotate_procurement_cycle(
+            queryset, 'procurement_officer'
         ).order_by('avg_cycle')
         
         result = []
@@ -290,6 +281,7 @@ def get_procurement_cycle_ranking(rank_type='project', year=None, method=None):
                 'name': item['procurement_officer'] or '未指定',
                 'total_count': item['total_count'],
                 'avg_cycle_days': avg_days,
+                'on_time_rate': _percent(item['on_time_count'], item['total_count']),
                 'medal': get_medal(idx)
             })
     
@@ -319,7 +311,7 @@ def get_procurement_quantity_ranking(rank_type='project', year=None):
     ).filter(result_publicity_release_date__isnull=False)
     
     if year:
-        queryset = queryset.filter(result_publicity_release_date__year=year)
+        queryset = queryset.filter(period_q('result_publicity_release_date', year))
         months = 12
     else:
         # 计算实际跨度月数
@@ -405,6 +397,120 @@ def get_procurement_quantity_ranking(rank_type='project', year=None):
 
 # ==================== 6.4 归档模块业务排名 ====================
 
+# 归档及时标准：基准日期 + N天内归档视为及时
+PROCUREMENT_ARCHIVE_DEADLINE_DAYS = 40
+CONTRACT_ARCHIVE_DEADLINE_DAYS = 30
+
+# 归档统计数据源：(数据源键, 模型, 基准日期字段, 及时期限天数, {排名维度: 分组字段})
+_ARCHIVE_SOURCES = (
+    ('procurement', Procurement, 'result_publicity_release_date', PROCUREMENT_ARCHIVE_DEADLINE_DAYS,
+     {'project': 'project__project_code', 'person': 'procurement_officer'}),
+    ('contract', Contract, 'signing_date', CONTRACT_ARCHIVE_DEADLINE_DAYS,
+     {'project': 'project__project_code', 'person': 'contract_officer'}),
+)
+
+_EMPTY_ARCHIVE_STATS = {'total': 0, 'timely': 0, 'archived': 0, 'avg_cycle': None}
+
+
+def _aggregate_archive_stats(rank_type='project', year=None):
+    """
+    归档维度分组聚合引擎
+    
+    每个数据源（采购、合同）只执行一条 values().annotate() 查询，
+    使用条件计数一次性得到所有项目（或经办人）的应归档数、及时归档数、
+    已归档数和平均归档周期，查询数量与项目/人员数量无关。
+    
+    Args:
+        rank_type: 'project'（按项目编码分组）或 'person'（按经办人分组）
+        year: 指定年份（按各数据源的基准日期筛选）
+        
+    Returns:
+        dict: {维度值: {'procurement': stats, 'contract': stats}}，
+              stats 包含 total/timely/archived/avg_cycle，维度值为空时归为 ''
+    """
+    stats = {}
+    for source, model, base_field, deadline_days, group_fields in _ARCHIVE_SOURCES:
+        queryset = model.objects.filter(**{f'{base_field}__isnull': False})
+        if year:
+            queryset = queryset.filter(period_q(base_field, year))
+        
+        archived = Q(archive_date__isnull=False)
+        rows = queryset.annotate(
+            dimension=Coalesce(F(group_fields[rank_type]), Value(''), output_field=CharField())
+        ).values('dimension').annotate(
+            total=Count('pk'),
+            timely=Count('pk', filter=archived & Q(
+                archive_date__lte=F(base_field) + timedelta(days=deadline_days)
+            )),
+            archived=Count('pk', filter=archived),
+            avg_cycle=Avg(
+                ExpressionWrapper(F('archive_date') - F(base_field), output_field=fields.DurationField()),
+                filter=archived
+            ),
+        ).order_by()
+        
+        for row in rows:
+            stats.setdefault(row.pop('dimension'), {})[source] = row
+    return stats
+
+
+def _archive_subjects(rank_type, stats):
+    """
+    返回排名主体列表 [(维度值, 显示名称, 项目编码)]
+    
+    按项目排名时包含所有项目（与其他项目维度排名保持一致），
+    按人员排名时仅包含有归档数据的经办人。
+    """
+    if rank_type == 'project':
+        return [
+            (project.project_code, project.project_name, project.project_code)
+            for project in Project.objects.only('project_code', 'project_name')
+        ]
+    return [(name, name or '未指定', None) for name in stats]
+
+
+def _average_archive_cycle_days(proc_stats, contract_stats):
+    """合并采购与合同的平均归档周期（天）：两者都有时取简单平均"""
+    proc_avg = proc_stats['avg_cycle']
+    contract_avg = contract_stats['avg_cycle']
+    if proc_avg and contract_avg:
+        return (proc_avg.days + contract_avg.days) / 2
+    if proc_avg:
+        return proc_avg.days
+    if contract_avg:
+        return contract_avg.days
+    return 0
+
+
+def _build_archive_timeliness_items(rank_type='project', year=None):
+    """基于分组聚合结果构建归档及时率条目（未排序），跳过无应归档数据的主体"""
+    stats = _aggregate_archive_stats(rank_type, year)
+    items = []
+    for key, name, project_code in _archive_subjects(rank_type, stats):
+        entry = stats.get(key, {})
+        proc = entry.get('procurement', _EMPTY_ARCHIVE_STATS)
+        contract = entry.get('contract', _EMPTY_ARCHIVE_STATS)
+        
+        total = proc['total'] + contract['total']
+        if total == 0:
+            continue
+        timely = proc['timely'] + contract['timely']
+        
+        item = {
+            'name': name,
+            'total_count': total,
+            'timely_count': timely,
+            'timely_rate': round(timely / total * 100, 1),
+            'avg_cycle_days': int(_average_archive_cycle_days(proc, contract)),
+            'procurement': {'total': proc['total'], 'timely': proc['timely']},
+            'contract': {'total': contract['total'], 'timely': contract['timely']}
+        }
+        if project_code is not None:
+            item['project_code'] = project_code
+        items.append(item)
+    return items
+
+
 def get_archive_timeliness_ranking(rank_type='project', year=None):
     """
     6.4.1 归档及时率排名
@@ -417,93 +523,23 @@ def get_archive_timeliness_ranking(rank_type='project', year=None):
     - 合同资料：归档日期 ≤ 合同签订日期 + 30天
     
     Args:
-        rank_type: 'project' 或 'person'
+        rank_type: 'project' 或 'person'（采购经办人与合同经办人合并统计）
         year: 指定年份
         
     Returns:
         list: 排名列表
     """
-    if rank_type == 'project':
-        result = []
-        projects = Project.objects.all()
-        
-        for project in projects:
-            # 采购归档统计
-            proc_qs = Procurement.objects.filter(project=project, result_publicity_release_date__isnull=False)
-            if year:
-                proc_qs = proc_qs.filter(result_publicity_release_date__year=year)
-            
-            proc_total = proc_qs.count()
-            proc_timely = proc_qs.filter(
-                archive_date__isnull=False,
-                archive_date__lte=F('result_publicity_release_date') + timedelta(days=40)
-            ).count()
-            
-            # 合同归档统计
-            contract_qs = Contract.objects.filter(project=project, signing_date__isnull=False)
-            if year:
-                contract_qs = contract_qs.filter(signing_date__year=year)
-            
-            contract_total = contract_qs.count()
-            contract_timely = contract_qs.filter(
-                archive_date__isnull=False,
-                archive_date__lte=F('signing_date') + timedelta(days=30)
-            ).count()
-            
-            total = proc_total + contract_total
-            timely = proc_timely + contract_timely
-            
-            if total > 0:
-                timely_rate = (timely / total * 100)
-                
-                # 计算平均归档周期
-                proc_avg = proc_qs.filter(archive_date__isnull=False).aggregate(
-                    avg=Avg(ExpressionWrapper(
-                        F('archive_date') - F('result_publicity_release_date'),
-                        output_field=fields.DurationField()
-                    ))
-                )['avg']
-                
-                contract_avg = contract_qs.filter(archive_date__isnull=False).aggregate(
-                    avg=Avg(ExpressionWrapper(
-                        F('archive_date') - F('signing_date'),
-                        output_field=fields.DurationField()
-                    ))
-                )['avg']
-                
-                avg_cycle_days = 0
-                if proc_avg and contract_avg:
-                    avg_cycle_days = (proc_avg.days + contract_avg.days) / 2
-                elif proc_avg:
-                    avg_cycle_days = proc_avg.days
-                elif contract_avg:
-                    avg_cycle_days = contract_avg.days
-                
-                result.append({
-                    'name': project.project_name,
-                    'project_code': project.project_code,
-                    'total_count': total,
-                    'timely_count': timely,
-                    'timely_rate': round(timely_rate, 1),
-                    'avg_cycle_days': int(avg_cycle_days),
-                    'procurement': {'total': proc_total, 'timely': proc_timely},
-                    'contract': {'total': contract_total, 'timely': contract_timely}
-                })
-        
-        # 按及时率排序
-        result.sort(key=lambda x: x['timely_rate'], reverse=True)
-        
-        # 添加排名和奖牌
-        for idx, item in enumerate(result, 1):
-            item['rank'] = idx
-            item['medal'] = get_medal(idx)
-        
-        return result
-    else:
-        # 按个人排名（采购经办人和合同经办人）
-        result = []
-        # TODO: 实现按个人的归档及时率排名
-        return result
+    result = _build_archive_timeliness_items(rank_type, year)
+    
+    # 按及时率排序
+    result.sort(key=lambda x: x['timely_rate'], reverse=True)
+    
+    # 添加排名和奖牌
+    for idx, item in enumerate(result, 1):
+        item['rank'] = idx
+        item['medal'] = get_medal(idx)
+    
+    return result
 
 
 def get_archive_speed_ranking(rank_type='project', year=None):
@@ -516,82 +552,39 @@ def get_archive_speed_ranking(rank_type='project', year=None):
     平均归档周期 = 所有归档周期的平均值
     
     Args:
-        rank_type: 'project' 或 'person'
+        rank_type: 'project' 或 'person'（采购经办人与合同经办人合并统计）
         year: 指定年份
         
     Returns:
         list: 排名列表（按平均归档周期升序，周期越短排名越高）
     """
-    if rank_type == 'project':
-        result = []
-        projects = Project.objects.all()
-        
-        for project in projects:
-            # 采购归档
-            proc_qs = Procurement.objects.filter(
-                project=project,
-                archive_date__isnull=False,
-                result_publicity_release_date__isnull=False
-            )
-            if year:
-                proc_qs = proc_qs.filter(result_publicity_release_date__year=year)
-            
-            # 合同归档
-            contract_qs = Contract.objects.filter(
-                project=project,
-                archive_date__isnull=False,
-                signing_date__isnull=False
-            )
-            if year:
-                contract_qs = contract_qs.filter(signing_date__year=year)
-            
-            total_count = proc_qs.count() + contract_qs.count()
-            
-            # 计算平均归档周期（即使没有数据也要包含）
-            avg_cycle_days = 0
-            if total_count > 0:
-                proc_avg = proc_qs.aggregate(
-                    avg=Avg(ExpressionWrapper(
-                        F('archive_date') - F('result_publicity_release_date'),
-                        output_field=fields.DurationField()
-                    ))
-                )['avg']
-                
-                contract_avg = contract_qs.aggregate(
-                    avg=Avg(ExpressionWrapper(
-                        F('archive_date') - F('signing_date'),
-                        output_field=fields.DurationField()
-                    ))
-                )['avg']
-                
-                if proc_avg and contract_avg:
-                    avg_cycle_days = (proc_avg.days + contract_avg.days) / 2
-                elif proc_avg:
-                    avg_cycle_days = proc_avg.days
-                elif contract_avg:
-                    avg_cycle_days = contract_avg.days
-            
-            # 包含所有项目，包括没有归档数据的项目
-            result.append({
-                'name': project.project_name,
-                'project_code': project.project_code,
-                'total_count': total_count,
-                'avg_cycle_days': int(avg_cycle_days)
-            })
-        
-        # 按平均周期排序（没有数据的项目排在后面）
-        result.sort(key=lambda x: (x['avg_cycle_days'] == 0, x['avg_cycle_days']))
-        
-        # 添加排名和奖牌
-        for idx, item in enumerate(result, 1):
-            item['rank'] = idx
-            item['medal'] = get_medal(idx)
+    stats = _aggregate_archive_stats(rank_type, year)
+    result = []
+    
+    for key, name, project_code in _archive_subjects(rank_type, stats):
+        entry = stats.get(key, {})
+        proc = entry.get('procurement', _EMPTY_ARCHIVE_STATS)
+        contract = entry.get('contract', _EMPTY_ARCHIVE_STATS)
         
-        return result
-    else:
-        result = []
-        # TODO: 实现按个人的归档速度排名
-        return result
+        # 包含所有项目，包括没有归档数据的项目
+        item = {
+            'name': name,
+            'total_count': proc['archived'] + contract['archived'],
+            'avg_cycle_days': int(_average_archive_cycle_days(proc, contract))
+        }
+        if project_code is not None:
+            item['project_code'] = project_code
+        result.append(item)
+    
+    # 按平均周期排序（没有数据的项目排在后面）
+    result.sort(key=lambda x: (x['avg_cycle_days'] == 0, x['avg_cycle_days']))
+    
+    # 添加排名和奖牌
+    for idx, item in enumerate(result, 1):
+        item['rank'] = idx
+        item['medal'] = get_medal(idx)
+    
+    return result
 
 
 # ==================== 综合排名函数（兼容旧视图）====================
@@ -625,7 +618,7 @@ def get_contract_ranking(rank_type='project', year=None):
     )
     
     if year:
-        queryset = queryset.filter(signing_date__year=year)
+        queryset = queryset.filter(period_q('signing_date', year))
     
     if rank_type == 'project':
         # 获取所有项目
@@ -750,23 +743,38 @@ def get_comprehensive_ranking(year=None):
     Returns:
         list: 综合排名列表
     """
-    projects = Project.objects.all()
+    projects = Project.objects.only('project_code', 'project_name')
     result = []
     
-    # 获取各项排名数据
-    procurement_on_time_data = {item['project_code']: item for item in get_procurement_on_time_ranking('project', year)}
-    procurement_cycle_data = {item['project_code']: item for item in get_procurement_cycle_ranking('project', year)}
-    archive_data = {item['project_code']: item for item in get_archive_timeliness_ranking('project', year)}
+    # 复用分组聚合结果（每个维度一条GROUP BY查询），不再构建三份完整排名
+    procurement_on_time_data = {
+        row['project__project_code']: row
+        for row in _annotate_procurement_on_time(
+            _procurement_on_time_queryset(year), 'project__project_code'
+        ).order_by()
+    }
+    procurement_cycle_data = {
+        row['project__project_code']: row
+        for row in _annotate_procurement_cycle(
+            _procurement_cycle_queryset(year), 'project__project_code'
+        ).order_by()
+    }
+    archive_stats = _aggregate_archive_stats('project', year)
     
     for project in projects:
         code = project.project_code
         
         # 采购准时完成率得分（0-100）
-        proc_on_time_score = procurement_on_time_data.get(code, {}).get('on_time_rate', 0)
+        on_time_item = procurement_on_time_data.get(code)
+        proc_on_time_score = (
+            _percent(on_time_item['on_time_count'], on_time_item['total_count']) if on_time_item else 0
+        )
         
         # 采购周期效率得分（需要计算相对得分）
-        proc_cycle_item = procurement_cycle_data.get(code, {})
-        proc_cycle_days = proc_cycle_item.get('avg_cycle_days', 0)
+        proc_cycle_item = procurement_cycle_data.get(code)
+        proc_cycle_days = (
+            proc_cycle_item['avg_cycle'].days if proc_cycle_item and proc_cycle_item['avg_cycle'] else 0
+        )
         # 假设基准周期为45天，周期越短得分越高
         if proc_cycle_days > 0:
             proc_cycle_score = max(0, (1 - proc_cycle_days / 45) * 100)
@@ -774,7 +782,14 @@ def get_comprehensive_ranking(year=None):
             proc_cycle_score = 0
         
         # 归档及时率得分（0-100）
-        archive_score = archive_data.get(code, {}).get('timely_rate', 0)
+        archive_entry = archive_stats.get(code, {})
+        archive_proc = archive_entry.get('procurement', _EMPTY_ARCHIVE_STATS)
+        archive_contract = archive_entry.get('contract', _EMPTY_ARCHIVE_STATS)
+        archive_total = archive_proc['total'] + archive_contract['total']
+        archive_score = (
+            round((archive_proc['timely'] + archive_contract['timely']) / archive_total * 100, 1)
+            if archive_total else 0
+        )
         
         # 数据齐全率得分（暂时使用100，待实现数据齐全性检查）
         data_quality_score = 100
@@ -0,0 +1,151 @@
+"""
+全文检索索引（SQLite FTS5）
+
+为采购、合同、项目、供应商评价的可搜索文本字段维护一张 FTS5 影子表（trigram 分词，适合中文子串匹配），
+每条业务记录的每个非空字段一行：(model, source_pk, field, value)。
+- 由各模型的保存/删除信号增量维护（见 project/signals.py），批量写入需调用 refresh_search_index；
+- 数据不一致时可执行 python manage.py rebuild_search_index 全量重建；
+- project/utils/filters 的模糊筛选在索引可用时改走索引，非 SQLite 数据库、索引表不存在、
+  关键字短于 3 个字符（trigram 无法命中）或字段未建索引时退回 icontains。
+"""
+from __future__ import annotations
+
+from typing import Iterable, Optional, Sequence
+
+from django.db import connections, router
+from django.db.models.expressions import RawSQL
+
+from project.services.shared.utils import in_query_batches
+
+SEARCH_INDEX_TABLE = 'project_search_index'
+
+# trigram 分词下 MATCH 需要至少 3 个字符
+MIN_KEYWORD_LENGTH = 3
+
+# 各模型参与全文检索的文本字段
+SEARCH_INDEX_FIELDS = {
+    'project.Project': [
+        'project_code', 'project_name', 'project_manager',
+    ],
+    'procurement.Procurement': [
+        'procurement_code', 'project_name', 'procurement_category', 'procurement_method',
+        'procurement_unit', 'procurement_platform', 'procurement_officer',
+        'qualification_review_method', 'bid_evaluation_method', 'bid_awarding_method',
+        'demand_department', 'demand_contact', 'winning_bidder', 'winning_contact',
+        'evaluation_committee', 'bid_guarantee', 'performance_guarantee',
+        'candidate_publicity_issue', 'non_bidding_explanation',
+    ],
+    'contract.Contract': [
+        'contract_code', 'contract_sequence', 'contract_name', 'contract_officer',
+        'party_a', 'party_a_legal_representative', 'party_a_contact_person', 'party_a_manager',
+        'party_b', 'party_b_legal_representative', 'party_b_contact_person', 'party_b_manager',
+    ],
+    'supplier_eval.SupplierEvaluation': [
+        'evaluation_code', 'supplier_name', 'evaluator', 'evaluation_period', 'remarks',
+    ],
+}
+
+CREATE_TABLE_SQL = (
+    f"CREATE VIRTUAL TABLE IF NOT EXISTS {SEARCH_INDEX_TABLE} USING fts5("
+    "model UNINDEXED, source_pk UNINDEXED, field UNINDEXED, value, tokenize='trigram')"
+)
+DROP_TABLE_SQL = f"DROP TABLE IF EXISTS {SEARCH_INDEX_TABLE}"
+
+# (数据库别名, 数据库名) -> 索引表是否存在；测试数据库名称不同，不会复用正式库的判断
+_availability = {}
+
+
+def _get_model(label, apps=None):
+    if apps is None:
+        from django.apps import apps
+    return apps.get_model(label)
+
+
+def search_index_available(using: str = 'default') -> bool:
+    """当前数据库是否可使用全文检索索引（SQLite 且索引表已建立）"""
+    connection = connections[using]
+    if connection.vendor != 'sqlite':
+        return False
+    key = (using, str(connection.settings_dict.get('NAME')))
+    if key not in _availability:
+        _availability[key] = SEARCH_INDEX_TABLE in connection.introspection.table_names()
+    return _availability[key]
+
+
+def reset_search_index_availability() -> None:
+    """建表/删表后清除缓存的可用性判断"""
+    _availability.clear()
+
+
+def refresh_search_index(label: str, pks: Iterable, *, using: Optional[str] = None, apps=None) -> int:
+    """
+    重算指定记录的索引行，返回写入的行数
+
+    先删除旧行再按业务表当前数据写入；记录已删除时只删除。
+    """
+    model = _get_model(label, apps)
+    using = using or router.db_for_write(model)
+    if not search_index_available(using):
+        return 0
+
+    fields = SEARCH_INDEX_FIELDS[label]
+    pk_name = model._meta.pk.name
+    written = 0
+    with connections[using].cursor() as cursor:
+        for batch in in_query_batches(str(pk) for pk in pks if pk):
+            placeholders = ','.join(['%s'] * len(batch))
+            cursor.execute(
+                f"DELETE FROM {SEARCH_INDEX_TABLE} WHERE model = %s AND source_pk IN ({placeholders})",
+                [label, *batch],
+            )
+            rows = model._default_manager.using(using).filter(pk__in=batch).order_by().values_list(pk_name, *fields)
+            entries = [
+                (label, str(row[0]), field, str(value))
+                for row in rows
+                for field, value in zip(fields, row[1:])
+                if value not in (None, '')
+            ]
+            if entries:
+                cursor.executemany(
+                    f"INSERT INTO {SEARCH_INDEX_TABLE} (model, source_pk, field, value) VALUES (%s, %s, %s, %s)",
+                    entries,
+                )
+            written += len(entries)
+    return written
+
+
+def rebuild_search_index(labels: Optional[Sequence[str]] = None, *, using: str = 'default', apps=None) -> int:
+    """全量重建指定模型（默认全部）的索引行，返回写入的行数"""
+    if not search_index_available(using):
+        return 0
+    written = 0
+    for label in labels or SEARCH_INDEX_FIELDS:
+        model = _get_model(label, apps)
+        with connections[using].cursor() as cursor:
+            cursor.execute(f"DELETE FROM {SEARCH_INDEX_TABLE} WHERE model = %s", [label])
+        pks = model._default_manager.using(using).order_by().values_list('pk', flat=True)
+        written += refresh_search_index(label, pks, using=using, apps=apps)
+    return written
+
+
+def keyword_subquery(model, fields: Sequence[str], keyword: str):
+    """
+    关键字命中记录的主键子查询（任一字段包含关键字）
+
+    无法使用索引时返回 None，由调用方退回 icontains。
+    """
+    label = model._meta.label
+    indexed = SEARCH_INDEX_FIELDS.get(label)
+    if not indexed or not fields or any(field not in indexed for field in fields):
+        return None
+    if len(keyword) < MIN_KEYWORD_LENGTH or not search_index_available(router.db_for_read(model)):
+        return None
+
+    # 整个关键字作为短语匹配，双引号按 FTS5 语法转义
+    phrase = '"' + keyword.replace('"', '""') + '"'
+    placeholders = ','.join(['%s'] * len(fields))
+    return RawSQL(
+        f"SELECT source_pk FROM {SEARCH_INDEX_TABLE} "
+        f"WHERE {SEARCH_INDEX_TABLE} MATCH %s AND model = %s AND field IN ({placeholders})",
+        [phrase, label, *fields],
+    )
@@ -1,13 +1,17 @@
 """
 共享工具方法（仅内部复用，不改变对外行为）：
 - 年份与项目编码归一化
-- 缓存键构造（与现有metrics一致的格式）
+- 缓存键构造（与现有metrics一致的格式，附带缓存代数）
+- 缓存代数（generation）读取与更新，用于事件驱动的缓存失效
+- 统计缓存（跨进程共享的缓存别名，代数键与依赖代数的缓存都存放在这里）
+- 按 IN 查询上限分批（派生表按主键集合批量重算时共用）
 - 安全比率/百分比计算
 """
 from __future__ import annotations
 
+import time
 from functools import lru_cache
-from typing import Iterable, Optional, Sequence, Tuple
+from typing import Iterable, Iterator, List, Optional, Sequence, Tuple
 
 
 def normalize_year(year: Optional[int]) -> Optional[int]:
@@ -23,11 +27,104 @@ def normalize_project_codes(codes: Optional[Sequence[str]]) -> Tuple[str, ...]:
     return tuple(sorted(filtered))
 
 
+# 统计缓存别名（见 settings.CACHES）：必须是跨进程共享的后端（文件缓存、数据库缓存或 Redis），
+# 否则一个进程递增的代数其他进程看不到
+STATISTICS_CACHE_ALIAS = 'statistics'
+
+GLOBAL_GENERATION_KEY = 'cachegen:global'
+PROJECT_GENERATION_KEY = 'cachegen:project:{code}'
+
+
+def statistics_cache():
+    """统计缓存实例：代数键与依赖代数的统计缓存均通过它读写。"""
+    from django.core.cache import caches
+
+    return caches[STATISTICS_CACHE_ALIAS]
+
+
+def _generation_keys(project_codes: Iterable[Optional[str]]) -> list:
+    """代数键列表：未指定项目时为全局键，否则为各项目键。"""
+    codes = [code for code in project_codes if code]
+    if not codes:
+        return [GLOBAL_GENERATION_KEY]
+    return [PROJECT_GENERATION_KEY.format(code=code) for code in codes]
+
+
+def _seed_generations(keys: Sequence[str]) -> dict:
+    """
+    读取代数，缺失的键以当前时间戳初始化。
+
+    使用时间戳而非 0 作为初始值：代数键被缓存淘汰后重新初始化，
+    也不会与淘汰前写入的旧缓存键发生碰撞。
+    初始值取整到秒：文件缓存的 add 并非原子操作，同时初始化的多个进程/线程写入相同的值，
+    不会各自得到不同的代数。
+    """
+    cache = statistics_cache()
+    values = cache.get_many(keys)
+    missing = [key for key in keys if key not in values]
+    if missing:
+        seed = int(time.time()) * 1000000
+        for key in missing:
+            cache.add(key, seed, None)
+        values.update(cache.get_many(missing))
+    return values
+
+
+def get_cache_generation(project_codes: Tuple[str, ...] = ()) -> str:
+    """
+    读取缓存代数标记（存放在统计缓存别名中，所有进程读写同一份代数）。
+
+    - 未指定项目：返回全局代数，任意业务数据变更都会使其递增；
+    - 指定项目：返回各项目代数，仅这些项目的数据变更才会使其变化。
+    """
+    keys = _generation_keys(project_codes)
+    values = _seed_generations(keys)
+    prefix = 'p' if project_codes else 'g'
+    return prefix + '.'.join(str(values.get(key, 0)) for key in keys)
+
+
+def bump_cache_generation(project_codes: Iterable[Optional[str]] = ()) -> None:
+    """递增全局代数及指定项目的代数，使依赖它们的缓存键整体失效。"""
+    codes = {code for code in project_codes if code}
+    keys = [GLOBAL_GENERATION_KEY]
+    if codes:
+        keys.extend(_generation_keys(sorted(codes)))
+    for key in keys:
+        bump_generation(key)
+
+
+def get_generation(key: str) -> int:
+    """读取单个代数键（缺失时以时间戳初始化），供独立失效的缓存使用。"""
+    return _seed_generations([key]).get(key, 0)
+
+
+def bump_generation(key: str) -> None:
+    """
+    将单个代数键更新为新的时间戳（永不过期）。
+
+    不使用 cache.incr：其实现为读取后按别名默认超时写回，代数键会在数分钟后过期，
+    且多个进程同时递增时可能写入相同的值而丢失一次失效。
+    """
+    statistics_cache().set(key, time.time_ns() // 1000, None)
+
+
 def build_cache_key(prefix: str, year: Optional[int], project_codes: Tuple[str, ...], *, namespace: str = 'metrics') -> str:
-    """构造统一缓存键（与现有metrics一致）：`{namespace}:{prefix}:{year|all}:{codes|all}`"""
+    """构造统一缓存键：`{namespace}:{prefix}:{year|all}:{codes|all}:{generation}`"""
     year_key = year if year is not None else 'all'
     codes_key = ','.join(project_codes) if project_codes else 'all'
-    return f'{namespace}:{prefix}:{year_key}:{codes_key}'
+    generation = get_cache_generation(project_codes)
+    return f'{namespace}:{prefix}:{year_key}:{codes_key}:{generation}'
+
+
+# 单次 IN 查询的取值数量上限（SQLite 变量数限制）
+IN_QUERY_BATCH_SIZE = 500
+
+
+def in_query_batches(values: Iterable, batch_size: int = IN_QUERY_BATCH_SIZE) -> Iterator[List]:
+    """去空、去重、排序后按 IN 查询上限切分为多批。"""
+    ordered = sorted({value for value in values if value})
+    for start in range(0, len(ordered), batch_size):
+        yield ordered[start:start + batch_size]
 
 
 def safe_ratio(part: float, total: float, *, digits: Optional[int] = None) -> float:
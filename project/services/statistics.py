@@ -3,12 +3,13 @@
 
 提供采购、合同、付款、结算的统计分析功能
 """
-from django.db.models import Sum, Count, Q, Avg, Max, Min
-from django.db.models.functions import TruncMonth, TruncYear
+from django.db.models import Sum, Count, Q, Avg, Max, Min, F
+from django.db.models.functions import Coalesce, TruncMonth, TruncYear
 from datetime import datetime, timedelta
 from decimal import Decimal
 from project.enums import FilePositioning, PROCUREMENT_METHODS_COMMON, PROCUREMENT_METHODS_ALL
 from project.constants import get_current_year
+from project.utils.date_helpers import period_q
 
 
 def get_procurement_statistics(year=None, project_codes=None):
@@ -33,7 +34,7 @@ def get_procurement_statistics(year=None, project_codes=None):
 
     # 年份过滤（按结果公示发布时间）
     if year is not None:
-        queryset = queryset.filter(result_publicity_release_date__year=year)
+        queryset = queryset.filter(period_q('result_publicity_release_date', year))
 
     # 项目过滤
     if project_codes:
@@ -193,7 +194,7 @@ def get_contract_statistics(year=None, project_codes=None):
 
     # 年份过滤（按签订日期）
     if year is not None:
-        queryset = queryset.filter(signing_date__year=year)
+        queryset = queryset.filter(period_q('signing_date', year))
 
     # 项目过滤
     if project_codes:
@@ -304,7 +305,6 @@ def get_payment_statistics(year=None, project_codes=None):
     """
     from payment.models import Payment
     from contract.models import Contract
-    from settlement.models import Settlement
     
     # 基础查询集 - 使用select_related优化查询
     queryset = Payment.objects.select_related('contract', 'contract__project').only(
@@ -315,7 +315,7 @@ def get_payment_statistics(year=None, project_codes=None):
     # 年份筛选 - 按付款时间统计
     # year=None表示全部年份，不进行筛选
     if year is not None:
-        queryset = queryset.filter(payment_date__year=year)
+        queryset = queryset.filter(period_q('payment_date', year))
     
     # 项目筛选
     if project_codes:
@@ -371,35 +371,18 @@ def get_payment_statistics(year=None, project_codes=None):
     
     # 应用年份筛选（按签订日期）
     if year is not None:
-        main_contracts_query = main_contracts_query.filter(signing_date__year=year)
-    
-    total_remaining = Decimal('0')
-    
-    for contract in main_contracts_query:
-        # 获取合同+补充协议总额
-        contract_total = contract.get_contract_with_supplements_amount()
-        
-        # 检查是否有结算
-        try:
-            settlement = Settlement.objects.filter(main_contract=contract).first()
-            if settlement:
-                # 有结算，使用结算价
-                base_amount = settlement.final_amount
-            else:
-                # 无结算，使用合同价+补充协议
-                base_amount = contract_total
-        except:
-            base_amount = contract_total
-        
-        # 获取已付金额（不应用年份筛选，因为要计算该合同的总已付金额）
-        # 只应用项目筛选（如果有的话）
-        paid_query = Payment.objects.filter(contract=contract)
-        # 注意：这里不应用年份筛选，因为我们要计算该合同的所有历史付款
-        paid_amount = paid_query.aggregate(total=Sum('payment_amount'))['total'] or Decimal('0')
-        
-        # 计算剩余（包括负值，即超付情况）
-        remaining = base_amount - paid_amount
-        total_remaining += remaining
+        main_contracts_query = main_contracts_query.filter(period_q('signing_date', year))
+    
+    # 剩余 = 结算价（有结算记录时）或合同价+补充协议 - 该合同全部历史已付金额（包括负值，即超付情况）
+    # 直接从合同财务汇总表聚合，不再逐个合同查询
+    total_remaining = main_contracts_query.aggregate(
+        total=Sum(
+            Coalesce(
+                'financial_summary__settlement_final_amount',
+                'financial_summary__contract_total_amount',
+            ) - F('financial_summary__total_paid_amount')
+        )
+    )['total'] or Decimal('0')
     
     return {
         'year': year if year is not None else '全部',
@@ -448,7 +431,7 @@ def get_settlement_statistics(year=None, project_codes=None):
     
     # 年份筛选 - 按付款日期统计
     if year is not None:
-        queryset = queryset.filter(payment_date__year=year)
+        queryset = queryset.filter(period_q('payment_date', year))
     
     # 项目筛选
     if project_codes:
@@ -505,7 +488,7 @@ def get_settlement_statistics(year=None, project_codes=None):
     # 应用年份和项目筛选
     main_contracts_query = Contract.objects.filter(file_positioning=FilePositioning.MAIN_CONTRACT.value)
     if year is not None:
-        main_contracts_query = main_contracts_query.filter(signing_date__year=year)
+        main_contracts_query = main_contracts_query.filter(period_q('signing_date', year))
     if project_codes:
         main_contracts_query = main_contracts_query.filter(project__project_code__in=project_codes)
     
@@ -518,9 +501,9 @@ def get_settlement_statistics(year=None, project_codes=None):
     )
     
     pending_count = pending_settlements.count()
-    pending_amount = Decimal('0')
-    for contract in pending_settlements:
-        pending_amount += contract.get_contract_with_supplements_amount()
+    pending_amount = pending_settlements.aggregate(
+        total=Sum('financial_summary__contract_total_amount')
+    )['total'] or Decimal('0')
     
     # 结算与合同差异分析 - 使用去重后的结算数据
     variance_analysis = []
@@ -653,7 +636,7 @@ def get_procurement_details(year=None, project_codes=None):
     
     # 年份筛选
     if year is not None:
-        queryset = queryset.filter(result_publicity_release_date__year=year)
+        queryset = queryset.filter(period_q('result_publicity_release_date', year))
     
     # 项目筛选
     if project_codes:
@@ -749,7 +732,7 @@ def get_contract_details(year=None, project_codes=None):
     
     # 年份筛选
     if year is not None:
-        queryset = queryset.filter(signing_date__year=year)
+        queryset = queryset.filter(period_q('signing_date', year))
     
     # 项目筛选
     if project_codes:
@@ -826,7 +809,7 @@ def get_payment_details(year=None, project_codes=None):
     
     # 年份筛选
     if year is not None:
-        queryset = queryset.filter(payment_date__year=year)
+        queryset = queryset.filter(period_q('payment_date', year))
     
     # 项目筛选
     if project_codes:
@@ -896,7 +879,7 @@ def get_settlement_details(year=None, project_codes=None):
     
     # 年份筛选
     if year is not None:
-        queryset = queryset.filter(payment_date__year=year)
+        queryset = queryset.filter(period_q('payment_date', year))
     
     # 项目筛选
     if project_codes:
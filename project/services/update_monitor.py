@@ -1,70 +1,31 @@
 """
 Service logic for the update monitoring dashboard.
 
-Collects module-specific business events, evaluates deadline compliance (by the
-end of the following month), and returns KPI, heatmap, and statistics payloads
-for presentation.
+Reads module-specific business events from the UpdateEventFact table (deadline
+compliance by the end of the following month is evaluated when the rows are
+written), and returns KPI, heatmap, and statistics payloads for presentation.
 """
 from __future__ import annotations
 
-import calendar
 from collections import defaultdict
 from datetime import date
 from typing import Any, Dict, Iterable, List, Optional, Tuple
 
-from django.db.models import QuerySet
+from django.db.models import Case, IntegerField, Value, When
 from django.utils import timezone
 
-from contract.models import Contract
-from payment.models import Payment
-from procurement.models import Procurement
-from settlement.models import Settlement
+from project.models_update_event import UpdateEventFact
+from project.utils.date_helpers import period_q
 
 
 class UpdateMonitorService:
     """事件驱动的数据更新监控服务。"""
 
     MODULES: Dict[str, Dict[str, Any]] = {
-        "procurement": {
-            "display_name": "采购",
-            "model": Procurement,
-            "event_field": "result_publicity_release_date",
-            "project_path": "project",
-            "handler_fields": ["procurement_officer", "updated_by", "created_by"],
-            "code_field": "procurement_code",
-            "update_attr": "updated_at",
-            "fallback_update_attr": "created_at",
-        },
-        "contract": {
-            "display_name": "合同",
-            "model": Contract,
-            "event_field": "signing_date",
-            "project_path": "project",
-            "handler_fields": ["contract_officer", "updated_by", "created_by"],
-            "code_field": "contract_code",
-            "update_attr": "updated_at",
-            "fallback_update_attr": "created_at",
-        },
-        "payment": {
-            "display_name": "付款",
-            "model": Payment,
-            "event_field": "payment_date",
-            "project_path": "contract__project",
-            "handler_fields": ["updated_by", "created_by"],
-            "code_field": "payment_code",
-            "update_attr": "updated_at",
-            "fallback_update_attr": "created_at",
-        },
-        "settlement": {
-            "display_name": "结算",
-            "model": Settlement,
-            "event_field": "completion_date",
-            "project_path": "main_contract__project",
-            "handler_fields": ["updated_by", "created_by"],
-            "code_field": "settlement_code",
-            "update_attr": "updated_at",
-            "fallback_update_attr": "created_at",
-        },
+        "procurement": {"display_name": "采购"},
+        "contract": {"display_name": "合同"},
+        "payment": {"display_name": "付款"},
+        "settlement": {"display_name": "结算"},
     }
 
     def build_snapshot(self, year: Optional[int], start_date: date) -> Dict[str, Any]:
@@ -97,84 +58,49 @@ class UpdateMonitorService:
     # ------------------------------------------------------------------ #
 
     def _collect_events(self, year: Optional[int], start_date: date) -> List[Dict[str, Any]]:
-        events: List[Dict[str, Any]] = []
-        for module_key, config in self.MODULES.items():
-            queryset = self._build_queryset(config, year, start_date)
-
-            for record in queryset:
-                project = self._resolve_attr(record, config["project_path"])
-                if project is None:
-                    continue
-
-                event_date = getattr(record, config["event_field"], None)
-                if event_date is None:
-                    continue
-
-                update_datetime = getattr(record, config.get("update_attr", "updated_at"), None)
-                if update_datetime is None:
-                    fallback_attr = config.get("fallback_update_attr")
-                    if fallback_attr:
-                        update_datetime = getattr(record, fallback_attr, None)
-                if update_datetime is None:
-                    continue
-                update_date = update_datetime.date()
-
-                handler = self._extract_first_non_empty(record, config.get("handler_fields", []))
-                if not handler:
-                    handler = "未标记"
-
-                code_value = self._resolve_attr(record, config.get("code_field", "")) or getattr(
-                    record, "pk", ""
-                )
-
-                deadline = self._calculate_deadline(event_date)
-                is_timely = update_date <= deadline
-
-                events.append(
-                    {
-                        "project_id": project.project_code,
-                        "project_code": project.project_code,
-                        "project_name": project.project_name,
-                        "module_key": module_key,
-                        "module_name": config["display_name"],
-                        "event_date": event_date,
-                        "update_date": update_date,
-                        "handler": handler,
-                        "code": str(code_value),
-                        "deadline": deadline,
-                        "is_timely": is_timely,
-                        "month": event_date.month,
-                    }
-                )
-        return events
-
-    def _build_queryset(
-        self,
-        config: Dict[str, Any],
-        year: Optional[int],
-        start_date: date,
-    ) -> QuerySet:
-        model = config["model"]
-        event_field = config["event_field"]
+        """
+        一次查询读取事件事实表（只取需要的列），不再逐模块加载业务记录。
 
-        filters = {f"{event_field}__isnull": False}
+        只统计有所属项目、有更新日期的事件；按模块顺序、业务日期排序。
+        """
+        queryset = UpdateEventFact.objects.filter(
+            project__isnull=False,
+            update_date__isnull=False,
+        )
         if year is not None:
-            filters[f"{event_field}__year"] = year
-        queryset = model.objects.filter(**filters)
+            queryset = queryset.filter(period_q('event_date', year))
         if start_date:
-            queryset = queryset.filter(**{f"{event_field}__gte": start_date})
+            queryset = queryset.filter(event_date__gte=start_date)
 
-        related_paths = config.get("select_related")
-        if related_paths:
-            queryset = queryset.select_related(*related_paths)
-        else:
-            related_parts = [
-                "__".join(config["project_path"].split("__")[: idx + 1])
-                for idx in range(len(config["project_path"].split("__")))
-            ]
-            queryset = queryset.select_related(*related_parts)
+        module_order = Case(
+            *[When(module=key, then=Value(index)) for index, key in enumerate(self.MODULES)],
+            output_field=IntegerField(),
+        )
+        rows = queryset.order_by(module_order, "event_date", "source_code").values_list(
+            "module", "source_code", "project_id", "project__project_name",
+            "event_date", "update_date", "deadline", "is_timely", "handler",
+        )
 
-        return queryset.order_by(event_field)
+        events: List[Dict[str, Any]] = []
+        for (module_key, code, project_code, project_name,
+             event_date, update_date, deadline, is_timely, handler) in rows:
+            events.append(
+                {
+                    "project_id": project_code,
+                    "project_code": project_code,
+                    "project_name": project_name,
+                    "module_key": module_key,
+                    "module_name": self.MODULES[module_key]["display_name"],
+                    "event_date": event_date,
+                    "update_date": update_date,
+                    "handler": handler,
+                    "code": code,
+                    "deadline": deadline,
+                    "is_timely": is_timely,
+                    "month": event_date.month,
+                }
+            )
+        return events
 
     # ------------------------------------------------------------------ #
     # 数据整理
@@ -322,32 +248,6 @@ class UpdateMonitorService:
     # 工具函数
     # ------------------------------------------------------------------ #
 
-    def _calculate_deadline(self, event_date: date) -> date:
-        next_month = event_date.month + 1
-        year = event_date.year
-        if next_month == 13:
-            next_month = 1
-            year += 1
-        last_day = calendar.monthrange(year, next_month)[1]
-        return date(year, next_month, last_day)
-
-    def _resolve_attr(self, instance: Any, path: str) -> Any:
-        value = instance
-        for attr in filter(None, path.split("__")):
-            value = getattr(value, attr, None)
-            if value is None:
-                return None
-        return value
-
-    def _extract_first_non_empty(self, instance: Any, fields: Iterable[str]) -> str:
-        for field in fields:
-            value = self._resolve_attr(instance, field) if "__" in field else getattr(instance, field, "")
-            if isinstance(value, str):
-                value = value.strip()
-            if value:
-                return str(value)
-        return ""
-
     def _derive_status(self, timely_count: int, delayed_count: int) -> Tuple[str, float]:
         total = timely_count + delayed_count
         if total == 0:
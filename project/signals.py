@@ -0,0 +1,157 @@
+"""
+项目模块 - 信号处理器
+
+业务数据（项目、采购、合同、付款、结算）变更时递增共享缓存中的数据代数，
+使统计缓存在所有进程中同时失效（缓存键见 project/services/shared/utils.build_cache_key）。
+
+采购、合同、付款、结算保存或删除时同时重算对应的更新事件行（UpdateEventFact），
+事件行与业务数据在同一事务内写入。
+
+项目、采购、合同、供应商评价保存或删除时重算其全文检索索引行（见 project/services/search_index.py）。
+
+项目保存或删除时递增维度选项代数，使筛选栏的项目选项缓存失效
+（见 project/services/dimension_options.py）。
+"""
+from django.db import transaction
+from django.db.models.signals import post_delete, post_init, post_save, pre_save
+from django.dispatch import receiver
+
+from project.services.dimension_options import invalidate_dimension_options
+from project.services.search_index import SEARCH_INDEX_FIELDS, refresh_search_index
+from project.services.shared.utils import bump_cache_generation
+
+
+def _contract_project_code(contract_code):
+    """查询合同所属项目编码"""
+    if not contract_code:
+        return None
+    from contract.models import Contract
+    return Contract.objects.filter(pk=contract_code).values_list('project_id', flat=True).first()
+
+
+# 各业务模型 -> 所属项目编码的解析方式
+_PROJECT_CODE_RESOLVERS = {
+    'project.Project': lambda obj: obj.pk,
+    'procurement.Procurement': lambda obj: obj.project_id,
+    'contract.Contract': lambda obj: obj.project_id,
+    'payment.Payment': lambda obj: _contract_project_code(obj.contract_id),
+    'settlement.Settlement': lambda obj: _contract_project_code(obj.main_contract_id),
+}
+
+STATISTICS_SENDERS = tuple(_PROJECT_CODE_RESOLVERS)
+
+# 可在项目间移动的业务模型 -> 决定所属项目的外键列，及由该列取值解析项目编码的方式
+_PROJECT_FK_COLUMNS = {
+    'procurement.Procurement': ('project_id', lambda value: value),
+    'contract.Contract': ('project_id', lambda value: value),
+    'payment.Payment': ('contract_id', _contract_project_code),
+    'settlement.Settlement': ('main_contract_id', _contract_project_code),
+}
+# 实例上记录的加载时外键取值
+_ORIGINAL_FK_ATTR = '_original_project_fk'
+
+
+def invalidate_statistics_cache(project_codes=()):
+    """
+    在事务提交后递增数据代数
+
+    延迟到提交后执行，避免其他进程在提交前按新代数缓存旧数据。
+    bulk_create / update 等不触发信号的批量操作需显式调用本函数。
+    """
+    codes = tuple(project_codes)
+    transaction.on_commit(lambda: bump_cache_generation(codes))
+
+
+def _capture_original_project_fk(sender, instance, **kwargs):
+    """记录加载时的外键取值（不查询；延迟加载的字段不记录，保存前再单独读取该列）"""
+    column = _PROJECT_FK_COLUMNS[sender._meta.label][0]
+    if column in instance.__dict__:
+        setattr(instance, _ORIGINAL_FK_ATTR, instance.__dict__[column])
+
+
+def _remember_original_project_fk(sender, instance, **kwargs):
+    """新记录没有原项目；加载时外键被延迟而未记录时，保存前只读取该外键列"""
+    column = _PROJECT_FK_COLUMNS[sender._meta.label][0]
+    if instance._state.adding:
+        setattr(instance, _ORIGINAL_FK_ATTR, instance.__dict__.get(column))
+        return
+    if hasattr(instance, _ORIGINAL_FK_ATTR):
+        return
+    setattr(instance, _ORIGINAL_FK_ATTR, sender._default_manager.filter(pk=instance.pk).values_list(
+        column, flat=True
+    ).first())
+
+
+def _previous_project_code(sender, instance):
+    """记录在项目间移动时返回原项目编码；外键未变化时不查询，返回 None"""
+    if sender._meta.label not in _PROJECT_FK_COLUMNS:
+        return None
+    column, resolve = _PROJECT_FK_COLUMNS[sender._meta.label]
+    original = getattr(instance, _ORIGINAL_FK_ATTR, None)
+    if original is None or original == instance.__dict__.get(column):
+        return None
+    return resolve(original)
+
+
+def _invalidate_on_change(sender, instance, **kwargs):
+    resolve = _PROJECT_CODE_RESOLVERS[sender._meta.label]
+    invalidate_statistics_cache((resolve(instance), _previous_project_code(sender, instance)))
+    if sender._meta.label in _PROJECT_FK_COLUMNS:
+        # 保存后以当前取值作为下一次保存的比较基准
+        setattr(instance, _ORIGINAL_FK_ATTR, instance.__dict__.get(_PROJECT_FK_COLUMNS[sender._meta.label][0]))
+
+
+for _label in _PROJECT_FK_COLUMNS:
+    receiver(post_init, sender=_label, dispatch_uid=f'cachegen_post_init_{_label}')(_capture_original_project_fk)
+    receiver(pre_save, sender=_label, dispatch_uid=f'cachegen_pre_save_{_label}')(_remember_original_project_fk)
+
+for _label in STATISTICS_SENDERS:
+    receiver(post_save, sender=_label, dispatch_uid=f'cachegen_post_save_{_label}')(_invalidate_on_change)
+    receiver(post_delete, sender=_label, dispatch_uid=f'cachegen_post_delete_{_label}')(_invalidate_on_change)
+
+
+# 各业务模型 -> 更新事件模块
+_UPDATE_EVENT_MODULES = {
+    'procurement.Procurement': 'procurement',
+    'contract.Contract': 'contract',
+    'payment.Payment': 'payment',
+    'settlement.Settlement': 'settlement',
+}
+
+
+def _refresh_update_events(sender, instance, **kwargs):
+    from project.models_update_event import refresh_contract_update_events, refresh_update_events
+
+    module = _UPDATE_EVENT_MODULES[sender._meta.label]
+    if module == 'contract':
+        # 付款/结算事件的项目、名称、负责人取自合同，一并重算
+        refresh_contract_update_events({instance.pk})
+    else:
+        refresh_update_events(module, {instance.pk})
+
+
+for _label in _UPDATE_EVENT_MODULES:
+    receiver(post_save, sender=_label, dispatch_uid=f'update_event_post_save_{_label}')(_refresh_update_events)
+    receiver(post_delete, sender=_label, dispatch_uid=f'update_event_post_delete_{_label}')(_refresh_update_events)
+
+
+# 维度选项（项目）的数据来源
+_DIMENSION_SENDERS = ('project.Project',)
+
+
+def _invalidate_dimension_options(sender, instance, **kwargs):
+    invalidate_dimension_options()
+
+
+for _label in _DIMENSION_SENDERS:
+    receiver(post_save, sender=_label, dispatch_uid=f'dimensions_post_save_{_label}')(_invalidate_dimension_options)
+    receiver(post_delete, sender=_label, dispatch_uid=f'dimensions_post_delete_{_label}')(_invalidate_dimension_options)
+
+
+def _refresh_search_index(sender, instance, **kwargs):
+    refresh_search_index(sender._meta.label, {instance.pk}, using=kwargs.get('using'))
+
+
+for _label in SEARCH_INDEX_FIELDS:
+    receiver(post_save, sender=_label, dispatch_uid=f'search_index_post_save_{_label}')(_refresh_search_index)
+    receiver(post_delete, sender=_label, dispatch_uid=f'search_index_post_delete_{_label}')(_refresh_search_index)
@@ -1,76 +1,255 @@
 import logging
-from datetime import date
-from typing import List, Optional
+import os
+import shutil
+import tempfile
+import time
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from pathlib import Path
+from typing import Optional
 
-from django.contrib.auth import get_user_model
 from django.core.mail import send_mail
 from django.conf import settings
+from django.db import connections, transaction
+from django.utils import timezone
 
-from django_rq import job
+import django_rq
 
-from project.models import Project
+from project.models import ExportJob, Project
 from project.services.export_service import generate_project_excel
 
 logger = logging.getLogger(__name__)
-User = get_user_model()
 
+# 导出任务使用的 RQ 队列（与 settings.RQ_QUEUES 对应）
+EXPORT_QUEUE = 'low'
+# 单个导出任务的最长执行时间（秒）
+EXPORT_JOB_TIMEOUT = 60 * 60
+# 连接 Redis 失败后，在该时间内直接使用进程内队列，避免每次提交都等待连接重试（秒）
+RQ_RETRY_INTERVAL = 5 * 60
 
-@job("low")
-def generate_project_export_zip_async(
-    project_codes: List[str],
-    user_id: int,
-    export_all: bool = False,
-    business_start_date: Optional[date] = None,
-    business_end_date: Optional[date] = None,
-) -> Optional[str]:
+_fallback_executor: Optional[ThreadPoolExecutor] = None
+_rq_unavailable_until = 0.0
+
+
+def _get_fallback_executor() -> ThreadPoolExecutor:
+    """Redis 不可用时的进程内队列：单线程顺序执行，避免多个导出任务争抢数据库"""
+    global _fallback_executor
+    if _fallback_executor is None:
+        _fallback_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='export-job')
+    return _fallback_executor
+
+
+def _export_root() -> Path:
+    return Path(getattr(settings, 'EXPORT_JOB_ROOT', Path(settings.BASE_DIR) / 'data' / 'exports'))
+
+
+def _retention() -> timedelta:
+    return timedelta(hours=getattr(settings, 'EXPORT_JOB_RETENTION_HOURS', 24))
+
+
+def enqueue_export_job(job: ExportJob) -> None:
     """
-    异步生成多项目导出 ZIP 文件，并通过邮件通知用户。
+    提交导出任务（在事务提交后执行，确保工作进程能读到任务记录）
 
-    返回值是生成的ZIP文件路径，实际存储位置和生命周期由调用方或后续任务管理。
-    当前实现仅演示异步任务与通知流程，避免与现有同步下载逻辑产生破坏性冲突。
+    优先投递到 django-rq；Redis 不可用时退回进程内后台线程执行。
     """
-    try:
-        user = User.objects.filter(id=user_id).first()
-        user_email = getattr(user, "email", None)
-
-        qs = Project.objects.all()
-        if project_codes and not export_all:
-            qs = qs.filter(project_code__in=project_codes)
-
-        projects = list(qs)
-        if not projects:
-            logger.warning("异步导出任务未找到项目，project_codes=%s", project_codes)
-            return None
-
-        # 复用现有的导出逻辑为每个项目生成 Excel，
-        # 这里只是模拟处理流程，实际持久化可以根据业务再扩展。
-        for project in projects:
-            _ = generate_project_excel(
-                project,
-                user,
-                business_start_date=business_start_date,
-                business_end_date=business_end_date,
-            )  # 生成 BytesIO，但不直接返回给浏览器
-
-        # 发送完成通知邮件（如果用户配置了邮箱）
-        if user_email:
+    def submit():
+        global _rq_unavailable_until
+        if time.monotonic() >= _rq_unavailable_until:
             try:
-                send_mail(
-                    subject="项目数据导出任务已完成",
-                    message="您提交的项目数据导出任务已在后台完成，请登录系统下载或联系管理员获取文件。",
-                    from_email=getattr(
-                        settings, "DEFAULT_FROM_EMAIL", "no-reply@example.com"
-                    ),
-                    recipient_list=[user_email],
-                    fail_silently=True,
+                django_rq.get_queue(EXPORT_QUEUE).enqueue(
+                    run_export_job, job.pk, job_timeout=EXPORT_JOB_TIMEOUT
                 )
-            except Exception as exc:  # 邮件发送失败不能影响主任务
-                logger.error("异步导出任务邮件通知失败: %s", exc)
+                return
+            except Exception as exc:
+                _rq_unavailable_until = time.monotonic() + RQ_RETRY_INTERVAL
+                logger.warning('RQ 队列不可用，导出任务 %s 改为进程内执行: %s', job.pk, exc)
+        _get_fallback_executor().submit(_run_in_fallback, job.pk)
+
+    transaction.on_commit(submit)
+
+
+def _run_in_fallback(job_id: int) -> None:
+    """进程内执行导出任务，结束后关闭本线程的数据库连接"""
+    try:
+        run_export_job(job_id)
+    finally:
+        connections.close_all()
 
-        logger.info(
-            "异步导出任务完成, 项目数=%s, 用户ID=%s", len(projects), user_id
+
+def run_export_job(job_id: int) -> Optional[str]:
+    """
+    执行多项目导出任务
+
+    逐个项目生成 Excel 并增量写入 ZIP（先写入 .part 临时文件，完成后原子替换），
+    每完成一个项目更新一次进度。成功返回ZIP文件路径，失败或任务不存在返回 None。
+    """
+    claimed = ExportJob.objects.filter(pk=job_id, status=ExportJob.STATUS_PENDING).update(
+        status=ExportJob.STATUS_RUNNING,
+        started_at=timezone.now(),
+    )
+    if not claimed:
+        logger.warning('导出任务 %s 不存在或已被执行，跳过', job_id)
+        return None
+
+    job = ExportJob.objects.select_related('user').get(pk=job_id)
+    projects = list(
+        Project.objects.filter(project_code__in=job.project_codes).order_by('project_name')
+    )
+    ExportJob.objects.filter(pk=job_id).update(total_projects=len(projects))
+
+    timestamp = timezone.localtime(job.created_at).strftime('%Y%m%d_%H%M%S')
+    export_root = _export_root()
+    final_path = export_root / f'export_{job_id}_{timestamp}.zip'
+    part_path = final_path.with_name(final_path.name + '.part')
+
+    try:
+        export_root.mkdir(parents=True, exist_ok=True)
+        with zipfile.ZipFile(part_path, 'w', zipfile.ZIP_DEFLATED) as zip_file:
+            for index, project in enumerate(projects, start=1):
+                ExportJob.objects.filter(pk=job_id).update(current_project=project.project_name)
+                with tempfile.TemporaryFile() as excel_file:
+                    generate_project_excel(
+                        project,
+                        job.user,
+                        business_start_date=job.business_start_date,
+                        business_end_date=job.business_end_date,
+                        output=excel_file,
+                    )
+                    # ZIP内部的文件名使用中文（ZIP格式本身支持UTF-8）
+                    with zip_file.open(f'{project.project_name}_{timestamp}.xlsx', 'w') as entry:
+                        shutil.copyfileobj(excel_file, entry)
+                ExportJob.objects.filter(pk=job_id).update(processed_projects=index)
+        os.replace(part_path, final_path)
+    except Exception as exc:
+        logger.exception('导出任务 %s 执行失败: %s', job_id, exc)
+        part_path.unlink(missing_ok=True)
+        now = timezone.now()
+        ExportJob.objects.filter(pk=job_id).update(
+            status=ExportJob.STATUS_FAILED,
+            error_message=str(exc),
+            current_project='',
+            finished_at=now,
+            expires_at=now + _retention(),
         )
         return None
+
+    now = timezone.now()
+    ExportJob.objects.filter(pk=job_id).update(
+        status=ExportJob.STATUS_SUCCEEDED,
+        file_path=str(final_path),
+        file_size=final_path.stat().st_size,
+        current_project='',
+        finished_at=now,
+        expires_at=now + _retention(),
+    )
+    logger.info('导出任务 %s 完成, 项目数=%s, 文件=%s', job_id, len(projects), final_path)
+
+    _notify_export_finished(job)
+    return str(final_path)
+
+
+def _notify_export_finished(job: ExportJob) -> None:
+    """发送完成通知邮件（如果用户配置了邮箱），失败不影响任务结果"""
+    user_email = getattr(job.user, 'email', None)
+    if not user_email:
+        return
+    try:
+        send_mail(
+            subject="项目数据导出任务已完成",
+            message=(
+                f"您提交的项目数据导出任务（#{job.pk}）已在后台完成，"
+                f"请在 {getattr(settings, 'EXPORT_JOB_RETENTION_HOURS', 24)} 小时内登录系统下载。"
+            ),
+            from_email=getattr(
+                settings, "DEFAULT_FROM_EMAIL", "no-reply@example.com"
+            ),
+            recipient_list=[user_email],
+            fail_silently=True,
+        )
+    except Exception as exc:  # 邮件发送失败不能影响主任务
+        logger.error("导出任务邮件通知失败: %s", exc)
+
+
+def cleanup_expired_export_jobs() -> int:
+    """
+    清理过期导出任务：删除产物文件并标记为已过期
+
+    长时间停留在排队/执行状态的任务（如进程内执行时服务重启）一并标记为失败。
+    返回清理的任务数量。
+    """
+    now = timezone.now()
+    ExportJob.objects.filter(
+        status__in=[ExportJob.STATUS_PENDING, ExportJob.STATUS_RUNNING],
+        created_at__lt=now - _retention(),
+    ).update(
+        status=ExportJob.STATUS_FAILED,
+        error_message='任务超时未完成',
+        finished_at=now,
+        expires_at=now,
+    )
+
+    expired = ExportJob.objects.filter(expires_at__lte=now).exclude(status=ExportJob.STATUS_EXPIRED)
+    for file_path in expired.exclude(file_path='').values_list('file_path', flat=True):
+        try:
+            Path(file_path).unlink(missing_ok=True)
+        except OSError as exc:
+            logger.error('删除过期导出文件失败 %s: %s', file_path, exc)
+    return expired.update(status=ExportJob.STATUS_EXPIRED, file_path='', file_size=0)
+
+
+# ==================== 数据库备份任务 ====================
+# 备份必须在持有 SQLite 文件的主机上执行，因此不投递到 RQ，固定使用进程内单线程队列；
+# 任务状态写入备份目录下的状态文件（见 project.services.db_backup），各工作进程轮询时都能读到。
+
+_backup_executor: Optional[ThreadPoolExecutor] = None
+
+
+def _get_backup_executor() -> ThreadPoolExecutor:
+    global _backup_executor
+    if _backup_executor is None:
+        _backup_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='db-backup')
+    return _backup_executor
+
+
+def get_backup_job(job_id: str) -> Optional[dict]:
+    """备份任务状态；不存在或已过期清理时返回 None"""
+    from project.services.db_backup import read_job_status
+
+    return read_job_status(job_id)
+
+
+def enqueue_database_backup(db_path, name: str, *, description: str = '', compression: Optional[str] = None) -> str:
+    """提交后台备份任务，返回任务编号"""
+    from project.services.db_backup import create_job_status
+
+    job_id = create_job_status(name)
+    _get_backup_executor().submit(
+        run_database_backup, job_id, db_path, name, description=description, compression=compression
+    )
+    return job_id
+
+
+def run_database_backup(job_id: str, db_path, name: str, *, description: str = '', compression: Optional[str] = None):
+    """执行备份任务：按页复制时更新进度，各阶段及心跳时刷新状态，完成后记录文件名"""
+    from project.services import db_backup
+
+    db_backup.update_job_status(job_id, status=db_backup.JOB_STATUS_RUNNING)
+    try:
+        manifest = db_backup.create_backup(
+            Path(db_path),
+            name,
+            description=description,
+            compression=compression,
+            progress=lambda copied, total: db_backup.update_job_status(
+                job_id, copied_pages=copied, total_pages=total
+            ),
+            phase=lambda stage: db_backup.update_job_status(job_id, phase=stage),
+        )
     except Exception as exc:
-        logger.exception("异步导出任务执行失败: %s", exc)
+        logger.exception('数据库备份任务 %s 执行失败: %s', job_id, exc)
+        db_backup.update_job_status(job_id, status=db_backup.JOB_STATUS_FAILED, error_message=str(exc))
         return None
+    db_backup.update_job_status(job_id, status=db_backup.JOB_STATUS_SUCCEEDED, file_name=manifest['file_name'])
+    return manifest
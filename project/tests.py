@@ -1,3 +1,1694 @@
-from django.test import TestCase
+"""
+项目模块单元测试
+"""
+from datetime import date, timedelta
+from decimal import Decimal
+from io import BytesIO, StringIO
+from unittest import skipUnless
 
-# Create your tests here.
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from django.db.models import Count, Q
+from django.test import RequestFactory, SimpleTestCase, TestCase
+
+from contract.models import Contract
+from payment.models import Payment
+from procurement.models import Procurement
+from project.enums import ContractSource
+from project.context_processors import global_filter_options
+from project.middleware.operation_log import write_operation_logs
+from project.models import Project
+from project.models_operation_log import OperationLog
+from project.services import ranking
+from project.services.dimension_options import get_project_options
+from project.services.search_index import SEARCH_INDEX_TABLE
+from project.services.shared.utils import build_cache_key, statistics_cache
+from project.utils.date_helpers import period_q
+from project.utils.filters import apply_multi_field_search, apply_text_filter
+from project.utils.operation_log_writer import OperationLogWriter
+from project.utils.pagination import apply_keyset_pagination
+
+
+
+def isolate_statistics_cache(testcase):
+    """
+    测试期间将统计缓存别名指向临时目录，避免清空或写入服务器上共享的统计缓存。
+
+    返回临时目录，子进程可据此使用同一份缓存。
+    """
+    import shutil
+    import tempfile
+    from django.conf import settings
+    from django.test import override_settings
+
+    location = tempfile.mkdtemp()
+    testcase.addCleanup(shutil.rmtree, location, ignore_errors=True)
+    settings_override = override_settings(CACHES={
+        **settings.CACHES,
+        'statistics': {
+            'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+            'LOCATION': location,
+        },
+    })
+    settings_override.enable()
+    testcase.addCleanup(settings_override.disable)
+    return location
+
+
+class RankingQueryCountTests(TestCase):
+    """业务排名分组聚合测试：查询数量不随项目数量增长"""
+
+    @classmethod
+    def setUpTestData(cls):
+        for idx in range(1, 6):
+            project = Project.objects.create(
+                project_code=f'PRJ-{idx:03d}',
+                project_name=f'测试项目{idx}'
+            )
+            Procurement.objects.create(
+                procurement_code=f'CG-{idx:03d}',
+                project=project,
+                project_name=f'采购{idx}',
+                procurement_officer='张三',
+                requirement_approval_date=date(2025, 1, 1),
+                planned_completion_date=date(2025, 2, 1),
+                result_publicity_release_date=date(2025, 1, 20),
+                archive_date=date(2025, 2, 10) if idx % 2 else date(2025, 4, 1),
+            )
+            Contract.objects.create(
+                contract_code=f'HT-{idx:03d}',
+                contract_name=f'合同{idx}',
+                contract_source=ContractSource.DIRECT.value,
+                project=project,
+                contract_officer='李四',
+                contract_amount=Decimal('1000.00'),
+                signing_date=date(2025, 3, 1),
+                archive_date=date(2025, 3, 11),
+            )
+
+    def test_archive_timeliness_ranking_constant_queries(self):
+        """归档及时率排名：1次项目查询 + 采购/合同各1次分组查询"""
+        with self.assertNumQueries(3):
+            result = ranking.get_archive_timeliness_ranking('project', 2025)
+
+        self.assertEqual(len(result), 5)
+        first = result[0]
+        self.assertEqual(first['timely_rate'], 100.0)
+        self.assertEqual(first['procurement'], {'total': 1, 'timely': 1})
+        self.assertEqual(first['contract'], {'total': 1, 'timely': 1})
+        # 采购归档周期21天，合同归档周期10天
+        self.assertEqual(first['avg_cycle_days'], 15)
+        self.assertEqual(result[-1]['timely_rate'], 50.0)
+
+    def test_archive_rankings_by_person(self):
+        """按经办人排名合并采购经办人和合同经办人"""
+        with self.assertNumQueries(2):
+            result = ranking.get_archive_speed_ranking('person')
+
+        names = {item['name']: item for item in result}
+        self.assertEqual(set(names), {'张三', '李四'})
+        self.assertEqual(names['李四']['avg_cycle_days'], 10)
+        self.assertEqual(names['李四']['total_count'], 5)
+
+    def test_comprehensive_ranking_constant_queries(self):
+        """综合排名复用分组结果，不再调用三份完整排名"""
+        with self.assertNumQueries(5):
+            result = ranking.get_comprehensive_ranking(2025)
+
+        self.assertEqual(len(result), 5)
+        top = result[0]
+        self.assertEqual(top['procurement_score'], 100.0)
+        self.assertEqual(top['archive_score'], 100.0)
+
+
+class StatisticsCacheGenerationTests(TestCase):
+    """统计缓存代数：业务数据变更后缓存键随之变化，其他进程递增的代数同样生效"""
+
+    def setUp(self):
+        self.statistics_cache_location = isolate_statistics_cache(self)
+        self.project = Project.objects.create(project_code='PRJ-A', project_name='项目A')
+        self.other = Project.objects.create(project_code='PRJ-B', project_name='项目B')
+
+    def test_change_bumps_global_and_project_generation(self):
+        global_key = build_cache_key('combined', None, ())
+        project_key = build_cache_key('combined', None, ('PRJ-A',))
+        other_key = build_cache_key('combined', None, ('PRJ-B',))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Procurement.objects.create(
+                procurement_code='CG-A-001',
+                project=self.project,
+                project_name='采购A',
+            )
+
+        self.assertNotEqual(build_cache_key('combined', None, ()), global_key)
+        self.assertNotEqual(build_cache_key('combined', None, ('PRJ-A',)), project_key)
+        self.assertEqual(build_cache_key('combined', None, ('PRJ-B',)), other_key)
+
+    def test_moving_record_invalidates_previous_project(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            procurement = Procurement.objects.create(
+                procurement_code='CG-A-002',
+                project=self.project,
+                project_name='采购A',
+            )
+        project_key = build_cache_key('combined', None, ('PRJ-A',))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            procurement.project = self.other
+            procurement.save()
+
+        self.assertNotEqual(build_cache_key('combined', None, ('PRJ-A',)), project_key)
+
+    def test_moving_payment_between_contracts_invalidates_previous_project(self):
+        from django.test.utils import CaptureQueriesContext
+
+        contracts = [
+            Contract.objects.create(
+                contract_code=f'HT-{project.pk}',
+                contract_name=f'合同{project.pk}',
+                contract_source=ContractSource.DIRECT.value,
+                project=project,
+            )
+            for project in (self.project, self.other)
+        ]
+        with self.captureOnCommitCallbacks(execute=True):
+            Payment.objects.create(contract=contracts[0], payment_amount=Decimal('10.00'), payment_date=date(2025, 1, 1))
+        payment = Payment.objects.get()
+
+        # 外键未变化：保存前不再读取原记录
+        with CaptureQueriesContext(connection) as unchanged:
+            payment.save()
+        del payment._original_project_fk
+        with CaptureQueriesContext(connection) as fallback:
+            payment.save()
+        # 加载时未记录外键时，只多一次读取外键列的查询
+        lookup = 'SELECT "payment_payment"."contract_id" AS "contract_id" FROM "payment_payment" WHERE'
+        self.assertEqual(len(fallback), len(unchanged) + 1)
+        self.assertEqual(
+            sum(query['sql'].startswith(lookup) for query in fallback),
+            sum(query['sql'].startswith(lookup) for query in unchanged) + 1,
+        )
+
+        project_key = build_cache_key('combined', None, ('PRJ-A',))
+        with self.captureOnCommitCallbacks(execute=True):
+            payment.contract = contracts[1]
+            payment.save()
+        self.assertNotEqual(build_cache_key('combined', None, ('PRJ-A',)), project_key)
+
+    def test_bump_from_another_process_changes_key(self):
+        import os
+        import subprocess
+        import sys
+        from django.conf import settings
+
+        global_key = build_cache_key('combined', None, ())
+        project_key = build_cache_key('combined', None, ('PRJ-A',))
+        other_key = build_cache_key('combined', None, ('PRJ-B',))
+
+        script = (
+            'import django; django.setup(); '
+            'from django.conf import settings; '
+            'from django.test import override_settings; '
+            'from project.services.shared.utils import bump_cache_generation; '
+            "caches = {**settings.CACHES, 'statistics': {"
+            "'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache', "
+            f"'LOCATION': {self.statistics_cache_location!r}}}}}; "
+            "override_settings(CACHES=caches).enable(); "
+            "bump_cache_generation(['PRJ-A'])"
+        )
+        subprocess.run(
+            [sys.executable, '-c', script],
+            cwd=settings.BASE_DIR,
+            env={**os.environ, 'DJANGO_SETTINGS_MODULE': 'config.settings'},
+            check=True,
+        )
+
+        self.assertNotEqual(build_cache_key('combined', None, ()), global_key)
+        self.assertNotEqual(build_cache_key('combined', None, ('PRJ-A',)), project_key)
+        self.assertEqual(build_cache_key('combined', None, ('PRJ-B',)), other_key)
+
+    def test_bumped_generation_never_expires(self):
+        import pickle
+        from project.services.shared.utils import GLOBAL_GENERATION_KEY, bump_generation
+
+        stats_cache = statistics_cache()
+        before = stats_cache.get(GLOBAL_GENERATION_KEY)
+        bump_generation(GLOBAL_GENERATION_KEY)
+
+        self.assertNotEqual(stats_cache.get(GLOBAL_GENERATION_KEY), before)
+        with open(stats_cache._key_to_file(GLOBAL_GENERATION_KEY), 'rb') as handle:
+            self.assertIsNone(pickle.load(handle))
+
+
+class PanelExecutorTests(TestCase):
+    """驾驶舱面板并发执行器：缓存、超时降级"""
+
+    def setUp(self):
+        isolate_statistics_cache(self)
+
+    def test_slow_panel_degrades_without_blocking(self):
+        import time
+        from project.services.panel_executor import (
+            Panel, STATUS_FRESH, STATUS_UNAVAILABLE, run_panels,
+        )
+
+        panels = [
+            Panel('fast', lambda: {'value': 1}, timeout=2),
+            Panel('slow', lambda: time.sleep(1) or {'value': 2}, timeout=0.05,
+                  placeholder=lambda: {'value': 0}),
+        ]
+        started = time.monotonic()
+        results = run_panels(panels, namespace='test-panel')
+
+        self.assertLess(time.monotonic() - started, 1)
+        self.assertEqual(results['fast'].status, STATUS_FRESH)
+        self.assertEqual(results['fast'].data, {'value': 1})
+        self.assertEqual(results['slow'].status, STATUS_UNAVAILABLE)
+        self.assertEqual(results['slow'].data, {'value': 0})
+
+    def test_cached_panel_skips_compute(self):
+        from project.services.panel_executor import Panel, STATUS_CACHED, run_panels
+
+        calls = []
+        panel = Panel('counter', lambda: calls.append(1) or {'calls': len(calls)})
+        run_panels([panel], namespace='test-panel')
+        results = run_panels([panel], namespace='test-panel')
+
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(results['counter'].status, STATUS_CACHED)
+
+    def test_unscoped_panel_shares_cache_across_filters(self):
+        from project.services.panel_executor import Panel, STATUS_CACHED, run_panels
+
+        calls = []
+        panel = Panel('global', lambda: calls.append(1) or {'calls': len(calls)}, scoped=False)
+        run_panels([panel], year=2024, project_codes=['P001'], namespace='test-panel')
+        results = run_panels([panel], year=2025, namespace='test-panel')
+
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(results['global'].status, STATUS_CACHED)
+
+    def test_concurrent_requests_share_inflight_panels(self):
+        import threading
+        import time
+        from project.services.panel_executor import (
+            MAX_PANEL_WORKERS, Panel, STATUS_CACHED, STATUS_FRESH, run_panels,
+        )
+
+        calls = {'a': 0, 'b': 0}
+        lock = threading.Lock()
+
+        def compute(name):
+            def inner():
+                with lock:
+                    calls[name] += 1
+                time.sleep(0.3)
+                return {'panel': name}
+            return inner
+
+        panels = [Panel(name, compute(name), timeout=0.6) for name in calls]
+        results = []
+
+        def request():
+            results.append(run_panels(panels, namespace='test-panel-shared'))
+
+        # 请求数多于线程数：若每个请求都重复排队，后面的请求会排队超时而降级
+        threads = [threading.Thread(target=request) for _ in range(MAX_PANEL_WORKERS * 2)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(calls, {'a': 1, 'b': 1})
+        self.assertEqual(len(results), MAX_PANEL_WORKERS * 2)
+        for result in results:
+            self.assertIn(result['a'].status, (STATUS_FRESH, STATUS_CACHED))
+            self.assertEqual(result['b'].data, {'panel': 'b'})
+
+    def test_timeout_starts_when_panel_runs(self):
+        import threading
+        from project.services.panel_executor import MAX_PANEL_WORKERS, Panel, STATUS_FRESH, run_panels
+
+        release = threading.Event()
+        self.addCleanup(release.set)
+        # 占满线程池：这些面板超时降级，但线程仍在执行
+        blockers = [
+            Panel(f'blocker{i}', lambda: release.wait(5) and {}, timeout=0.01)
+            for i in range(MAX_PANEL_WORKERS)
+        ]
+        run_panels(blockers, namespace='test-panel-queue')
+        threading.Timer(0.3, release.set).start()
+
+        # 排队约 0.3 秒后开始执行，执行本身远小于 0.2 秒的超时
+        late = Panel('late', lambda: {'value': 1}, timeout=0.2, queue_timeout=2)
+        results = run_panels([late], namespace='test-panel-queue')
+
+        self.assertEqual(results['late'].status, STATUS_FRESH)
+        self.assertEqual(results['late'].data, {'value': 1})
+
+
+class CompletenessEngineTests(TestCase):
+    """齐全性统计：数据库聚合计数，查询数量不随记录数增长"""
+
+    @classmethod
+    def setUpTestData(cls):
+        from project.models_completeness_config import CompletenessFieldConfig
+
+        for order, field_name in enumerate(['demand_department', 'budget_amount', 'archive_date', 'no_such_field']):
+            CompletenessFieldConfig.objects.create(
+                model_type='procurement', field_name=field_name, field_label=field_name, sort_order=order
+            )
+        for idx in range(1, 3):
+            Project.objects.create(project_code=f'PRJ-{idx:03d}', project_name=f'测试项目{idx}')
+        rows = [
+            # (项目, 需求部门, 预算, 归档日期)
+            ('PRJ-001', '工程部', Decimal('100.00'), date(2025, 2, 1)),
+            ('PRJ-001', '', Decimal('100.00'), date(2025, 2, 1)),
+            ('PRJ-001', '', None, None),
+            ('PRJ-002', '工程部', None, date(2025, 2, 1)),
+        ]
+        for idx, (project_code, department, budget, archive_date) in enumerate(rows, start=1):
+            Procurement.objects.create(
+                procurement_code=f'CG-{idx:03d}',
+                project_id=project_code,
+                project_name=f'采购{idx}',
+                procurement_officer='张三',
+                demand_department=department,
+                budget_amount=budget,
+                archive_date=archive_date,
+                result_publicity_release_date=date(2025, 1, 20),
+            )
+
+    def test_field_completeness_aggregated_in_database(self):
+        from project.services.completeness import check_procurement_field_completeness
+
+        # 字段配置1次 + 聚合1次 + 不完整记录1次
+        with self.assertNumQueries(3):
+            result = check_procurement_field_completeness(year=2025)
+
+        self.assertEqual(result['total_count'], 4)
+        self.assertEqual(result['field_count'], 4)
+        filled = {item['field_name']: item['filled_count'] for item in result['field_stats']}
+        self.assertEqual(filled, {'demand_department': 2, 'budget_amount': 2,
+                                  'archive_date': 3, 'no_such_field': 0})
+        # 7 / 16 个单元格已填写
+        self.assertEqual(result['completeness_rate'], 43.75)
+        # 模型中不存在的字段恒为缺失，所有记录都不完整，按齐全率升序
+        self.assertEqual(result['incomplete_count'], 4)
+        records = result['incomplete_records']
+        self.assertEqual(records[0]['code'], 'CG-003')
+        self.assertEqual(records[0]['missing_count'], 4)
+        self.assertEqual(records[-1]['filled_count'], 3)
+
+    def test_project_ranking_groups_by_project(self):
+        from project.services.completeness import get_project_completeness_ranking
+
+        result = get_project_completeness_ranking(year=2025)
+
+        by_code = {item['project_code']: item for item in result}
+        self.assertEqual(by_code['PRJ-001']['procurement_count'], 3)
+        self.assertEqual(by_code['PRJ-002']['procurement_count'], 1)
+        self.assertEqual(by_code['PRJ-002']['procurement_rate'], 50.0)
+
+
+class ContractFinancialSummaryTests(TestCase):
+    """合同财务汇总：付款、结算、补充协议变更时增量维护"""
+
+    def setUp(self):
+        from project.enums import FilePositioning
+
+        self.main = Contract.objects.create(
+            contract_code='HT-M-001',
+            contract_name='主合同',
+            contract_source=ContractSource.DIRECT.value,
+            party_b='供应商甲',
+            contract_amount=Decimal('1000.00'),
+            signing_date=date(2025, 1, 1),
+        )
+        self.supplement = Contract.objects.create(
+            contract_code='HT-M-001-BC1',
+            contract_name='补充协议',
+            contract_source=ContractSource.DIRECT.value,
+            file_positioning=FilePositioning.SUPPLEMENT.value,
+            parent_contract=self.main,
+            contract_amount=Decimal('200.00'),
+        )
+
+    def _summary(self, contract):
+        from contract.models import ContractFinancialSummary
+        return ContractFinancialSummary.objects.get(pk=contract.pk)
+
+    def _pay(self, contract, amount, payment_date):
+        from payment.models import Payment
+        return Payment.objects.create(
+            contract=contract, payment_amount=Decimal(amount), payment_date=payment_date
+        )
+
+    def test_payments_and_supplements_update_summary(self):
+        self._pay(self.main, '300.00', date(2025, 2, 1))
+        payment = self._pay(self.main, '300.00', date(2025, 3, 1))
+
+        summary = self._summary(self.main)
+        self.assertEqual(summary.total_paid_amount, Decimal('600.00'))
+        self.assertEqual(summary.payment_count, 2)
+        self.assertEqual(summary.contract_total_amount, Decimal('1200.00'))
+        self.assertEqual(summary.payment_ratio, Decimal('50.00'))
+        self.assertEqual(self.main.get_payment_ratio(), Decimal('50'))
+
+        payment.delete()
+        self.supplement.contract_amount = Decimal('500.00')
+        self.supplement.save()
+
+        summary = self._summary(self.main)
+        self.assertEqual(summary.total_paid_amount, Decimal('300.00'))
+        self.assertEqual(summary.supplements_total, Decimal('500.00'))
+        self.assertEqual(summary.payment_ratio, Decimal('20.00'))
+
+    def test_settlement_becomes_ratio_base(self):
+        from settlement.models import Settlement
+
+        self._pay(self.main, '400.00', date(2025, 2, 1))
+        settlement = Settlement.objects.create(
+            settlement_code='JS-M-001', main_contract=self.main, final_amount=Decimal('800.00')
+        )
+
+        summary = self._summary(self.main)
+        self.assertTrue(summary.has_settlement)
+        self.assertEqual(summary.settlement_amount, Decimal('800.00'))
+        self.assertEqual(summary.payment_ratio, Decimal('50.00'))
+
+        settlement.delete()
+        summary = self._summary(self.main)
+        # 删除结算后付款记录上的结算信息同时被清除
+        self.assertFalse(summary.has_settlement)
+        self.assertEqual(summary.payment_ratio, Decimal('33.33'))
+
+    def test_readers_use_summary(self):
+        from supplier_eval.services import SupplierAnalysisService
+
+        self._pay(self.main, '600.00', date(2025, 2, 1))
+
+        with self.assertNumQueries(2):
+            result = SupplierAnalysisService.get_supplier_summary()
+        self.assertEqual(result[0]['total_amount'], Decimal('1200.00'))
+        self.assertEqual(result[0]['total_paid'], Decimal('600.00'))
+
+        from project.services.statistics import get_payment_statistics
+        stats = get_payment_statistics()
+        self.assertEqual(stats['estimated_remaining'], 0.06)
+
+    def test_rebuild_command_restores_missing_rows(self):
+        from contract.models import ContractFinancialSummary
+
+        self._pay(self.main, '120.00', date(2025, 2, 1))
+        ContractFinancialSummary.objects.all().delete()
+
+        call_command('rebuild_contract_rollups', stdout=StringIO())
+
+        self.assertEqual(ContractFinancialSummary.objects.count(), 2)
+        self.assertEqual(self._summary(self.main).payment_ratio, Decimal('10.00'))
+
+
+class SupplierAnalysisServiceTests(TestCase):
+    """供应商分析：分组查询在内存中关联，查询数量不随供应商数量增长"""
+
+    @classmethod
+    def setUpTestData(cls):
+        from supplier_eval.models import SupplierEvaluation
+
+        for idx, party_b in enumerate(['甲建设', '甲建设', '乙工程', '丙科技']):
+            contract = Contract.objects.create(
+                contract_code=f'HT-S-{idx:03d}',
+                contract_name=f'合同{idx}',
+                contract_source=ContractSource.DIRECT.value,
+                party_b=party_b,
+                contract_amount=Decimal('1000.00'),
+            )
+            SupplierEvaluation.objects.create(
+                evaluation_code=f'PJ-S-{idx:03d}',
+                contract=contract,
+                supplier_name='甲建设集团' if idx == 1 else party_b,
+                comprehensive_score=Decimal(95 - idx * 10),
+            )
+
+    def test_summary_attributes_evaluations_by_name_containment(self):
+        from supplier_eval.services import SupplierAnalysisService
+
+        with self.assertNumQueries(2):
+            result = SupplierAnalysisService.get_supplier_summary()
+
+        by_name = {item['party_b']: item for item in result}
+        self.assertEqual(result[0]['party_b'], '甲建设')
+        self.assertEqual(by_name['甲建设']['total_contracts'], 2)
+        self.assertEqual(by_name['甲建设']['total_amount'], Decimal('2000.00'))
+        # “甲建设集团”的评价同样归属“甲建设”
+        self.assertEqual(by_name['甲建设']['evaluation_count'], 2)
+        self.assertEqual(by_name['甲建设']['avg_score'], Decimal('90.00'))
+        self.assertEqual(by_name['丙科技']['avg_score'], Decimal('65.00'))
+
+    def test_evaluation_statistics_single_query(self):
+        from supplier_eval.services import SupplierAnalysisService
+
+        with self.assertNumQueries(1):
+            stats = SupplierAnalysisService.get_evaluation_statistics()
+        self.assertEqual(stats['total'], 4)
+        self.assertEqual((stats['excellent'], stats['good'], stats['qualified'], stats['unqualified']), (1, 1, 1, 1))
+        self.assertEqual(stats['score_distribution'][0], {'range': '0-59', 'count': 0, 'percentage': 0.0})
+
+        with self.assertNumQueries(1):
+            stats = SupplierAnalysisService.get_evaluation_statistics('甲建设')
+        self.assertEqual(stats['total'], 2)
+        self.assertEqual(stats['avg_score'], Decimal('90.00'))
+
+    def test_latest_evaluations_single_query(self):
+        from supplier_eval.services import SupplierAnalysisService
+
+        with self.assertNumQueries(1):
+            result = SupplierAnalysisService.get_latest_evaluations_by_year()
+            contract_names = [item['contract_name'] for item in result]
+
+        self.assertEqual(len(result), 4)
+        self.assertEqual(contract_names[0], '合同0')
+        self.assertEqual([item['total_evaluations'] for item in result], [1, 1, 1, 1])
+
+
+class TrendEngineTests(TestCase):
+    """趋势引擎：全部时间段与全部序列一次分组查询"""
+
+    @classmethod
+    def setUpTestData(cls):
+        Project.objects.create(project_code='PRJ-001', project_name='测试项目')
+        rows = [
+            # (经办人, 需求审批日期, 工作周期天数)
+            ('张三', date(2024, 1, 10), 10),
+            ('张三', date(2024, 1, 20), 21),
+            ('张三', date(2024, 8, 1), 30),
+            ('李四', date(2024, 3, 1), 5),
+            ('李四', date(2025, 2, 1), None),
+        ]
+        for idx, (officer, start, days) in enumerate(rows, start=1):
+            Procurement.objects.create(
+                procurement_code=f'CG-{idx:03d}',
+                project_id='PRJ-001',
+                project_name=f'采购{idx}',
+                procurement_officer=officer,
+                requirement_approval_date=start,
+                result_publicity_release_date=start + timedelta(days=days) if days is not None else None,
+            )
+
+    def _queryset(self):
+        from django.db.models import ExpressionWrapper, F, fields
+        from django.db.models.functions import ExtractMonth, ExtractYear
+
+        return Procurement.objects.annotate(
+            work_cycle=ExpressionWrapper(
+                F('result_publicity_release_date') - F('requirement_approval_date'),
+                output_field=fields.DurationField(),
+            ),
+            business_year=ExtractYear('requirement_approval_date'),
+            business_month=ExtractMonth('requirement_approval_date'),
+        )
+
+    def test_group_functions_single_query(self):
+        from project.services.monitors.utils.time_grouping import group_by_half_year, group_by_month
+
+        with self.assertNumQueries(1):
+            monthly = group_by_month(self._queryset(), cycle_field='work_cycle')
+        self.assertEqual(monthly, [
+            {'month': 1, 'period': '1月', 'avg_cycle': 15, 'count': 2},
+            {'month': 2, 'period': '2月', 'avg_cycle': 0, 'count': 1},
+            {'month': 3, 'period': '3月', 'avg_cycle': 5, 'count': 1},
+            {'month': 8, 'period': '8月', 'avg_cycle': 30, 'count': 1},
+        ])
+
+        with self.assertNumQueries(1):
+            half_year = group_by_half_year(self._queryset(), cycle_field='work_cycle')
+        self.assertEqual([(item['period'], item['avg_cycle'], item['count']) for item in half_year], [
+            ('2024上半年', 12, 3), ('2024下半年', 30, 1), ('2025上半年', 0, 1),
+        ])
+
+    def test_all_series_aligned_in_one_query(self):
+        from project.services.monitors.utils.time_grouping import HALF_YEAR, TrendEngine
+
+        engine = TrendEngine(
+            self._queryset(), cycle_field='work_cycle', granularity=HALF_YEAR,
+            series_field='procurement_officer',
+        )
+        with self.assertNumQueries(1):
+            result = engine.aligned(['李四', '张三', '王五'])
+
+        self.assertEqual(result['labels'], ['2024上半年', '2024下半年', '2025上半年'])
+        self.assertEqual(result['series'], [
+            {'name': '李四', 'data': [5, None, 0]},
+            {'name': '张三', 'data': [15, 30, None]},
+        ])
+
+
+class UpdateEventFactTests(TestCase):
+    """更新事件事实表：信号增量维护，监控页面对事实表分组查询"""
+
+    @classmethod
+    def setUpTestData(cls):
+        from payment.models import Payment
+
+        cls.project = Project.objects.create(project_code='PRJ-001', project_name='测试项目')
+        Procurement.objects.create(
+            procurement_code='CG-001',
+            project=cls.project,
+            project_name='采购一',
+            procurement_officer='张三',
+            result_publicity_release_date=date(2025, 1, 15),
+        )
+        cls.contract = Contract.objects.create(
+            contract_code='HT-001',
+            contract_name='合同一',
+            contract_source=ContractSource.DIRECT.value,
+            project=cls.project,
+            contract_officer='李四',
+            contract_amount=Decimal('1000.00'),
+            signing_date=date(2025, 2, 10),
+        )
+        Payment.objects.create(
+            payment_code='HT-001-FK-001',
+            contract=cls.contract,
+            payment_amount=Decimal('100.00'),
+            payment_date=date(2025, 3, 5),
+        )
+
+    def _facts(self):
+        from project.models_update_event import UpdateEventFact
+
+        return {
+            (fact.module, fact.source_code): fact
+            for fact in UpdateEventFact.objects.all()
+        }
+
+    def test_signals_maintain_facts(self):
+        from payment.models import Payment
+
+        facts = self._facts()
+        self.assertEqual(set(facts), {
+            ('procurement', 'CG-001'), ('contract', 'HT-001'), ('payment', 'HT-001-FK-001'),
+        })
+        payment_fact = facts[('payment', 'HT-001-FK-001')]
+        self.assertEqual(payment_fact.project_id, 'PRJ-001')
+        self.assertEqual(payment_fact.name, '合同一')
+        self.assertEqual(payment_fact.responsible_person, '李四')
+        self.assertEqual(payment_fact.deadline, date(2025, 4, 30))
+
+        # 合同经办人变更后同步到付款事件
+        self.contract.contract_officer = '王五'
+        self.contract.save()
+        self.assertEqual(self._facts()[('payment', 'HT-001-FK-001')].responsible_person, '王五')
+
+        # 删除付款、清空业务日期后不再保留事件
+        Payment.objects.get(pk='HT-001-FK-001').delete()
+        procurement = Procurement.objects.get(pk='CG-001')
+        procurement.result_publicity_release_date = None
+        procurement.save()
+        self.assertEqual(set(self._facts()), {('contract', 'HT-001')})
+
+    def test_rebuild_matches_incremental(self):
+        from project.models_update_event import UpdateEventFact
+
+        def snapshot():
+            return sorted(UpdateEventFact.objects.values_list(
+                'module', 'source_code', 'project_id', 'name', 'responsible_person', 'handler',
+                'event_date', 'update_date', 'deadline', 'is_timely',
+            ))
+
+        incremental = snapshot()
+        UpdateEventFact.objects.all().delete()
+        call_command('rebuild_update_events', stdout=StringIO())
+        self.assertEqual(snapshot(), incremental)
+
+    def test_monitor_pages_use_grouped_queries(self):
+        from project.services.monitors.update_problem_detector import UpdateProblemDetector
+        from project.services.monitors.update_statistics import UpdateStatisticsService
+        from project.services.update_monitor import UpdateMonitorService
+
+        with self.assertNumQueries(1):
+            snapshot = UpdateMonitorService().build_snapshot(year=2025, start_date=date(2025, 1, 1))
+        self.assertEqual(snapshot['kpis']['totalEvents'], 3)
+        self.assertEqual(snapshot['projects'][0]['projectName'], '测试项目')
+
+        service = UpdateStatisticsService(start_date=date(2025, 1, 1))
+        with self.assertNumQueries(2):
+            overview = service.get_projects_update_overview(year_filter='2025')
+        row = overview['projects'][0]
+        self.assertEqual((row['procurement_count'], row['contract_count'], row['payment_count']), (1, 1, 1))
+
+        with self.assertNumQueries(4):
+            persons = service.get_persons_update_overview(year_filter='2025')
+        self.assertEqual(sorted(item['person_name'] for item in persons['persons']), ['张三', '李四'])
+
+        with self.assertNumQueries(1):
+            problems = UpdateProblemDetector(year_filter=2025).detect_problems(filters={'responsible_person': '李四'})
+        codes = sorted(item['code'] for group in problems.values() for item in group)
+        self.assertEqual(codes, ['HT-001', 'HT-001-FK-001'])
+
+
+class DimensionOptionsTests(TestCase):
+    """维度选项缓存：上下文处理器惰性读取，命中缓存不查询，项目变更后失效"""
+
+    def setUp(self):
+        isolate_statistics_cache(self)
+        Project.objects.create(project_code='PRJ-B', project_name='项目B')
+        Project.objects.create(project_code='PRJ-A', project_name='项目A')
+
+    def test_context_processor_is_lazy_and_cached(self):
+        request = RequestFactory().get('/')
+        with self.assertNumQueries(0):
+            context = global_filter_options(request)
+
+        with self.assertNumQueries(1):
+            self.assertEqual(
+                [item['code'] for item in context['global_filter_projects']],
+                ['PRJ-A', 'PRJ-B'],
+            )
+        with self.assertNumQueries(0):
+            self.assertEqual(len(global_filter_options(request)['global_filter_projects']), 2)
+
+    def test_project_change_invalidates_options(self):
+        self.assertEqual(len(get_project_options()), 2)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Project.objects.create(project_code='PRJ-C', project_name='项目C')
+
+        with self.assertNumQueries(1):
+            self.assertEqual(
+                [item['project_code'] for item in get_project_options()],
+                ['PRJ-A', 'PRJ-B', 'PRJ-C'],
+            )
+
+
+class OperationLogWriterTests(TestCase):
+    """操作日志缓冲写入：后台线程按批写出，落库时按对象类型批量查询对象描述"""
+
+    def test_background_thread_writes_in_batches(self):
+        batches = []
+        writer = OperationLogWriter(batches.append, batch_size=2, flush_interval=0.05)
+        for index in range(3):
+            self.assertTrue(writer.submit({'index': index}))
+        writer.stop()
+
+        self.assertEqual([entry['index'] for batch in batches for entry in batch], [0, 1, 2])
+        self.assertTrue(all(len(batch) <= 2 for batch in batches))
+        self.assertEqual(writer.stats['written'], 3)
+        self.assertEqual(writer.stats['pending'], 0)
+
+    def test_writer_follows_sink_setting(self):
+        from django.test import override_settings
+        from project.middleware.operation_log import get_operation_log_writer
+
+        with override_settings(OPERATION_LOG_SINK='sync'):
+            sync_writer = get_operation_log_writer()
+            self.assertFalse(sync_writer.background)
+            self.assertIs(get_operation_log_writer(), sync_writer)
+        with override_settings(OPERATION_LOG_SINK='thread'):
+            thread_writer = get_operation_log_writer()
+            self.assertTrue(thread_writer.background)
+        thread_writer.stop()
+
+    def test_write_operation_logs_resolves_reprs_in_bulk(self):
+        from django.contrib.auth.models import User
+
+        user = User.objects.create_user(username='clerk', password='pwd')
+        Project.objects.create(project_code='PRJ-A', project_name='项目A')
+        Project.objects.create(project_code='PRJ-B', project_name='项目B')
+        entries = [
+            {
+                'user_id': user.pk,
+                'username': user.username,
+                'operation_type': 'update',
+                'object_type': 'project',
+                'object_id': code,
+                'ip_address': '127.0.0.1',
+                'changes': {'project_name': {'old': '旧名称', 'new': '新名称'}},
+            }
+            for code in ('PRJ-A', 'PRJ-B', 'PRJ-X')
+        ]
+
+        with self.assertNumQueries(2):
+            self.assertEqual(write_operation_logs(entries), 3)
+
+        logs = {log.object_id: log for log in OperationLog.objects.all()}
+        self.assertEqual(logs['PRJ-A'].object_repr, 'PRJ-A - 项目A')
+        self.assertEqual(logs['PRJ-X'].object_repr, 'PRJ-X')
+        self.assertIn('项目名称(旧名称→新名称)', logs['PRJ-B'].description)
+
+
+class KeysetPaginationTests(TestCase):
+    """游标分页：逐页向后、向前翻页的结果与完整排序一致，每页一次查询"""
+
+    def setUp(self):
+        cache.clear()
+        isolate_statistics_cache(self)
+        signing_dates = [date(2025, 1, 1), date(2025, 1, 1), None, date(2025, 3, 1), None, date(2025, 2, 1), date(2025, 1, 1)]
+        for index, signing_date in enumerate(signing_dates):
+            Contract.objects.create(
+                contract_code=f'HT-K-{index:03d}',
+                contract_name=f'合同{index}',
+                contract_source=ContractSource.DIRECT.value,
+                signing_date=signing_date,
+            )
+
+    def _walk(self, ordering, expected):
+        factory = RequestFactory()
+        page = apply_keyset_pagination(Contract.objects.all(), factory.get('/'), ordering, page_size=3)
+        pages = [[contract.pk for contract in page]]
+        while page.has_next():
+            with self.assertNumQueries(1):
+                page = apply_keyset_pagination(
+                    Contract.objects.all(), factory.get('/', {'cursor': page.next_cursor}), ordering, page_size=3
+                )
+                pages.append([contract.pk for contract in page])
+        self.assertEqual([code for codes in pages for code in codes], expected)
+
+        backwards = []
+        while page.has_previous():
+            page = apply_keyset_pagination(
+                Contract.objects.all(), factory.get('/', {'cursor': page.previous_cursor}), ordering, page_size=3
+            )
+            backwards.insert(0, [contract.pk for contract in page])
+        self.assertEqual(backwards, pages[:-1])
+        return page
+
+    def test_walks_descending_and_ascending_with_nulls(self):
+        contracts = list(Contract.objects.all())
+
+        def key(contract):
+            return (contract.signing_date is not None, contract.signing_date or date.min, contract.pk)
+
+        self._walk('-signing_date', [c.pk for c in sorted(contracts, key=key, reverse=True)])
+        self._walk('signing_date', [c.pk for c in sorted(contracts, key=key)])
+
+    def test_invalid_cursor_returns_first_page_and_count_is_cached(self):
+        request = RequestFactory().get('/', {'cursor': 'tampered'})
+        page = apply_keyset_pagination(Contract.objects.all(), request, '-signing_date', page_size=3)
+        self.assertFalse(page.has_previous())
+        self.assertEqual(len(page), 3)
+
+        self.assertEqual(page.count, 7)
+        next_page = apply_keyset_pagination(
+            Contract.objects.all(), RequestFactory().get('/', {'cursor': page.next_cursor}), '-signing_date', page_size=3
+        )
+        with self.assertNumQueries(0):
+            self.assertEqual(next_page.count, 7)
+
+
+class SearchIndexTests(TestCase):
+    """全文检索索引：随保存/删除同步，模糊筛选命中索引且结果与 icontains 一致"""
+
+    def setUp(self):
+        for code, name, party_b in [
+            ('HT-S-001', '办公楼装修工程合同', '华建装饰有限公司'),
+            ('HT-S-002', '道路绿化养护合同', '绿源园林有限公司'),
+            ('HT-S-003', '装修设计服务合同', 'Alpha Design Studio'),
+        ]:
+            Contract.objects.create(
+                contract_code=code,
+                contract_name=name,
+                contract_source=ContractSource.DIRECT.value,
+                party_b=party_b,
+            )
+
+    def _codes(self, queryset):
+        return sorted(queryset.values_list('pk', flat=True))
+
+    def _icontains_codes(self, fields, keyword):
+        condition = Q()
+        for field in fields:
+            condition |= Q(**{f'{field}__icontains': keyword})
+        return self._codes(Contract.objects.filter(condition))
+
+    def test_search_uses_index_and_matches_icontains(self):
+        fields = ['contract_sequence', 'contract_name', 'party_b']
+        for keyword in ['装修工程', '有限公司', 'alpha design', '不存在的词']:
+            queryset = apply_multi_field_search(Contract.objects.all(), fields, keyword)
+            self.assertIn(SEARCH_INDEX_TABLE, str(queryset.query))
+            self.assertEqual(self._codes(queryset), self._icontains_codes(fields, keyword))
+
+        # 逗号=且：两个关键字都需命中
+        queryset = apply_multi_field_search(Contract.objects.all(), fields, '装修,有限公司')
+        self.assertEqual(self._codes(queryset), ['HT-S-001'])
+
+        # 短于 3 个字符的关键字无法使用 trigram 索引，退回 icontains
+        queryset = apply_text_filter(Contract.objects.all(), 'contract_name', '装修')
+        self.assertNotIn(SEARCH_INDEX_TABLE, str(queryset.query))
+        self.assertEqual(self._codes(queryset), ['HT-S-001', 'HT-S-003'])
+
+    def test_index_follows_updates_deletes_and_rebuild(self):
+        contract = Contract.objects.get(pk='HT-S-002')
+        contract.party_b = '青山市政工程公司'
+        contract.save()
+        Contract.objects.filter(pk='HT-S-003').delete()
+
+        self.assertEqual(self._codes(apply_text_filter(Contract.objects.all(), 'party_b', '市政工程')), ['HT-S-002'])
+        self.assertEqual(self._codes(apply_text_filter(Contract.objects.all(), 'party_b', '绿源园林')), [])
+        self.assertEqual(self._codes(apply_text_filter(Contract.objects.all(), 'contract_name', '设计服务')), [])
+
+        # 绕过信号的批量更新后，重建命令恢复索引
+        Contract.objects.filter(pk='HT-S-001').update(contract_name='档案室改造合同')
+        self.assertEqual(self._codes(apply_text_filter(Contract.objects.all(), 'contract_name', '档案室')), [])
+        call_command('rebuild_search_index', '--model=contract.Contract', stdout=StringIO())
+        self.assertEqual(self._codes(apply_text_filter(Contract.objects.all(), 'contract_name', '档案室')), ['HT-S-001'])
+
+    def test_migration_falls_back_when_fts5_unsupported(self):
+        import importlib
+        from types import SimpleNamespace
+        from unittest import mock
+        from project.services.search_index import (
+            DROP_TABLE_SQL, reset_search_index_availability, search_index_available,
+        )
+
+        migration = importlib.import_module('project.migrations.0013_search_index')
+        with connection.cursor() as cursor:
+            cursor.execute(DROP_TABLE_SQL)
+        self.addCleanup(reset_search_index_availability)
+        schema_editor = SimpleNamespace(
+            connection=connection,
+            execute=lambda sql: connection.cursor().execute(sql),
+        )
+
+        # 模拟不支持 trigram 分词的 SQLite：建表失败时迁移不中断
+        unsupported_sql = migration.CREATE_TABLE_SQL.replace("'trigram'", "'unsupported_tokenizer'")
+        with mock.patch.object(migration, 'CREATE_TABLE_SQL', unsupported_sql), \
+                self.assertLogs(migration.__name__, level='WARNING'):
+            migration.create_search_index(None, schema_editor)
+
+        reset_search_index_availability()
+        self.assertFalse(search_index_available())
+        queryset = apply_text_filter(Contract.objects.all(), 'contract_name', '装修工程')
+        self.assertNotIn(SEARCH_INDEX_TABLE, str(queryset.query))
+        self.assertEqual(self._codes(queryset), ['HT-S-001'])
+
+
+class DashboardSummaryServiceTests(TestCase):
+    """首页汇总：固定查询数，命中缓存不查询，业务数据变更后失效"""
+
+    def setUp(self):
+        isolate_statistics_cache(self)
+        for index in range(7):
+            project = Project.objects.create(project_code=f'PRJ-D{index}', project_name=f'项目{index}')
+            for seq in range(index % 3):
+                Procurement.objects.create(
+                    procurement_code=f'CG-D{index}-{seq}',
+                    project=project,
+                    project_name=f'采购{index}-{seq}',
+                    result_publicity_release_date=date(2025, 3, 1),
+                )
+                Contract.objects.create(
+                    contract_code=f'HT-D{index}-{seq}',
+                    contract_name=f'合同{index}-{seq}',
+                    contract_source=ContractSource.DIRECT.value,
+                    project=project,
+                    contract_amount=Decimal('100.00'),
+                    signing_date=date(2025, 4, 1) if seq == 0 else date(2024, 4, 1),
+                )
+
+    def test_summary_queries_and_values(self):
+        from project.services.dashboard import DashboardSummaryService
+
+        with self.assertNumQueries(5):
+            summary = DashboardSummaryService(year=2025).get_summary()
+
+        self.assertEqual(summary['stats']['project_count'], 7)
+        self.assertEqual(summary['stats']['procurement_count'], 6)
+        self.assertEqual(summary['stats']['contract_count'], 4)
+        self.assertEqual(summary['stats']['total_amount'], Decimal('400.00'))
+        cards = {project.pk: project for project in summary['projects']}
+        self.assertEqual(len(cards), 5)
+        self.assertEqual(
+            (cards['PRJ-D5'].procurement_count, cards['PRJ-D5'].contract_count, cards['PRJ-D5'].contract_total),
+            (2, 1, Decimal('100.00')),
+        )
+        self.assertEqual(cards['PRJ-D3'].contract_total, Decimal('0'))
+        self.assertEqual(len(summary['recent_procurements']), 6)
+
+        with self.assertNumQueries(0):
+            DashboardSummaryService(year=2025).get_summary()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Contract.objects.create(
+                contract_code='HT-D6-9',
+                contract_name='新增合同',
+                contract_source=ContractSource.DIRECT.value,
+                project=Project.objects.get(pk='PRJ-D6'),
+                contract_amount=Decimal('50.00'),
+                signing_date=date(2025, 5, 1),
+            )
+        with self.assertNumQueries(5):
+            summary = DashboardSummaryService(year=2025, project_code='PRJ-D6').get_summary()
+        self.assertEqual(summary['stats']['total_amount'], Decimal('50.00'))
+        self.assertEqual([project.pk for project in summary['projects']], ['PRJ-D6'])
+
+
+class CycleStatisticsGroupingTests(TestCase):
+    """工作周期概览：按采购方式的规定周期在查询中比较，项目/经办人各一次分组查询"""
+
+    def setUp(self):
+        project = Project.objects.create(project_code='PRJ-C1', project_name='周期项目')
+        Project.objects.create(project_code='PRJ-C2', project_name='空项目')
+        direct = Procurement.objects.create(
+            procurement_code='CG-C1',
+            project=project,
+            project_name='直接采购',
+            procurement_method='直接采购',
+            procurement_officer='张三',
+            requirement_approval_date=date(2025, 3, 1),
+            result_publicity_release_date=date(2025, 3, 21),
+        )
+        Procurement.objects.create(
+            procurement_code='CG-C2',
+            project=project,
+            project_name='公开招标',
+            procurement_method='公开招标',
+            procurement_officer='张三',
+            requirement_approval_date=date(2025, 3, 1),
+            result_publicity_release_date=date(2025, 3, 21),
+        )
+        Procurement.objects.create(
+            procurement_code='CG-C3',
+            project=project,
+            project_name='未公示',
+            procurement_method='直接采购',
+            procurement_officer='张三',
+            requirement_approval_date=date(2025, 5, 1),
+        )
+        Contract.objects.create(
+            contract_code='HT-C1',
+            contract_name='合同',
+            contract_source=ContractSource.PROCUREMENT.value,
+            project=project,
+            procurement=direct,
+            contract_officer='李四',
+            signing_date=date(2025, 3, 31),
+        )
+
+    def test_projects_overview(self):
+        from project.services.monitors.cycle_statistics import CycleStatisticsService
+
+        with self.assertNumQueries(3):
+            result = CycleStatisticsService().get_projects_cycle_overview(year_filter='2025')
+
+        projects = {item['project_code']: item for item in result['projects']}
+        # 直接采购规定15天、公开招标规定45天，均用时20天
+        self.assertEqual(
+            {key: projects['PRJ-C1'][key] for key in (
+                'procurement_count', 'procurement_completed', 'procurement_avg_cycle',
+                'procurement_on_time_rate', 'excluded_count', 'contract_count', 'contract_on_time_rate',
+            )},
+            {
+                'procurement_count': 2, 'procurement_completed': 2, 'procurement_avg_cycle': 20,
+                'procurement_on_time_rate': 50.0, 'excluded_count': 1, 'contract_count': 1,
+                'contract_on_time_rate': 100.0,
+            },
+        )
+        self.assertEqual(projects['PRJ-C2']['procurement_count'], 0)
+        self.assertEqual(result['summary']['excluded_procurement_count'], 1)
+
+    def test_persons_overview(self):
+        from project.services.monitors.cycle_statistics import CycleStatisticsService
+
+        with self.assertNumQueries(6):
+            result = CycleStatisticsService().get_persons_cycle_overview(year_filter='2025')
+
+        persons = {item['handler_name']: item for item in result['persons']}
+        self.assertEqual(set(persons), {'张三', '李四'})
+        self.assertEqual(persons['张三']['procurement_on_time_rate'], 50.0)
+        self.assertEqual(persons['张三']['project_count'], 1)
+        self.assertEqual(persons['李四']['contract_completed'], 1)
+
+    def test_problem_detector_uses_method_deadline(self):
+        from project.services.monitors.cycle_problem_detector import CycleProblemDetector
+
+        problems = CycleProblemDetector().detect_problems({'project': 'PRJ-C1'}, show_all=True)
+        deadlines = {item['code']: item['deadline_days'] for item in problems['completed']}
+        self.assertEqual(deadlines['CG-C1'], 15)
+        self.assertEqual(deadlines['CG-C2'], 45)
+
+
+class ArchiveMonitorServiceTests(TestCase):
+    """归档总览：每个模块一次条件聚合查询，逾期列表按逾期天数由数据库排序"""
+
+    def setUp(self):
+        from django.utils import timezone
+
+        today = timezone.now().date()
+        project = Project.objects.create(project_code='PRJ-A1', project_name='归档项目')
+        # 公示距今天数：已归档 10 天/50 天，未归档逾期 0、20、35 天
+        for code, published_days_ago, archive_after in [
+            ('CG-A1', 100, 10), ('CG-A2', 100, 50), ('CG-A3', 40, None), ('CG-A4', 60, None), ('CG-A5', 75, None),
+        ]:
+            published = today - timedelta(days=published_days_ago)
+            Procurement.objects.create(
+                procurement_code=code,
+                project=project,
+                project_name=code,
+                result_publicity_release_date=published,
+                archive_date=published + timedelta(days=archive_after) if archive_after is not None else None,
+            )
+        Contract.objects.create(
+            contract_code='HT-A1',
+            contract_name='合同',
+            contract_source=ContractSource.DIRECT.value,
+            project=project,
+            signing_date=today - timedelta(days=100),
+        )
+
+    def test_overview_constant_queries(self):
+        from project.services.archive_monitor import ArchiveMonitorService
+
+        with self.assertNumQueries(2):
+            overview = ArchiveMonitorService().get_archive_overview()
+
+        procurement = overview['procurement']
+        self.assertEqual((procurement['total'], procurement['archived'], procurement['timely_archived']), (5, 2, 1))
+        self.assertEqual(procurement['avg_archive_days'], 30.0)
+        self.assertEqual(procurement['overdue_breakdown'], {'severe': 1, 'moderate': 1, 'mild': 1})
+        self.assertEqual(overview['contract']['overdue_breakdown']['severe'], 1)
+
+        performance = ArchiveMonitorService().get_project_archive_performance()
+        self.assertEqual(performance[0]['procurement_timely'], 1)
+        self.assertEqual(performance[0]['contract_total'], 1)
+
+    def test_overdue_list_ordered_and_limited(self):
+        from project.services.archive_monitor import ArchiveMonitorService
+
+        overdue = ArchiveMonitorService().get_overdue_list(limit=3)
+        self.assertEqual([item['code'] for item in overdue], ['HT-A1', 'CG-A5', 'CG-A4'])
+        self.assertEqual(overdue[0]['overdue_days'], 70)
+
+        moderate = ArchiveMonitorService().get_overdue_list(module='procurement', severity='moderate')
+        self.assertEqual([item['code'] for item in moderate], ['CG-A4'])
+
+
+@skipUnless(connection.vendor == 'sqlite', 'EXPLAIN QUERY PLAN 仅适用于 SQLite')
+class MultiTrendQueryCountTests(TestCase):
+    """多人/多项目散点趋势：排名一次分组计数，全部序列的散点一次查询，查询数量不随序列数增长"""
+
+    @classmethod
+    def setUpTestData(cls):
+        for idx in range(1, 5):
+            project = Project.objects.create(project_code=f'PRJ-M{idx}', project_name=f'趋势项目{idx}')
+            for seq in range(idx):
+                procurement = Procurement.objects.create(
+                    procurement_code=f'CG-M{idx}-{seq}',
+                    project=project,
+                    project_name=f'采购{idx}-{seq}',
+                    procurement_officer=f'采购员{seq}',
+                    requirement_approval_date=date(2025, 1, 1),
+                    result_publicity_release_date=date(2025, 1, 11 + seq),
+                    archive_date=date(2025, 2, 1 + seq),
+                )
+                Contract.objects.create(
+                    contract_code=f'HT-M{idx}-{seq}',
+                    contract_name=f'合同{idx}-{seq}',
+                    contract_source=ContractSource.PROCUREMENT.value,
+                    project=project,
+                    procurement=procurement,
+                    contract_officer=f'合同员{seq}',
+                    signing_date=date(2025, 3, 1 + seq),
+                    archive_date=date(2025, 3, 21 + seq),
+                )
+
+    def test_cycle_projects_multi_trend(self):
+        from project.services.monitors.cycle_statistics import CycleStatisticsService
+
+        # 采购/合同分组计数各1次 + 项目列表1次 + 采购/合同散点各1次
+        with self.assertNumQueries(5):
+            result = CycleStatisticsService().get_projects_multi_trend(year_filter='2025', top_n=3)
+
+        self.assertEqual([item['name'] for item in result['procurement']], ['PRJ-M4', 'PRJ-M3', 'PRJ-M2'])
+        points = result['procurement'][0]['points']
+        self.assertEqual([p['code'] for p in points], ['CG-M4-0', 'CG-M4-1', 'CG-M4-2', 'CG-M4-3'])
+        self.assertEqual(points[-1]['cycle_days'], 13)
+        self.assertEqual(len(result['contract'][0]['points']), 4)
+
+    def test_cycle_persons_and_officers_multi_trend(self):
+        from project.services.monitors.cycle_statistics import CycleStatisticsService
+
+        service = CycleStatisticsService()
+        with self.assertNumQueries(4):
+            persons = service.get_persons_multi_trend(year_filter='2025', top_n=10)
+        self.assertEqual([item['name'] for item in persons['procurement']], ['采购员0', '采购员1', '采购员2', '采购员3'])
+        self.assertEqual([len(item['points']) for item in persons['contract']], [4, 3, 2, 1])
+
+        with self.assertNumQueries(6):
+            officers = service.get_project_officers_multi_trend('PRJ-M4', year_filter='2025', top_n=2)
+        self.assertEqual(len(officers['procurement']), 2)
+        self.assertTrue(all(len(item['points']) == 1 for item in officers['contract']))
+
+    def test_archive_multi_trend(self):
+        from project.services.monitors.archive_statistics import ArchiveStatisticsService
+
+        service = ArchiveStatisticsService()
+        with self.assertNumQueries(5):
+            projects = service.get_projects_multi_trend(year_filter='2025', top_n=2)
+        self.assertEqual([item['name'] for item in projects['contract']], ['PRJ-M4', 'PRJ-M3'])
+        self.assertEqual(projects['contract'][0]['points'][0]['cycle_days'], 20)
+
+        with self.assertNumQueries(4):
+            persons = service.get_persons_multi_trend(year_filter='2025')
+        self.assertEqual([len(item['points']) for item in persons['procurement']], [4, 3, 2, 1])
+
+
+class YearRangeQueryPlanTests(TestCase):
+    """年度区间筛选：热点查询须走索引，退化为全表扫描时失败"""
+
+    def _plan(self, queryset):
+        sql, params = queryset.query.sql_with_params()
+        with connection.cursor() as cursor:
+            cursor.execute(f'EXPLAIN QUERY PLAN {sql}', params)
+            return [row[3] for row in cursor.fetchall()]
+
+    def assertUsesIndex(self, queryset, table):
+        plan = self._plan(queryset)
+        self.assertTrue(
+            any(detail.startswith(f'SEARCH {table} USING') and 'INDEX' in detail for detail in plan),
+            plan,
+        )
+        self.assertNotIn(f'SCAN {table}', plan)
+
+    def test_period_q_ranges(self):
+        self.assertEqual(period_q('signing_date', 'all'), Q())
+        self.assertEqual(
+            period_q('signing_date', '2025-H1'),
+            Q(signing_date__gte=date(2025, 1, 1), signing_date__lt=date(2025, 7, 1)),
+        )
+        self.assertEqual(
+            period_q('signing_date', '2025下半年'),
+            Q(signing_date__gte=date(2025, 7, 1), signing_date__lt=date(2026, 1, 1)),
+        )
+
+    def test_hot_queries_use_indexes(self):
+        self.assertUsesIndex(
+            Procurement.objects.filter(period_q('result_publicity_release_date', 2025), project_id='PRJ-001')
+            .order_by().values('procurement_officer').annotate(total=Count('pk')),
+            'procurement_procurement',
+        )
+        self.assertUsesIndex(
+            Procurement.objects.filter(period_q('result_publicity_release_date', '2025'))
+            .order_by().values_list('procurement_officer', flat=True).distinct(),
+            'procurement_procurement',
+        )
+        self.assertUsesIndex(
+            Contract.objects.filter(period_q('signing_date', '2025-H2'))
+            .order_by().values_list('contract_officer', 'project_id').distinct(),
+            'contract_contract',
+        )
+        self.assertUsesIndex(
+            Payment.objects.filter(period_q('payment_date', 2025), contract_id='HT-001').order_by(),
+            'payment_payment',
+        )
+
+
+class ProjectExcelExportTests(TestCase):
+    """项目 Excel 导出：只写模式逐行写入，样式与原美化结果一致"""
+
+    def setUp(self):
+        from payment.models import Payment
+
+        self.project = Project.objects.create(project_code='PRJ-X', project_name='导出项目')
+        Procurement.objects.create(
+            procurement_code='CG-X-002',
+            project=self.project,
+            project_name='采购二',
+            budget_amount=Decimal('2000.00'),
+            result_publicity_release_date=date(2025, 2, 1),
+        )
+        Procurement.objects.create(
+            procurement_code='CG-X-001',
+            project=self.project,
+            project_name='采购一',
+            result_publicity_release_date=date(2025, 1, 1),
+        )
+        contract = Contract.objects.create(
+            contract_code='HT-X-001',
+            contract_sequence='XH-X-001',
+            contract_name='合同一',
+            contract_source=ContractSource.DIRECT.value,
+            project=self.project,
+            contract_amount=Decimal('1000.00'),
+            signing_date=date(2025, 3, 1),
+        )
+        Payment.objects.create(contract=contract, payment_amount=Decimal('100.00'), payment_date=date(2025, 3, 5))
+        Payment.objects.create(contract=contract, payment_amount=Decimal('150.00'), payment_date=date(2025, 5, 5))
+
+    def test_export_sheets_values_and_styles(self):
+        from openpyxl import load_workbook
+        from project.services.export_service import generate_project_excel
+
+        workbook = load_workbook(generate_project_excel(self.project, None))
+
+        self.assertEqual(workbook.sheetnames, ['采购表', '合同表', '付款表', '结算表', '供应商管理表'])
+
+        procurement_sheet = workbook['采购表']
+        self.assertEqual(procurement_sheet.freeze_panes, 'A2')
+        self.assertTrue(procurement_sheet['A1'].font.b)
+        self.assertEqual(procurement_sheet['A1'].fill.fgColor.rgb, '004472C4')
+        self.assertEqual([procurement_sheet['B2'].value, procurement_sheet['B3'].value], ['CG-X-001', 'CG-X-002'])
+        self.assertEqual(procurement_sheet['I3'].value, 2000.0)
+        # 列宽按内容计算：'采购预算金额(元)' 含7个中文字符
+        self.assertEqual(procurement_sheet.column_dimensions['I'].width, 18)
+
+        payment_sheet = workbook['付款表']
+        self.assertEqual(
+            [cell.value for cell in payment_sheet[1]],
+            ['合同序号', '合同名称', '是否已结算', '结算价', '累计付款金额', '累计付款比例', '2025年3月', '2025年5月'],
+        )
+        self.assertEqual(
+            [cell.value for cell in payment_sheet[2]],
+            ['XH-X-001', '合同一', '否', None, 250.0, 25.0, 100.0, 150.0],
+        )
+
+    def test_export_writes_into_given_file(self):
+        import tempfile
+        from openpyxl import load_workbook
+        from project.services.export_service import generate_project_excel
+
+        with tempfile.TemporaryFile() as handle:
+            self.assertIs(generate_project_excel(self.project, None, year_filter=2024, output=handle), handle)
+            workbook = load_workbook(handle)
+
+        # 2024 年无业务数据：各表仅保留表头
+        self.assertEqual(workbook['采购表'].max_row, 1)
+        self.assertEqual(workbook['付款表'].max_column, 6)
+
+    def test_styled_sheet_reads_rows_once(self):
+        from unittest import mock
+        from openpyxl import Workbook, load_workbook
+        from project.utils import excel_beautifier
+
+        produced = []
+
+        def rows():
+            for idx in range(5):
+                produced.append(idx)
+                yield (f'行{idx}', 'x' * (40 if idx == 4 else 5))
+
+        workbook = Workbook(write_only=True)
+        with mock.patch.object(excel_beautifier, 'WIDTH_SAMPLE_ROWS', 2):
+            excel_beautifier.write_styled_sheet(workbook, '表', ['名称', '内容'], rows())
+        output = BytesIO()
+        workbook.save(output)
+        sheet = load_workbook(output)['表']
+
+        # 行生成器只遍历一次；列宽按表头与样本行计算，样本之外的长内容不参与
+        self.assertEqual(produced, [0, 1, 2, 3, 4])
+        self.assertEqual([row[0].value for row in sheet.iter_rows(min_row=2)], [f'行{idx}' for idx in range(5)])
+        self.assertEqual(sheet.column_dimensions['B'].width, 10)
+
+
+class ExportJobTests(TestCase):
+    """多项目后台导出任务：增量写入ZIP、进度、下载与过期清理"""
+
+    def setUp(self):
+        import shutil
+        import tempfile
+        from django.contrib.auth.models import User
+        from django.test import override_settings
+
+        self.export_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.export_root, ignore_errors=True)
+        # 导出请求经过操作日志中间件，测试中在请求内写入日志
+        settings_override = override_settings(EXPORT_JOB_ROOT=self.export_root, OPERATION_LOG_SINK='sync')
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+        self.user = User.objects.create_user(username='exporter', password='pass')
+        for idx in (1, 2):
+            Project.objects.create(project_code=f'PRJ-E{idx}', project_name=f'导出项目{idx}')
+
+    def _create_job(self):
+        from project.models import ExportJob
+
+        return ExportJob.objects.create(
+            user=self.user, project_codes=['PRJ-E1', 'PRJ-E2'], total_projects=2
+        )
+
+    def test_run_export_job_writes_zip(self):
+        import os
+        import zipfile
+        from project.models import ExportJob
+        from project.tasks import run_export_job
+
+        job = self._create_job()
+        path = run_export_job(job.pk)
+
+        job.refresh_from_db()
+        self.assertEqual(job.status, ExportJob.STATUS_SUCCEEDED)
+        self.assertEqual((job.processed_projects, job.progress_percent), (2, 100))
+        self.assertEqual(job.file_path, path)
+        self.assertEqual(job.file_size, os.path.getsize(path))
+        self.assertIsNotNone(job.expires_at)
+        with zipfile.ZipFile(path) as archive:
+            names = archive.namelist()
+        self.assertEqual(len(names), 2)
+        self.assertTrue(names[0].startswith('导出项目1_'))
+        # 任务只能被执行一次
+        self.assertIsNone(run_export_job(job.pk))
+
+    def test_multi_project_export_submits_job_and_downloads(self):
+        from project.models import ExportJob
+        from project.tasks import run_export_job
+
+        self.client.force_login(self.user)
+        with self.captureOnCommitCallbacks(execute=False) as callbacks:
+            response = self.client.post(
+                '/api/export/project-data/', {'project_codes': ['PRJ-E1', 'PRJ-E2']}
+            )
+
+        self.assertEqual(response.status_code, 202)
+        payload = response.json()
+        self.assertEqual(payload['status'], ExportJob.STATUS_PENDING)
+        self.assertEqual(payload['download_url'], '')
+        self.assertEqual(len(callbacks), 1)
+
+        run_export_job(payload['job_id'])
+        status = self.client.get(payload['status_url']).json()
+        self.assertEqual(status['status'], ExportJob.STATUS_SUCCEEDED)
+
+        download = self.client.get(status['download_url'])
+        self.assertEqual(download.status_code, 200)
+        self.assertEqual(download['Content-Type'], 'application/zip')
+        self.assertTrue(b''.join(download.streaming_content).startswith(b'PK'))
+
+    def test_cleanup_removes_expired_artifacts(self):
+        import os
+        from django.utils import timezone
+        from project.models import ExportJob
+        from project.tasks import cleanup_expired_export_jobs, run_export_job
+
+        job = self._create_job()
+        path = run_export_job(job.pk)
+        ExportJob.objects.filter(pk=job.pk).update(expires_at=timezone.now())
+
+        self.assertEqual(cleanup_expired_export_jobs(), 1)
+        job.refresh_from_db()
+        self.assertEqual(job.status, ExportJob.STATUS_EXPIRED)
+        self.assertFalse(os.path.exists(path))
+
+        self.client.force_login(self.user)
+        response = self.client.get(f'/api/export/jobs/{job.pk}/download/')
+        self.assertEqual(response.status_code, 410)
+
+
+class DatabaseBackupTests(SimpleTestCase):
+    """SQLite 在线备份：压缩产物与清单、校验、原子恢复与定时备份保留"""
+
+    def setUp(self):
+        import shutil
+        import sqlite3
+        import tempfile
+        from contextlib import closing
+        from pathlib import Path
+
+        # 恢复会更新统计与维度选项代数
+        isolate_statistics_cache(self)
+        workdir = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, workdir, ignore_errors=True)
+        self.root = workdir / 'backups'
+        self.root.mkdir()
+        self.db_path = workdir / 'source.sqlite3'
+        with closing(sqlite3.connect(self.db_path)) as conn:
+            conn.execute('CREATE TABLE item (id INTEGER PRIMARY KEY, name TEXT)')
+            conn.executemany('INSERT INTO item (name) VALUES (?)', [(f'记录{i}' * 50,) for i in range(500)])
+            conn.commit()
+
+    def _count_items(self, path):
+        import sqlite3
+        from contextlib import closing
+
+        with closing(sqlite3.connect(path)) as conn:
+            return conn.execute('SELECT COUNT(*) FROM item').fetchone()[0]
+
+    def test_backup_writes_manifest_and_verifies(self):
+        from project.services import db_backup
+
+        steps = []
+        manifest = db_backup.create_backup(
+            self.db_path, '月度备份', root=self.root, compression='gzip',
+            progress=lambda copied, total: steps.append((copied, total)),
+        )
+        backup_file = self.root / manifest['file_name']
+
+        self.assertTrue(manifest['file_name'].endswith('.sqlite3.gz'))
+        self.assertEqual(manifest['sha256'], db_backup.file_sha256(backup_file))
+        self.assertEqual(manifest['integrity'], 'ok')
+        self.assertEqual(manifest['row_counts'], {'item': 500})
+        self.assertEqual(steps[-1], (manifest['page_count'], manifest['page_count']))
+        self.assertTrue(db_backup.verify_backup(backup_file)['ok'])
+
+        # 产物被改动后校验和不一致
+        with open(backup_file, 'ab') as fh:
+            fh.write(b'\0')
+        self.assertFalse(db_backup.verify_backup(backup_file)['ok'])
+
+    def test_backup_reports_phases_and_heartbeats(self):
+        from unittest import mock
+        from project.services import db_backup
+
+        phases = []
+        with mock.patch.object(db_backup, 'HEARTBEAT_SECONDS', 0), \
+                mock.patch.object(db_backup, 'INSPECT_PROGRESS_OPS', 100), \
+                mock.patch.object(db_backup, 'CHUNK_SIZE', 4096):
+            db_backup.create_backup(self.db_path, '心跳', root=self.root, compression='gzip', phase=phases.append)
+
+        # 检查与压缩阶段内持续发送心跳，执行中的任务不会被判为中断
+        self.assertEqual(
+            list(dict.fromkeys(phases)),
+            [db_backup.BACKUP_PHASE_COPY, db_backup.BACKUP_PHASE_INSPECT, db_backup.BACKUP_PHASE_COMPRESS],
+        )
+        self.assertGreater(phases.count(db_backup.BACKUP_PHASE_INSPECT), 1)
+        self.assertGreater(phases.count(db_backup.BACKUP_PHASE_COMPRESS), 1)
+
+    def test_restore_replaces_database_and_rejects_corrupt_backup(self):
+        from project.services import db_backup
+        from project.services.dimension_options import DIMENSION_GENERATION_KEY
+        from project.services.shared.utils import get_generation
+
+        import sqlite3
+
+        manifest = db_backup.create_backup(self.db_path, 'before', root=self.root, compression='none')
+        backup_file = self.root / manifest['file_name']
+        # 路径中的 ?、#、% 需要在 URI 中转义
+        target_dir = self.db_path.parent / 'live #1 100%?'
+        target_dir.mkdir()
+        target = target_dir / 'target.sqlite3'
+        live = sqlite3.connect(target)
+        self.addCleanup(live.close)
+        live.execute('PRAGMA journal_mode = WAL')
+        live.execute('CREATE TABLE item (id INTEGER PRIMARY KEY, name TEXT)')
+        live.execute("INSERT INTO item (name) VALUES ('恢复前')")
+        live.commit()
+        generations = (build_cache_key('combined', None, ()), get_generation(DIMENSION_GENERATION_KEY))
+
+        db_backup.restore_backup(backup_file, target)
+        self.assertEqual(self._count_items(target), 500)
+        # 恢复后统计缓存与维度选项缓存均失效
+        self.assertNotEqual(build_cache_key('combined', None, ()), generations[0])
+        self.assertNotEqual(get_generation(DIMENSION_GENERATION_KEY), generations[1])
+        # 恢复前已打开的连接读写的是恢复后的数据，而不是被替换掉的旧文件
+        self.assertEqual(live.execute('SELECT COUNT(*) FROM item').fetchone()[0], 500)
+        live.execute("INSERT INTO item (name) VALUES ('恢复后')")
+        live.commit()
+        self.assertEqual(self._count_items(target), 501)
+
+        backup_file.write_bytes(backup_file.read_bytes()[:4096])
+        with self.assertRaises(db_backup.BackupError):
+            db_backup.restore_backup(backup_file, target)
+        # 校验失败时原数据库保持不变，临时文件已清理
+        self.assertEqual(self._count_items(target), 501)
+        self.assertEqual(sorted(p.name for p in target.parent.iterdir() if p.name.startswith('.')), [])
+
+    def test_job_status_is_shared_through_status_file(self):
+        import json
+        import time
+        from django.test import override_settings
+        from project.services import db_backup
+        from project.tasks import get_backup_job, run_database_backup
+
+        with override_settings(DATABASE_BACKUP_ROOT=self.root):
+            job_id = db_backup.create_job_status('页面备份')
+            self.assertEqual(get_backup_job(job_id)['status'], db_backup.JOB_STATUS_PENDING)
+            manifest = run_database_backup(job_id, self.db_path, '页面备份', compression='none')
+
+            # 状态来自文件而非进程内存：任何工作进程读取结果一致
+            status_file = self.root / db_backup.JOB_STATUS_DIR / f'{job_id}.json'
+            with open(status_file, encoding='utf-8') as fh:
+                self.assertEqual(json.load(fh)['file_name'], manifest['file_name'])
+            job = get_backup_job(job_id)
+            self.assertEqual(job['status'], db_backup.JOB_STATUS_SUCCEEDED)
+            self.assertEqual(job['copied_pages'], job['total_pages'])
+
+            # 执行中却长时间未更新（进程已退出）按失败处理
+            db_backup.update_job_status(job_id, status=db_backup.JOB_STATUS_RUNNING)
+            data = json.loads(status_file.read_text(encoding='utf-8'))
+            data['updated_at'] = time.time() - db_backup.JOB_STALE_SECONDS - 1
+            status_file.write_text(json.dumps(data), encoding='utf-8')
+            self.assertEqual(get_backup_job(job_id)['status'], db_backup.JOB_STATUS_FAILED)
+
+            self.assertIsNone(get_backup_job('../../etc/passwd'))
+            # 备份列表不包含任务状态目录
+            self.assertEqual([item['name'] for item in db_backup.list_backups()], [manifest['file_name']])
+
+    def test_prune_keeps_recent_scheduled_backups_only(self):
+        import os
+        from project.services import db_backup
+
+        db_backup.create_backup(self.db_path, 'manual', root=self.root, compression='none')
+        for index in range(3):
+            manifest = db_backup.create_backup(self.db_path, f'daily{index}', root=self.root, scheduled=True)
+            path = self.root / manifest['file_name']
+            os.utime(path, (1_700_000_000 + index, 1_700_000_000 + index))
+
+        removed = db_backup.prune_backups(keep=1, root=self.root)
+
+        self.assertEqual(len(removed), 2)
+        names = [item['name'] for item in db_backup.list_backups(self.root)]
+        self.assertEqual(len(names), 2)
+        self.assertTrue(any(name.startswith('auto_daily2_') for name in names))
+        self.assertTrue(any(name.startswith('manual_') for name in names))
+        self.assertFalse(any(p.name.endswith('.manifest.json') and 'daily0' in p.name for p in self.root.iterdir()))
+
+
+class SqliteConnectionTuningTests(TestCase):
+    """SQLite 连接参数：新建连接时按 SQLITE_PRAGMAS 设置，维护命令报告实际值"""
+
+    def test_env_profile_overrides_and_disable(self):
+        from config.sqlite_tuning import DEFAULT_SQLITE_PRAGMAS, sqlite_pragmas_from_env
+
+        self.assertEqual(sqlite_pragmas_from_env({}), DEFAULT_SQLITE_PRAGMAS)
+        pragmas = sqlite_pragmas_from_env({'SQLITE_MMAP_SIZE': '0', 'SQLITE_SYNCHRONOUS': 'FULL'})
+        self.assertEqual((pragmas['mmap_size'], pragmas['synchronous']), (0, 'FULL'))
+        self.assertEqual(sqlite_pragmas_from_env({'SQLITE_TUNING': 'off'}), {})
+
+    @skipUnless(connection.vendor == 'sqlite', 'SQLite 连接参数')
+    def test_connection_applies_profile_and_command_reports(self):
+        from django.test.utils import CaptureQueriesContext
+
+        with connection.cursor() as cursor:
+            cursor.execute('PRAGMA busy_timeout')
+            self.assertEqual(cursor.fetchone()[0], 20000)
+            cursor.execute('PRAGMA cache_size')
+            self.assertEqual(cursor.fetchone()[0], -64000)
+            cursor.execute('PRAGMA temp_store')
+            self.assertEqual(cursor.fetchone()[0], 2)
+
+        out = StringIO()
+        with CaptureQueriesContext(connection) as queries:
+            call_command('sqlite_maintenance', '--optimize', '--analyze', stdout=out)
+        self.assertIn('temp_store: MEMORY / MEMORY', out.getvalue())
+        self.assertIn('已执行 PRAGMA optimize', out.getvalue())
+        # 全量 ANALYZE 不受 optimize 的 analysis_limit 限制，命令结束后恢复为不限制
+        statements = [query['sql'] for query in queries]
+        analyze = statements.index('ANALYZE')
+        self.assertEqual(statements[analyze - 1], 'PRAGMA analysis_limit = 0')
+        self.assertLess(analyze, statements.index('PRAGMA optimize'))
+        with connection.cursor() as cursor:
+            cursor.execute('PRAGMA analysis_limit')
+            self.assertEqual(cursor.fetchone()[0], 0)
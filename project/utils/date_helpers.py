@@ -2,8 +2,10 @@
 日期处理工具函数
 提供日期计算、格式化等辅助功能
 """
-from datetime import datetime, timedelta, date
-from typing import Optional, Tuple
+import re
+from datetime import datetime, time, timedelta, date
+from typing import Optional, Tuple, Union
+from django.db.models import Q
 from django.utils import timezone
 
 
@@ -184,6 +186,74 @@ def get_week_date_range(target_date: Optional[date] = None) -> Tuple[date, date]
     return start_date, end_date
 
 
+_HALF_YEAR_PATTERN = re.compile(r'^(\d{4})(?:-?H([12])|(上|下)半年)?$')
+
+
+def parse_period(period: Union[int, str, None], half: Optional[int] = None) -> Optional[Tuple[int, Optional[int]]]:
+    """
+    解析年度/半年度选择
+
+    支持 2025、'2025'、'2025-H1'、'2025H2'、'2025上半年'；None、''、'all' 表示不筛选，返回 None。
+
+    Returns:
+        tuple: (年份, 半年 1/2 或 None)
+    """
+    if period in (None, '', 'all'):
+        return None
+    if isinstance(period, int):
+        return period, half
+    match = _HALF_YEAR_PATTERN.match(str(period).strip())
+    if not match:
+        raise ValueError(f'无法识别的年度/半年度: {period}')
+    year, half_code, half_label = match.groups()
+    if half_code:
+        half = int(half_code)
+    elif half_label:
+        half = 1 if half_label == '上' else 2
+    return int(year), half
+
+
+def get_period_date_range(year: int, half: Optional[int] = None) -> Tuple[date, date]:
+    """
+    获取年度或半年度的半开区间 [起始日期, 结束日期)
+
+    Args:
+        year: 年份
+        half: 半年 (1 上半年 / 2 下半年)，None 表示全年
+
+    Returns:
+        tuple: (起始日期, 结束日期)，结束日期不包含在区间内
+    """
+    if half not in (None, 1, 2):
+        raise ValueError("半年必须为1或2")
+    start_date = date(year, 7 if half == 2 else 1, 1)
+    end_date = date(year, 7, 1) if half == 1 else date(year + 1, 1, 1)
+    return start_date, end_date
+
+
+def period_q(field: str, period: Union[int, str, None], half: Optional[int] = None, *, with_time: bool = False) -> Q:
+    """
+    年度/半年度筛选条件：field >= 起始 且 field < 结束
+
+    直接比较字段本身，可使用该字段（或以其为前缀的组合）索引；
+    period 为空或 'all' 时返回空条件。DateTimeField 需传 with_time=True，按当前时区零点换算。
+
+    Args:
+        field: 日期字段（可含关联路径，如 'procurement__result_publicity_release_date'）
+        period: 年份或半年度，格式见 parse_period
+        half: 半年 (1/2)，仅 period 为整数年份时使用
+        with_time: 字段是否为 DateTimeField
+    """
+    parsed = parse_period(period, half)
+    if parsed is None:
+        return Q()
+    start, end = get_period_date_range(*parsed)
+    if with_time:
+        start = timezone.make_aware(datetime.combine(start, time.min))
+        end = timezone.make_aware(datetime.combine(end, time.min))
+    return Q(**{f'{field}__gte': start, f'{field}__lt': end})
+
+
 # 注意：get_current_year() 已移至 project/constants.py 统一管理
 # 为保持向后兼容，此处重新导出
 from project.constants import get_current_year
@@ -1,15 +1,74 @@
 """
 Excel工作表美化辅助函数
-用于美化pandas生成的Excel工作表
+用于美化pandas生成的Excel工作表，以及在只写模式下边写入边应用相同样式
 """
+from itertools import chain, islice
+
+from openpyxl.cell import WriteOnlyCell
 from openpyxl.styles import Font, Alignment, PatternFill, Border, Side
 from openpyxl.utils import get_column_letter
 
 
+# 样式定义（beautify_worksheet 与 write_styled_sheet 共用）
+HEADER_FONT = Font(name='微软雅黑', size=11, bold=True, color='FFFFFF')
+HEADER_FILL = PatternFill(start_color='4472C4', end_color='4472C4', fill_type='solid')
+HEADER_ALIGNMENT = Alignment(horizontal='center', vertical='center', wrap_text=True)
+
+CELL_FONT = Font(name='微软雅黑', size=10)
+MONEY_FONT = Font(name='微软雅黑', size=10, bold=True, color='C00000')
+
+MONEY_ALIGNMENT = Alignment(horizontal='right', vertical='center', wrap_text=False)
+DATE_ALIGNMENT = Alignment(horizontal='center', vertical='center', wrap_text=False)
+CENTER_ALIGNMENT = Alignment(horizontal='center', vertical='center', wrap_text=True)
+DEFAULT_ALIGNMENT = Alignment(horizontal='left', vertical='center', wrap_text=True)
+
+THIN_BORDER = Border(
+    left=Side(style='thin', color='D0D0D0'),
+    right=Side(style='thin', color='D0D0D0'),
+    top=Side(style='thin', color='D0D0D0'),
+    bottom=Side(style='thin', color='D0D0D0')
+)
+
+HEADER_ROW_HEIGHT = 25
+DATA_ROW_HEIGHT = 30
+MONEY_NUMBER_FORMAT = '#,##0.00'
+# 只写模式下用于计算列宽的样本行数（列宽最大50，样本足以覆盖常见内容长度）
+WIDTH_SAMPLE_ROWS = 500
+
+
+def _data_cell_style(col_idx, money_columns, date_columns, center_columns):
+    """根据列类型返回数据单元格的 (字体, 对齐, 数字格式)，数字格式为None表示保持默认"""
+    if col_idx in money_columns:
+        # 金额列：红色加粗，千分位分隔，不换行
+        return MONEY_FONT, MONEY_ALIGNMENT, MONEY_NUMBER_FORMAT
+    if col_idx in date_columns:
+        # 日期列：居中，不换行
+        return CELL_FONT, DATE_ALIGNMENT, None
+    if col_idx in center_columns:
+        # 居中列，自动换行
+        return CELL_FONT, CENTER_ALIGNMENT, None
+    # 默认：左对齐，自动换行
+    return CELL_FONT, DEFAULT_ALIGNMENT, None
+
+
+def _display_length(value):
+    """单元格内容显示宽度，中文字符按2个字符宽度计算"""
+    if not value:
+        return 0
+    cell_str = str(value)
+    chinese_count = sum(1 for c in cell_str if ord(c) > 127)
+    return len(cell_str) + chinese_count
+
+
+def _column_width(max_length):
+    """列宽限制在10-50之间"""
+    return min(max(max_length + 2, 10), 50)
+
+
 def beautify_worksheet(worksheet, money_columns=None, date_columns=None, center_columns=None):
     """
     美化Excel工作表
-    
+
     Args:
         worksheet: openpyxl工作表对象
         money_columns: 金额列索引列表（从1开始），如 [5, 6, 7]
@@ -19,78 +78,117 @@ def beautify_worksheet(worksheet, money_columns=None, date_columns=None, center_
     money_columns = money_columns or []
     date_columns = date_columns or []
     center_columns = center_columns or []
-    
-    # 定义样式
-    header_font = Font(name='微软雅黑', size=11, bold=True, color='FFFFFF')
-    header_fill = PatternFill(start_color='4472C4', end_color='4472C4', fill_type='solid')
-    header_alignment = Alignment(horizontal='center', vertical='center', wrap_text=True)
-    
-    cell_font = Font(name='微软雅黑', size=10)
-    money_font = Font(name='微软雅黑', size=10, bold=True, color='C00000')
-    
-    thin_border = Border(
-        left=Side(style='thin', color='D0D0D0'),
-        right=Side(style='thin', color='D0D0D0'),
-        top=Side(style='thin', color='D0D0D0'),
-        bottom=Side(style='thin', color='D0D0D0')
-    )
-    
+
     # 美化表头（第1行）
     for cell in worksheet[1]:
-        cell.font = header_font
-        cell.fill = header_fill
-        cell.alignment = header_alignment
-        cell.border = thin_border
-    
-    worksheet.row_dimensions[1].height = 25
-    
+        cell.font = HEADER_FONT
+        cell.fill = HEADER_FILL
+        cell.alignment = HEADER_ALIGNMENT
+        cell.border = THIN_BORDER
+
+    worksheet.row_dimensions[1].height = HEADER_ROW_HEIGHT
+
     # 美化数据行
     for row_idx, row in enumerate(worksheet.iter_rows(min_row=2), start=2):
         for col_idx, cell in enumerate(row, start=1):
             # 应用边框
-            cell.border = thin_border
-            
+            cell.border = THIN_BORDER
+
             # 根据列类型应用不同格式
-            if col_idx in money_columns:
-                # 金额列：红色加粗，千分位分隔，不换行
-                cell.font = money_font
-                cell.number_format = '#,##0.00'
-                cell.alignment = Alignment(horizontal='right', vertical='center', wrap_text=False)
-            elif col_idx in date_columns:
-                # 日期列：居中，不换行
-                cell.font = cell_font
-                cell.alignment = Alignment(horizontal='center', vertical='center', wrap_text=False)
-            elif col_idx in center_columns:
-                # 居中列，自动换行
-                cell.font = cell_font
-                cell.alignment = Alignment(horizontal='center', vertical='center', wrap_text=True)
-            else:
-                # 默认：左对齐，自动换行
-                cell.font = cell_font
-                cell.alignment = Alignment(horizontal='left', vertical='center', wrap_text=True)
-        
+            font, alignment, number_format = _data_cell_style(
+                col_idx, money_columns, date_columns, center_columns
+            )
+            cell.font = font
+            cell.alignment = alignment
+            if number_format:
+                cell.number_format = number_format
+
         # 设置行高（增加高度以适应换行）
-        worksheet.row_dimensions[row_idx].height = 30
-    
+        worksheet.row_dimensions[row_idx].height = DATA_ROW_HEIGHT
+
     # 自动调整列宽
     for col_idx, column in enumerate(worksheet.columns, start=1):
         column_letter = get_column_letter(col_idx)
         max_length = 0
-        
+
         for cell in column:
             try:
-                if cell.value:
-                    # 中文字符按2个字符宽度计算
-                    cell_str = str(cell.value)
-                    chinese_count = sum(1 for c in cell_str if ord(c) > 127)
-                    cell_length = len(cell_str) + chinese_count
-                    max_length = max(max_length, cell_length)
+                max_length = max(max_length, _display_length(cell.value))
             except:
                 pass
-        
-        # 设置列宽，限制在10-50之间
-        adjusted_width = min(max(max_length + 2, 10), 50)
-        worksheet.column_dimensions[column_letter].width = adjusted_width
-    
+
+        worksheet.column_dimensions[column_letter].width = _column_width(max_length)
+
     # 冻结首行
-    worksheet.freeze_panes = 'A2'
\ No newline at end of file
+    worksheet.freeze_panes = 'A2'
+
+
+def write_styled_sheet(workbook, title, headers, rows, money_columns=None, date_columns=None,
+                       center_columns=None):
+    """
+    在只写模式工作簿中写入工作表，写入时直接应用与 beautify_worksheet 相同的样式
+
+    只写模式下列宽必须在写入第一行前确定，因此先缓存前 WIDTH_SAMPLE_ROWS 行，
+    按表头与这些样本行计算列宽后再逐行写入；rows 只遍历一次，行数据的生成（关联查询等）不会重复执行，
+    数据行也不在内存中累积，适合大数据量导出。
+
+    Args:
+        workbook: openpyxl.Workbook(write_only=True)
+        title: 工作表名称
+        headers: 表头列表
+        rows: 数据行可迭代对象（行内顺序与表头一致）
+        money_columns / date_columns / center_columns: 同 beautify_worksheet
+    """
+    money_columns = money_columns or []
+    date_columns = date_columns or []
+    center_columns = center_columns or []
+
+    worksheet = workbook.create_sheet(title=title)
+    rows = iter(rows)
+
+    # 列宽按表头与前若干行样本计算
+    sample_rows = list(islice(rows, WIDTH_SAMPLE_ROWS))
+    max_lengths = [_display_length(header) for header in headers]
+    for row in sample_rows:
+        for col_idx, value in enumerate(row):
+            length = _display_length(value)
+            if length > max_lengths[col_idx]:
+                max_lengths[col_idx] = length
+    for col_idx, max_length in enumerate(max_lengths, start=1):
+        worksheet.column_dimensions[get_column_letter(col_idx)].width = _column_width(max_length)
+
+    # 数据行统一使用默认行高，避免逐行记录行高
+    worksheet.row_dimensions[1].height = HEADER_ROW_HEIGHT
+    worksheet.sheet_format.defaultRowHeight = DATA_ROW_HEIGHT
+    worksheet.sheet_format.customHeight = True
+    worksheet.freeze_panes = 'A2'
+
+    header_cells = []
+    for header in headers:
+        cell = WriteOnlyCell(worksheet, value=header)
+        cell.font = HEADER_FONT
+        cell.fill = HEADER_FILL
+        cell.alignment = HEADER_ALIGNMENT
+        cell.border = THIN_BORDER
+        header_cells.append(cell)
+    worksheet.append(header_cells)
+
+    column_styles = [
+        _data_cell_style(col_idx, money_columns, date_columns, center_columns)
+        for col_idx in range(1, len(headers) + 1)
+    ]
+
+    # 逐行写入（先写样本行，再继续消费剩余行）
+    for row in chain(sample_rows, rows):
+        cells = []
+        for value, (font, alignment, number_format) in zip(row, column_styles):
+            cell = WriteOnlyCell(worksheet, value=value)
+            cell.font = font
+            cell.alignment = alignment
+            cell.border = THIN_BORDER
+            if number_format:
+                cell.number_format = number_format
+            cells.append(cell)
+        worksheet.append(cells)
+
+    return worksheet
@@ -1,11 +1,17 @@
-"""通用筛选工具函数"""
+"""
+通用筛选工具函数
+
+模糊筛选在全文检索索引可用时改走 FTS5 索引（见 project/services/search_index.py），否则使用 icontains。
+"""
 
 from __future__ import annotations
 
-from typing import Iterable, List, Tuple
+from typing import Iterable, List, Sequence, Tuple
 
 from django.db.models import Q, QuerySet
 
+from project.services.search_index import keyword_subquery
+
 __all__ = [
     "apply_text_filter",
     "apply_multi_field_search",
@@ -26,6 +32,18 @@ def _split_keywords(value: str) -> Tuple[List[str], str]:
     return keywords, "or"
 
 
+def _keyword_condition(queryset: QuerySet, fields: Sequence[str], keyword: str) -> Q:
+    """任一字段包含关键字的条件：优先使用全文检索索引，不可用时为 icontains 的或条件。"""
+    subquery = keyword_subquery(queryset.model, fields, keyword)
+    if subquery is not None:
+        return Q(pk__in=subquery)
+
+    q_object = Q()
+    for field in fields:
+        q_object |= Q(**{f"{field}__icontains": keyword})
+    return q_object
+
+
 def apply_text_filter(queryset: QuerySet, field_name: str, filter_value: str) -> QuerySet:
     """
     按照项目中通用规则（逗号=且，空格=或）对单个字段进行模糊筛选。
@@ -42,17 +60,15 @@ def apply_text_filter(queryset: QuerySet, field_name: str, filter_value: str) ->
     if not keywords:
         return queryset
 
-    lookup = f"{field_name}__icontains"
-
     if mode == "and":
         for keyword in keywords:
-            queryset = queryset.filter(**{lookup: keyword})
+            queryset = queryset.filter(_keyword_condition(queryset, [field_name], keyword))
         return queryset
 
     # mode == "or"
     q_object = Q()
     for keyword in keywords:
-        q_object |= Q(**{lookup: keyword})
+        q_object |= _keyword_condition(queryset, [field_name], keyword)
     return queryset.filter(q_object) if q_object else queryset
 
 
@@ -75,6 +91,7 @@ def apply_multi_field_search(
     if not search_term:
         return queryset
 
+    fields = list(fields)
     normalized = search_term.replace("，", ",")
     mode = mode.lower()
     if mode not in {"and", "or"}:
@@ -85,10 +102,7 @@ def apply_multi_field_search(
         for keyword in keywords:
             if not keyword:
                 continue
-            q_object = Q()
-            for field in fields:
-                q_object |= Q(**{f"{field}__icontains": keyword})
-            queryset = queryset.filter(q_object)
+            queryset = queryset.filter(_keyword_condition(queryset, fields, keyword))
         return queryset
 
     # mode == "or"
@@ -98,7 +112,6 @@ def apply_multi_field_search(
 
     q_object = Q()
     for keyword in keywords:
-        for field in fields:
-            q_object |= Q(**{f"{field}__icontains": keyword})
+        q_object |= _keyword_condition(queryset, fields, keyword)
 
     return queryset.filter(q_object) if q_object else queryset
@@ -0,0 +1,149 @@
+"""
+操作日志缓冲写入器
+
+请求线程只把日志条目放入进程内有界队列，由后台线程按批写入：
+- 攒满 batch_size 条或距本批第一条超过 flush_interval 秒即写出一批；
+- 队列已满时丢弃新条目并计数（dropped），不阻塞请求；
+- 写入失败只记录日志并计数（failed），不影响业务请求；
+- 进程退出时（atexit）写出队列中剩余的条目。
+"""
+from __future__ import annotations
+
+import logging
+import queue
+import threading
+import time
+from typing import Callable, Dict, List, Optional
+
+from django.db import connections
+
+logger = logging.getLogger(__name__)
+
+# 丢弃条目时每隔多少条输出一次告警，避免日志刷屏
+DROP_WARNING_EVERY = 100
+
+
+class OperationLogWriter:
+    """
+    有界缓冲 + 后台线程批量写出
+
+    handler 接收一批条目并负责落库（或投递到任务队列）；
+    background=False 时不启动后台线程，每次提交后立即在当前线程写出。
+    """
+
+    def __init__(
+        self,
+        handler: Callable[[List[dict]], object],
+        *,
+        batch_size: int = 50,
+        flush_interval: float = 0.5,
+        max_buffer: int = 5000,
+        background: bool = True,
+    ):
+        self.handler = handler
+        self.batch_size = max(1, batch_size)
+        self.flush_interval = flush_interval
+        self.background = background
+        self._queue: queue.Queue = queue.Queue(maxsize=max_buffer)
+        self._write_lock = threading.Lock()
+        self._start_lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._counter_lock = threading.Lock()
+        self._counters = {'submitted': 0, 'written': 0, 'dropped': 0, 'failed': 0}
+
+    @property
+    def stats(self) -> Dict[str, int]:
+        """累计计数：提交、写出、因缓冲区满丢弃、写入失败，以及当前待写条目数"""
+        return {**self._counters, 'pending': self._queue.qsize()}
+
+    def submit(self, entry: dict) -> bool:
+        """放入缓冲队列，缓冲区已满时丢弃并返回 False"""
+        try:
+            self._queue.put_nowait(entry)
+        except queue.Full:
+            dropped = self._count('dropped')
+            if dropped % DROP_WARNING_EVERY == 1:
+                logger.warning('操作日志缓冲区已满，累计丢弃 %s 条', dropped)
+            return False
+        self._count('submitted')
+        if self.background:
+            self._ensure_started()
+        else:
+            self.flush()
+        return True
+
+    def flush(self) -> int:
+        """在当前线程写出缓冲区中的全部条目，返回写出的条数"""
+        written = 0
+        while True:
+            batch = self._drain(self.batch_size)
+            if not batch:
+                return written
+            written += self._write(batch)
+
+    def stop(self, timeout: float = 5.0) -> None:
+        """停止后台线程并写出剩余条目"""
+        self._stop_event.set()
+        thread = self._thread
+        if thread is not None and thread.is_alive():
+            thread.join(timeout)
+        self.flush()
+
+    def _ensure_started(self) -> None:
+        if self._thread is not None and self._thread.is_alive():
+            return
+        with self._start_lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._stop_event.clear()
+            self._thread = threading.Thread(
+                target=self._run, name='operation-log-writer', daemon=True
+            )
+            self._thread.start()
+
+    def _run(self) -> None:
+        try:
+            while not self._stop_event.is_set():
+                try:
+                    first = self._queue.get(timeout=self.flush_interval)
+                except queue.Empty:
+                    continue
+                batch = [first]
+                deadline = time.monotonic() + self.flush_interval
+                while len(batch) < self.batch_size:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    try:
+                        batch.append(self._queue.get(timeout=remaining))
+                    except queue.Empty:
+                        break
+                self._write(batch)
+        finally:
+            connections.close_all()
+
+    def _drain(self, limit: int) -> List[dict]:
+        batch = []
+        while len(batch) < limit:
+            try:
+                batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _write(self, batch: List[dict]) -> int:
+        with self._write_lock:
+            try:
+                self.handler(batch)
+            except Exception as exc:
+                self._count('failed', len(batch))
+                logger.error('操作日志批量写入失败（%s 条）: %s', len(batch), exc)
+                return 0
+        self._count('written', len(batch))
+        return len(batch)
+
+    def _count(self, name: str, amount: int = 1) -> int:
+        with self._counter_lock:
+            self._counters[name] += amount
+            return self._counters[name]
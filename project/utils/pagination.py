@@ -1,6 +1,17 @@
+import hashlib
+from decimal import Decimal
 from typing import Any, Iterable
 
+from django.core import signing
+from django.core.exceptions import EmptyResultSet, ValidationError
+from django.core.cache import cache
 from django.core.paginator import Paginator
+from django.db.models import F, Q
+
+# 游标签名盐值：游标对客户端不透明，被篡改时按第一页处理
+CURSOR_SALT = 'project.pagination.cursor'
+# 游标分页总数缓存时长（秒）；缓存键附带数据代数，业务数据变更后自然失效
+KEYSET_COUNT_CACHE_TIMEOUT = 5 * 60
 
 
 def apply_pagination(items: Iterable[Any], request, page_size: int | None = None, default_page_size: int = 20):
@@ -16,3 +27,178 @@ def apply_pagination(items: Iterable[Any], request, page_size: int | None = None
     paginator = Paginator(items, size)
     return paginator.get_page(page)
 
+
+def wants_keyset_pagination(request) -> bool:
+    """请求是否选择游标分页：?pagination=cursor 或携带 cursor 参数"""
+    return request.GET.get('pagination') == 'cursor' or 'cursor' in request.GET
+
+
+class KeysetPage:
+    """
+    游标分页结果
+
+    与 Page 的常用接口保持一致（迭代、len、has_next/has_previous、object_list），
+    另提供 next_cursor / previous_cursor 与总数 count（带缓存，可能滞后于最新数据）。
+    """
+
+    is_keyset = True
+
+    def __init__(self, object_list, *, page_size, has_next, has_previous, next_cursor, previous_cursor, count_func):
+        self.object_list = object_list
+        self.page_size = page_size
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+        self._has_next = has_next
+        self._has_previous = has_previous
+        self._count_func = count_func
+        self._count = None
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def has_next(self) -> bool:
+        return self._has_next
+
+    def has_previous(self) -> bool:
+        return self._has_previous
+
+    def has_other_pages(self) -> bool:
+        return self._has_next or self._has_previous
+
+    @property
+    def count(self) -> int:
+        if self._count is None:
+            self._count = self._count_func()
+        return self._count
+
+
+def _output_field(queryset, name):
+    annotation = queryset.query.annotations.get(name)
+    if annotation is not None:
+        return annotation.output_field
+    return queryset.model._meta.get_field(name)
+
+
+def _encode_cursor(value, pk, direction):
+    if hasattr(value, 'isoformat'):
+        value = value.isoformat()
+    elif isinstance(value, Decimal):
+        value = str(value)
+    return signing.dumps([value, pk, direction], salt=CURSOR_SALT, compress=True)
+
+
+def _decode_cursor(token, field):
+    """解析游标，返回 (排序值, 主键, 方向)；无效游标返回 None"""
+    try:
+        raw_value, pk, direction = signing.loads(token, salt=CURSOR_SALT)
+        value = None if raw_value is None else field.to_python(raw_value)
+    except (signing.BadSignature, ValidationError, TypeError, ValueError):
+        return None
+    if direction not in ('next', 'prev'):
+        return None
+    return value, pk, direction
+
+
+def _seek_condition(name, pk_name, descending, value, pk):
+    """
+    取排序在 (value, pk) 之后的行
+
+    降序时空值排在最后、升序时空值排在最前（与 SQLite 默认一致），
+    空值之间按主键同向排序。
+    """
+    after = 'lt' if descending else 'gt'
+    pk_after = Q(**{f'{pk_name}__{after}': pk})
+    if value is None:
+        condition = Q(**{f'{name}__isnull': True}) & pk_after
+        return condition if descending else condition | Q(**{f'{name}__isnull': False})
+    condition = Q(**{f'{name}__{after}': value}) | (Q(**{name: value}) & pk_after)
+    return condition | Q(**{f'{name}__isnull': True}) if descending else condition
+
+
+def _order_expressions(name, pk_name, descending):
+    if descending:
+        return [F(name).desc(nulls_last=True), F(pk_name).desc()]
+    return [F(name).asc(nulls_first=True), F(pk_name).asc()]
+
+
+def _cached_count(queryset) -> int:
+    """总数缓存：同一筛选条件在数据未变更时只执行一次 COUNT"""
+    from project.services.shared.utils import get_cache_generation
+
+    try:
+        sql = str(queryset.order_by().query)
+    except EmptyResultSet:
+        return 0
+    digest = hashlib.md5(sql.encode('utf-8')).hexdigest()
+    cache_key = f'pagination:count:{digest}:{get_cache_generation()}'
+    count = cache.get(cache_key)
+    if count is None:
+        count = queryset.count()
+        cache.set(cache_key, count, KEYSET_COUNT_CACHE_TIMEOUT)
+    return count
+
+
+def apply_keyset_pagination(queryset, request, ordering: str, page_size: int | None = None, default_page_size: int = 20):
+    """
+    游标（keyset）分页：按 (排序字段, 主键) 定位，不使用 OFFSET
+
+    - ordering 为单个字段名，'-' 前缀表示降序；主键作为同值时的次序；
+    - 游标从 querystring 的 'cursor' 读取，无效或缺失时返回第一页；
+    - 每页只查询 page_size + 1 行判断是否还有下一页，深翻页与第一页开销相同；
+    - 总数 page.count 惰性计算并按数据代数缓存，不展示总数的调用方不执行 COUNT。
+    """
+    size = page_size or default_page_size
+    descending = ordering.startswith('-')
+    name = ordering.lstrip('-')
+    pk_name = queryset.model._meta.pk.name
+    field = _output_field(queryset, name)
+
+    cursor = _decode_cursor(request.GET.get('cursor', ''), field) if request.GET.get('cursor') else None
+    direction = cursor[2] if cursor else 'next'
+    # 向前翻页时反向排序取数，再倒回正常顺序
+    scan_descending = descending if direction == 'next' else not descending
+
+    page_qs = queryset.order_by(*_order_expressions(name, pk_name, scan_descending))
+    if cursor:
+        page_qs = page_qs.filter(_seek_condition(name, pk_name, scan_descending, cursor[0], cursor[1]))
+    rows = list(page_qs[:size + 1])
+    has_more = len(rows) > size
+    rows = rows[:size]
+    if direction == 'prev':
+        rows.reverse()
+
+    has_next = has_more if direction == 'next' else cursor is not None
+    has_previous = cursor is not None if direction == 'next' else has_more
+    return KeysetPage(
+        rows,
+        page_size=size,
+        has_next=has_next and bool(rows),
+        has_previous=has_previous and bool(rows),
+        next_cursor=_encode_cursor(getattr(rows[-1], name), rows[-1].pk, 'next') if has_next and rows else None,
+        previous_cursor=_encode_cursor(getattr(rows[0], name), rows[0].pk, 'prev') if has_previous and rows else None,
+        count_func=lambda: _cached_count(queryset),
+    )
+
+
+def pagination_info(page_obj) -> dict:
+    """JSON 接口的分页信息：页码分页与游标分页各自返回对应字段"""
+    if getattr(page_obj, 'is_keyset', False):
+        return {
+            'mode': 'cursor',
+            'page_size': page_obj.page_size,
+            'total_count': page_obj.count,
+            'has_next': page_obj.has_next(),
+            'has_previous': page_obj.has_previous(),
+            'next_cursor': page_obj.next_cursor,
+            'previous_cursor': page_obj.previous_cursor,
+        }
+    return {
+        'current_page': page_obj.number,
+        'total_pages': page_obj.paginator.num_pages,
+        'total_count': page_obj.paginator.count,
+        'has_next': page_obj.has_next(),
+        'has_previous': page_obj.has_previous(),
+    }
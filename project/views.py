@@ -6,7 +6,6 @@ from django.core.paginator import Paginator
 from django.db import connections
 from django.db.models import (
     Count,
-    Sum,
     Q,
     OuterRef,
     Subquery,
@@ -40,10 +39,6 @@ import shutil
 import tempfile
 import pandas as pd
 
-from .models import Project
-from contract.models import Contract
-from procurement.models import Procurement
-from payment.models import Payment
 from settlement.models import Settlement
 from supplier_eval.models import SupplierEvaluation
 from project.enums import FilePositioning, PROCUREMENT_METHODS_COMMON_LABELS
@@ -51,6 +46,7 @@ from project.enums import FilePositioning, PROCUREMENT_METHODS_COMMON_LABELS
 from project.services.archive_monitor import ArchiveMonitorService
 from project.services.update_monitor import UpdateMonitorService
 from project.services.completeness import get_completeness_overview, get_project_completeness_ranking
+from project.services.dashboard import DashboardSummaryService
 
 from project.services.metrics import get_combined_statistics
 from project.filter_config import get_monitoring_filter_config, resolve_monitoring_year
@@ -281,66 +277,15 @@ def _get_page_size(request, default=20, max_size=200):
 def dashboard(request):
     """数据概览页面"""
     global_filters = _resolve_global_filters(request)
-    year_filter = global_filters['year_filter']
-    project_scope = Project.objects.all()
-    if global_filters['project']:
-        project_scope = project_scope.filter(project_code=global_filters['project'])
-
-    procurement_scope = Procurement.objects.all()
-    contract_scope = Contract.objects.all()
-    payment_scope = Payment.objects.all()
-
-    if global_filters['project']:
-        procurement_scope = procurement_scope.filter(project__project_code=global_filters['project'])
-        contract_scope = contract_scope.filter(project__project_code=global_filters['project'])
-        payment_scope = payment_scope.filter(contract__project__project_code=global_filters['project'])
-
-    if year_filter is not None:
-        procurement_scope = procurement_scope.filter(result_publicity_release_date__year=year_filter)
-        contract_scope = contract_scope.filter(signing_date__year=year_filter)
-        payment_scope = payment_scope.filter(payment_date__year=year_filter)
-
-    # 统计数据 - 每次访问时实时计算
-    total_amount_yuan = contract_scope.aggregate(Sum('contract_amount'))['contract_amount__sum'] or 0
-    stats = {
-        'project_count': project_scope.count(),
-        'procurement_count': procurement_scope.count(),
-        'contract_count': contract_scope.count(),
-        'total_amount': total_amount_yuan,
-        'total_amount_wan': round(float(total_amount_yuan) / 10000, 2),  # 转换为万元
-    }
-    
-    # 项目列表(前5个) - 实时计算每个项目的统计数据
-    projects_queryset = project_scope.order_by('-created_at')[:5]
-    projects = []
-    for project in projects_queryset:
-        project_procurements = Procurement.objects.filter(project=project)
-        project_contracts = Contract.objects.filter(project=project)
-        if year_filter is not None:
-            project_procurements = project_procurements.filter(result_publicity_release_date__year=year_filter)
-            project_contracts = project_contracts.filter(signing_date__year=year_filter)
-        # 实时计算采购数量
-        procurement_count = project_procurements.count()
-        # 实时计算合同数量
-        contract_count = project_contracts.count()
-        # 实时计算合同总额
-        contract_total = project_contracts.aggregate(
-            total=Sum('contract_amount')
-        )['total'] or 0
-        
-        # 添加计算后的属性
-        setattr(project, 'procurement_count', procurement_count)
-        setattr(project, 'contract_count', contract_count)
-        setattr(project, 'contract_total', contract_total)
-        projects.append(project)
-    
-    # 最近采购(前10个)
-    recent_procurements = procurement_scope.select_related('project').order_by('-result_publicity_release_date', '-created_at')[:10]
-    
+    summary = DashboardSummaryService(
+        year=global_filters['year_filter'],
+        project_code=global_filters['project'],
+    ).get_summary()
+
     context = {
-        'stats': stats,
-        'projects': projects,
-        'recent_procurements': recent_procurements,
+        'stats': summary['stats'],
+        'projects': summary['projects'],
+        'recent_procurements': summary['recent_procurements'],
         'global_selected_year': global_filters['year_value'],
         'global_selected_project': global_filters['project'],
     }
@@ -388,6 +333,11 @@ def database_management(request):
     return _views_ops.database_management(request)
 
 
+@require_http_methods(['GET'])
+def database_backup_status(request, job_id):
+    return _views_ops.database_backup_status(request, job_id)
+
+
 @require_http_methods(['GET'])
 def download_import_template(request):
     return _views_ops.download_import_template(request)
@@ -433,6 +383,16 @@ def export_project_data(request):
     return _views_ops.export_project_data(request)
 
 
+@require_http_methods(['GET'])
+def export_job_status(request, job_id):
+    return _views_ops.export_job_status(request, job_id)
+
+
+@require_http_methods(['GET'])
+def export_job_download(request, job_id):
+    return _views_ops.export_job_download(request, job_id)
+
+
 @login_required
 @csrf_protect
 @require_POST
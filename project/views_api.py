@@ -1,5 +1,10 @@
 from django.core.paginator import Paginator
-from project.utils.pagination import apply_pagination
+from project.utils.pagination import (
+    apply_keyset_pagination,
+    apply_pagination,
+    pagination_info,
+    wants_keyset_pagination,
+)
 from django.db.models import Q
 from django.http import JsonResponse
 from django.views.decorators.http import require_http_methods
@@ -13,6 +18,7 @@ from procurement.models import Procurement
 from contract.models import Contract
 from project.services.completeness import get_enabled_fields
 from drf_spectacular.utils import extend_schema, OpenApiParameter
+from project.utils.date_helpers import period_q
 
 
 @extend_schema(
@@ -40,6 +46,13 @@ from drf_spectacular.utils import extend_schema, OpenApiParameter
             description="每页数量",
             required=False,
         ),
+        OpenApiParameter(
+            name="cursor",
+            type=str,
+            location=OpenApiParameter.QUERY,
+            description="游标分页：上一次响应中的 next_cursor / previous_cursor；传 pagination=cursor 取第一页",
+            required=False,
+        ),
     ],
     tags=["基础数据"],
 )
@@ -53,8 +66,10 @@ def api_projects_list(request):
     if search:
         projects = projects.filter(Q(project_code__icontains=search) | Q(project_name__icontains=search))
 
-    page_obj = apply_pagination(projects, request, page_size=page_size)
-    paginator = page_obj.paginator
+    if wants_keyset_pagination(request):
+        page_obj = apply_keyset_pagination(projects, request, '-created_at', page_size=page_size)
+    else:
+        page_obj = apply_pagination(projects, request, page_size=page_size)
     data = [
         {
             'id': project.project_code,
@@ -68,13 +83,7 @@ def api_projects_list(request):
         {
             'success': True,
             'data': data,
-            'pagination': {
-                'current_page': page_obj.number,
-                'total_pages': paginator.num_pages,
-                'total_count': paginator.count,
-                'has_next': page_obj.has_next(),
-                'has_previous': page_obj.has_previous(),
-            },
+            'pagination': pagination_info(page_obj),
         }
     )
 
@@ -111,6 +120,13 @@ def api_projects_list(request):
             description="每页数量",
             required=False,
         ),
+        OpenApiParameter(
+            name="cursor",
+            type=str,
+            location=OpenApiParameter.QUERY,
+            description="游标分页：上一次响应中的 next_cursor / previous_cursor；传 pagination=cursor 取第一页",
+            required=False,
+        ),
     ],
     tags=["基础数据"],
 )
@@ -126,7 +142,7 @@ def api_procurements_list(request):
     
     # 年度筛选
     if year and year.isdigit():
-        procurements = procurements.filter(announcement_release_date__year=int(year))
+        procurements = procurements.filter(period_q('announcement_release_date', year))
     
     # 项目筛选
     if project:
@@ -136,8 +152,10 @@ def api_procurements_list(request):
     if search:
         procurements = procurements.filter(Q(procurement_code__icontains=search) | Q(project_name__icontains=search))
 
-    page_obj = apply_pagination(procurements, request, page_size=page_size)
-    paginator = page_obj.paginator
+    if wants_keyset_pagination(request):
+        page_obj = apply_keyset_pagination(procurements, request, '-created_at', page_size=page_size)
+    else:
+        page_obj = apply_pagination(procurements, request, page_size=page_size)
     data = [
         {
             'id': procurement.procurement_code,
@@ -152,13 +170,7 @@ def api_procurements_list(request):
         {
             'success': True,
             'data': data,
-            'pagination': {
-                'current_page': page_obj.number,
-                'total_pages': paginator.num_pages,
-                'total_count': paginator.count,
-                'has_next': page_obj.has_next(),
-                'has_previous': page_obj.has_previous(),
-            },
+            'pagination': pagination_info(page_obj),
         }
     )
 
@@ -216,6 +228,13 @@ def api_procurements_list(request):
             description="每页数量",
             required=False,
         ),
+        OpenApiParameter(
+            name="cursor",
+            type=str,
+            location=OpenApiParameter.QUERY,
+            description="游标分页：上一次响应中的 next_cursor / previous_cursor；传 pagination=cursor 取第一页",
+            required=False,
+        ),
     ],
     tags=["基础数据"],
 )
@@ -233,7 +252,7 @@ def api_contracts_list(request):
     
     # 年度筛选
     if year and year.isdigit():
-        contracts = contracts.filter(signing_date__year=int(year))
+        contracts = contracts.filter(period_q('signing_date', year))
     
     # 项目筛选
     if project:
@@ -255,8 +274,10 @@ def api_contracts_list(request):
             | Q(contract_sequence__icontains=search)
         )
 
-    page_obj = apply_pagination(contracts, request, page_size=page_size)
-    paginator = page_obj.paginator
+    if wants_keyset_pagination(request):
+        page_obj = apply_keyset_pagination(contracts, request, '-created_at', page_size=page_size)
+    else:
+        page_obj = apply_pagination(contracts, request, page_size=page_size)
     data = [
         {
             'id': contract.contract_code,
@@ -275,13 +296,7 @@ def api_contracts_list(request):
         {
             'success': True,
             'data': data,
-            'pagination': {
-                'current_page': page_obj.number,
-                'total_pages': paginator.num_pages,
-                'total_count': paginator.count,
-                'has_next': page_obj.has_next(),
-                'has_previous': page_obj.has_previous(),
-            },
+            'pagination': pagination_info(page_obj),
         }
     )
 
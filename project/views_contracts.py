@@ -2,22 +2,12 @@ from typing import Optional
 from decimal import Decimal, InvalidOperation
 
 from django.core.paginator import Paginator
-from project.utils.pagination import apply_pagination
+from project.utils.pagination import apply_keyset_pagination, apply_pagination, wants_keyset_pagination
 from django.db.models import (
-    Count,
-    Sum,
     Q,
-    OuterRef,
-    Subquery,
     Value,
     DecimalField,
-    Case,
-    When,
-    Exists,
     F,
-    BooleanField,
-    ExpressionWrapper,
-    DateField,
 )
 from django.db.models.functions import Coalesce
 from django.http import JsonResponse, HttpResponse
@@ -27,10 +17,10 @@ from django.views.decorators.http import require_http_methods
 from .models import Project
 from contract.models import Contract
 from payment.models import Payment
-from settlement.models import Settlement
 
 from project.utils.filters import apply_text_filter, apply_multi_field_search
 from project.views_helpers import _resolve_global_filters, _get_page_size
+from project.utils.date_helpers import period_q
 
 
 def contract_list(request):
@@ -82,7 +72,7 @@ def contract_list(request):
 
     # 年度筛选
     if global_filters['year_filter'] is not None:
-        contracts = contracts.filter(signing_date__year=global_filters['year_filter'])
+        contracts = contracts.filter(period_q('signing_date', global_filters['year_filter']))
 
     # 搜索过滤
     search_mode_value = search_mode if search_mode in {'and', 'or'} else 'auto'
@@ -132,134 +122,20 @@ def contract_list(request):
     if contract_amount_max:
         contracts = contracts.filter(contract_amount__lte=contract_amount_max)
 
+    # 付款与结算汇总读取物化汇总表（由信号增量维护，见 contract/signals.py）
     zero_decimal = Value(Decimal('0'), output_field=DecimalField(max_digits=18, decimal_places=2))
     contracts = contracts.annotate(
-        total_paid_amount=Coalesce(Sum('payments__payment_amount'), zero_decimal),
-        payment_count=Count('payments', distinct=True),
-    )
-
-    supplements_subquery = (
-        Contract.objects.filter(parent_contract=OuterRef('pk'))
-        .values('parent_contract')
-        .annotate(total=Sum('contract_amount'))
-        .values('total')
-    )
-
-    settlement_payment_subquery = (
-        Payment.objects.filter(
-            contract=OuterRef('pk'),
-            is_settled=True,
-            settlement_amount__isnull=False,
-        )
-        .order_by('-payment_date')
-        .values('settlement_amount')[:1]
-    )
-
-    settlement_record_subquery = (
-        Settlement.objects.filter(main_contract=OuterRef('pk')).values('final_amount')[:1]
-    )
-
-    settlement_payment_completion_subquery = (
-        Payment.objects.filter(
-            contract=OuterRef('pk'),
-            is_settled=True,
-            settlement_completion_date__isnull=False,
-        )
-        .order_by('-settlement_completion_date', '-payment_date')
-        .values('settlement_completion_date')[:1]
-    )
-
-    settlement_record_completion_subquery = (
-        Settlement.objects.filter(
-            main_contract=OuterRef('pk'),
-            completion_date__isnull=False,
-        )
-        .values('completion_date')[:1]
-    )
-
-    contracts = contracts.annotate(
-        supplements_total=Coalesce(
-            Subquery(
-                supplements_subquery,
-                output_field=DecimalField(max_digits=18, decimal_places=2),
-            ),
-            zero_decimal,
-        ),
-        settlement_final_amount=Subquery(
-            settlement_record_subquery,
-            output_field=DecimalField(max_digits=18, decimal_places=2),
-        ),
-        settlement_payment_amount=Subquery(
-            settlement_payment_subquery,
-            output_field=DecimalField(max_digits=18, decimal_places=2),
-        ),
-        settlement_record_completion_date=Subquery(
-            settlement_record_completion_subquery,
-            output_field=DateField(),
-        ),
-        settlement_payment_completion_date=Subquery(
-            settlement_payment_completion_subquery,
-            output_field=DateField(),
-        ),
-        has_settlement_record=Exists(Settlement.objects.filter(main_contract=OuterRef('pk'))),
-        has_settlement_payment=Exists(
-            Payment.objects.filter(contract=OuterRef('pk'), is_settled=True)
-        ),
-    )
-
-    contracts = contracts.annotate(
-        contract_plus_supplements=ExpressionWrapper(
-            Coalesce(F('contract_amount'), zero_decimal)
-            + Coalesce(F('supplements_total'), zero_decimal),
-            output_field=DecimalField(max_digits=18, decimal_places=2),
-        ),
-        settlement_amount=Coalesce(
-            F('settlement_final_amount'),
-            F('settlement_payment_amount'),
-            output_field=DecimalField(max_digits=18, decimal_places=2),
-        ),
-        settlement_completion_date=Coalesce(
-            F('settlement_record_completion_date'),
-            F('settlement_payment_completion_date'),
-            output_field=DateField(),
-        ),
-        has_settlement=Case(
-            When(has_settlement_record=True, then=Value(True)),
-            When(has_settlement_payment=True, then=Value(True)),
-            default=Value(False),
-            output_field=BooleanField(),
+        total_paid_amount=Coalesce(F('financial_summary__total_paid_amount'), zero_decimal),
+        payment_count=Coalesce(F('financial_summary__payment_count'), Value(0)),
+        settlement_amount=F('financial_summary__settlement_amount'),
+        settlement_completion_date=F('financial_summary__settlement_completion_date'),
+        has_settlement=Coalesce(F('financial_summary__has_settlement'), Value(False)),
+        payment_ratio=Coalesce(
+            F('financial_summary__payment_ratio'),
+            Value(Decimal('0'), output_field=DecimalField(max_digits=20, decimal_places=2)),
         ),
     )
 
-    contracts = contracts.annotate(
-        base_amount=Case(
-            When(
-                file_positioning='主合同',
-                settlement_amount__isnull=False,
-                then=F('settlement_amount'),
-            ),
-            When(file_positioning='主合同', then=F('contract_plus_supplements')),
-            default=Coalesce(F('contract_amount'), zero_decimal),
-            output_field=DecimalField(max_digits=18, decimal_places=2),
-        ),
-    )
-
-    contracts = contracts.annotate(
-        payment_ratio=Case(
-            When(
-                base_amount__gt=0,
-                then=ExpressionWrapper(
-                    F('total_paid_amount')
-                    * Value(100, output_field=DecimalField(max_digits=5, decimal_places=2))
-                    / F('base_amount'),
-                    output_field=DecimalField(max_digits=12, decimal_places=2),
-                ),
-            ),
-            default=Value(0, output_field=DecimalField(max_digits=12, decimal_places=2)),
-            output_field=DecimalField(max_digits=12, decimal_places=2),
-        )
-    )
-
     # 应用排序
     sort_field_mapping = {
         'contract_sequence': 'contract_sequence',
@@ -303,7 +179,12 @@ def contract_list(request):
     if max_ratio is not None:
         contracts = contracts.filter(payment_ratio__lte=max_ratio)
 
-    page_obj = apply_pagination(contracts, request, page_size=page_size)
+    # ?pagination=cursor 时使用游标分页：按 (排序字段, 合同编号) 定位，深翻页不再 OFFSET 扫描
+    if wants_keyset_pagination(request):
+        keyset_ordering = f'-{actual_sort_field}' if sort_order.lower() == 'desc' else actual_sort_field
+        page_obj = apply_keyset_pagination(contracts, request, keyset_ordering, page_size=page_size)
+    else:
+        page_obj = apply_pagination(contracts, request, page_size=page_size)
 
     contract_data = []
     for contract in page_obj.object_list:
@@ -397,7 +278,7 @@ def contract_detail(request, contract_code):
 
     # 付款记录使用display_contract
     payments = Payment.objects.filter(contract=display_contract).order_by('-payment_date')
-    total_paid = payments.aggregate(Sum('payment_amount'))['payment_amount__sum'] or 0
+    total_paid = display_contract.get_total_paid_amount()
 
     payment_progress = 0
     if contract.contract_amount and contract.contract_amount > 0:
@@ -102,34 +102,113 @@ def _filter_update_problems_by_module(data, module_filter):
     return new_data
 
 
+def _empty_archive_panel():
+    rate_block = {'rate': 0, 'overdue': 0}
+    return {
+        'overview': {
+            'overall_rate': 0,
+            'procurement': dict(rate_block),
+            'contract': dict(rate_block),
+            'settlement': dict(rate_block),
+        },
+        'overdue_list': [],
+    }
+
+
+def _empty_update_panel():
+    return {
+        'kpis': {'overallTimelinessRate': None, 'totalEvents': 0, 'delayedEvents': 0},
+        'statistics': {},
+        'projects': [],
+    }
+
+
+def _empty_completeness_panel():
+    return {
+        'procurement_field_check': {'completeness_rate': 0},
+        'contract_field_check': {'completeness_rate': 0},
+        'error_count': 0,
+    }
+
+
+def _empty_statistics_panel():
+    return {
+        'procurement': {'total_budget': 0, 'method_distribution': [], 'monthly_trend': []},
+        'contract': {'total_amount': 0, 'total_count': 0, 'type_distribution': [], 'monthly_trend': []},
+        'payment': {'total_amount': 0, 'monthly_trend': []},
+    }
+
+
+def _empty_workload_panel():
+    return {'procurement': 0, 'contract': 0, 'payment': 0, 'settlement': 0}
+
+
+def _build_cockpit_panels(year_filter, project_filter, start_date):
+    """驾驶舱各面板定义：互相独立，可并发计算"""
+    from project.services.monitors.workload_statistics import WorkloadStatistics
+    from project.services.panel_executor import Panel
+
+    def compute_archive():
+        archive_service = ArchiveMonitorService(year=year_filter, project_codes=project_filter)
+        return {
+            'overview': archive_service.get_archive_overview(),
+            'overdue_list': archive_service.get_overdue_list(limit=5),
+        }
+
+    def compute_update():
+        return UpdateMonitorService().build_snapshot(year=year_filter, start_date=start_date)
+
+    def compute_completeness():
+        return get_completeness_overview(year=year_filter, project_codes=project_filter)
+
+    def compute_statistics():
+        return get_combined_statistics(year_filter, project_filter)
+
+    def compute_workload():
+        # 工作量按当前自然年统计全部数据，不受年度/项目筛选影响
+        workload_stats = WorkloadStatistics(time_dimension='current_year', dimension_type='person')
+        workload_ranking = workload_stats.get_workload_ranking()
+        return {
+            'procurement': sum(r['procurement_count'] for r in workload_ranking),
+            'contract': sum(r['contract_count'] for r in workload_ranking),
+            'payment': sum(r['payment_count'] for r in workload_ranking),
+            'settlement': sum(r['settlement_count'] for r in workload_ranking),
+        }
+
+    return [
+        Panel('archive', compute_archive, timeout=8, placeholder=_empty_archive_panel),
+        Panel('update', compute_update, timeout=8, placeholder=_empty_update_panel),
+        Panel('completeness', compute_completeness, timeout=8, placeholder=_empty_completeness_panel),
+        Panel('statistics', compute_statistics, timeout=5, placeholder=_empty_statistics_panel),
+        Panel('workload', compute_workload, timeout=5, placeholder=_empty_workload_panel, scoped=False),
+    ]
+
+
 def monitoring_cockpit(request):
-    """综合监控驾驶舱。"""
+    """综合监控驾驶舱：各面板在线程池中并发计算，单个面板超时降级展示。"""
+    from project.services.panel_executor import format_timing_header, run_panels
+    from project.services.shared.utils import normalize_project_codes
+
     year_context, project_codes, project_filter, filter_config = _extract_monitoring_filters(request)
     year_filter = year_context['year_filter']
     start_date = date(year_filter, 1, 1) if year_filter else date(BASE_YEAR, 1, 1)
 
-    archive_service = ArchiveMonitorService(year=year_filter, project_codes=project_filter)
-    archive_overview = archive_service.get_archive_overview()
-    overdue_list = archive_service.get_overdue_list()[:5]
-
-    update_service = UpdateMonitorService()
-    update_snapshot = update_service.build_snapshot(year=year_filter, start_date=start_date)
+    panel_results = run_panels(
+        _build_cockpit_panels(year_filter, project_filter, start_date),
+        year=year_filter,
+        project_codes=normalize_project_codes(project_filter),
+        namespace='cockpit',
+    )
 
-    completeness_overview = get_completeness_overview(year=year_filter, project_codes=project_filter)
-    stats_bundle = get_combined_statistics(year_filter, project_filter)
+    archive_overview = panel_results['archive'].data['overview']
+    overdue_list = panel_results['archive'].data['overdue_list']
+    update_snapshot = panel_results['update'].data
+    completeness_overview = panel_results['completeness'].data
+    stats_bundle = panel_results['statistics'].data
     procurement_stats = stats_bundle['procurement']
     contract_stats = stats_bundle['contract']
     payment_stats = stats_bundle['payment']
-
-    from project.services.monitors.workload_statistics import WorkloadStatistics
-    workload_stats = WorkloadStatistics(time_dimension='current_year', dimension_type='person')
-    workload_ranking = workload_stats.get_workload_ranking()
-    workload_summary = {
-        'procurement': sum(r['procurement_count'] for r in workload_ranking),
-        'contract': sum(r['contract_count'] for r in workload_ranking),
-        'payment': sum(r['payment_count'] for r in workload_ranking),
-        'settlement': sum(r['settlement_count'] for r in workload_ranking),
-    }
+    workload_summary = panel_results['workload'].data
 
     kpis = {
         'timeliness_rate': update_snapshot['kpis']['overallTimelinessRate'] if update_snapshot['kpis']['overallTimelinessRate'] is not None else 0,
@@ -240,8 +319,11 @@ def monitoring_cockpit(request):
         'archive_progress': archive_progress,
         'completeness_progress': completeness_progress,
         'completeness_issues': completeness_issues,
+        'degraded_panels': [name for name, result in panel_results.items() if result.is_degraded],
     }
-    return render(request, 'monitoring/cockpit.html', context)
+    response = render(request, 'monitoring/cockpit.html', context)
+    response['Server-Timing'] = format_timing_header(panel_results)
+    return response
 
 
 def archive_monitor(request):
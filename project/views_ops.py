@@ -1,9 +1,7 @@
 import csv
 import json
 import os
-import shutil
 import tempfile
-import zipfile
 from datetime import datetime, date
 from io import StringIO, BytesIO
 from pathlib import Path
@@ -15,13 +13,14 @@ from django.conf import settings
 from django.contrib import messages
 from django.contrib.auth.decorators import login_required
 from django.core.management import call_command
-from django.http import JsonResponse, HttpResponse
+from django.http import FileResponse, JsonResponse, HttpResponse
 from django.shortcuts import render
+from django.urls import reverse
 from django.utils import timezone
 from django.views.decorators.csrf import csrf_exempt, csrf_protect
 from django.views.decorators.http import require_http_methods, require_POST
 
-from .models import Project
+from .models import ExportJob, Project
 from contract.models import Contract
 from procurement.models import Procurement
 from payment.models import Payment
@@ -32,7 +31,13 @@ from project.services.export_service import (
     import_project_excel,
     ProjectDataImportError,
 )
-from project.tasks import generate_project_export_zip_async
+from project.services import db_backup
+from project.tasks import (
+    cleanup_expired_export_jobs,
+    enqueue_database_backup,
+    enqueue_export_job,
+    get_backup_job,
+)
 
 from .views_helpers import _get_page_size, _resolve_global_filters
 
@@ -65,20 +70,10 @@ from project.decorators import require_permission
 @require_permission('project.view_project')
 @require_http_methods(["GET", "POST", "DELETE", "PUT"])
 def database_management(request):
-    """数据库管理：备份、恢复、清理、下载。"""
-    default_db = settings.DATABASES.get('default', {})
-    engine = default_db.get('ENGINE', '')
-    db_name = default_db.get('NAME')
-    db_path = None
-
-    if engine.endswith('sqlite3') and db_name:
-        db_path = Path(db_name)
-        if not db_path.is_absolute():
-            db_path = Path(settings.BASE_DIR) / db_name
-        db_path = db_path.resolve()
-
-    backups_dir = Path(settings.BASE_DIR) / 'backups' / 'database'
-    backups_dir.mkdir(parents=True, exist_ok=True)
+    """数据库管理：备份、恢复、校验、清理、下载。"""
+    engine = settings.DATABASES.get('default', {}).get('ENGINE', '')
+    db_path = db_backup.get_sqlite_path()
+    backups_dir = db_backup.backup_root()
 
     def _format_size(num_bytes: int) -> str:
         size = float(num_bytes)
@@ -110,11 +105,13 @@ def database_management(request):
             file_name = data.get('file_name')
             if not file_name:
                 return JsonResponse({'success': False, 'message': '未指定要删除的备份文件'}, status=400)
-            backup_file = backups_dir / file_name
+            backup_file = db_backup.resolve_backup(file_name, backups_dir)
             if not backup_file.exists():
                 return JsonResponse({'success': False, 'message': '备份文件不存在'}, status=404)
-            backup_file.unlink()
+            db_backup.delete_backup(backup_file)
             return JsonResponse({'success': True, 'message': f'备份文件 {file_name} 已删除'})
+        except db_backup.BackupError as exc:
+            return JsonResponse({'success': False, 'message': str(exc)}, status=400)
         except Exception as exc:
             return JsonResponse({'success': False, 'message': f'删除失败：{exc}'}, status=500)
 
@@ -125,20 +122,13 @@ def database_management(request):
             new_name = data.get('new_name', '').strip()
             if not old_name or not new_name:
                 return JsonResponse({'success': False, 'message': '请提供原文件名和新文件名'}, status=400)
-            import re
-            clean_name = re.sub(r'[<>:"/\\|?*]', '_', new_name).strip('. ')
-            if not clean_name:
-                return JsonResponse({'success': False, 'message': '新文件名无效'}, status=400)
-            if not clean_name.lower().endswith('.sqlite3'):
-                clean_name += '.sqlite3'
-            old_file = backups_dir / old_name
-            new_file = backups_dir / clean_name
+            old_file = db_backup.resolve_backup(old_name, backups_dir)
             if not old_file.exists():
                 return JsonResponse({'success': False, 'message': '原备份文件不存在'}, status=404)
-            if new_file.exists():
-                return JsonResponse({'success': False, 'message': f'文件名已存在：{clean_name}'}, status=400)
-            old_file.rename(new_file)
-            return JsonResponse({'success': True, 'message': f'备份文件已重命名为：{clean_name}'})
+            new_file = db_backup.rename_backup(old_file, new_name)
+            return JsonResponse({'success': True, 'message': f'备份文件已重命名为：{new_file.name}'})
+        except db_backup.BackupError as exc:
+            return JsonResponse({'success': False, 'message': str(exc)}, status=400)
         except Exception as exc:
             return JsonResponse({'success': False, 'message': f'重命名失败：{exc}'}, status=500)
 
@@ -150,77 +140,53 @@ def database_management(request):
                 messages.success(request, '会话数据已清理')
             elif action == 'backup':
                 if not db_path or not db_path.exists():
-                    messages.error(request, '未找到数据库文件，无法备份')
-                else:
-                    # 获取用户输入的备份名称
-                    backup_name = request.POST.get('backup_name', '').strip()
-                    if not backup_name:
-                        messages.error(request, '请输入备份名称')
-                    else:
-                        # 清理文件名中的非法字符
-                        import re
-                        clean_name = re.sub(r'[<>:"/\\|?*]', '_', backup_name).strip('. ')
-                        if not clean_name:
-                            messages.error(request, '备份名称无效')
-                        else:
-                            # 添加时间戳以避免重名
-                            ts = datetime.now().strftime('%Y%m%d_%H%M%S')
-                            if not clean_name.lower().endswith('.sqlite3'):
-                                backup_file = backups_dir / f'{clean_name}_{ts}.sqlite3'
-                            else:
-                                # 如果用户输入已包含.sqlite3，在扩展名前插入时间戳
-                                base_name = clean_name[:-8]  # 移除.sqlite3
-                                backup_file = backups_dir / f'{base_name}_{ts}.sqlite3'
-                            shutil.copy2(db_path, backup_file)
-                            messages.success(request, f'数据库已备份到：{backup_file.name}')
-            elif action == 'restore':
+                    return JsonResponse({'success': False, 'message': '未找到数据库文件，无法备份'}, status=400)
+                # 清理文件名中的非法字符，时间戳与压缩后缀由备份服务添加
+                backup_name = db_backup.clean_backup_name(request.POST.get('backup_name', '').strip())
+                if not backup_name:
+                    return JsonResponse({'success': False, 'message': '请输入有效的备份名称'}, status=400)
+                job_id = enqueue_database_backup(
+                    db_path,
+                    backup_name,
+                    description=request.POST.get('backup_description', '').strip(),
+                )
+                return JsonResponse({
+                    'success': True,
+                    'message': '备份任务已提交',
+                    **_backup_job_payload(get_backup_job(job_id)),
+                }, status=202)
+            elif action == 'verify':
                 file_name = request.POST.get('file_name', '').strip()
-                if not file_name:
-                    return JsonResponse({
-                        'success': False,
-                        'message': '请选择要恢复的备份文件'
-                    }, status=400)
-                
-                src_file = backups_dir / file_name
-                if not src_file.exists():
-                    return JsonResponse({
-                        'success': False,
-                        'message': f'备份文件不存在：{file_name}'
-                    }, status=404)
-                
-                if not db_path:
-                    return JsonResponse({
-                        'success': False,
-                        'message': '无法定位数据库文件'
-                    }, status=500)
-                
-                try:
-                    shutil.copy2(src_file, db_path)
-                    # 返回JSON响应而不是使用messages
-                    return JsonResponse({
-                        'success': True,
-                        'message': f'数据库已从备份"{file_name}"恢复成功'
-                    })
-                except Exception as e:
-                    return JsonResponse({
-                        'success': False,
-                        'message': f'恢复失败：{str(e)}'
-                    }, status=500)
+                backup_file = db_backup.resolve_backup(file_name, backups_dir)
+                if not backup_file.exists():
+                    return JsonResponse({'success': False, 'message': f'备份文件不存在：{file_name}'}, status=404)
+                result = db_backup.verify_backup(backup_file)
+                return JsonResponse({
+                    'success': result['ok'],
+                    'message': '备份校验通过' if result['ok'] else '；'.join(result['errors']),
+                    'row_counts': result.get('row_counts'),
+                })
+            elif action == 'restore':
+                return _restore_database_response(request.POST.get('file_name', '').strip())
             else:
                 messages.error(request, '不支持的操作')
+        except db_backup.BackupError as exc:
+            return JsonResponse({'success': False, 'message': str(exc)}, status=400)
         except Exception as exc:
             messages.error(request, f'操作失败：{exc}')
 
     db_stat = _collect_db_stat(db_path) if db_path else None
     backups = []
-    for file in backups_dir.glob('*.sqlite3'):
-        info = _collect_db_stat(file)
-        if info:
-            backups.append(info)
-    backups.sort(key=lambda x: x['modified_at'], reverse=True)
+    for item in db_backup.list_backups(backups_dir):
+        backups.append({
+            **item,
+            'path': str(item['path']),
+            'size_display': _format_size(item['size_bytes']),
+            'modified_display': item['modified_at'].strftime('%Y-%m-%d %H:%M:%S'),
+        })
 
     # SQLite3 数据库支持文件级备份
-    supports_file_ops = engine.endswith('sqlite3') and db_path is not None
+    supports_file_ops = db_path is not None
     
     # 获取所有项目用于导入功能
     projects = Project.objects.all().order_by('project_name')
@@ -236,6 +202,78 @@ def database_management(request):
     return render(request, 'database_management.html', context)
 
 
+def _backup_job_payload(job):
+    """备份任务状态（供前端轮询）"""
+    total = job['total_pages']
+    return {
+        'job_id': job['job_id'],
+        'status': job['status'],
+        'phase': job.get('phase', ''),
+        'progress': 100 if job['status'] == db_backup.JOB_STATUS_SUCCEEDED else (
+            int(job['copied_pages'] * 100 / total) if total else 0
+        ),
+        'copied_pages': job['copied_pages'],
+        'total_pages': total,
+        'file_name': job['file_name'],
+        'error_message': job['error_message'],
+        'status_url': reverse('database_backup_status', args=[job['job_id']]),
+    }
+
+
+@login_required
+@require_permission('project.view_project')
+@require_http_methods(['GET'])
+def database_backup_status(request, job_id):
+    """查询后台备份任务进度"""
+    job = get_backup_job(job_id)
+    if job is None:
+        return JsonResponse({'success': False, 'message': '备份任务不存在'}, status=404)
+    return JsonResponse({'success': True, **_backup_job_payload(job)})
+
+
+def _restore_database_response(file_name: str) -> JsonResponse:
+    """校验备份并通过 SQLite 备份 API 将其整体写回在线数据库（见 db_backup.restore_backup）"""
+    if not file_name:
+        return JsonResponse({
+            'success': False,
+            'message': '请选择要恢复的备份文件'
+        }, status=400)
+
+    db_path = db_backup.get_sqlite_path()
+    if not db_path:
+        return JsonResponse({
+            'success': False,
+            'message': '当前数据库引擎不支持文件级恢复'
+        }, status=400)
+
+    try:
+        src_file = db_backup.resolve_backup(file_name)
+    except db_backup.BackupError as exc:
+        return JsonResponse({'success': False, 'message': str(exc)}, status=400)
+    if not src_file.exists():
+        return JsonResponse({
+            'success': False,
+            'message': f'备份文件不存在：{file_name}'
+        }, status=404)
+
+    try:
+        db_backup.restore_backup(src_file, db_path)
+    except db_backup.BackupError as exc:
+        return JsonResponse({
+            'success': False,
+            'message': f'恢复失败：{exc}'
+        }, status=400)
+    except Exception as e:
+        return JsonResponse({
+            'success': False,
+            'message': f'恢复失败：{str(e)}'
+        }, status=500)
+    return JsonResponse({
+        'success': True,
+        'message': f'数据库已从备份"{file_name}"恢复成功'
+    })
+
+
 @csrf_protect
 @require_POST
 def restore_database_no_auth(request):
@@ -245,54 +283,7 @@ def restore_database_no_auth(request):
     仅支持POST请求，需要提供CSRF token。
     """
     try:
-        file_name = request.POST.get('file_name', '').strip()
-        if not file_name:
-            return JsonResponse({
-                'success': False,
-                'message': '请选择要恢复的备份文件'
-            }, status=400)
-        
-        # 获取数据库配置
-        default_db = settings.DATABASES.get('default', {})
-        engine = default_db.get('ENGINE', '')
-        db_name = default_db.get('NAME')
-        
-        # 仅支持SQLite数据库
-        if not engine.endswith('sqlite3') or not db_name:
-            return JsonResponse({
-                'success': False,
-                'message': '当前数据库引擎不支持文件级恢复'
-            }, status=400)
-        
-        # 获取数据库文件路径
-        db_path = Path(db_name)
-        if not db_path.is_absolute():
-            db_path = Path(settings.BASE_DIR) / db_name
-        db_path = db_path.resolve()
-        
-        # 获取备份文件路径
-        backups_dir = Path(settings.BASE_DIR) / 'backups' / 'database'
-        src_file = backups_dir / file_name
-        
-        if not src_file.exists():
-            return JsonResponse({
-                'success': False,
-                'message': f'备份文件不存在：{file_name}'
-            }, status=404)
-        
-        # 执行恢复操作
-        try:
-            shutil.copy2(src_file, db_path)
-            return JsonResponse({
-                'success': True,
-                'message': f'数据库已从备份"{file_name}"恢复成功'
-            })
-        except Exception as e:
-            return JsonResponse({
-                'success': False,
-                'message': f'恢复失败：{str(e)}'
-            }, status=500)
-    
+        return _restore_database_response(request.POST.get('file_name', '').strip())
     except Exception as exc:
         return JsonResponse({
             'success': False,
@@ -717,7 +708,7 @@ def batch_delete_projects(request):
 @login_required
 @require_http_methods(['GET', 'POST'])
 def export_project_data(request):
-    """导出项目数据为Excel或ZIP。"""
+    """导出项目数据：单项目直接下载Excel，多项目提交后台导出任务生成ZIP。"""
     if request.method == 'GET':
         global_filters = _resolve_global_filters(request)
         projects = Project.objects.all()
@@ -780,11 +771,13 @@ def export_project_data(request):
             project = projects.first()
             if project is None:
                 return JsonResponse({'success': False, 'message': '项目不存在'}, status=404)
+            # 写入临时文件并分块流式返回，避免整个文件驻留内存
             excel_file = generate_project_excel(
                 project,
                 request.user,
                 business_start_date=business_start_date,
                 business_end_date=business_end_date,
+                output=tempfile.TemporaryFile(),
             )
 
             # 生成清晰的中文文件名，但限制长度避免问题
@@ -796,8 +789,8 @@ def export_project_data(request):
             filename_utf8 = f"{project_name_clean}_{timestamp}.xlsx"
             filename_ascii = f"project_{timestamp}.xlsx"  # ASCII回退名称
 
-            response = HttpResponse(
-                excel_file.getvalue(),
+            response = FileResponse(
+                excel_file,
                 content_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
             )
 
@@ -811,55 +804,87 @@ def export_project_data(request):
             )
             return response
 
-        # 多项目导出为zip
-        # 当项目数量较大时，改为异步导出，避免长时间阻塞请求
-        if len(projects) > 50:
-            generate_project_export_zip_async.delay(
-                list(projects.values_list('project_code', flat=True)),
-                request.user.id,
-                False,
-                business_start_date,
-                business_end_date,
-            )
-            return JsonResponse(
-                {
-                    'success': True,
-                    'message': '导出任务已提交到后台队列，完成后将通过邮件通知您。',
-                }
-            )
-
-        zip_buffer = BytesIO()
-        with zipfile.ZipFile(zip_buffer, 'w', zipfile.ZIP_DEFLATED) as zip_file:
-            for project in projects:
-                excel_file = generate_project_excel(
-                    project,
-                    request.user,
-                    business_start_date=business_start_date,
-                    business_end_date=business_end_date,
-                )
-                # ZIP内部的文件名使用中文（ZIP格式本身支持UTF-8）
-                filename = f"{project.project_name}_{timestamp}.xlsx"
-                zip_file.writestr(filename, excel_file.getvalue())
-
-        zip_buffer.seek(0)
-
-        # ZIP文件名也使用双文件名策略
-        zip_filename_utf8 = f"项目数据导出_{timestamp}.zip"
-        zip_filename_ascii = f"projects_export_{timestamp}.zip"
-
-        response = HttpResponse(zip_buffer.getvalue(), content_type='application/zip')
-        # 使用双文件名策略：ASCII回退 + UTF-8中文名
-        encoded_zip_filename = quote(zip_filename_utf8.encode('utf-8'))
-        response['Content-Disposition'] = (
-            f'attachment; '
-            f'filename="{zip_filename_ascii}"; '
-            f"filename*=UTF-8''{encoded_zip_filename}"
+        # 多项目导出：提交后台导出任务，前端轮询进度后下载ZIP，避免长时间占用Web进程
+        cleanup_expired_export_jobs()
+        job = ExportJob.objects.create(
+            user=request.user,
+            project_codes=list(projects.values_list('project_code', flat=True)),
+            business_start_date=business_start_date,
+            business_end_date=business_end_date,
+            total_projects=len(projects),
+        )
+        enqueue_export_job(job)
+        return JsonResponse(
+            {
+                'success': True,
+                'message': '导出任务已提交到后台，完成后可直接下载。',
+                **_export_job_payload(job),
+            },
+            status=202,
         )
-        return response
     except Exception as e:
         return JsonResponse({'success': False, 'message': f'导出失败: {str(e)}'}, status=500)
 
 
+def _export_job_payload(job):
+    """导出任务状态（供前端轮询）"""
+    return {
+        'job_id': job.pk,
+        'status': job.status,
+        'status_display': job.get_status_display(),
+        'progress': job.progress_percent,
+        'processed_projects': job.processed_projects,
+        'total_projects': job.total_projects,
+        'current_project': job.current_project,
+        'error_message': job.error_message,
+        'status_url': reverse('export_job_status', args=[job.pk]),
+        'download_url': reverse('export_job_download', args=[job.pk]) if job.is_downloadable else '',
+    }
+
+
+def _get_user_export_job(request, job_id):
+    """只允许提交人（或超级管理员）访问导出任务"""
+    jobs = ExportJob.objects.all()
+    if not request.user.is_superuser:
+        jobs = jobs.filter(user=request.user)
+    return jobs.filter(pk=job_id).first()
+
+
+@login_required
+@require_http_methods(['GET'])
+def export_job_status(request, job_id):
+    """查询后台导出任务进度"""
+    job = _get_user_export_job(request, job_id)
+    if job is None:
+        return JsonResponse({'success': False, 'message': '导出任务不存在'}, status=404)
+    return JsonResponse({'success': True, **_export_job_payload(job)})
+
+
+@login_required
+@require_http_methods(['GET'])
+def export_job_download(request, job_id):
+    """下载后台导出任务生成的ZIP文件"""
+    job = _get_user_export_job(request, job_id)
+    if job is None:
+        return JsonResponse({'success': False, 'message': '导出任务不存在'}, status=404)
+    if not job.is_downloadable or not os.path.exists(job.file_path):
+        return JsonResponse(
+            {'success': False, 'message': f'导出文件不可下载（{job.get_status_display()}）'},
+            status=410 if job.status == ExportJob.STATUS_EXPIRED else 409,
+        )
+
+    timestamp = timezone.localtime(job.created_at).strftime('%Y%m%d_%H%M%S')
+    response = FileResponse(open(job.file_path, 'rb'), content_type='application/zip')
+    # ZIP文件名使用双文件名策略：ASCII回退 + UTF-8中文名
+    encoded_zip_filename = quote(f"项目数据导出_{timestamp}.zip".encode('utf-8'))
+    response['Content-Disposition'] = (
+        f'attachment; '
+        f'filename="projects_export_{timestamp}.zip"; '
+        f"filename*=UTF-8''{encoded_zip_filename}"
+    )
+    return response
+
+
 @login_required
 @csrf_protect
 @require_POST
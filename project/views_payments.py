@@ -9,6 +9,7 @@ from payment.models import Payment
 
 from project.utils.filters import apply_text_filter, apply_multi_field_search
 from project.views_helpers import _resolve_global_filters, _get_page_size
+from project.utils.date_helpers import period_q
 
 
 def payment_list(request):
@@ -35,7 +36,7 @@ def payment_list(request):
     payments = Payment.objects.select_related('contract', 'contract__project')
 
     if global_filters['year_filter'] is not None:
-        payments = payments.filter(payment_date__year=global_filters['year_filter'])
+        payments = payments.filter(period_q('payment_date', global_filters['year_filter']))
 
     search_mode_value = search_mode if search_mode in {'and', 'or'} else 'auto'
     payments = apply_multi_field_search(
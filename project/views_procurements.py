@@ -12,6 +12,7 @@ from payment.models import Payment
 
 from project.utils.filters import apply_text_filter, apply_multi_field_search
 from project.views_helpers import _resolve_global_filters, _get_page_size
+from project.utils.date_helpers import period_q
 
 
 def procurement_list(request):
@@ -75,7 +76,7 @@ def procurement_list(request):
 
     procurements = Procurement.objects.select_related('project')
     if global_filters['year_filter'] is not None:
-        procurements = procurements.filter(result_publicity_release_date__year=global_filters['year_filter'])
+        procurements = procurements.filter(period_q('result_publicity_release_date', global_filters['year_filter']))
 
     search_mode_value = search_mode if search_mode in {'and', 'or'} else 'auto'
     procurements = apply_multi_field_search(
@@ -21,6 +21,7 @@ from payment.models import Payment
 
 from project.utils.filters import apply_text_filter, apply_multi_field_search
 from project.views_helpers import _resolve_global_filters, _get_page_size
+from project.utils.date_helpers import period_q
 
 
 def project_list(request):
@@ -46,7 +47,7 @@ def project_list(request):
     if global_filters['project']:
         projects = projects.filter(project_code=global_filters['project'])
     if global_filters['year_filter'] is not None:
-        projects = projects.filter(created_at__year=global_filters['year_filter'])
+        projects = projects.filter(period_q('created_at', global_filters['year_filter'], with_time=True))
 
     # 搜索过滤
     search_mode_value = search_mode if search_mode in {'and', 'or'} else 'auto'
@@ -104,9 +105,9 @@ def project_detail(request, project_code):
     contract_scope = Contract.objects.filter(project=project)
     payment_scope = Payment.objects.filter(contract__project=project)
     if year_filter is not None:
-        procurement_scope = procurement_scope.filter(result_publicity_release_date__year=year_filter)
-        contract_scope = contract_scope.filter(signing_date__year=year_filter)
-        payment_scope = payment_scope.filter(payment_date__year=year_filter)
+        procurement_scope = procurement_scope.filter(period_q('result_publicity_release_date', year_filter))
+        contract_scope = contract_scope.filter(period_q('signing_date', year_filter))
+        payment_scope = payment_scope.filter(period_q('payment_date', year_filter))
 
     procurement_count = procurement_scope.count()
     contract_count = contract_scope.count()
@@ -0,0 +1,178 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+单元格检测器查询性能基准
+对比线性扫描（原实现）与网格/文本索引的锚点查找与右侧/下方邻居查询耗时，并校验结果一致
+
+用法：
+    python scripts/benchmark_cell_detector.py                 # 使用 docs/ 下的样本PDF，缺失时使用合成数据
+    python scripts/benchmark_cell_detector.py a.pdf b.pdf     # 指定PDF
+    python scripts/benchmark_cell_detector.py --pages 20      # 合成数据页数
+"""
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from pdf_import.core.config_loader import ConfigLoader
+from pdf_import.utils.cell_detector import Cell, CellDetector
+
+SAMPLE_PDFS = [
+    '2-23.采购请示OA审批（PDF导出版）.pdf',
+    '2-24.采购公告-特区建工采购平台（PDF导出版）.pdf',
+    '2-44.采购结果OA审批（PDF导出版）.pdf',
+    '2-45.中标候选人公示-特区建工采购平台（PDF导出版）.pdf',
+    '2-47.采购结果公示-特区建工采购平台（PDF导出版）.pdf',
+]
+
+
+# ---------- 线性扫描参考实现（与索引化之前的 CellDetector 逻辑一致） ----------
+
+def linear_find_cell_by_text(cells, text, fuzzy=True):
+    for cell in cells:
+        if fuzzy:
+            if text in cell.text or cell.text in text:
+                return cell
+        elif cell.text == text:
+            return cell
+    return None
+
+
+def linear_find_right_cell(detector, anchor, max_distance=200.0):
+    candidates = []
+    for cell in detector.cells:
+        if cell.page_num != anchor.page_num or cell.x0 <= anchor.x1:
+            continue
+        if abs(cell.center_y - anchor.center_y) > detector.tolerance_y * 2:
+            continue
+        distance = cell.x0 - anchor.x1
+        if distance <= max_distance:
+            candidates.append((distance, cell))
+    candidates.sort(key=lambda x: x[0])
+    return candidates[0][1] if candidates else None
+
+
+def linear_find_below_cell(detector, anchor, max_distance=100.0):
+    candidates = []
+    for cell in detector.cells:
+        if cell.page_num != anchor.page_num or cell.y0 <= anchor.y1:
+            continue
+        if abs(cell.center_x - anchor.center_x) > detector.tolerance_x * 2:
+            continue
+        distance = cell.y0 - anchor.y1
+        if distance <= max_distance:
+            candidates.append((distance, cell))
+    candidates.sort(key=lambda x: x[0])
+    return candidates[0][1] if candidates else None
+
+
+# ---------- 数据准备 ----------
+
+def configured_keys():
+    """锚点查询词：field_mapping.yml 中各字段提取配置的 key，没有 key 时使用字段标签"""
+    keys = set()
+    for field_config in ConfigLoader().load_field_mapping().get('fields', {}).values():
+        extraction = (field_config.get('source') or {}).get('extraction') or {}
+        key = extraction.get('key') or field_config.get('label')
+        if key:
+            keys.add(key)
+    return sorted(keys)
+
+
+def synthetic_detector(pages, rng):
+    """合成数据：每页约 60 行 x 8 列文字块"""
+    vocabulary = ['项目名称', '采购控制价', '中标单位', '成交价', '开标时间', '联系人', '序号',
+                  '有限公司', '元', '人民币', '公告', '审批', '意见', '同意', '采购人', '代理机构']
+    detector = CellDetector()
+    cells = []
+    for page_num in range(pages):
+        for row in range(60):
+            top = 40 + row * 12
+            for col in range(8):
+                text = rng.choice(vocabulary) + str(rng.randint(0, 999))
+                x0 = 30 + col * 70
+                cells.append(Cell(text, x0, top, x0 + 10 * len(text) * 0.6, top + 10, page_num))
+    detector.cells = cells
+    detector._build_spatial_index()
+    return detector
+
+
+def timed(func, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        result = func()
+    return (time.perf_counter() - start) / repeat, result
+
+
+def run_benchmark(name, detector, keys, repeat, rng):
+    sample = rng.sample(detector.cells, min(200, len(detector.cells)))
+    queries = keys + [cell.text for cell in sample[:50]] + [cell.text[:2] for cell in sample[50:100]]
+
+    def indexed_lookup():
+        return [detector.find_cell_by_text(q, fuzzy=True) for q in queries]
+
+    def linear_lookup():
+        return [linear_find_cell_by_text(detector.cells, q, fuzzy=True) for q in queries]
+
+    def indexed_neighbours():
+        return [(detector.find_right_cell(c), detector.find_below_cell(c)) for c in sample]
+
+    def linear_neighbours():
+        return [(linear_find_right_cell(detector, c), linear_find_below_cell(detector, c)) for c in sample]
+
+    # 建索引耗时
+    build_time, _ = timed(detector._build_spatial_index, repeat)
+
+    rows = []
+    for label, linear, indexed, count in (
+        ('锚点查找(模糊)', linear_lookup, indexed_lookup, len(queries)),
+        ('右侧+下方邻居', linear_neighbours, indexed_neighbours, len(sample)),
+    ):
+        linear_time, linear_result = timed(linear, repeat)
+        indexed_time, indexed_result = timed(indexed, repeat)
+        rows.append((label, count, linear_time, indexed_time, linear_result == indexed_result))
+
+    print(f"\n[{name}] 单元格数 {len(detector.cells)}, 建索引 {build_time * 1000:.2f} ms")
+    print(f"  {'查询':<14}{'次数':>6}{'线性(ms)':>12}{'索引(ms)':>12}{'加速比':>9}  结果一致")
+    for label, count, linear_time, indexed_time, same in rows:
+        speedup = linear_time / indexed_time if indexed_time else float('inf')
+        print(f"  {label:<14}{count:>6}{linear_time * 1000:>12.2f}{indexed_time * 1000:>12.2f}"
+              f"{speedup:>8.1f}x  {'是' if same else '否'}")
+    return all(row[4] for row in rows)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='单元格检测器查询性能基准')
+    parser.add_argument('pdfs', nargs='*', help='PDF文件路径（默认 docs/ 下的样本PDF）')
+    parser.add_argument('--pages', type=int, default=10, help='没有样本PDF时合成数据的页数')
+    parser.add_argument('--repeat', type=int, default=5, help='每项测试重复次数')
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    keys = configured_keys()
+
+    pdf_paths = [Path(p) for p in args.pdfs] or [
+        project_root / 'docs' / name for name in SAMPLE_PDFS if (project_root / 'docs' / name).exists()
+    ]
+
+    all_same = True
+    if pdf_paths:
+        for pdf_path in pdf_paths:
+            detector = CellDetector()
+            detector.extract_cells_from_pdf(str(pdf_path))
+            all_same &= run_benchmark(pdf_path.name, detector, keys, args.repeat, rng)
+    else:
+        print("未找到样本PDF，使用合成数据")
+        all_same &= run_benchmark(f'合成数据 {args.pages} 页', synthetic_detector(args.pages, rng),
+                                  keys, args.repeat, rng)
+
+    print("\n结果校验:", "全部一致" if all_same else "存在差异！")
+    return 0 if all_same else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,181 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+SQLite 连接参数并发基准
+模拟批量导入期间的统计查询：一个写线程按批次事务插入数据，多个读线程反复执行按年度分组的统计查询，
+对比 SQLite 默认参数（回滚日志）与 config/sqlite_tuning.py 中的连接参数（WAL 等）下的读延迟与锁冲突次数。
+
+每个场景使用独立的临时数据库文件（journal_mode 会持久化在文件中），两种场景的数据与操作完全相同。
+
+用法：
+    python scripts/benchmark_sqlite_pragmas.py                          # 默认规模
+    python scripts/benchmark_sqlite_pragmas.py --rows 50000 --import-rows 100000 --readers 4
+    python scripts/benchmark_sqlite_pragmas.py --timeout 0.1            # 缩短锁等待，观察 "database is locked"
+"""
+import argparse
+import random
+import sqlite3
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from contextlib import closing
+from datetime import date, timedelta
+from pathlib import Path
+
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from config.sqlite_tuning import DEFAULT_SQLITE_PRAGMAS, apply_sqlite_pragmas
+
+OFFICERS = [f'经办人{i}' for i in range(20)]
+PROJECTS = [f'PRJ{i:03d}' for i in range(50)]
+START_DATE = date(2022, 1, 1)
+
+CREATE_SQL = [
+    'CREATE TABLE procurement ('
+    ' id INTEGER PRIMARY KEY, project_id TEXT, procurement_officer TEXT,'
+    ' result_publicity_release_date TEXT, winning_amount REAL, remark TEXT)',
+    'CREATE INDEX procurement_date_officer ON procurement (result_publicity_release_date, procurement_officer)',
+]
+INSERT_SQL = (
+    'INSERT INTO procurement (project_id, procurement_officer, result_publicity_release_date, winning_amount, remark)'
+    ' VALUES (?, ?, ?, ?, ?)'
+)
+# 与统计页面相同形态的查询：年度半开区间 + 按经办人分组
+READ_SQL = (
+    'SELECT procurement_officer, COUNT(*), SUM(winning_amount) FROM procurement'
+    ' WHERE result_publicity_release_date >= ? AND result_publicity_release_date < ?'
+    ' GROUP BY procurement_officer'
+)
+
+
+def make_rows(count, rng):
+    for _ in range(count):
+        yield (
+            rng.choice(PROJECTS),
+            rng.choice(OFFICERS),
+            (START_DATE + timedelta(days=rng.randrange(3 * 365))).isoformat(),
+            round(rng.uniform(1e4, 1e7), 2),
+            '备注' * rng.randrange(5, 40),
+        )
+
+
+def connect(path, pragmas, timeout):
+    conn = sqlite3.connect(path, timeout=timeout, check_same_thread=False)
+    apply_sqlite_pragmas(conn, pragmas)
+    return conn
+
+
+def prepare_database(path, pragmas, rows, seed):
+    with closing(connect(path, pragmas, timeout=30)) as conn:
+        for sql in CREATE_SQL:
+            conn.execute(sql)
+        conn.executemany(INSERT_SQL, make_rows(rows, random.Random(seed)))
+        conn.commit()
+        conn.execute('ANALYZE')
+
+
+def run_scenario(label, pragmas, args):
+    """返回 (读延迟列表(秒), 锁冲突次数, 导入耗时)"""
+    workdir = Path(tempfile.mkdtemp(prefix='sqlite_bench_'))
+    db_path = workdir / 'bench.sqlite3'
+    prepare_database(db_path, pragmas, args.rows, args.seed)
+
+    latencies = []
+    locked_errors = [0]
+    lock = threading.Lock()
+    import_done = threading.Event()
+
+    def reader(index):
+        rng = random.Random(args.seed + index)
+        with closing(connect(db_path, pragmas, args.timeout)) as conn:
+            while not import_done.is_set():
+                year = 2022 + rng.randrange(3)
+                started = time.perf_counter()
+                try:
+                    conn.execute(READ_SQL, (f'{year}-01-01', f'{year + 1}-01-01')).fetchall()
+                except sqlite3.OperationalError as exc:
+                    if 'locked' not in str(exc):
+                        raise
+                    with lock:
+                        locked_errors[0] += 1
+                    continue
+                elapsed = time.perf_counter() - started
+                with lock:
+                    latencies.append(elapsed)
+
+    readers = [threading.Thread(target=reader, args=(i,)) for i in range(args.readers)]
+    for thread in readers:
+        thread.start()
+
+    rng = random.Random(args.seed * 7)
+    import_started = time.perf_counter()
+    with closing(connect(db_path, pragmas, args.timeout)) as writer:
+        remaining = args.import_rows
+        while remaining > 0:
+            batch = min(args.batch_size, remaining)
+            try:
+                with writer:
+                    writer.executemany(INSERT_SQL, make_rows(batch, rng))
+            except sqlite3.OperationalError as exc:
+                if 'locked' not in str(exc):
+                    raise
+                with lock:
+                    locked_errors[0] += 1
+                continue
+            remaining -= batch
+    import_elapsed = time.perf_counter() - import_started
+    import_done.set()
+    for thread in readers:
+        thread.join()
+
+    for path in workdir.iterdir():
+        path.unlink()
+    workdir.rmdir()
+    return latencies, locked_errors[0], import_elapsed
+
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+def report(label, latencies, locked, import_elapsed):
+    print(f'\n[{label}]')
+    print(f'  导入耗时: {import_elapsed:.2f}s   读查询完成: {len(latencies)} 次   锁冲突: {locked} 次')
+    if not latencies:
+        print('  （导入期间没有完成的读查询）')
+        return
+    ms = [value * 1000 for value in latencies]
+    print(
+        f'  读延迟(ms): p50={statistics.median(ms):.2f}  p95={percentile(ms, 95):.2f}'
+        f'  p99={percentile(ms, 99):.2f}  max={max(ms):.2f}'
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description='SQLite 连接参数并发基准（导入期间的读延迟）')
+    parser.add_argument('--rows', type=int, default=20000, help='初始数据行数')
+    parser.add_argument('--import-rows', type=int, default=50000, help='导入行数')
+    parser.add_argument('--batch-size', type=int, default=500, help='每个导入事务的行数')
+    parser.add_argument('--readers', type=int, default=4, help='并发读线程数')
+    parser.add_argument('--timeout', type=float, default=20, help='锁等待超时（秒），与 settings 的 OPTIONS.timeout 对应')
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    print(
+        f'初始 {args.rows} 行，导入 {args.import_rows} 行（每批 {args.batch_size} 行），'
+        f'{args.readers} 个读线程，锁等待 {args.timeout}s'
+    )
+    scenarios = [
+        ('SQLite 默认参数', {'busy_timeout': int(args.timeout * 1000)}),
+        ('连接参数配置', {**DEFAULT_SQLITE_PRAGMAS, 'busy_timeout': int(args.timeout * 1000)}),
+    ]
+    for label, pragmas in scenarios:
+        report(label, *run_scenario(label, pragmas, args))
+
+
+if __name__ == '__main__':
+    main()
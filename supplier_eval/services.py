@@ -2,11 +2,99 @@
 供应商管理模块 - 业务逻辑服务层
 提供供应商分析、统计等业务逻辑
 """
+from collections import defaultdict
 from decimal import Decimal
-from django.db.models import Count, Sum, Q, Avg
-from django.db.models.functions import Coalesce
+from django.db.models import Count, Sum, Q, F, Window
+from django.db.models.functions import Coalesce, RowNumber
 from contract.models import Contract
 from supplier_eval.models import SupplierEvaluation, SupplierInterview
+from project.utils.date_helpers import period_q
+
+# 分数段分布(每10分一档)：(下限, 上限(不含), 标签)
+SCORE_RANGES = [
+    (0, 60, '0-59'),
+    (60, 70, '60-69'),
+    (70, 80, '70-79'),
+    (80, 90, '80-89'),
+    (90, 101, '90-100'),
+]
+
+# 评分等级：(键, 下限, 上限(不含))，None 表示不限
+SCORE_LEVELS = [
+    ('excellent', 90, None),
+    ('good', 80, 90),
+    ('qualified', 70, 80),
+    ('unqualified', None, 70),
+]
+
+
+def normalize_supplier_name(name):
+    """供应商归一化键：合并空白、忽略大小写，合同乙方与评价中的供应商名称统一按此比较"""
+    return ' '.join(str(name or '').split()).casefold()
+
+
+class SupplierDimension:
+    """
+    供应商维度 - 以归一化名称为键关联合同与履约评价
+
+    评价归属规则沿用原逐个供应商 icontains 查询：评价中的供应商名称包含该供应商名称即归属该供应商
+    （同一条评价可归属多个供应商）。各供应商的合同、评价先分组查询，再在内存中按键关联。
+    """
+
+    def __init__(self, keys):
+        self._keys_by_length = defaultdict(set)
+        for key in keys:
+            if key:
+                self._keys_by_length[len(key)].add(key)
+
+    def match(self, name):
+        """返回名称中包含的全部供应商键"""
+        text = normalize_supplier_name(name)
+        matched = set()
+        for length, keys in self._keys_by_length.items():
+            for start in range(len(text) - length + 1):
+                if text[start:start + length] in keys:
+                    matched.add(text[start:start + length])
+        return matched
+
+    @staticmethod
+    def evaluation_rows(evaluations):
+        """
+        按供应商名称分组的评价统计（一次分组查询）
+
+        每行包含 supplier_name、count、score_sum、last_sum、last_count，
+        以及各评分等级与分数段的计数（键为 SCORE_LEVELS / SCORE_RANGES 中的键与标签）。
+        """
+        aggregates = {
+            'count': Count('pk'),
+            'score_sum': Sum('comprehensive_score'),
+            'last_sum': Sum('last_evaluation_score'),
+            'last_count': Count('last_evaluation_score'),
+        }
+        for key, min_score, max_score in SCORE_LEVELS:
+            condition = Q()
+            if min_score is not None:
+                condition &= Q(comprehensive_score__gte=min_score)
+            if max_score is not None:
+                condition &= Q(comprehensive_score__lt=max_score)
+            aggregates[key] = Count('pk', filter=condition)
+        for min_score, max_score, label in SCORE_RANGES:
+            aggregates[label] = Count(
+                'pk', filter=Q(comprehensive_score__gte=min_score, comprehensive_score__lt=max_score)
+            )
+        return list(
+            evaluations.order_by().values('supplier_name').annotate(**aggregates)
+        )
+
+    @staticmethod
+    def combine(rows):
+        """合并多行评价统计（按列求和）"""
+        combined = defaultdict(lambda: 0)
+        for row in rows:
+            for key, value in row.items():
+                if key != 'supplier_name' and value is not None:
+                    combined[key] += value
+        return combined
 
 
 class SupplierAnalysisService:
@@ -40,64 +128,60 @@ class SupplierAnalysisService:
         contracts = Contract.objects.filter(
             file_positioning__in=['主合同', '框架协议']
         )
+        evaluations = SupplierEvaluation.objects.filter(comprehensive_score__isnull=False)
         
         # 如果指定供应商名称，进行模糊查询
+        # 评价名称需包含供应商名称，而供应商名称包含查询词，评价同样可按查询词预筛
         if supplier_name:
             contracts = contracts.filter(party_b__icontains=supplier_name)
+            evaluations = evaluations.filter(supplier_name__icontains=supplier_name)
         
-        # 按供应商分组统计
-        summary = contracts.values('party_b').annotate(
-            total_contracts=Count('contract_code', distinct=True),  # 使用distinct避免重复计数
-            ongoing_contracts=Count(
-                'contract_code',
-                distinct=True,  # 使用distinct避免重复计数
-                filter=Q(settlement__isnull=True) & ~Q(payments__is_settled=True)  # 未结算的合同（排除Settlement表和Payment表中标记为已结算的）
-            )
-        ).order_by('-total_contracts')
+        # 按乙方分组：合同数、在执行合同数、合同总金额(含补充协议)、累计付款均来自合同财务汇总表
+        # 在执行：既没有结算记录，也没有标记为已结算的付款
+        contract_rows = contracts.order_by().values('party_b').annotate(
+            total_contracts=Count('pk'),
+            ongoing_contracts=Count('pk', filter=Q(financial_summary__has_settlement=False)),
+            total_amount=Sum('financial_summary__contract_total_amount'),
+            total_paid=Sum('financial_summary__total_paid_amount'),
+        )
         
-        # 补充计算每个供应商的合同总金额和累计付款
-        result = []
-        for item in summary:
-            supplier = item['party_b']
-            
-            # 获取该供应商的所有主合同和框架协议
-            supplier_contracts = Contract.objects.filter(
-                party_b=supplier,
-                file_positioning__in=['主合同', '框架协议']
-            )
-            
-            # 计算合同总金额(包含补充协议)
-            total_amount = Decimal('0')
-            total_paid = Decimal('0')
-            
-            for contract in supplier_contracts:
-                # 使用模型方法获取含补充协议的总金额
-                total_amount += contract.get_contract_with_supplements_amount() or Decimal('0')
-                # 获取累计付款
-                total_paid += contract.get_total_paid_amount() or Decimal('0')
-            
-            # 获取该供应商的评价统计
-            evaluations = SupplierEvaluation.objects.filter(
-                supplier_name__icontains=supplier,
-                comprehensive_score__isnull=False
-            )
-            
-            avg_score = evaluations.aggregate(
-                avg=Avg('comprehensive_score')
-            )['avg']
-            
-            evaluation_count = evaluations.count()
-            
-            # 组装结果
-            result.append({
-                'party_b': supplier,
-                'total_contracts': item['total_contracts'],
-                'ongoing_contracts': item['ongoing_contracts'],
-                'total_amount': total_amount,
-                'total_paid': total_paid,
-                'avg_score': round(avg_score, 2) if avg_score else None,
-                'evaluation_count': evaluation_count,
+        # 按归一化名称合并（大小写、空白不同的乙方视为同一供应商，显示合同最多的写法）
+        suppliers = {}
+        for row in sorted(contract_rows, key=lambda r: (-r['total_contracts'], r['party_b'])):
+            key = normalize_supplier_name(row['party_b'])
+            supplier = suppliers.setdefault(key, {
+                'party_b': row['party_b'],
+                'total_contracts': 0,
+                'ongoing_contracts': 0,
+                'total_amount': Decimal('0'),
+                'total_paid': Decimal('0'),
+                'score_sum': Decimal('0'),
+                'evaluation_count': 0,
             })
+            supplier['total_contracts'] += row['total_contracts']
+            supplier['ongoing_contracts'] += row['ongoing_contracts']
+            supplier['total_amount'] += row['total_amount'] or Decimal('0')
+            supplier['total_paid'] += row['total_paid'] or Decimal('0')
+        
+        # 评价按供应商名称一次分组，再归属到名称被包含的供应商
+        dimension = SupplierDimension(suppliers)
+        evaluation_rows = evaluations.order_by().values('supplier_name').annotate(
+            count=Count('pk'),
+            score_sum=Sum('comprehensive_score'),
+        )
+        for row in evaluation_rows:
+            for key in dimension.match(row['supplier_name']):
+                suppliers[key]['score_sum'] += row['score_sum'] or Decimal('0')
+                suppliers[key]['evaluation_count'] += row['count']
+        
+        result = []
+        for supplier in sorted(suppliers.values(), key=lambda s: (-s['total_contracts'], s['party_b'])):
+            evaluation_count = supplier.pop('evaluation_count')
+            score_sum = supplier.pop('score_sum')
+            avg_score = score_sum / evaluation_count if evaluation_count else None
+            supplier['avg_score'] = round(avg_score, 2) if avg_score else None
+            supplier['evaluation_count'] = evaluation_count
+            result.append(supplier)
         
         return result
     
@@ -134,7 +218,7 @@ class SupplierAnalysisService:
         contracts = Contract.objects.filter(
             party_b__icontains=supplier_name,
             file_positioning__in=['主合同', '框架协议']
-        ).select_related('settlement').prefetch_related('supplements', 'payments', 'evaluations')
+        ).select_related('settlement', 'financial_summary').prefetch_related('evaluations')
         
         # 状态筛选
         if contract_status == 'ongoing':
@@ -147,22 +231,18 @@ class SupplierAnalysisService:
         
         result = []
         for contract in contracts:
-            # 计算合同总金额(含补充协议)
+            # 付款、补充协议、结算信息均取自合同财务汇总（随合同一并查询）
+            summary = contract.get_financial_summary()
             contract_total_amount = contract.get_contract_with_supplements_amount()
-            
-            # 获取付款信息
-            total_paid = contract.get_total_paid_amount()
-            payment_count = contract.get_payment_count()
+            total_paid = summary.total_paid_amount
+            payment_count = summary.payment_count
             payment_ratio = contract.get_payment_ratio()
             
-            # 判断是否在执行中
-            # 检查两个条件：1. Settlement表中没有记录  2. Payment表中没有标记为已结算的记录
-            has_settlement_record = hasattr(contract, 'settlement') and contract.settlement is not None  # type: ignore[attr-defined]
-            has_settled_payment = contract.payments.filter(is_settled=True).exists()  # type: ignore[attr-defined]
-            is_ongoing = not (has_settlement_record or has_settled_payment)
+            # 判断是否在执行中：既没有结算记录，也没有标记为已结算的付款
+            is_ongoing = not summary.has_settlement
             
             # 补充协议数量
-            supplement_count = contract.supplements.count()  # type: ignore[attr-defined]
+            supplement_count = summary.supplement_count
             
             # 是否有履约评价
             has_evaluation = contract.evaluations.exists()  # type: ignore[attr-defined]
@@ -205,16 +285,16 @@ class SupplierAnalysisService:
             >>> stats = service.get_evaluation_statistics()
             >>> print(f"优秀率: {stats['excellent']/stats['total']*100:.1f}%")
         """
-        # 基础查询
-        evaluations = SupplierEvaluation.objects.filter(
-            comprehensive_score__isnull=False
+        # 评价按供应商名称一次分组统计，指定供应商时合并名称包含该供应商的各组
+        rows = SupplierDimension.evaluation_rows(
+            SupplierEvaluation.objects.filter(comprehensive_score__isnull=False)
         )
-        
-        # 如果指定供应商，进行筛选
         if supplier_name:
-            evaluations = evaluations.filter(supplier_name__icontains=supplier_name)
+            key = normalize_supplier_name(supplier_name)
+            rows = [row for row in rows if key in normalize_supplier_name(row['supplier_name'])]
+        stats = SupplierDimension.combine(rows)
         
-        total = evaluations.count()
+        total = stats['count']
         
         # 如果没有评价数据，返回空统计
         if total == 0:
@@ -229,57 +309,25 @@ class SupplierAnalysisService:
                 'score_distribution': [],
             }
         
-        # 按评分等级统计
-        excellent = evaluations.filter(comprehensive_score__gte=90).count()
-        good = evaluations.filter(
-            comprehensive_score__gte=80,
-            comprehensive_score__lt=90
-        ).count()
-        qualified = evaluations.filter(
-            comprehensive_score__gte=70,
-            comprehensive_score__lt=80
-        ).count()
-        unqualified = evaluations.filter(comprehensive_score__lt=70).count()
-        
-        # 计算平均分
-        aggregates = evaluations.aggregate(
-            avg_score=Avg('comprehensive_score'),
-            avg_last_score=Avg('last_evaluation_score')
-        )
-        
-        avg_score = aggregates['avg_score']
-        avg_last_score = aggregates['avg_last_score']
-        
-        # 分数段分布(每10分一档)
-        score_ranges = [
-            (0, 60, '0-59'),
-            (60, 70, '60-69'),
-            (70, 80, '70-79'),
-            (80, 90, '80-89'),
-            (90, 101, '90-100'),
-        ]
+        # 计算平均分（末次评分只统计已填写的记录）
+        avg_score = stats['score_sum'] / total
+        avg_last_score = stats['last_sum'] / stats['last_count'] if stats['last_count'] else None
         
-        score_distribution = []
-        for min_score, max_score, label in score_ranges:
-            count = evaluations.filter(
-                comprehensive_score__gte=min_score,
-                comprehensive_score__lt=max_score
-            ).count()
-            
-            percentage = (count / total * 100) if total > 0 else 0
-            
-            score_distribution.append({
+        score_distribution = [
+            {
                 'range': label,
-                'count': count,
-                'percentage': round(percentage, 1)
-            })
+                'count': stats[label],
+                'percentage': round(stats[label] / total * 100, 1)
+            }
+            for _, _, label in SCORE_RANGES
+        ]
         
         return {
             'total': total,
-            'excellent': excellent,
-            'good': good,
-            'qualified': qualified,
-            'unqualified': unqualified,
+            'excellent': stats['excellent'],
+            'good': stats['good'],
+            'qualified': stats['qualified'],
+            'unqualified': stats['unqualified'],
             'avg_score': round(avg_score, 2) if avg_score else None,
             'avg_last_score': round(avg_last_score, 2) if avg_last_score else None,
             'score_distribution': score_distribution,
@@ -430,56 +478,50 @@ class SupplierAnalysisService:
                 - total_evaluations (int): 该供应商的评价总数
                 - evaluation_count (int): 该供应商的评价记录数（同total_evaluations，为了向后兼容）
         """
-        from django.db.models import Q, Count
-        
         # 基础查询
         evaluations = SupplierEvaluation.objects.filter(
             comprehensive_score__isnull=False
-        ).select_related('contract')
+        )
         
         # 如果指定年度，则筛选该年度；否则获取所有年度
         if year is not None:
-            evaluations = evaluations.filter(created_at__year=year)
-        
-        # 先统计每个供应商的评价总数
-        supplier_counts = {}
-        all_evaluations_query = SupplierEvaluation.objects.filter(comprehensive_score__isnull=False)
-        if year is not None:
-            all_evaluations_query = all_evaluations_query.filter(created_at__year=year)
-        
-        count_result = all_evaluations_query.values('supplier_name').annotate(
-            total=Count('evaluation_code')
-        )
-        for item in count_result:
-            supplier_counts[item['supplier_name']] = item['total']
-        
-        # 按供应商分组，获取每个供应商的最新评价
+            evaluations = evaluations.filter(period_q('created_at', year, with_time=True))
+        
+        # 窗口函数一次查询：每个供应商名称只取最新一条评价，并带出该名称的评价总数
+        latest_per_name = evaluations.annotate(
+            _rank=Window(
+                RowNumber(),
+                partition_by=F('supplier_name'),
+                order_by=[F('created_at').desc(), F('pk').desc()],
+            ),
+            _name_total=Window(Count('pk'), partition_by=F('supplier_name')),
+        ).filter(_rank=1).select_related('contract')
+        
+        # 按归一化名称合并：取各写法中最新的一条，评价数累加
         supplier_latest = {}
-        for evaluation in evaluations:
-            supplier = evaluation.supplier_name
-            # 自动判断评价类别
-            evaluation_type = SupplierAnalysisService._determine_evaluation_type(evaluation)
-            
-            # 如果该供应商尚未记录，或当前评价更新
-            if (supplier not in supplier_latest or
-                evaluation.created_at > supplier_latest[supplier]['evaluation'].created_at):
-                supplier_latest[supplier] = {
-                    'evaluation': evaluation,
-                    'evaluation_type': evaluation_type
-                }
+        for evaluation in latest_per_name:
+            key = normalize_supplier_name(evaluation.supplier_name)
+            data = supplier_latest.get(key)
+            if data is None:
+                supplier_latest[key] = {'evaluation': evaluation, 'total': evaluation._name_total}
+                continue
+            data['total'] += evaluation._name_total
+            if evaluation.created_at > data['evaluation'].created_at:
+                data['evaluation'] = evaluation
         
         # 构建结果列表
         result = []
-        for supplier_name, data in supplier_latest.items():
+        for data in supplier_latest.values():
             evaluation = data['evaluation']
-            total_evals = supplier_counts.get(supplier_name, 1)
+            total_evals = data['total']
             result.append({
-                'supplier_name': supplier_name,
+                'supplier_name': evaluation.supplier_name,
                 'evaluation': evaluation,
                 'contract_name': evaluation.contract.contract_name if evaluation.contract else '-',
                 'comprehensive_score': evaluation.comprehensive_score,
                 'last_evaluation_score': evaluation.last_evaluation_score,
-                'evaluation_type': data['evaluation_type'],
+                # 自动判断评价类别
+                'evaluation_type': SupplierAnalysisService._determine_evaluation_type(evaluation),
                 'evaluation_result': evaluation.get_score_level(),
                 'total_evaluations': total_evals,
                 'evaluation_count': total_evals,  # 向后兼容
@@ -17,6 +17,7 @@ from supplier_eval.models import SupplierEvaluation, SupplierInterview
 from supplier_eval.services import SupplierAnalysisService
 from contract.models import Contract
 from project.utils.filters import apply_text_filter, apply_multi_field_search
+from project.utils.date_helpers import period_q
 from project.models_operation_log import OperationLog
 from project.utils.operation_log_helpers import get_client_ip
 
@@ -143,7 +144,7 @@ def supplier_evaluation_list(request):
     if year_filter:
         # 特定年度的统计
         year_evaluations = SupplierEvaluation.objects.filter(
-            created_at__year=year_filter,
+            period_q('created_at', year_filter, with_time=True),
             comprehensive_score__isnull=False
         )
     else: